@@ -0,0 +1,39 @@
+"""Add analytics rollups for retention aggregation
+
+Revision ID: 3a7c1e9d5b20
+Revises: 0b2f849dc961
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c1e9d5b20'
+down_revision: Union[str, Sequence[str], None] = '0b2f849dc961'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('analytics_rollups',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('source_table', sa.String(length=100), nullable=False),
+        sa.Column('period', sa.String(length=10), nullable=False),
+        sa.Column('dimension', sa.String(length=100), nullable=True),
+        sa.Column('event_count', sa.Integer(), nullable=True),
+        sa.Column('metrics', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_analytics_rollups_source_period', 'analytics_rollups', ['source_table', 'period'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_analytics_rollups_source_period', table_name='analytics_rollups')
+    op.drop_table('analytics_rollups')
@@ -0,0 +1,34 @@
+"""Add composite indexes for hot query paths
+
+Revision ID: 5c8d2f6a1e47
+Revises: 3a7c1e9d5b20
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8d2f6a1e47'
+down_revision: Union[str, Sequence[str], None] = '3a7c1e9d5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_messages_conversation_created', 'messages', ['conversation_id', 'created_at'])
+    op.create_index('ix_document_chunks_document_index', 'document_chunks', ['document_id', 'chunk_index'])
+    op.create_index('ix_conversations_active_updated', 'conversations', ['is_active', 'updated_at'])
+    op.create_index('ix_search_queries_created_at', 'search_queries', ['created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_search_queries_created_at', table_name='search_queries')
+    op.drop_index('ix_conversations_active_updated', table_name='conversations')
+    op.drop_index('ix_document_chunks_document_index', table_name='document_chunks')
+    op.drop_index('ix_messages_conversation_created', table_name='messages')
@@ -0,0 +1,66 @@
+"""Store message tool_calls and extra_data as native JSON
+
+Revision ID: 8e1b4d7c2a93
+Revises: 5c8d2f6a1e47
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+import json
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e1b4d7c2a93'
+down_revision: Union[str, Sequence[str], None] = '5c8d2f6a1e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger(f"alembic.runtime.migration.{revision}")
+
+
+def _null_invalid_json(column: str) -> None:
+    """Set values of a text column that are not valid JSON (e.g. empty strings) to NULL."""
+    bind = op.get_bind()
+    messages = sa.table('messages', sa.column('id', sa.String()), sa.column(column, sa.Text()))
+    rows = bind.execution_options(stream_results=True).execute(
+        sa.select(messages.c.id, messages.c[column]).where(messages.c[column].isnot(None))
+    )
+    invalid = []
+    for message_id, value in rows:
+        try:
+            json.loads(value)
+        except (TypeError, ValueError):
+            invalid.append(message_id)
+
+    for start in range(0, len(invalid), 1000):
+        bind.execute(
+            sa.update(messages).where(messages.c.id.in_(invalid[start:start + 1000])).values({column: None})
+        )
+    if invalid:
+        logger.warning(f"Set {len(invalid)} messages.{column} values that were not valid JSON to NULL")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Values were written with json.dumps; anything else (hand edits, empty strings)
+    # would make the cast fail, so it is cleared first
+    _null_invalid_json('tool_calls')
+    _null_invalid_json('extra_data')
+    with op.batch_alter_table('messages') as batch_op:
+        batch_op.alter_column('tool_calls', existing_type=sa.Text(), type_=sa.JSON(),
+                              existing_nullable=True, postgresql_using='tool_calls::json')
+        batch_op.alter_column('extra_data', existing_type=sa.Text(), type_=sa.JSON(),
+                              existing_nullable=True, postgresql_using='extra_data::json')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('messages') as batch_op:
+        batch_op.alter_column('extra_data', existing_type=sa.JSON(), type_=sa.Text(),
+                              existing_nullable=True, postgresql_using='extra_data::text')
+        batch_op.alter_column('tool_calls', existing_type=sa.JSON(), type_=sa.Text(),
+                              existing_nullable=True, postgresql_using='tool_calls::text')
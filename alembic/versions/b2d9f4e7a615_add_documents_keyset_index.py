@@ -0,0 +1,28 @@
+"""Add a keyset pagination index on documents
+
+Revision ID: b2d9f4e7a615
+Revises: 8e1b4d7c2a93
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d9f4e7a615'
+down_revision: Union[str, Sequence[str], None] = '8e1b4d7c2a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_documents_active_created', 'documents', ['is_active', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_active_created', table_name='documents')
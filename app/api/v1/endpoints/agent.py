@@ -1,4 +1,5 @@
 # app/api/v1/endpoints/agent.py
+import asyncio
 import logging
 import html
 import re
@@ -6,8 +7,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.core.agent import agent_graph_app
+from app.core.agent import run_agent_graph, agent_slot
+from app.core.admission import DEFAULT_PRIORITY
 from app.core.multi_agent import multi_agent_orchestrator
+from app.core.security import User, get_current_user_optional
 from app.database.database import get_db
 from app.services.chat_history import ChatHistoryService
 from app.services.agent_memory import AgentMemoryService
@@ -18,7 +21,9 @@ from app.core.exceptions import (
     AgentProcessingException,
     ValidationException,
     ValidationErrorDetail,
-    ExternalServiceException
+    ExternalServiceException,
+    AgentQueueFullException,
+    AgentQueueTimeoutException
 )
 
 logger = logging.getLogger(__name__)
@@ -67,7 +72,10 @@ def sanitize_input(text: str) -> str:
 
 # Keep the original simple endpoint for backward compatibility
 @router.post("/invoke")
-async def invoke_agent_simple(request: dict):
+async def invoke_agent_simple(
+    request: dict,
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
     """Simple agent invocation (backward compatibility)."""
     import time
     start_time = time.time()
@@ -94,9 +102,12 @@ async def invoke_agent_simple(request: dict):
         inputs = {"messages": [human_message]}
 
         try:
-            final_state = {}
-            for s in agent_graph_app.stream(inputs):
-                final_state.update(s)
+            final_state = await run_agent_graph(
+                inputs,
+                priority=int(request.get("priority", DEFAULT_PRIORITY)),
+                user_id=current_user.id if current_user else None,
+                user_roles=current_user.roles if current_user else None
+            )
 
             logger.info(f"Agent final_state: {final_state}")
 
@@ -141,6 +152,8 @@ async def invoke_agent_simple(request: dict):
                 "execution_time": execution_time
             }
 
+        except (AgentQueueFullException, AgentQueueTimeoutException):
+            raise
         except Exception as e:
             logger.error(f"Agent processing failed: {e}")
             raise AgentProcessingException(
@@ -149,7 +162,7 @@ async def invoke_agent_simple(request: dict):
                 processing_step="agent_execution"
             )
 
-    except (ValidationException, AgentProcessingException):
+    except (ValidationException, AgentProcessingException, AgentQueueFullException, AgentQueueTimeoutException):
         raise
     except Exception as e:
         logger.error(f"Unexpected error in agent endpoint: {e}")
@@ -164,6 +177,8 @@ async def invoke_agent_simple(request: dict):
 async def invoke_agent_with_conversation(
     request: AgentConversationRequest,
     use_multi_agent: bool = Query(False, description="Use multi-agent system for enhanced reasoning"),
+    priority: int = Query(DEFAULT_PRIORITY, ge=1, le=10, description="Admission priority (1-10)"),
+    current_user: Optional[User] = Depends(get_current_user_optional),
     db: AsyncSession = Depends(get_db)
 ):
     """Invoke agent with conversation context and history management."""
@@ -173,6 +188,8 @@ async def invoke_agent_with_conversation(
     try:
         conversation_id = request.conversation_id
         context_used = False
+        user_id = current_user.id if current_user else None
+        user_roles = current_user.roles if current_user else None
 
         # Handle conversation management only if saving is enabled
         if request.save_conversation:
@@ -196,10 +213,10 @@ async def invoke_agent_with_conversation(
             # Don't create conversation if not saving
             conversation_id = None
 
-        # Add user message to conversation if saving is enabled
-        user_message = None
+        # Add user message to conversation if saving is enabled. It is written before
+        # the run, so the question is kept even if the agent fails or is rejected.
         if request.save_conversation:
-            user_message = await ChatHistoryService.add_message(
+            await ChatHistoryService.add_message(
                 db=db,
                 conversation_id=conversation_id,
                 role="user",
@@ -218,11 +235,13 @@ async def invoke_agent_with_conversation(
                 current_query=request.input
             ) if conversation_id else request.input
 
-            # Execute simple multi-agent workflow
-            multi_result = multi_agent_orchestrator.execute_simple_query(
-                query=context_prompt,
-                context=""
-            )
+            # Execute simple multi-agent workflow off the event loop
+            async with agent_slot(priority, user_id, user_roles):
+                multi_result = await asyncio.to_thread(
+                    multi_agent_orchestrator.execute_simple_query,
+                    context_prompt,
+                    ""
+                )
 
             agent_response = str(multi_result.get("result", ""))
             # Create a simple dict structure instead of a dynamic object
@@ -258,9 +277,8 @@ async def invoke_agent_with_conversation(
 
             # Invoke the agent with context
             inputs = {"messages": context_messages}
-            final_state = {}
-            for s in agent_graph_app.stream(inputs):
-                final_state.update(s)
+            final_state = await run_agent_graph(inputs, priority=priority,
+                                                user_id=user_id, user_roles=user_roles)
 
             # Extract agent response
             agent_response = ""
@@ -316,7 +334,8 @@ async def invoke_agent_with_conversation(
             execution_time=execution_time
         )
 
-    except HTTPException:
+    except (HTTPException, AgentQueueFullException, AgentQueueTimeoutException):
+        # Admission rejections keep their 429 / 503 responses
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Agent invocation failed: {str(e)}")
@@ -5,6 +5,7 @@ from typing import List, Optional
 
 from app.database.database import get_db
 from app.services.chat_history import ChatHistoryService
+from app.services.pagination import InvalidCursorError
 from app.api.v1.schemas.chat_history import (
     ConversationCreate,
     ConversationResponse,
@@ -39,27 +40,46 @@ async def create_conversation(
 @router.get("/conversations", response_model=ConversationListResponse)
 async def get_conversations(
     limit: int = Query(50, ge=1, le=100, description="Number of conversations to return"),
-    offset: int = Query(0, ge=0, description="Number of conversations to skip"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    offset: int = Query(0, ge=0, description="Number of conversations to skip (deprecated, use cursor)"),
     active_only: bool = Query(True, description="Only return active conversations"),
+    include_total: bool = Query(False, description="Include the total number of conversations (extra COUNT query)"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get a list of conversations."""
+    """Get a list of conversations, most recently updated first."""
     try:
-        conversations = await ChatHistoryService.get_conversations(
+        if offset and not cursor:
+            conversations = await ChatHistoryService.get_conversations(
+                db=db,
+                limit=limit,
+                offset=offset,
+                active_only=active_only
+            )
+            total = await ChatHistoryService.count_conversations(db, active_only) if include_total else None
+            return ConversationListResponse(
+                conversations=conversations,
+                total=total,
+                limit=limit,
+                offset=offset,
+                has_more=len(conversations) == limit
+            )
+
+        page = await ChatHistoryService.get_conversations_page(
             db=db,
             limit=limit,
-            offset=offset,
-            active_only=active_only
+            cursor=cursor,
+            active_only=active_only,
+            include_total=include_total
         )
-
-        # For simplicity, we're not implementing total count query here
-        # In production, you might want to add a separate count query
         return ConversationListResponse(
-            conversations=conversations,
-            total=len(conversations),
+            conversations=page.items,
+            total=page.total,
             limit=limit,
-            offset=offset
+            next_cursor=page.next_cursor,
+            has_more=page.has_more
         )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve conversations: {str(e)}")
 
@@ -192,10 +212,12 @@ async def add_message(
 async def get_messages(
     conversation_id: str,
     limit: int = Query(100, ge=1, le=500, description="Number of messages to return"),
-    offset: int = Query(0, ge=0, description="Number of messages to skip"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    offset: int = Query(0, ge=0, description="Number of messages to skip (deprecated, use cursor)"),
+    include_total: bool = Query(False, description="Include the total number of messages (extra COUNT query)"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get messages for a specific conversation."""
+    """Get messages for a specific conversation, oldest first."""
     try:
         # Verify conversation exists
         conversation = await ChatHistoryService.get_conversation(
@@ -207,20 +229,40 @@ async def get_messages(
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
 
-        messages = await ChatHistoryService.get_messages(
+        if offset and not cursor:
+            messages = await ChatHistoryService.get_messages(
+                db=db,
+                conversation_id=conversation_id,
+                limit=limit,
+                offset=offset
+            )
+            total = await ChatHistoryService.count_messages(db, conversation_id) if include_total else None
+            return MessageListResponse(
+                messages=messages,
+                conversation_id=conversation_id,
+                total=total,
+                limit=limit,
+                offset=offset,
+                has_more=len(messages) == limit
+            )
+
+        page = await ChatHistoryService.get_messages_page(
             db=db,
             conversation_id=conversation_id,
             limit=limit,
-            offset=offset
+            cursor=cursor,
+            include_total=include_total
         )
-
         return MessageListResponse(
-            messages=messages,
+            messages=page.items,
             conversation_id=conversation_id,
-            total=len(messages),
+            total=page.total,
             limit=limit,
-            offset=offset
+            next_cursor=page.next_cursor,
+            has_more=page.has_more
         )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -10,9 +10,11 @@ from typing import Optional, List
 
 from app.database.database import get_db
 from app.services.document_service import DocumentService
+from app.services.pagination import InvalidCursorError
 from app.core.rag_system import rag_system
 from app.core.vector_store import vector_store
-from app.core.security import get_current_user, User, check_user_access
+from app.core.security import get_current_user, get_current_user_optional, User, check_user_access
+from app.core.fair_scheduler import fair_scheduler
 from app.api.v1.schemas.documents import (
     DocumentCreate,
     DocumentResponse,
@@ -567,6 +569,7 @@ async def analyze_document_content(
 @router.post("/analyze/batch", response_model=BatchAnalysisResponse)
 async def batch_analyze_documents(
     request: BatchAnalysisRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional),
     db: AsyncSession = Depends(get_db)
 ):
     """Perform batch content analysis on multiple documents."""
@@ -590,14 +593,19 @@ async def batch_analyze_documents(
                     })
                     continue
 
-                # Perform analysis
-                analysis_result = await ContentAnalysisService.analyze_document_content(
-                    db=db,
-                    document=document,
-                    include_summary=request.include_summary,
-                    include_tags=request.include_tags,
-                    include_entities=request.include_entities
-                )
+                # Perform analysis, taking one fair-share slot per document so
+                # interactive users can interleave with large batches
+                async with fair_scheduler.slot(
+                    current_user.id if current_user else None,
+                    current_user.roles if current_user else None
+                ):
+                    analysis_result = await ContentAnalysisService.analyze_document_content(
+                        db=db,
+                        document=document,
+                        include_summary=request.include_summary,
+                        include_tags=request.include_tags,
+                        include_entities=request.include_entities
+                    )
 
                 results.append(ContentAnalysisResponse(
                     document_id=analysis_result["document_id"],
@@ -1065,20 +1073,36 @@ async def list_documents(
     offset: int = 0,
     tags: Optional[str] = None,
     content_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
-    """List documents with optional filtering."""
+    """List documents with optional filtering, newest first (pass next_cursor as cursor for the next page)."""
     try:
         # Parse tags if provided
         tag_list = tags.split(",") if tags else None
         
-        documents, total = await DocumentService.list_documents(
-            db=db,
-            limit=limit,
-            offset=offset,
-            tags=tag_list,
-            content_type=content_type
-        )
+        next_cursor = None
+        if offset and not cursor:
+            # Deprecated offset pagination
+            documents, total = await DocumentService.list_documents(
+                db=db,
+                limit=limit,
+                offset=offset,
+                tags=tag_list,
+                content_type=content_type
+            )
+            has_more = len(documents) == limit
+        else:
+            page = await DocumentService.list_documents_page(
+                db=db,
+                limit=limit,
+                cursor=cursor,
+                tags=tag_list,
+                content_type=content_type,
+                include_total=include_total
+            )
+            documents, total, next_cursor, has_more = page.items, page.total, page.next_cursor, page.has_more
         
         document_responses = [
             DocumentResponse(
@@ -1103,9 +1127,13 @@ async def list_documents(
             documents=document_responses,
             total=total,
             limit=limit,
-            offset=offset
+            offset=offset,
+            next_cursor=next_cursor,
+            has_more=has_more
         )
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing documents: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to list documents: {str(e)}")
@@ -1220,20 +1248,25 @@ async def semantic_search(
 @router.post("/rag")
 async def rag_query(
     request: RAGRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional),
     db: AsyncSession = Depends(get_db)
 ):
     """Perform Retrieval-Augmented Generation query."""
     try:
-        rag_response = await rag_system.retrieve_and_generate(
-            db=db,
-            query=request.query,
-            conversation_id=request.conversation_id,
-            search_limit=request.search_limit,
-            score_threshold=request.score_threshold,
-            filter_conditions=request.filter_conditions,
-            use_multi_agent=request.use_multi_agent,
-            search_type=request.search_type.value
-        )
+        async with fair_scheduler.slot(
+            current_user.id if current_user else None,
+            current_user.roles if current_user else None
+        ):
+            rag_response = await rag_system.retrieve_and_generate(
+                db=db,
+                query=request.query,
+                conversation_id=request.conversation_id,
+                search_limit=request.search_limit,
+                score_threshold=request.score_threshold,
+                filter_conditions=request.filter_conditions,
+                use_multi_agent=request.use_multi_agent,
+                search_type=request.search_type.value
+            )
         
         # Convert retrieved documents to SearchResult format
         search_results = [
@@ -1270,6 +1303,8 @@ async def rag_query(
             "timestamp": rag_response["timestamp"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in RAG query: {e}")
         raise HTTPException(status_code=500, detail=f"RAG query failed: {str(e)}")
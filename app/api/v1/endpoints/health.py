@@ -4,7 +4,9 @@ Health check endpoints for monitoring LLM system status and performance.
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
 from typing import Dict, Any
+import asyncio
 import logging
 import time
 
@@ -15,6 +17,15 @@ from app.core.llm_config import (
     get_pool_stats,
     reset_llm_metrics
 )
+from app.core.fair_scheduler import get_scheduler_stats
+from app.core.step_cache import get_step_cache_stats, step_result_cache
+from app.core.tools import get_search_tool_stats
+from app.core.admission import get_admission_stats
+from app.core.task_events import get_task_event_stats
+from app.core.claim_check import get_claim_check_stats
+from app.core.queue_metrics import get_queue_metrics, render_prometheus
+from app.database.database import get_database_pool_stats
+from app.services.analytics_buffer import get_analytics_buffer_stats
 
 logger = logging.getLogger(__name__)
 
@@ -107,6 +118,194 @@ async def get_pool_status():
         logger.error(f"Failed to get pool status: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get pool status: {str(e)}")
 
+@router.get("/health/scheduler", response_model=Dict[str, Any])
+async def get_scheduler_status():
+    """
+    Get fair-share scheduler status with per-user queue metrics.
+    
+    Returns:
+        Dictionary with scheduler capacity, role weights and per-user consumption
+    """
+    try:
+        return {
+            "status": "success",
+            "scheduler": get_scheduler_stats()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get scheduler status: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get scheduler status: {str(e)}")
+
+@router.get("/health/workflow-cache", response_model=Dict[str, Any])
+async def get_workflow_cache_status():
+    """
+    Get multi-agent workflow step cache statistics.
+    
+    Returns:
+        Dictionary with cache size, TTL and hit rate
+    """
+    try:
+        return {
+            "status": "success",
+            "cache": get_step_cache_stats()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get workflow cache status: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get workflow cache status: {str(e)}")
+
+@router.post("/health/workflow-cache/clear")
+async def clear_workflow_cache():
+    """
+    Clear the multi-agent workflow step cache.
+    
+    Returns:
+        Confirmation of cache clear
+    """
+    try:
+        step_result_cache.clear()
+        return {
+            "status": "success",
+            "message": "Workflow step cache has been cleared"
+        }
+    except Exception as e:
+        logger.error(f"Failed to clear workflow cache: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to clear workflow cache: {str(e)}")
+
+@router.get("/health/tools", response_model=Dict[str, Any])
+async def get_tools_status():
+    """
+    Get search tool statistics.
+    
+    Returns:
+        Dictionary with the active search backend, cache hit rate and rate limiter state
+    """
+    try:
+        return {
+            "status": "success",
+            "search": get_search_tool_stats()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get tool status: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get tool status: {str(e)}")
+
+@router.get("/health/agent-queue", response_model=Dict[str, Any])
+async def get_agent_queue_status():
+    """
+    Get agent admission queue status.
+    
+    Returns:
+        Dictionary with queue depth, admissions, rejections and queue-wait/run-time histograms
+    """
+    try:
+        return {
+            "status": "success",
+            "agent_queue": get_admission_stats()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get agent queue status: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get agent queue status: {str(e)}")
+
+@router.get("/health/task-events", response_model=Dict[str, Any])
+async def get_task_events_status():
+    """
+    Get task event hub status.
+    
+    Returns:
+        Dictionary with the pub/sub subscription state, watcher counts and event counters
+    """
+    try:
+        return {
+            "status": "success",
+            "task_events": get_task_event_stats()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get task event status: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get task event status: {str(e)}")
+
+@router.get("/health/claim-check", response_model=Dict[str, Any])
+async def get_claim_check_status():
+    """
+    Get claim-check storage status.
+    
+    Returns:
+        Dictionary with offloaded payload counts, stored bytes and broker bytes per task
+    """
+    try:
+        return {
+            "status": "success",
+            "claim_check": get_claim_check_stats()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get claim-check status: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get claim-check status: {str(e)}")
+
+@router.get("/health/queues", response_model=Dict[str, Any])
+async def get_queue_status():
+    """
+    Get Celery queue depth and worker saturation for autoscaling.
+    
+    Returns:
+        Dictionary with per-queue length and oldest-message age, active and reserved
+        tasks per worker, and task runtime / wait histograms
+    """
+    try:
+        # Broker reads and worker inspection block; keep them off the event loop
+        return {
+            "status": "success",
+            "queues": await asyncio.to_thread(get_queue_metrics)
+        }
+    except Exception as e:
+        logger.error(f"Failed to get queue metrics: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get queue metrics: {str(e)}")
+
+@router.get("/health/queues/prometheus", response_class=PlainTextResponse)
+async def get_queue_metrics_prometheus():
+    """
+    Get Celery queue depth and worker saturation in the Prometheus text format.
+    
+    Returns:
+        Prometheus exposition text for scraping by Prometheus, KEDA or an HPA adapter
+    """
+    try:
+        metrics = await asyncio.to_thread(get_queue_metrics)
+        return PlainTextResponse(render_prometheus(metrics), media_type="text/plain; version=0.0.4")
+    except Exception as e:
+        logger.error(f"Failed to render queue metrics: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to render queue metrics: {str(e)}")
+
+@router.get("/health/database", response_model=Dict[str, Any])
+async def get_database_status():
+    """
+    Get database engine pool status.
+    
+    Returns:
+        Dictionary with pool size, overflow and checkout metrics of the async and sync engines
+    """
+    try:
+        return {
+            "status": "success",
+            "database": get_database_pool_stats()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get database pool status: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get database pool status: {str(e)}")
+
+@router.get("/health/analytics-buffer", response_model=Dict[str, Any])
+async def get_analytics_buffer_status():
+    """
+    Get analytics write buffer status.
+
+    Returns:
+        Dictionary with pending events, flush counters and dropped events by reason
+    """
+    try:
+        return {
+            "status": "success",
+            "analytics_buffer": get_analytics_buffer_stats()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get analytics buffer status: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get analytics buffer status: {str(e)}")
+
 @router.get("/health/detailed", response_model=Dict[str, Any])
 async def get_detailed_health():
     """
@@ -1,14 +1,18 @@
 # app/api/v1/endpoints/multi_agent.py
+import json
 import logging
 import time
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from app.database.database import get_db
 from app.services.chat_history import ChatHistoryService
 from app.services.agent_memory import AgentMemoryService
 from app.core.multi_agent import multi_agent_orchestrator
+from app.core.fair_scheduler import fair_scheduler
+from app.core.security import User, get_current_user_optional
 from app.api.v1.schemas.multi_agent import (
     MultiAgentRequest,
     MultiAgentResponse,
@@ -16,8 +20,7 @@ from app.api.v1.schemas.multi_agent import (
     AgentMemoryRequest,
     AgentMemoryResponse,
     ConversationSummaryResponse,
-    AgentPerformanceResponse,
-    WorkflowType
+    AgentPerformanceResponse
 )
 
 logger = logging.getLogger(__name__)
@@ -26,6 +29,7 @@ router = APIRouter()
 @router.post("/execute")
 async def execute_multi_agent_task(
     request: dict,
+    current_user: Optional[User] = Depends(get_current_user_optional),
     db: AsyncSession = Depends(get_db)
 ):
     """Execute a multi-agent task with simplified interface."""
@@ -38,21 +42,21 @@ async def execute_multi_agent_task(
         if not input_text:
             raise HTTPException(status_code=422, detail="Input is required")
 
-        # Execute based on workflow type
-        if workflow_type == "simple_research":
-            result = multi_agent_orchestrator.execute_simple_query(
-                query=input_text,
-                context=request.get("context", "")
-            )
-        elif workflow_type in ["complex_analysis", "research_analyze_write"]:
-            # For complex workflows, use simple query for now
-            result = multi_agent_orchestrator.execute_simple_query(
-                query=input_text,
-                context=request.get("context", "")
-            )
-        else:
+        if workflow_type not in ["simple_research", "complex_analysis", "research_analyze_write"]:
             raise HTTPException(status_code=422, detail=f"Unsupported workflow type: {workflow_type}")
 
+        # Execute within the caller's fair share of agent capacity
+        async with fair_scheduler.slot(
+            current_user.id if current_user else None,
+            current_user.roles if current_user else None
+        ):
+            result = await multi_agent_orchestrator.execute_workflow(
+                workflow_type=workflow_type,
+                input_data=input_text,
+                context=request.get("context", ""),
+                conversation_id=request.get("conversation_id")
+            )
+
         execution_time = time.time() - start_time
 
         # Determine if context was used
@@ -79,6 +83,7 @@ async def execute_multi_agent_task(
 @router.post("/workflow", response_model=MultiAgentResponse)
 async def execute_multi_agent_workflow(
     request: MultiAgentRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional),
     db: AsyncSession = Depends(get_db)
 ):
     """Execute a multi-agent workflow with the specified parameters."""
@@ -106,10 +111,10 @@ async def execute_multi_agent_workflow(
             )
             conversation_id = conversation.id
         
-        # Add user message if saving is enabled
-        user_message = None
+        # Add user message if saving is enabled. It is written before the run, so the
+        # question is kept even if the workflow fails.
         if request.save_conversation:
-            user_message = await ChatHistoryService.add_message(
+            await ChatHistoryService.add_message(
                 db=db,
                 conversation_id=conversation_id,
                 role="user",
@@ -126,21 +131,20 @@ async def execute_multi_agent_workflow(
             )
             context_used = True
         
-        # Execute the appropriate workflow
-        if request.workflow_type == WorkflowType.SIMPLE_RESEARCH:
-            result = multi_agent_orchestrator.execute_simple_query(
-                query=context_prompt,
-                context=""
-            )
-        else:
-            result = multi_agent_orchestrator.execute_complex_workflow(
-                query=context_prompt,
-                workflow_type=request.workflow_type.value
+        # Execute the appropriate workflow within the caller's fair share
+        async with fair_scheduler.slot(
+            current_user.id if current_user else None,
+            current_user.roles if current_user else None
+        ):
+            result = await multi_agent_orchestrator.execute_workflow(
+                workflow_type=request.workflow_type.value,
+                input_data=context_prompt,
+                conversation_id=conversation_id
             )
         
         execution_time = time.time() - start_time
         
-        # Store agent interactions in memory
+        # Store the workflow result and agent interactions in one transaction
         message_ids = []
         if request.save_conversation:
             # Create serializable extra_data (avoid complex objects)
@@ -152,19 +156,11 @@ async def execute_multi_agent_workflow(
                 "workflow_steps": result.get("workflow_steps", 1)
             }
 
-            # Store the agent workflow result
-            agent_message = await ChatHistoryService.add_message(
-                db=db,
-                conversation_id=conversation_id,
-                role="assistant",
-                content=str(result.get("result", "")),
-                extra_data=extra_data
-            )
-            
-            if agent_message:
-                message_ids.append(agent_message.id)
-            
-            # Store individual agent interactions with serializable data
+            turn_messages = [
+                {"role": "assistant", "content": str(result.get("result", "")), "extra_data": extra_data}
+            ]
+
+            # Individual agent interactions with serializable data
             for agent_name in result.get("agents_used", []):
                 # Create serializable input and output data
                 input_data = {
@@ -179,17 +175,16 @@ async def execute_multi_agent_workflow(
                     "note": result.get("note", "")
                 }
 
-                interaction_id = await AgentMemoryService.store_agent_interaction(
-                    db=db,
-                    conversation_id=conversation_id,
+                turn_messages.append(AgentMemoryService.agent_interaction_message(
                     agent_name=agent_name,
                     task_type=request.workflow_type.value,
                     input_data=input_data,
                     output_data=output_data,
                     metadata={"execution_time": execution_time}
-                )
-                if interaction_id:
-                    message_ids.append(interaction_id)
+                ))
+
+            stored_messages = await ChatHistoryService.add_messages(db, conversation_id, turn_messages)
+            message_ids = [message.id for message in stored_messages or []]
         
         # Extract string result from multi-agent response
         result_text = ""
@@ -211,7 +206,8 @@ async def execute_multi_agent_workflow(
             workflow_steps=result.get("workflow_steps", 1) if isinstance(result, dict) else 1,
             execution_time=execution_time,
             context_used=context_used,
-            message_ids=message_ids
+            message_ids=message_ids,
+            step_timings=result.get("step_timings", []) if isinstance(result, dict) else []
         )
         
     except HTTPException:
@@ -220,6 +216,51 @@ async def execute_multi_agent_workflow(
         logger.error(f"Multi-agent workflow execution failed: {e}")
         raise HTTPException(status_code=500, detail=f"Workflow execution failed: {str(e)}")
 
+@router.post("/workflow/stream")
+async def stream_multi_agent_workflow(
+    request: MultiAgentRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Execute a multi-agent workflow, streaming progress as newline-delimited JSON.
+
+    Emits a ``workflow_started`` event, one ``step_completed`` event per step as
+    soon as it finishes, and a final ``workflow_completed`` event with the result.
+    """
+    context_prompt = request.input
+    if request.conversation_id:
+        conversation = await ChatHistoryService.get_conversation(
+            db=db,
+            conversation_id=request.conversation_id,
+            include_messages=False
+        )
+        if not conversation:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        context_prompt = await AgentMemoryService.create_agent_context_prompt(
+            db=db,
+            conversation_id=request.conversation_id,
+            current_query=request.input
+        )
+
+    async def event_stream():
+        try:
+            async with fair_scheduler.slot(
+                current_user.id if current_user else None,
+                current_user.roles if current_user else None
+            ):
+                async for event in multi_agent_orchestrator.stream_workflow(
+                    workflow_type=request.workflow_type.value,
+                    input_data=context_prompt,
+                    conversation_id=request.conversation_id
+                ):
+                    yield json.dumps(event, default=str) + "\n"
+        except Exception as e:
+            logger.error(f"Streaming multi-agent workflow failed: {e}")
+            yield json.dumps({"event": "workflow_failed", "error": str(e)}) + "\n"
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
 @router.get("/capabilities", response_model=AgentCapabilitiesResponse)
 async def get_agent_capabilities():
     """Get information about available agents and their capabilities."""
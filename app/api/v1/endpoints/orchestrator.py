@@ -3,28 +3,60 @@ API endpoints for the enhanced orchestrator in Phase 5.
 Provides task management and orchestration capabilities.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+import json
+import logging
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Header, Query
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, List, Optional
 from app.api.v1.schemas.orchestrator import (
     TaskRequest as TaskRequestSchema,
     TaskResponse,
     TaskStatusResponse,
+    BatchTaskRequest,
+    BatchTaskResponse,
+    BatchStatusResponse,
     OrchestratorCapabilities,
     WorkflowRequest,
     WorkflowResponse,
     HealthCheckResponse
 )
 from app.core.orchestrator import enhanced_orchestrator, TaskType, ExecutionMode, TaskRequest
+from app.core.security import (
+    User, get_current_user, get_current_user_optional, require_authentication, require_role
+)
+from app.core.task_events import task_event_hub, FINAL_STATES
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Task types only admins may submit (retention cleanup hard-deletes data)
+ADMIN_TASK_TYPES = {TaskType.DATA_CLEANUP}
+
+
+def _check_task_access(task_type: TaskType, current_user: Optional[User]):
+    """Raise 401/403 if the caller may not submit tasks of this type."""
+    if task_type in ADMIN_TASK_TYPES:
+        require_role(require_authentication(current_user), "admin")
+
 @router.post("/execute", response_model=TaskResponse)
-async def execute_task(request: TaskRequestSchema):
+async def execute_task(
+    request: TaskRequestSchema,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
     """
     Execute a task through the orchestrator.
 
+    Asynchronous submissions are deduplicated per user: a submission with the
+    same ``Idempotency-Key`` header (or, for RAG queries and document batches of
+    an authenticated user, the same payload) as a running or recently completed
+    task of the same user returns that task's ID.
+
     Args:
         request: Task request containing type, payload, and execution mode
+        idempotency_key: Optional ``Idempotency-Key`` header, overrides the body field
+        current_user: Authenticated user, if any
 
     Returns:
         TaskResponse with execution results
@@ -36,9 +68,14 @@ async def execute_task(request: TaskRequestSchema):
             payload=request.payload,
             execution_mode=ExecutionMode(request.execution_mode),
             priority=request.priority,
-            timeout=request.timeout
+            timeout=request.timeout,
+            idempotency_key=idempotency_key or request.idempotency_key,
+            user_id=current_user.id if current_user else None,
+            user_roles=current_user.roles if current_user else None
         )
 
+        _check_task_access(task_request.task_type, current_user)
+
         # Execute task
         result = await enhanced_orchestrator.execute_task(task_request)
 
@@ -63,11 +100,88 @@ async def execute_task(request: TaskRequestSchema):
             error=result.error
         )
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid task type or execution mode: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Task execution failed: {str(e)}")
 
+@router.post("/batch", response_model=BatchTaskResponse)
+async def execute_task_batch(
+    request: BatchTaskRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """
+    Dispatch a batch of tasks as a single Celery group, or a chord when a reduce step is requested.
+
+    Args:
+        request: Tasks to dispatch and an optional reduce step
+        current_user: Authenticated user, if any
+
+    Returns:
+        BatchTaskResponse with the batch ID and the IDs of its tasks
+    """
+    try:
+        task_requests = [
+            TaskRequest(
+                task_type=TaskType(task.task_type),
+                payload=task.payload,
+                execution_mode=ExecutionMode.ASYNCHRONOUS,
+                priority=task.priority,
+                timeout=task.timeout,
+                user_id=current_user.id if current_user else None,
+                user_roles=current_user.roles if current_user else None
+            )
+            for task in request.tasks
+        ]
+        for task_request in task_requests:
+            _check_task_access(task_request.task_type, current_user)
+
+        result = await enhanced_orchestrator.execute_batch(
+            task_requests,
+            reducer=request.reduce.value if request.reduce else None
+        )
+
+        return BatchTaskResponse(
+            batch_id=result.batch_id,
+            status=result.status,
+            task_ids=result.task_ids,
+            total_tasks=len(result.task_ids),
+            reduce_task_id=result.reduce_task_id,
+            execution_time=result.execution_time
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch: {str(e)}")
+    except Exception as e:
+        logger.error(f"Batch dispatch failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Batch dispatch failed: {str(e)}")
+
+@router.get("/batch/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch_status(batch_id: str):
+    """
+    Get aggregate progress of a task batch.
+
+    Args:
+        batch_id: The batch ID returned by POST /batch
+
+    Returns:
+        BatchStatusResponse with aggregate progress, per-task states and the reduce step
+    """
+    try:
+        status_info = await enhanced_orchestrator.get_batch_status(batch_id)
+        if status_info is None:
+            raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+        return BatchStatusResponse(**status_info)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get batch status: {str(e)}")
+
 @router.get("/status/{task_id}", response_model=TaskStatusResponse)
 async def get_task_status(task_id: str):
     """
@@ -96,6 +210,111 @@ async def get_task_status(task_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get task status: {str(e)}")
 
+async def _task_status_event(task_id: str) -> Dict[str, Any]:
+    """Build a task event from a single result-backend read (used when no event was published)."""
+    status_info = await enhanced_orchestrator.get_task_status(task_id)
+    state = status_info.get("status", "unknown")
+    info = status_info.get("info")
+    return {
+        "task_id": task_id,
+        "state": state,
+        "status": info.get("status") if isinstance(info, dict) else None,
+        "progress": 1.0 if status_info.get("ready") else None,
+        "meta": info if isinstance(info, dict) else {},
+        "final": state in FINAL_STATES,
+        "result": status_info.get("result"),
+        "seq": 0,
+    }
+
+@router.get("/status/{task_id}/wait")
+async def wait_for_task_update(
+    task_id: str,
+    since: int = Query(0, ge=0, description="Sequence number of the last event received"),
+    timeout: float = Query(30.0, ge=0, le=60, description="Maximum seconds to wait for a new event")
+):
+    """
+    Long-poll for the next progress event of an asynchronous task.
+
+    Returns as soon as an event newer than ``since`` is published, or after
+    ``timeout`` seconds with ``timed_out`` set. Pass the returned ``seq`` as
+    ``since`` on the next request.
+
+    Args:
+        task_id: The task ID to watch
+        since: Sequence number of the last event received
+        timeout: Maximum seconds to wait
+
+    Returns:
+        The task event, or a timeout marker
+    """
+    try:
+        if not task_event_hub.running:
+            # No event stream in this process: fall back to one status read
+            return await _task_status_event(task_id)
+
+        event = await task_event_hub.wait_for_event(task_id, since=since, timeout=timeout)
+        if event is None:
+            if since == 0:
+                return await _task_status_event(task_id)
+            return {"task_id": task_id, "seq": since, "timed_out": True}
+        return event
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to wait for task update: {str(e)}")
+
+@router.get("/status/{task_id}/events")
+async def stream_task_events(
+    task_id: str,
+    since: int = Query(0, ge=0, description="Sequence number of the last event received"),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Stream progress events of an asynchronous task as Server-Sent Events.
+
+    The stream ends after the task's final event. Reconnecting clients resume
+    from the ``Last-Event-ID`` header.
+
+    Args:
+        task_id: The task ID to watch
+        since: Sequence number of the last event received
+        last_event_id: Standard SSE resume header, takes precedence over ``since``
+
+    Returns:
+        A ``text/event-stream`` response
+    """
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    async def event_stream():
+        try:
+            if not task_event_hub.running:
+                event = await _task_status_event(task_id)
+                yield f"event: task_update\ndata: {json.dumps(event, default=str)}\n\n"
+                return
+
+            if since == 0 and await task_event_hub.get_latest(task_id) is None:
+                # Nothing published yet; report the current state once
+                event = await _task_status_event(task_id)
+                yield f"event: task_update\ndata: {json.dumps(event, default=str)}\n\n"
+                if event["final"]:
+                    return
+
+            async for event in task_event_hub.stream(task_id, since=since):
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event.get('seq', 0)}\nevent: task_update\ndata: {json.dumps(event, default=str)}\n\n"
+
+        except Exception as e:
+            logger.error(f"Task event stream for {task_id} failed: {e}")
+            yield f"event: error\ndata: {json.dumps({'task_id': task_id, 'error': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/tasks")
 async def list_tasks(
     status: Optional[str] = None,
@@ -159,6 +378,20 @@ async def list_tasks(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list tasks: {str(e)}")
 
+@router.get("/scheduling")
+async def get_scheduling_stats():
+    """
+    Get task scheduling statistics.
+
+    Returns:
+        Scheduling delay per priority for synchronous (in-process queue) and
+        asynchronous (Celery dispatch to start) tasks
+    """
+    try:
+        return enhanced_orchestrator.get_scheduling_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get scheduling stats: {str(e)}")
+
 @router.get("/capabilities", response_model=OrchestratorCapabilities)
 async def get_orchestrator_capabilities():
     """
@@ -181,12 +414,16 @@ async def get_orchestrator_capabilities():
         raise HTTPException(status_code=500, detail=f"Failed to get capabilities: {str(e)}")
 
 @router.post("/workflow", response_model=WorkflowResponse)
-async def execute_workflow(request: WorkflowRequest):
+async def execute_workflow(
+    request: WorkflowRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
     """
     Execute a comprehensive workflow combining multiple system capabilities.
 
     Args:
         request: Workflow request with configuration and steps
+        current_user: Authenticated user, if any
 
     Returns:
         WorkflowResponse with workflow execution results
@@ -203,7 +440,9 @@ async def execute_workflow(request: WorkflowRequest):
                 "save_conversation": request.save_conversation
             },
             execution_mode=ExecutionMode(request.execution_mode),
-            priority=request.priority
+            priority=request.priority,
+            user_id=current_user.id if current_user else None,
+            user_roles=current_user.roles if current_user else None
         )
 
         # Execute workflow
@@ -218,6 +457,8 @@ async def execute_workflow(request: WorkflowRequest):
             error=result.error
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Workflow execution failed: {str(e)}")
 
@@ -251,6 +492,8 @@ async def perform_health_check(async_mode: bool = False):
             async_mode=async_mode
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
 
@@ -261,7 +504,8 @@ async def enhanced_agent_chat(
     use_multi_agent: bool = False,
     use_rag: bool = False,
     save_conversation: bool = True,
-    async_mode: bool = False
+    async_mode: bool = False,
+    current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """
     Execute an enhanced agent chat with optional multi-agent and RAG capabilities.
@@ -273,6 +517,7 @@ async def enhanced_agent_chat(
         use_rag: Whether to use RAG for document context
         save_conversation: Whether to save the conversation
         async_mode: Whether to execute asynchronously
+        current_user: Authenticated user, if any
 
     Returns:
         Enhanced chat response
@@ -289,7 +534,9 @@ async def enhanced_agent_chat(
                 "use_rag": use_rag,
                 "save_conversation": save_conversation
             },
-            execution_mode=execution_mode
+            execution_mode=execution_mode,
+            user_id=current_user.id if current_user else None,
+            user_roles=current_user.roles if current_user else None
         )
 
         result = await enhanced_orchestrator.execute_task(task_request)
@@ -303,6 +550,8 @@ async def enhanced_agent_chat(
             "error": result.error
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Enhanced chat failed: {str(e)}")
 
@@ -312,7 +561,8 @@ async def execute_multi_agent_workflow(
     input: str,
     conversation_id: Optional[str] = None,
     save_conversation: bool = True,
-    async_mode: bool = False
+    async_mode: bool = False,
+    current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """
     Execute a multi-agent workflow.
@@ -323,6 +573,7 @@ async def execute_multi_agent_workflow(
         conversation_id: Optional conversation ID
         save_conversation: Whether to save the conversation
         async_mode: Whether to execute asynchronously
+        current_user: Authenticated user, if any
 
     Returns:
         Multi-agent workflow response
@@ -338,7 +589,9 @@ async def execute_multi_agent_workflow(
                 "conversation_id": conversation_id,
                 "save_conversation": save_conversation
             },
-            execution_mode=execution_mode
+            execution_mode=execution_mode,
+            user_id=current_user.id if current_user else None,
+            user_roles=current_user.roles if current_user else None
         )
 
         result = await enhanced_orchestrator.execute_task(task_request)
@@ -352,6 +605,8 @@ async def execute_multi_agent_workflow(
             "error": result.error
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Multi-agent workflow failed: {str(e)}")
 
@@ -362,7 +617,8 @@ async def execute_rag_query(
     use_multi_agent: bool = False,
     conversation_id: Optional[str] = None,
     save_conversation: bool = True,
-    async_mode: bool = False
+    async_mode: bool = False,
+    current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """
     Execute a RAG query with optional multi-agent processing.
@@ -374,6 +630,7 @@ async def execute_rag_query(
         conversation_id: Optional conversation ID
         save_conversation: Whether to save the conversation
         async_mode: Whether to execute asynchronously
+        current_user: Authenticated user, if any
 
     Returns:
         RAG query response
@@ -390,7 +647,9 @@ async def execute_rag_query(
                 "conversation_id": conversation_id,
                 "save_conversation": save_conversation
             },
-            execution_mode=execution_mode
+            execution_mode=execution_mode,
+            user_id=current_user.id if current_user else None,
+            user_roles=current_user.roles if current_user else None
         )
 
         result = await enhanced_orchestrator.execute_task(task_request)
@@ -404,36 +663,48 @@ async def execute_rag_query(
             "error": result.error
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"RAG query failed: {str(e)}")
 
 @router.post("/system/cleanup")
-async def cleanup_system_data(days_old: int = 30):
+async def cleanup_system_data(days_old: Optional[int] = None, tables: Optional[str] = None,
+                              dry_run: bool = False, current_user: User = Depends(get_current_user)):
     """
-    Clean up old system data asynchronously.
+    Clean up old system data asynchronously by applying the retention policies (admin only).
 
     Args:
-        days_old: Number of days old data should be to be considered for cleanup
+        days_old: Override the tables' retention periods (it can only lengthen how long
+            soft-deleted documents are kept); omit to use the per-table policies
+        tables: Comma-separated tables to clean up (default: all with a policy)
+        dry_run: Only count the rows that would be removed
+        current_user: Authenticated user, who must be an admin
 
     Returns:
         Cleanup task response
     """
     try:
+        require_role(current_user, "admin")
+        table_list = [table.strip() for table in tables.split(",") if table.strip()] if tables else None
         task_request = TaskRequest(
             task_type=TaskType.DATA_CLEANUP,
-            payload={"days_old": days_old},
+            payload={"days_old": days_old, "tables": table_list, "dry_run": dry_run},
             execution_mode=ExecutionMode.ASYNCHRONOUS
         )
 
         result = await enhanced_orchestrator.execute_task(task_request)
 
+        retention = f"older than {days_old} days" if days_old is not None else "past its retention period"
         return {
             "task_id": result.task_id,
             "status": result.status,
-            "message": f"Data cleanup task dispatched for data older than {days_old} days",
+            "message": f"Data cleanup task dispatched for data {retention}",
             "execution_time": result.execution_time
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Data cleanup failed: {str(e)}")
 
@@ -4,6 +4,7 @@ GraphQL resolvers for the GremlinsAI backend.
 Contains resolver functions for GraphQL queries, mutations, and subscriptions.
 """
 
+import asyncio
 import logging
 from typing import Optional, List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,6 +14,7 @@ from app.services.chat_history import ChatHistoryService
 from app.services.document_service import DocumentService
 from app.services.agent_memory import AgentMemoryService
 from app.core.multi_agent import multi_agent_orchestrator
+from app.core.fair_scheduler import fair_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -53,15 +55,22 @@ async def conversation_resolver(conversation_id: str) -> Optional[Dict[str, Any]
         return None
 
 
-async def conversations_resolver(limit: int = 50, offset: int = 0) -> Dict[str, Any]:
-    """Resolve conversations list with pagination."""
+async def conversations_resolver(limit: int = 50, offset: int = 0,
+                                 cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Resolve conversations list with cursor pagination (offset is deprecated)."""
     try:
         async with AsyncSessionLocal() as db:
-            conversations = await ChatHistoryService.get_conversations(
-                db=db,
-                limit=limit,
-                offset=offset
-            )
+            if offset and not cursor:
+                conversations = await ChatHistoryService.get_conversations(
+                    db=db,
+                    limit=limit,
+                    offset=offset
+                )
+                next_cursor = None
+            else:
+                page = await ChatHistoryService.get_conversations_page(db=db, limit=limit, cursor=cursor)
+                conversations, next_cursor = page.items, page.next_cursor
+            total = await ChatHistoryService.count_conversations(db)
             
             return {
                 "conversations": [
@@ -73,11 +82,12 @@ async def conversations_resolver(limit: int = 50, offset: int = 0) -> Dict[str,
                         "is_active": conv.is_active,
                         "messages": []  # Don't load messages for list view
                     }
-                    for conv in conversations.conversations
+                    for conv in conversations
                 ],
-                "total": conversations.total,
+                "total": total,
                 "limit": limit,
-                "offset": offset
+                "offset": offset,
+                "next_cursor": next_cursor
             }
     except Exception as e:
         logger.error(f"Error resolving conversations: {e}")
@@ -85,7 +95,8 @@ async def conversations_resolver(limit: int = 50, offset: int = 0) -> Dict[str,
             "conversations": [],
             "total": 0,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": None
         }
 
 
@@ -206,14 +217,13 @@ async def add_message_resolver(conversation_id: str, role: str, content: str,
 
 
 async def execute_agent_resolver(input_data: str, workflow_type: str = "simple_research", 
-                                conversation_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
-    """Resolve agent execution."""
+                                conversation_id: Optional[str] = None, user_id: Optional[str] = None,
+                                user_roles: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """Resolve agent execution within the caller's fair share."""
     try:
-        # Execute multi-agent workflow
-        result = multi_agent_orchestrator.execute_simple_query(
-            query=input_data,
-            context=""
-        )
+        # Execute multi-agent workflow off the event loop
+        async with fair_scheduler.slot(user_id, user_roles):
+            result = await asyncio.to_thread(multi_agent_orchestrator.execute_simple_query, input_data, "")
         
         return {
             "output": result.get("result", ""),
@@ -4,9 +4,12 @@ GraphQL schema implementation for Phase 6: API Modernization & Real-time Communi
 Provides modern GraphQL API alongside existing REST endpoints.
 """
 
+import asyncio
+import json
 import logging
 import strawberry
 import typing
+from strawberry.types import Info
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -15,11 +18,21 @@ from app.database.database import AsyncSessionLocal
 from app.services.chat_history import ChatHistoryService
 from app.services.document_service import DocumentService
 from app.core.multi_agent import multi_agent_orchestrator
+from app.core.fair_scheduler import fair_scheduler
+from app.core.security import User, authenticate_request
 from app.core.orchestrator import enhanced_orchestrator, TaskType, ExecutionMode, TaskRequest
 
 logger = logging.getLogger(__name__)
 
 
+async def _current_user(info: Info) -> Optional[User]:
+    """Get the authenticated caller of an operation (None for anonymous callers), once per request."""
+    if "current_user" not in info.context:
+        request = info.context.get("request")
+        info.context["current_user"] = await authenticate_request(request) if request is not None else None
+    return info.context["current_user"]
+
+
 @strawberry.type
 class Message:
     """GraphQL type for chat messages."""
@@ -46,6 +59,8 @@ class Conversation:
     total: Optional[int] = None
     limit: Optional[int] = None
     offset: Optional[int] = None
+    nextCursor: Optional[str] = None
+    hasMore: Optional[bool] = None
 
 
 @strawberry.type
@@ -60,6 +75,15 @@ class Document:
     tags: Optional[List[str]]
 
 
+@strawberry.type
+class DocumentPage:
+    """GraphQL type for a cursor-paginated page of documents."""
+    documents: typing.List[Document]
+    nextCursor: Optional[str]
+    hasMore: bool
+    total: Optional[int] = None
+
+
 @strawberry.type
 class Agent:
     """GraphQL type for individual agents."""
@@ -192,6 +216,26 @@ class TaskInput:
     priority: int = 5
 
 
+def _json_text(value: Any) -> Optional[str]:
+    """Render a JSON column value (tool_calls, extra_data) as the JSON string the schema exposes."""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def _document_type(doc) -> Document:
+    """Convert a document model to its GraphQL type."""
+    return Document(
+        id=doc.id,
+        title=doc.title,
+        content_type=doc.content_type,
+        file_size=doc.file_size,
+        created_at=doc.created_at,
+        updated_at=doc.updated_at,
+        tags=doc.tags
+    )
+
+
 @strawberry.type
 class Query:
     """GraphQL Query root type."""
@@ -216,8 +260,8 @@ class Query:
                         role=msg.role,
                         content=msg.content,
                         created_at=msg.created_at,
-                        tool_calls=msg.tool_calls,
-                        extra_data=msg.extra_data
+                        tool_calls=_json_text(msg.tool_calls),
+                        extra_data=_json_text(msg.extra_data)
                     )
                     for msg in conversation.messages
                 ]
@@ -236,15 +280,29 @@ class Query:
             return None
 
     @strawberry.field
-    async def conversations(self, limit: int = 50, offset: int = 0) -> Optional[Conversation]:
-        """Fetch conversations with pagination."""
+    async def conversations(self, limit: int = 50, offset: int = 0, cursor: Optional[str] = None,
+                            includeTotal: bool = False) -> Optional[Conversation]:
+        """Fetch conversations, most recently updated first (pass nextCursor as cursor for the next page)."""
         try:
             async with AsyncSessionLocal() as db:
-                conversations_list = await ChatHistoryService.get_conversations(
-                    db=db,
-                    limit=limit,
-                    offset=offset
-                )
+                if offset and not cursor:
+                    # Deprecated offset pagination
+                    conversations_list = await ChatHistoryService.get_conversations(
+                        db=db,
+                        limit=limit,
+                        offset=offset
+                    )
+                    total = await ChatHistoryService.count_conversations(db) if includeTotal else None
+                    next_cursor, has_more = None, len(conversations_list) == limit
+                else:
+                    page = await ChatHistoryService.get_conversations_page(
+                        db=db,
+                        limit=limit,
+                        cursor=cursor,
+                        include_total=includeTotal
+                    )
+                    conversations_list, total = page.items, page.total
+                    next_cursor, has_more = page.next_cursor, page.has_more
 
                 conversation_list = [
                     Conversation(
@@ -266,9 +324,11 @@ class Query:
                     is_active=True,
                     messages=[],
                     conversations=conversation_list,
-                    total=len(conversations_list),
+                    total=total,
                     limit=limit,
-                    offset=offset
+                    offset=offset,
+                    nextCursor=next_cursor,
+                    hasMore=has_more
                 )
         except Exception as e:
             logger.error(f"Error fetching conversations: {e}")
@@ -331,31 +391,47 @@ class Query:
 
     
     @strawberry.field
-    async def documents(self, limit: int = 50, offset: int = 0) -> List[Document]:
-        """Fetch documents."""
+    async def documents(self, limit: int = 50, offset: int = 0, cursor: Optional[str] = None) -> List[Document]:
+        """Fetch documents, newest first (use documentsPage to get the next page cursor)."""
         try:
             async with AsyncSessionLocal() as db:
-                documents = await DocumentService.get_documents(
-                    db=db,
-                    limit=limit,
-                    offset=offset
-                )
-                
-                return [
-                    Document(
-                        id=doc.id,
-                        title=doc.title,
-                        content_type=doc.content_type,
-                        file_size=doc.file_size,
-                        created_at=doc.created_at,
-                        updated_at=doc.updated_at,
-                        tags=doc.tags
+                if offset and not cursor:
+                    # Deprecated offset pagination
+                    documents, _ = await DocumentService.list_documents(
+                        db=db,
+                        limit=limit,
+                        offset=offset
                     )
-                    for doc in documents.documents
-                ]
+                else:
+                    page = await DocumentService.list_documents_page(db=db, limit=limit, cursor=cursor)
+                    documents = page.items
+                
+                return [_document_type(doc) for doc in documents]
         except Exception as e:
             logger.error(f"Error fetching documents: {e}")
             return []
+
+    @strawberry.field
+    async def documentsPage(self, limit: int = 50, cursor: Optional[str] = None,
+                            includeTotal: bool = False) -> Optional[DocumentPage]:
+        """Fetch a page of documents, newest first, with the cursor of the next page."""
+        try:
+            async with AsyncSessionLocal() as db:
+                page = await DocumentService.list_documents_page(
+                    db=db,
+                    limit=limit,
+                    cursor=cursor,
+                    include_total=includeTotal
+                )
+                return DocumentPage(
+                    documents=[_document_type(doc) for doc in page.items],
+                    nextCursor=page.next_cursor,
+                    hasMore=page.has_more,
+                    total=page.total
+                )
+        except Exception as e:
+            logger.error(f"Error fetching documents page: {e}")
+            return None
     
     @strawberry.field
     def agent_capabilities_list(self) -> List[AgentCapability]:
@@ -440,8 +516,8 @@ class Mutation:
                             role=msg.role,
                             content=msg.content,
                             created_at=msg.created_at,
-                            tool_calls=msg.tool_calls,
-                            extra_data=msg.extra_data
+                            tool_calls=_json_text(msg.tool_calls),
+                            extra_data=_json_text(msg.extra_data)
                         )
                         for msg in full_conv.messages
                     ]
@@ -490,8 +566,8 @@ class Mutation:
                         role=message.role,
                         content=message.content,
                         created_at=message.created_at,
-                        tool_calls=message.tool_calls,
-                        extra_data=message.extra_data
+                        tool_calls=_json_text(message.tool_calls),
+                        extra_data=_json_text(message.extra_data)
                     )
 
                 return None
@@ -500,7 +576,7 @@ class Mutation:
             return None
 
     @strawberry.mutation
-    async def execute_multi_agent_workflow(self, input: MultiAgentInput) -> Optional[str]:
+    async def execute_multi_agent_workflow(self, input: MultiAgentInput, info: Info) -> Optional[str]:
         """Execute a multi-agent workflow."""
         try:
             from app.api.v1.schemas.multi_agent import WorkflowType
@@ -508,32 +584,28 @@ class Mutation:
             # Convert string to enum
             workflow_type = WorkflowType(input.workflow_type)
 
-            # Execute workflow
-            result = multi_agent_orchestrator.execute_simple_query(
-                query=input.input,
-                context=""
-            )
+            # Execute workflow off the event loop within the caller's fair share
+            current_user = await _current_user(info)
+            async with fair_scheduler.slot(
+                current_user.id if current_user else None,
+                current_user.roles if current_user else None
+            ):
+                result = await asyncio.to_thread(multi_agent_orchestrator.execute_simple_query, input.input, "")
 
             # If save_conversation is True and conversation_id provided, save the interaction
             if input.save_conversation and input.conversation_id:
                 async with AsyncSessionLocal() as db:
-                    # Add user message
-                    await ChatHistoryService.add_message(
-                        db=db,
-                        conversation_id=input.conversation_id,
-                        role="user",
-                        content=input.input
-                    )
-
-                    # Add assistant response
+                    # Add the user message and assistant response in one transaction
                     response_content = result.get("result", "No response generated")
-                    await ChatHistoryService.add_message(
-                        db=db,
-                        conversation_id=input.conversation_id,
-                        role="assistant",
-                        content=response_content,
-                        extra_data={"workflow_type": input.workflow_type, "agents_used": result.get("agents_used", [])}
-                    )
+                    await ChatHistoryService.add_messages(db, input.conversation_id, [
+                        {"role": "user", "content": input.input},
+                        {
+                            "role": "assistant",
+                            "content": response_content,
+                            "extra_data": {"workflow_type": input.workflow_type,
+                                           "agents_used": result.get("agents_used", [])}
+                        }
+                    ])
 
             return result.get("result", "No response generated")
 
@@ -599,8 +671,8 @@ class Mutation:
                         role=message.role,
                         content=message.content,
                         created_at=message.created_at,
-                        tool_calls=message.tool_calls,
-                        extra_data=message.extra_data
+                        tool_calls=_json_text(message.tool_calls),
+                        extra_data=_json_text(message.extra_data)
                     )
 
                 return None
@@ -609,14 +681,16 @@ class Mutation:
             return None
 
     @strawberry.mutation
-    async def executeAgent(self, input: AgentExecutionInput) -> Optional[AgentExecutionResult]:
+    async def executeAgent(self, input: AgentExecutionInput, info: Info) -> Optional[AgentExecutionResult]:
         """Execute an agent workflow."""
         try:
-            # Execute multi-agent workflow
-            result = multi_agent_orchestrator.execute_simple_query(
-                query=input.input,
-                context=""
-            )
+            # Execute multi-agent workflow off the event loop within the caller's fair share
+            current_user = await _current_user(info)
+            async with fair_scheduler.slot(
+                current_user.id if current_user else None,
+                current_user.roles if current_user else None
+            ):
+                result = await asyncio.to_thread(multi_agent_orchestrator.execute_simple_query, input.input, "")
 
             execution_time = result.get("execution_time", 0.0)
             agents_used = result.get("agents_used", [])
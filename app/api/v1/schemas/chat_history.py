@@ -83,18 +83,22 @@ class ConversationSummary(ConversationBase):
 class ConversationListResponse(BaseModel):
     """Schema for conversation list responses."""
     conversations: List[ConversationSummary] = Field(..., description="List of conversations")
-    total: int = Field(..., description="Total number of conversations")
+    total: Optional[int] = Field(None, description="Total number of conversations (if requested)")
     limit: int = Field(..., description="Number of conversations per page")
-    offset: int = Field(..., description="Offset for pagination")
+    offset: int = Field(0, description="Offset for pagination (deprecated, use cursors)")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page")
+    has_more: bool = Field(False, description="Whether more conversations follow")
 
 
 class MessageListResponse(BaseModel):
     """Schema for message list responses."""
     messages: List[MessageResponse] = Field(..., description="List of messages")
     conversation_id: str = Field(..., description="ID of the conversation")
-    total: int = Field(..., description="Total number of messages")
+    total: Optional[int] = Field(None, description="Total number of messages (if requested)")
     limit: int = Field(..., description="Number of messages per page")
-    offset: int = Field(..., description="Offset for pagination")
+    offset: int = Field(0, description="Offset for pagination (deprecated, use cursors)")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page")
+    has_more: bool = Field(False, description="Whether more messages follow")
 
 
 class ConversationContextResponse(BaseModel):
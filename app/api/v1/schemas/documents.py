@@ -39,9 +39,11 @@ class DocumentResponse(BaseModel):
 class DocumentListResponse(BaseModel):
     """Schema for document list responses."""
     documents: List[DocumentResponse] = Field(..., description="List of documents")
-    total: int = Field(..., description="Total number of documents")
+    total: Optional[int] = Field(None, description="Total number of documents (if requested)")
     limit: int = Field(..., description="Limit used for pagination")
-    offset: int = Field(..., description="Offset used for pagination")
+    offset: int = Field(0, description="Offset used for pagination (deprecated, use cursors)")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page")
+    has_more: bool = Field(False, description="Whether more documents follow")
 
 class SemanticSearchRequest(BaseModel):
     """Schema for semantic search requests."""
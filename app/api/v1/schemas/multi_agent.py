@@ -57,6 +57,7 @@ class MultiAgentResponse(BaseModel):
     execution_time: Optional[float] = Field(None, description="Execution time in seconds")
     context_used: bool = Field(..., description="Whether conversation context was used")
     message_ids: List[str] = Field(default=[], description="IDs of messages created during execution")
+    step_timings: List[Dict[str, Any]] = Field(default=[], description="Per-step timings for DAG workflows")
 
 class AgentCapabilitiesResponse(BaseModel):
     """Schema for agent capabilities information."""
@@ -31,8 +31,15 @@ class TaskRequest(BaseModel):
         ExecutionModeEnum.SYNCHRONOUS, 
         description="Execution mode (sync or async)"
     )
-    priority: int = Field(1, ge=1, le=10, description="Task priority (1-10)")
+    priority: Optional[int] = Field(
+        None, ge=1, le=10,
+        description="Task priority (1 lowest - 10 highest); defaults by task type"
+    )
     timeout: Optional[int] = Field(None, description="Task timeout in seconds")
+    idempotency_key: Optional[str] = Field(
+        None, max_length=255,
+        description="Key identifying this submission; duplicate async submissions return the existing task"
+    )
 
 class TaskResponse(BaseModel):
     """Schema for task execution responses."""
@@ -42,6 +49,48 @@ class TaskResponse(BaseModel):
     execution_time: float = Field(..., description="Task execution time in seconds")
     error: Optional[str] = Field(None, description="Error message if task failed")
 
+class BatchReducerEnum(str, Enum):
+    """Enumeration of batch reduce steps."""
+    COLLECT = "collect"
+    SUMMARY = "summary"
+
+class BatchTaskRequest(BaseModel):
+    """Schema for batch task submission; all tasks are executed asynchronously."""
+    tasks: List[TaskRequest] = Field(..., min_length=1, description="Tasks to dispatch as one batch")
+    reduce: Optional[BatchReducerEnum] = Field(
+        None,
+        description="Optional reduce step run after all tasks succeed (collect: all results, summary: counts only)"
+    )
+
+class BatchTaskResponse(BaseModel):
+    """Schema for batch task submission responses."""
+    batch_id: Optional[str] = Field(None, description="Batch ID for tracking aggregate progress")
+    status: str = Field(..., description="Batch dispatch status")
+    task_ids: List[str] = Field(default_factory=list, description="Task IDs in submission order")
+    total_tasks: int = Field(..., description="Number of tasks in the batch")
+    reduce_task_id: Optional[str] = Field(None, description="Task ID of the reduce step, if any")
+    execution_time: float = Field(..., description="Dispatch time in seconds")
+    error: Optional[str] = Field(None, description="Error message if dispatch failed")
+
+class BatchTaskState(BaseModel):
+    """Schema for the state of one task in a batch."""
+    task_id: str = Field(..., description="Task ID")
+    status: str = Field(..., description="Current task status")
+    progress: float = Field(..., description="Task progress from 0 to 1")
+
+class BatchStatusResponse(BaseModel):
+    """Schema for batch status responses."""
+    batch_id: str = Field(..., description="Batch ID")
+    status: str = Field(..., description="Aggregate status (pending, running, completed, completed_with_errors, failed)")
+    total: int = Field(..., description="Number of tasks in the batch")
+    completed: int = Field(..., description="Number of successfully completed tasks")
+    failed: int = Field(..., description="Number of failed or revoked tasks")
+    pending: int = Field(..., description="Number of tasks not yet finished")
+    progress: float = Field(..., description="Aggregate progress from 0 to 1")
+    states: Dict[str, int] = Field(default_factory=dict, description="Task count per state")
+    tasks: List[BatchTaskState] = Field(default_factory=list, description="Per-task states")
+    reduce: Optional[Dict[str, Any]] = Field(None, description="Reduce step status and result")
+
 class TaskStatusResponse(BaseModel):
     """Schema for task status responses."""
     task_id: str = Field(..., description="Task ID")
@@ -76,7 +125,7 @@ class WorkflowRequest(BaseModel):
         ExecutionModeEnum.ASYNCHRONOUS,
         description="Execution mode (workflows are typically async)"
     )
-    priority: int = Field(1, ge=1, le=10, description="Workflow priority")
+    priority: Optional[int] = Field(None, ge=1, le=10, description="Workflow priority (1 lowest - 10 highest)")
 
 class WorkflowResponse(BaseModel):
     """Schema for workflow execution responses."""
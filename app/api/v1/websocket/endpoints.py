@@ -4,10 +4,12 @@ WebSocket endpoints for real-time communication.
 Provides real-time updates for conversations, tasks, and system events.
 """
 
+import asyncio
 import json
 import logging
+import os
 import uuid
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -15,12 +17,21 @@ from app.api.v1.websocket.connection_manager import connection_manager
 from app.database.database import get_db
 from app.services.chat_history import ChatHistoryService
 from app.core.orchestrator import enhanced_orchestrator
+from app.core.multi_agent import multi_agent_orchestrator
+from app.core.fair_scheduler import fair_scheduler
 from app.core.security import verify_access_token, check_rate_limit, sanitize_input, OAuth2Error
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Workflows started over WebSocket run in the background; keep references per
+# connection so they are not garbage collected mid-run and can be cancelled
+# when the client disconnects
+WEBSOCKET_MAX_WORKFLOWS = max(1, int(os.getenv("WEBSOCKET_MAX_WORKFLOWS", "2")))
+
+_workflow_tasks: Dict[str, Set[asyncio.Task]] = {}
+
 
 @router.websocket("/ws")
 async def websocket_endpoint(
@@ -118,6 +129,7 @@ async def websocket_endpoint(
         logger.error(f"WebSocket error for {connection_id}: {e}")
     
     finally:
+        cancel_connection_workflows(connection_id)
         connection_manager.disconnect(connection_id)
 
 
@@ -140,11 +152,14 @@ async def handle_websocket_message(connection_id: str, message: Dict[str, Any],
     elif message_type == "get_status":
         await handle_status_request(connection_id, message)
     
+    elif message_type == "run_workflow":
+        await handle_run_workflow_message(connection_id, message, user_info)
+    
     else:
         await connection_manager.send_personal_message({
             "type": "error",
             "message": f"Unknown message type: {message_type}",
-            "supported_types": ["subscribe", "unsubscribe", "ping", "get_status"]
+            "supported_types": ["subscribe", "unsubscribe", "ping", "get_status", "run_workflow"]
         }, connection_id)
 
 
@@ -232,6 +247,77 @@ async def handle_unsubscribe_message(connection_id: str, message: Dict[str, Any]
             }, connection_id)
 
 
+async def handle_run_workflow_message(connection_id: str, message: Dict[str, Any],
+                                      user_info: Optional[Dict[str, Any]] = None):
+    """Start a multi-agent workflow and stream its step results to the connection."""
+    input_data = message.get("input")
+    if not input_data:
+        await connection_manager.send_personal_message({
+            "type": "error",
+            "message": "input required for run_workflow"
+        }, connection_id)
+        return
+
+    async def run_workflow():
+        try:
+            async with fair_scheduler.slot(
+                user_info.get("user_id") if user_info else None,
+                user_info.get("roles") if user_info else None
+            ):
+                async for event in multi_agent_orchestrator.stream_workflow(
+                    workflow_type=message.get("workflow_type", "simple_research"),
+                    input_data=input_data,
+                    context=message.get("context"),
+                    conversation_id=message.get("conversation_id")
+                ):
+                    if connection_id not in connection_manager.active_connections:
+                        # Client went away; closing the stream cancels pending steps
+                        break
+                    await connection_manager.send_personal_message({
+                        "type": "workflow_progress",
+                        "request_id": message.get("request_id"),
+                        **event
+                    }, connection_id)
+        except Exception as e:
+            logger.error(f"WebSocket workflow for {connection_id} failed: {e}")
+            await connection_manager.send_personal_message({
+                "type": "error",
+                "request_id": message.get("request_id"),
+                "message": "Workflow execution failed"
+            }, connection_id)
+
+    tasks = _workflow_tasks.setdefault(connection_id, set())
+    if len(tasks) >= WEBSOCKET_MAX_WORKFLOWS:
+        await connection_manager.send_personal_message({
+            "type": "error",
+            "request_id": message.get("request_id"),
+            "message": f"Too many workflows in progress (limit {WEBSOCKET_MAX_WORKFLOWS})"
+        }, connection_id)
+        return
+
+    workflow_task = asyncio.create_task(run_workflow())
+    tasks.add(workflow_task)
+
+    def _forget(task: asyncio.Task):
+        remaining = _workflow_tasks.get(connection_id)
+        if remaining is not None:
+            remaining.discard(task)
+            if not remaining:
+                _workflow_tasks.pop(connection_id, None)
+
+    workflow_task.add_done_callback(_forget)
+
+
+def cancel_connection_workflows(connection_id: str) -> int:
+    """Cancel the workflows a connection still has in progress; returns how many."""
+    tasks = _workflow_tasks.pop(connection_id, set())
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        logger.info(f"Cancelled {len(tasks)} workflows of disconnected WebSocket client {connection_id}")
+    return len(tasks)
+
+
 async def handle_status_request(connection_id: str, message: Dict[str, Any]):
     """Handle status requests."""
     status_type = message.get("status_type", "connection")
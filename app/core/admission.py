@@ -0,0 +1,250 @@
+# app/core/admission.py
+"""
+Bounded admission queues for agent and orchestrator execution.
+
+Agent runs are long and CPU/LLM bound, so instead of rejecting requests at a
+hard concurrency limit they wait in a bounded priority queue. Requests are only
+rejected (429 with ``Retry-After``) when the queue itself is full, and give up
+with 503 when they wait longer than the configured maximum. Queue-wait and
+run-time histograms are kept for monitoring.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.exceptions import AgentQueueFullException, AgentQueueTimeoutException
+
+logger = logging.getLogger(__name__)
+
+# Admission configuration
+AGENT_MAX_CONCURRENT = int(os.getenv("AGENT_MAX_CONCURRENT", "10"))
+AGENT_QUEUE_DEPTH = int(os.getenv("AGENT_QUEUE_DEPTH", "50"))
+AGENT_QUEUE_MAX_WAIT = float(os.getenv("AGENT_QUEUE_MAX_WAIT", "30"))
+
+# Priorities follow TaskRequest.priority: 1 (lowest) to 10 (highest)
+DEFAULT_PRIORITY = 5
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds (Prometheus style)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Returns None when the quantile falls in the +Inf bucket.
+        """
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts[:-1]):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return self.buckets[i]
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            label = str(self.buckets[i]) if i < len(self.buckets) else "+Inf"
+            buckets[label] = cumulative
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "average": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": buckets,
+        }
+
+
+class AdmissionQueue:
+    """
+    Priority admission queue in front of a bounded number of execution slots.
+
+    Waiting requests are admitted highest priority first, FIFO within a
+    priority. The queue holds at most ``max_depth`` waiting requests.
+    """
+
+    def __init__(self, name: str, max_concurrent: int = AGENT_MAX_CONCURRENT,
+                 max_depth: int = AGENT_QUEUE_DEPTH, max_wait: float = AGENT_QUEUE_MAX_WAIT):
+        """
+        Initialize the admission queue.
+
+        Args:
+            name: Queue name used in errors and metrics
+            max_concurrent: Number of requests allowed to run at once
+            max_depth: Maximum number of waiting requests before rejecting
+            max_wait: Maximum time in seconds a request waits for admission
+        """
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_depth = max(0, max_depth)
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._queued = 0
+        self._sequence = itertools.count()
+
+        # Metrics
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.queue_wait = Histogram()
+        self.queue_wait_by_priority: Dict[int, Histogram] = {}
+        self.run_time = Histogram()
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a new request could be admitted."""
+        average_run = self.run_time.sum / self.run_time.count if self.run_time.count else 1.0
+        estimate = average_run * (self._queued + 1) / self.max_concurrent
+        return max(1, min(int(math.ceil(estimate)), int(math.ceil(self.max_wait)) or 1))
+
+    async def acquire(self, priority: int = DEFAULT_PRIORITY) -> float:
+        """
+        Wait for an execution slot.
+
+        Args:
+            priority: Request priority, 1 (lowest) to 10 (highest)
+
+        Returns:
+            Time spent waiting in the queue, in seconds
+
+        Raises:
+            AgentQueueFullException: If the queue is full
+            AgentQueueTimeoutException: If no slot became available within max_wait
+        """
+        if self.active < self.max_concurrent and not self._queued:
+            self.active += 1
+            self.admitted += 1
+            self._observe_wait(priority, 0.0)
+            return 0.0
+
+        if self._queued >= self.max_depth:
+            self.rejected += 1
+            retry_after = self.retry_after()
+            logger.warning(f"Admission queue '{self.name}' full ({self._queued} waiting), retry after {retry_after}s")
+            raise AgentQueueFullException(self.name, retry_after)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._sequence), future))
+        self._queued += 1
+        enqueued_at = time.monotonic()
+
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait if self.max_wait > 0 else None)
+        except asyncio.TimeoutError:
+            self._queued -= 1
+            self.timed_out += 1
+            waited = time.monotonic() - enqueued_at
+            raise AgentQueueTimeoutException(self.name, waited, self.retry_after())
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just before cancellation; hand it back
+                self.release()
+            else:
+                self._queued -= 1
+            raise
+
+        waited = time.monotonic() - enqueued_at
+        self._observe_wait(priority, waited)
+        return waited
+
+    def _observe_wait(self, priority: int, waited: float):
+        self.queue_wait.observe(waited)
+        histogram = self.queue_wait_by_priority.get(priority)
+        if histogram is None:
+            histogram = self.queue_wait_by_priority[priority] = Histogram()
+        histogram.observe(waited)
+
+    def release(self, run_time: Optional[float] = None):
+        """Release a slot and admit the highest priority waiter."""
+        if run_time is not None:
+            self.run_time.observe(run_time)
+        self.active = max(0, self.active - 1)
+
+        while self._waiters and self.active < self.max_concurrent:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # Timed out or cancelled; already removed from the queued count
+                continue
+            self._queued -= 1
+            self.active += 1
+            self.admitted += 1
+            future.set_result(True)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = DEFAULT_PRIORITY):
+        """
+        Async context manager holding an execution slot for the duration of the block.
+
+        Example:
+            async with agent_admission.slot(priority=8):
+                result = await run_agent_graph(inputs)
+        """
+        await self.acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue statistics with queue-wait and run-time histograms."""
+        return {
+            "name": self.name,
+            "max_concurrent": self.max_concurrent,
+            "max_depth": self.max_depth,
+            "max_wait": self.max_wait,
+            "active": self.active,
+            "queued": self._queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "queue_wait_seconds": self.queue_wait.to_dict(),
+            "queue_wait_seconds_by_priority": {
+                str(priority): histogram.to_dict()
+                for priority, histogram in sorted(self.queue_wait_by_priority.items(), reverse=True)
+            },
+            "run_time_seconds": self.run_time.to_dict(),
+        }
+
+
+# Global admission queue for agent execution (LangGraph agent and AgentSystem)
+agent_admission = AdmissionQueue("agent")
+
+
+def get_admission_stats() -> Dict[str, Any]:
+    """Get agent admission queue statistics."""
+    return agent_admission.get_stats()
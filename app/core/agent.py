@@ -1,4 +1,5 @@
 # app/core/agent.py
+import asyncio
 import logging
 from langchain_core.agents import AgentAction, AgentFinish
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
@@ -87,3 +88,75 @@ workflow.add_conditional_edges(
     {"continue": "agent", "end": END}
 )
 agent_graph_app = workflow.compile()
+
+# 6. Non-blocking execution. Graph nodes are synchronous (LLM and search calls),
+# so runs go to a dedicated thread pool sized to the agent admission limit
+# instead of blocking the event loop or starving the default executor.
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+from app.core.admission import agent_admission, AGENT_MAX_CONCURRENT, DEFAULT_PRIORITY
+from app.core.fair_scheduler import fair_scheduler
+
+agent_executor = ThreadPoolExecutor(max_workers=AGENT_MAX_CONCURRENT, thread_name_prefix="agent-graph")
+
+@asynccontextmanager
+async def agent_slot(priority: int = DEFAULT_PRIORITY, user_id: Optional[str] = None,
+                     user_roles: Optional[List[str]] = None, fair_share: bool = True):
+    """
+    Hold the caller's fair-share slot and an agent admission slot for the duration of the block.
+
+    The fair-share slot is taken first: a user already at their share waits
+    without occupying an admission slot that another user's request could run in.
+    Callers that already hold the user's fair-share slot pass ``fair_share=False``.
+
+    Both queues are bounded, so overload surfaces as 429 / 503 from whichever
+    layer the request is waiting in.
+
+    Raises:
+        AgentQueueFullException: If the fair-share or admission queue is full
+        AgentQueueTimeoutException: If no slot became available in time
+    """
+    if not fair_share:
+        async with agent_admission.slot(priority):
+            yield
+        return
+
+    async with fair_scheduler.slot(user_id, user_roles):
+        async with agent_admission.slot(priority):
+            yield
+
+def _stream_agent_graph(inputs: dict, merge: bool) -> dict:
+    final_state = {}
+    for state in agent_graph_app.stream(inputs):
+        if merge:
+            final_state.update(state)
+        else:
+            final_state = state
+    return final_state
+
+async def run_agent_graph(inputs: dict, merge: bool = True, priority: int = DEFAULT_PRIORITY,
+                          user_id: Optional[str] = None, user_roles: Optional[List[str]] = None,
+                          fair_share: bool = True) -> dict:
+    """
+    Run the agent graph within the caller's fair share and behind the admission
+    queue, without blocking the event loop.
+
+    Args:
+        inputs: Graph input state
+        merge: Merge all streamed node states (True) or return only the last one
+        priority: Admission priority, 1 (lowest) to 10 (highest)
+        user_id: Requesting user (``None`` for anonymous callers)
+        user_roles: Roles of the user, used for the fair-share weight
+        fair_share: Take the user's fair-share slot (False if the caller already holds it)
+
+    Returns:
+        Final agent state
+
+    Raises:
+        AgentQueueFullException: If the admission queue is full
+        AgentQueueTimeoutException: If no slot became available in time
+    """
+    async with agent_slot(priority, user_id, user_roles, fair_share):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(agent_executor, _stream_agent_graph, inputs, merge)
@@ -10,9 +10,15 @@ from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 from enum import Enum
 
-from app.core.agent import agent_graph_app
+from app.core.agent import agent_graph_app, agent_executor, agent_slot
 from app.core.multi_agent import multi_agent_orchestrator
-from app.core.exceptions import GremlinsAIException, ErrorCode
+from app.core.exceptions import (
+    AgentProcessingException,
+    AgentQueueFullException,
+    AgentQueueTimeoutException
+)
+from app.core.fair_scheduler import fair_scheduler
+from app.core.admission import agent_admission, DEFAULT_PRIORITY
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +36,7 @@ class AgentType(str, Enum):
 class AgentStatus(str, Enum):
     """Agent execution status."""
     IDLE = "idle"
+    QUEUED = "queued"
     PROCESSING = "processing"
     COMPLETED = "completed"
     ERROR = "error"
@@ -40,12 +47,17 @@ class AgentTask:
     """Represents a task for an agent to execute."""
     
     def __init__(self, task_id: str, agent_type: AgentType, query: str, 
-                 context: Optional[Dict[str, Any]] = None, timeout: int = 300):
+                 context: Optional[Dict[str, Any]] = None, timeout: int = 300,
+                 user_id: Optional[str] = None, user_roles: Optional[List[str]] = None,
+                 priority: int = DEFAULT_PRIORITY):
         self.task_id = task_id
         self.agent_type = agent_type
         self.query = query
         self.context = context or {}
         self.timeout = timeout
+        self.user_id = user_id
+        self.user_roles = user_roles or ["user"]
+        self.priority = priority
         self.status = AgentStatus.IDLE
         self.result: Optional[Dict[str, Any]] = None
         self.error: Optional[str] = None
@@ -63,34 +75,44 @@ class AgentSystem:
     def __init__(self):
         self.active_tasks: Dict[str, AgentTask] = {}
         self.task_history: List[AgentTask] = []
-        self.max_concurrent_tasks = 10
+        self.admission = agent_admission
         self.max_history_size = 1000
     
+    @property
+    def max_concurrent_tasks(self) -> int:
+        """Number of agent tasks allowed to run at once (admission queue limit)."""
+        return self.admission.max_concurrent
+    
     async def execute_agent_task(self, task: AgentTask) -> Dict[str, Any]:
-        """Execute an agent task and return the result."""
-        if len(self.active_tasks) >= self.max_concurrent_tasks:
-            raise GremlinsAIException(
-                ErrorCode.RATE_LIMIT_EXCEEDED,
-                "Maximum concurrent agent tasks reached"
-            )
+        """
+        Execute an agent task and return the result.
         
+        Tasks first wait for the user's fair-share slot, then in the bounded
+        admission queue (by priority), and are only rejected when the admission
+        queue itself is full. A user over their share therefore waits without
+        holding an admission slot other users' tasks could run in.
+        """
         self.active_tasks[task.task_id] = task
-        task.status = AgentStatus.PROCESSING
-        task.started_at = datetime.utcnow()
+        task.status = AgentStatus.QUEUED
         
         try:
-            logger.info(f"Starting agent task {task.task_id} with type {task.agent_type}")
-            
-            # Execute based on agent type
-            if task.agent_type == AgentType.SIMPLE:
-                result = await self._execute_simple_agent(task)
-            elif task.agent_type == AgentType.MULTI_AGENT:
-                result = await self._execute_multi_agent(task)
-            elif task.agent_type == AgentType.RAG:
-                result = await self._execute_rag_agent(task)
-            else:
-                # Default to simple agent
-                result = await self._execute_simple_agent(task)
+            # Fair-share slot first, then admission, so one user can't take every
+            # execution slot or block the admission queue while over their share
+            async with agent_slot(task.priority, task.user_id, task.user_roles):
+                task.status = AgentStatus.PROCESSING
+                task.started_at = datetime.utcnow()
+                logger.info(f"Starting agent task {task.task_id} with type {task.agent_type}")
+
+                # Execute based on agent type
+                if task.agent_type == AgentType.SIMPLE:
+                    result = await self._execute_simple_agent(task)
+                elif task.agent_type == AgentType.MULTI_AGENT:
+                    result = await self._execute_multi_agent(task)
+                elif task.agent_type == AgentType.RAG:
+                    result = await self._execute_rag_agent(task)
+                else:
+                    # Default to simple agent
+                    result = await self._execute_simple_agent(task)
             
             task.result = result
             task.status = AgentStatus.COMPLETED
@@ -99,17 +121,23 @@ class AgentSystem:
             logger.info(f"Completed agent task {task.task_id}")
             return result
             
+        except (AgentQueueFullException, AgentQueueTimeoutException) as e:
+            task.status = AgentStatus.ERROR
+            task.error = e.error_response.error_message
+            raise
+            
         except asyncio.TimeoutError:
             task.status = AgentStatus.TIMEOUT
             task.error = f"Task timed out after {task.timeout} seconds"
             logger.error(f"Agent task {task.task_id} timed out")
-            raise GremlinsAIException(ErrorCode.TIMEOUT, task.error)
+            raise AgentProcessingException(task.error, processing_step="agent_execution")
             
         except Exception as e:
             task.status = AgentStatus.ERROR
             task.error = str(e)
             logger.error(f"Agent task {task.task_id} failed: {e}")
-            raise GremlinsAIException(ErrorCode.AGENT_EXECUTION_FAILED, str(e))
+            raise AgentProcessingException("Agent task failed", error_details=str(e),
+                                           processing_step="agent_execution")
             
         finally:
             # Move to history and clean up
@@ -120,8 +148,9 @@ class AgentSystem:
         """Execute a simple agent task."""
         try:
             # Use the existing agent system
+            loop = asyncio.get_running_loop()
             result = await asyncio.wait_for(
-                asyncio.to_thread(agent_graph_app.invoke, {"input": task.query}),
+                loop.run_in_executor(agent_executor, agent_graph_app.invoke, {"input": task.query}),
                 timeout=task.timeout
             )
             
@@ -142,11 +171,10 @@ class AgentSystem:
         try:
             # Use the multi-agent orchestrator
             result = await asyncio.wait_for(
-                asyncio.to_thread(
-                    multi_agent_orchestrator.execute_complex_workflow,
-                    "research_analyze_write",
+                multi_agent_orchestrator.execute_complex_workflow_async(
                     task.query,
-                    task.context
+                    workflow_type="research_analyze_write",
+                    sub_queries=task.context.get("sub_queries")
                 ),
                 timeout=task.timeout
             )
@@ -215,6 +243,7 @@ class AgentSystem:
         return {
             "task_id": task.task_id,
             "agent_type": task.agent_type.value,
+            "user_id": task.user_id,
             "status": task.status.value,
             "query": task.query,
             "result": task.result,
@@ -235,7 +264,9 @@ class AgentSystem:
             "max_concurrent_tasks": self.max_concurrent_tasks,
             "total_tasks_in_history": len(self.task_history),
             "available_agent_types": [agent_type.value for agent_type in AgentType],
-            "system_health": "operational" if len(self.active_tasks) < self.max_concurrent_tasks else "at_capacity"
+            "system_health": "operational" if self.admission.active < self.max_concurrent_tasks else "at_capacity",
+            "admission": self.admission.get_stats(),
+            "scheduler": fair_scheduler.get_stats()
         }
     
     def cancel_task(self, task_id: str) -> bool:
@@ -260,25 +291,6 @@ class AgentSystem:
 agent_system = AgentSystem()
 
 
-# Convenience functions for backward compatibility
-async def execute_agent(query: str, agent_type: str = "simple", 
-                       context: Optional[Dict[str, Any]] = None,
-                       task_id: Optional[str] = None) -> Dict[str, Any]:
-    """Execute an agent task with the specified parameters."""
-    import uuid
-    
-    if not task_id:
-        task_id = str(uuid.uuid4())
-    
-    try:
-        agent_type_enum = AgentType(agent_type)
-    except ValueError:
-        agent_type_enum = AgentType.SIMPLE
-    
-    task = AgentTask(task_id, agent_type_enum, query, context)
-    return await agent_system.execute_agent_task(task)
-
-
 def get_agent_capabilities() -> Dict[str, Any]:
     """Get information about available agent capabilities."""
     return {
@@ -4,12 +4,143 @@ Handles asynchronous task execution and orchestration.
 """
 
 import os
+import json
 import logging
-from celery import Celery
+import time
+from typing import Dict, Any, List, Optional
+from celery import Celery, Task
+from celery.schedules import crontab
+from celery.signals import (
+    before_task_publish, task_prerun, task_postrun, celeryd_init, worker_process_init,
+    worker_process_shutdown
+)
 from kombu import Queue
 
 logger = logging.getLogger(__name__)
 
+# Task priorities follow TaskRequest.priority: 1 (lowest) to 10 (highest).
+# Each priority band has its own queue per task module (e.g. agent_queue_high,
+# agent_queue, agent_queue_low), and messages also carry a broker priority.
+PRIORITY_HIGH_THRESHOLD = int(os.getenv("TASK_PRIORITY_HIGH_THRESHOLD", "7"))
+PRIORITY_LOW_THRESHOLD = int(os.getenv("TASK_PRIORITY_LOW_THRESHOLD", "3"))
+DEFAULT_TASK_PRIORITY = 5
+
+# Base queue for each task module (task names are "<module>.<task>")
+TASK_MODULE_QUEUES = {
+    'agent_tasks': 'agent_queue',
+    'document_tasks': 'document_queue',
+    'orchestration_tasks': 'orchestration_queue',
+}
+
+# Document ingestion pipeline stages have their own queues so each can scale its
+# own worker pool (CPU-bound embedding vs. I/O-bound parsing and indexing)
+TASK_STAGE_QUEUES = {
+    'ingestion_tasks.parse_documents': 'parse_queue',
+    'ingestion_tasks.embed_chunks': 'embed_queue',
+    'ingestion_tasks.index_documents': 'index_queue',
+}
+
+SCHEDULING_DELAY_KEY = "gremlins:scheduling_delay"
+
+# Optional broker message compression for all tasks (e.g. "zlib"); large values are
+# offloaded by the claim-check layer regardless (see app/core/claim_check.py)
+CELERY_MESSAGE_COMPRESSION = os.getenv("CELERY_MESSAGE_COMPRESSION") or None
+
+# Periodic retention cleanup (run `celery -A app.core.celery_app beat` to schedule it)
+RETENTION_SCHEDULE_ENABLED = os.getenv("RETENTION_SCHEDULE_ENABLED", "true").lower() == "true"
+RETENTION_SCHEDULE_HOUR = os.getenv("RETENTION_SCHEDULE_HOUR", "3")
+RETENTION_SCHEDULE_MINUTE = os.getenv("RETENTION_SCHEDULE_MINUTE", "30")
+
+# States published by task_postrun rather than update_state, once the result is stored
+FINAL_EVENT_STATES = frozenset({'SUCCESS', 'FAILURE', 'REVOKED'})
+
+
+def priority_band(priority: Optional[int]) -> str:
+    """Map a task priority (1-10) to a band: high, normal or low."""
+    priority = DEFAULT_TASK_PRIORITY if priority is None else priority
+    if priority >= PRIORITY_HIGH_THRESHOLD:
+        return "high"
+    if priority <= PRIORITY_LOW_THRESHOLD:
+        return "low"
+    return "normal"
+
+
+def queue_for_priority(base_queue: str, priority: Optional[int]) -> str:
+    """Get the queue for a base queue and priority, e.g. agent_queue_high."""
+    band = priority_band(priority)
+    return base_queue if band == "normal" else f"{base_queue}_{band}"
+
+
+def broker_priority(priority: Optional[int]) -> int:
+    """Map a task priority (10 = most important) to a Redis broker priority (0 = first)."""
+    priority = DEFAULT_TASK_PRIORITY if priority is None else priority
+    return min(9, max(0, 10 - priority))
+
+
+def dispatch_options(task_name: str, priority: Optional[int]) -> Dict[str, Any]:
+    """
+    Get apply_async options routing a task by priority.
+
+    Args:
+        task_name: Registered Celery task name, e.g. agent_tasks.run_multi_agent_workflow
+        priority: Task priority, 1 (lowest) to 10 (highest)
+
+    Returns:
+        Keyword arguments for ``apply_async`` (queue, priority and dispatch headers)
+    """
+    base_queue = TASK_STAGE_QUEUES.get(task_name) or TASK_MODULE_QUEUES.get(task_name.split('.')[0], 'default')
+    priority = DEFAULT_TASK_PRIORITY if priority is None else priority
+    return {
+        'queue': queue_for_priority(base_queue, priority),
+        'priority': broker_priority(priority),
+        'headers': {'dispatched_at': time.time(), 'task_priority': priority},
+    }
+
+
+def base_queues() -> List[str]:
+    """Get the base (normal priority band) name of every task queue."""
+    return list(TASK_MODULE_QUEUES.values()) + list(TASK_STAGE_QUEUES.values())
+
+
+def build_beat_schedule() -> Dict[str, Any]:
+    """Get the Celery beat schedule of periodic maintenance tasks."""
+    schedule = {}
+    if RETENTION_SCHEDULE_ENABLED:
+        # Low priority band; dispatch headers are set per message, not at schedule definition
+        options = dispatch_options('orchestration_tasks.cleanup_old_data', PRIORITY_LOW_THRESHOLD)
+        schedule['retention-cleanup'] = {
+            'task': 'orchestration_tasks.cleanup_old_data',
+            'schedule': crontab(hour=RETENTION_SCHEDULE_HOUR, minute=RETENTION_SCHEDULE_MINUTE),
+            'options': {'queue': options['queue'], 'priority': options['priority']},
+        }
+    return schedule
+
+
+class ProgressTask(Task):
+    """
+    Task base class that publishes every state update as a task event.
+
+    Claim-check references in the arguments are resolved before the task runs,
+    and a large return value is offloaded so only a reference is stored in the
+    result backend.
+    """
+
+    def __call__(self, *args, **kwargs):
+        from app.core.claim_check import claim_check
+
+        result = super().__call__(*claim_check.resolve(args), **claim_check.resolve(kwargs))
+        return claim_check.offload(result)
+
+    def update_state(self, task_id=None, state=None, meta=None, **kwargs):
+        super().update_state(task_id=task_id, state=state, meta=meta, **kwargs)
+
+        from app.core.task_events import publish_task_event
+
+        task_id = task_id or self.request.id
+        if state not in FINAL_EVENT_STATES:
+            publish_task_event(task_id, state, meta)
+
+
 # Create Celery app instance
 def create_celery_app() -> Celery:
     """Create and configure Celery application."""
@@ -27,9 +158,11 @@ def create_celery_app() -> Celery:
             'gremlinsai',
             broker='memory://',
             backend='cache+memory://',
+            task_cls=ProgressTask,
             include=[
                 'app.tasks.agent_tasks',
                 'app.tasks.document_tasks',
+                'app.tasks.ingestion_tasks',
                 'app.tasks.orchestration_tasks'
             ]
         )
@@ -39,9 +172,11 @@ def create_celery_app() -> Celery:
             'gremlinsai',
             broker=redis_url,
             backend=redis_url,
+            task_cls=ProgressTask,
             include=[
                 'app.tasks.agent_tasks',
                 'app.tasks.document_tasks',
+                'app.tasks.ingestion_tasks',
                 'app.tasks.orchestration_tasks'
             ]
         )
@@ -67,22 +202,36 @@ def create_celery_app() -> Celery:
         worker_prefetch_multiplier=1,
         worker_max_tasks_per_child=1000,
         
-        # Task routing
+        # Task routing (default band; dispatch_options picks the priority band)
         task_routes={
-            'app.tasks.agent_tasks.*': {'queue': 'agent_queue'},
-            'app.tasks.document_tasks.*': {'queue': 'document_queue'},
-            'app.tasks.orchestration_tasks.*': {'queue': 'orchestration_queue'},
+            **{name: {'queue': queue} for name, queue in TASK_STAGE_QUEUES.items()},
+            **{f'{module}.*': {'queue': queue} for module, queue in TASK_MODULE_QUEUES.items()},
         },
         
-        # Queue configuration
+        # Queue configuration: one queue per priority band for each task module
         task_default_queue='default',
-        task_queues=(
-            Queue('default'),
-            Queue('agent_queue'),
-            Queue('document_queue'),
-            Queue('orchestration_queue'),
+        task_queues=(Queue('default'),) + tuple(
+            Queue(f'{queue}{suffix}', queue_arguments={'x-max-priority': 10})
+            for queue in base_queues()
+            for suffix in ('_high', '', '_low')
         ),
         
+        # Message priorities (Redis emulates them with per-priority lists)
+        task_queue_max_priority=10,
+        task_default_priority=broker_priority(DEFAULT_TASK_PRIORITY),
+        broker_transport_options={
+            'priority_steps': list(range(10)),
+            'sep': ':',
+            'queue_order_strategy': 'priority',
+        },
+        
+        # Message compression
+        task_compression=CELERY_MESSAGE_COMPRESSION,
+        result_compression=CELERY_MESSAGE_COMPRESSION,
+        
+        # Periodic tasks
+        beat_schedule=build_beat_schedule(),
+        
         # Monitoring
         worker_send_task_events=True,
         task_send_sent_event=True,
@@ -95,3 +244,183 @@ celery_app = create_celery_app()
 
 # Task decorator for convenience
 task = celery_app.task
+
+
+@celeryd_init.connect
+def preload_worker_models(options=None, **kwargs):
+    """Load models in the worker parent so prefork children share them copy-on-write."""
+    from app.core.model_preload import preload_in_parent
+
+    options = options or {}
+    pool = options.get("pool_cls")
+    if pool is not None and not isinstance(pool, str):
+        pool = getattr(pool, "__module__", "").rsplit(".", 1)[-1]
+    preload_in_parent(pool=pool, concurrency=options.get("concurrency"))
+
+
+@worker_process_init.connect
+def start_worker_runtime(**kwargs):
+    """Start the per-process event loop, DB pool and preloaded models."""
+    from app.core.model_preload import after_fork
+    from app.core.worker_runtime import worker_runtime
+
+    after_fork()
+    worker_runtime.start()
+
+
+@worker_process_shutdown.connect
+def stop_worker_runtime(**kwargs):
+    """Close the per-process event loop and shared resources."""
+    from app.core.worker_runtime import worker_runtime
+
+    worker_runtime.stop()
+
+
+# Request attribute holding the perf_counter() start time of a running task
+TASK_STARTED_AT_ATTR = "gremlins_started_at"
+
+
+def _request_header(request, name: str):
+    value = getattr(request, name, None)
+    if value is None:
+        value = (getattr(request, 'headers', None) or {}).get(name)
+    return value
+
+
+@before_task_publish.connect
+def record_broker_bytes(sender=None, body=None, headers=None, **kwargs):
+    """
+    Record the argument size of published task messages.
+
+    The orchestrator passes the size measured while offloading arguments in a
+    header; other messages are only serialized for a small sample.
+    """
+    if sender is None:
+        return
+
+    from app.core.claim_check import claim_check, PAYLOAD_BYTES_HEADER
+
+    nbytes = (headers or {}).get(PAYLOAD_BYTES_HEADER)
+    if nbytes is not None:
+        claim_check.record_publish(sender, int(nbytes))
+        return
+
+    if body is None or not claim_check.should_sample_publish():
+        return
+    try:
+        nbytes = len(json.dumps(body, separators=(",", ":"), default=str))
+    except Exception:
+        return
+    claim_check.record_publish(sender, nbytes, sampled=True)
+
+
+@task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    """
+    Remember when a task started, and record its dispatch-to-start delay per
+    priority and its wait per queue in one Redis round trip.
+    """
+    if task is None:
+        return
+
+    # Kept on the request, which lives exactly as long as this execution
+    setattr(task.request, TASK_STARTED_AT_ATTR, time.perf_counter())
+
+    dispatched_at = _request_header(task.request, 'dispatched_at')
+    if dispatched_at is None:
+        return
+    priority = _request_header(task.request, 'task_priority')
+    queue = (getattr(task.request, 'delivery_info', None) or {}).get('routing_key')
+    if priority is None and not queue:
+        return
+
+    delay = max(0.0, time.time() - float(dispatched_at))
+    logger.debug(f"Task {task_id} (priority {priority}, queue {queue}) started after {delay:.3f}s")
+
+    try:
+        from app.core.redis_client import get_redis
+        from app.core.queue_metrics import queue_task_wait
+
+        client = get_redis()
+        if client is None:
+            return
+        pipe = client.pipeline(transaction=False)
+        if priority is not None:
+            pipe.hincrbyfloat(SCHEDULING_DELAY_KEY, f"{priority}:sum", delay)
+            pipe.hincrby(SCHEDULING_DELAY_KEY, f"{priority}:count", 1)
+        if queue:
+            queue_task_wait(pipe, queue, delay)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"Failed to record task start metrics: {e}")
+
+
+@task_postrun.connect
+def record_task_runtime(task_id=None, task=None, **kwargs):
+    """Record the runtime of a finished task by task name."""
+    if task is None:
+        return
+    started_at = getattr(task.request, TASK_STARTED_AT_ATTR, None)
+    if started_at is None:
+        return
+
+    from app.core.queue_metrics import observe_task_runtime
+
+    observe_task_runtime(task.name, time.perf_counter() - started_at)
+
+
+@task_postrun.connect
+def publish_task_completion(task_id=None, task=None, retval=None, state=None, **kwargs):
+    """Publish the final task event after the result has been stored."""
+    if task_id is None or state is None or state == 'IGNORED':
+        # Ignored tasks were replaced (e.g. by a pipeline) that reports under the same ID
+        return
+
+    from app.core.task_events import publish_task_event
+    from app.core.claim_check import claim_check
+
+    final = state in FINAL_EVENT_STATES
+    meta = {'status': 'Task completed' if state == 'SUCCESS' else f'Task {state.lower()}'}
+    if claim_check.is_reference(retval):
+        # Too large for an event; watchers fetch it from the status endpoint
+        meta['result_offloaded'] = True
+        retval = None
+    publish_task_event(task_id, state, meta, result=retval if final else None, final=final)
+
+
+@task_postrun.connect
+def settle_idempotency_key(task_id=None, task=None, state=None, **kwargs):
+    """Keep a successful task's idempotency key for the reuse window, release it otherwise."""
+    if task is None or state is None:
+        return
+
+    from app.core.idempotency import task_deduplicator, IDEMPOTENCY_HEADER
+
+    key = _request_header(task.request, IDEMPOTENCY_HEADER)
+    if not key:
+        return
+    if state == 'SUCCESS':
+        task_deduplicator.complete(key, task_id)
+    elif state in FINAL_EVENT_STATES:
+        task_deduplicator.release(key, task_id)
+
+
+def get_async_scheduling_stats() -> Dict[str, Any]:
+    """Get average Celery scheduling delay (dispatch to start) per task priority."""
+    from app.core.redis_client import get_redis
+
+    client = get_redis()
+    if client is None:
+        return {}
+
+    raw = client.hgetall(SCHEDULING_DELAY_KEY)
+    stats: Dict[str, Any] = {}
+    for field, value in raw.items():
+        priority, metric = field.split(':', 1)
+        stats.setdefault(priority, {"priority": int(priority), "band": priority_band(int(priority))})[metric] = float(value)
+
+    for entry in stats.values():
+        count = entry.get("count", 0)
+        entry["average_delay"] = entry.get("sum", 0.0) / count if count else 0.0
+
+    return dict(sorted(stats.items(), key=lambda item: -int(item[0])))
@@ -0,0 +1,306 @@
+# app/core/claim_check.py
+"""
+Claim-check storage for large Celery task payloads and results.
+
+Task arguments and results above a size threshold are serialized, compressed
+and written to a content-addressed blob store (a Redis key with a TTL, or a
+local directory shared by API and workers). Only a small reference travels
+through the broker and result backend; tasks resolve references in their
+arguments before running (see ProgressTask in app/core/celery_app.py), and
+result readers resolve them with ``claim_check.resolve``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+import zlib
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Claim-check configuration
+CLAIM_CHECK_ENABLED = os.getenv("CLAIM_CHECK_ENABLED", "true").lower() == "true"
+CLAIM_CHECK_THRESHOLD_BYTES = int(os.getenv("CLAIM_CHECK_THRESHOLD_BYTES", "65536"))
+CLAIM_CHECK_BACKEND = os.getenv("CLAIM_CHECK_BACKEND", "redis")  # redis or local
+CLAIM_CHECK_DIR = os.getenv("CLAIM_CHECK_DIR", "./data/claim_check")
+CLAIM_CHECK_TTL = int(os.getenv("CLAIM_CHECK_TTL", "86400"))
+CLAIM_CHECK_COMPRESSION_LEVEL = int(os.getenv("CLAIM_CHECK_COMPRESSION_LEVEL", "6"))
+# Fraction of published messages without a size header that are serialized just to measure them
+CLAIM_CHECK_PUBLISH_SAMPLE_RATE = float(os.getenv("CLAIM_CHECK_PUBLISH_SAMPLE_RATE", "0.01"))
+
+REFERENCE_MARKER = "__claim_check__"
+# Message header carrying the serialized size of the task arguments, measured while offloading
+PAYLOAD_BYTES_HEADER = "payload_bytes"
+BLOB_KEY_PREFIX = "gremlins:blob:"
+
+
+class ClaimCheckError(Exception):
+    """Raised when a referenced blob is missing (expired or never stored)."""
+
+
+class RedisBlobStore:
+    """Blobs stored as Redis keys that expire after a TTL."""
+
+    name = "redis"
+
+    def __init__(self, ttl: int = CLAIM_CHECK_TTL):
+        self.ttl = ttl
+
+    def _client(self):
+        from app.core.redis_client import get_binary_redis
+
+        client = get_binary_redis()
+        if client is None:
+            raise ClaimCheckError("Redis is not available for claim-check storage")
+        return client
+
+    def put(self, digest: str, data: bytes):
+        client = self._client()
+        # Content-addressed: an identical blob only needs its TTL refreshed
+        if not client.set(f"{BLOB_KEY_PREFIX}{digest}", data, ex=self.ttl, nx=True):
+            client.expire(f"{BLOB_KEY_PREFIX}{digest}", self.ttl)
+
+    def get(self, digest: str) -> Optional[bytes]:
+        return self._client().get(f"{BLOB_KEY_PREFIX}{digest}")
+
+
+class LocalBlobStore:
+    """Blobs stored as files in a directory shared by the API and workers."""
+
+    name = "local"
+
+    def __init__(self, directory: str = CLAIM_CHECK_DIR, ttl: int = CLAIM_CHECK_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self._last_purge = 0.0
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], f"{digest}.zz")
+
+    def put(self, digest: str, data: bytes):
+        path = self._path(digest)
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial blob
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        if time.time() - self._last_purge > min(3600, self.ttl):
+            self.purge_expired()
+
+    def get(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def purge_expired(self) -> int:
+        """Delete blobs not written or refreshed within the TTL."""
+        self._last_purge = time.time()
+        cutoff = self._last_purge - self.ttl
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        if removed:
+            logger.info(f"Purged {removed} expired claim-check blobs")
+        return removed
+
+
+class ClaimCheck:
+    """Offloads large values to a blob store and resolves references to them."""
+
+    def __init__(self, enabled: bool = CLAIM_CHECK_ENABLED,
+                 threshold: int = CLAIM_CHECK_THRESHOLD_BYTES,
+                 backend: str = CLAIM_CHECK_BACKEND,
+                 compression_level: int = CLAIM_CHECK_COMPRESSION_LEVEL,
+                 publish_sample_rate: float = CLAIM_CHECK_PUBLISH_SAMPLE_RATE):
+        """
+        Initialize the claim-check layer.
+
+        Args:
+            enabled: Whether large values are offloaded
+            threshold: Serialized size in bytes above which a value is offloaded
+            backend: Blob store, "redis" or "local"
+            compression_level: zlib compression level for stored blobs
+            publish_sample_rate: Fraction of unmeasured published messages to serialize for size stats
+        """
+        self.enabled = enabled
+        self.threshold = max(0, threshold)
+        self.store = LocalBlobStore() if backend == "local" else RedisBlobStore()
+        self.compression_level = compression_level
+        self.publish_sample_rate = min(1.0, max(0.0, publish_sample_rate))
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.offloaded = 0
+        self.offload_failures = 0
+        self.bytes_offloaded = 0
+        self.bytes_stored = 0
+        self.resolved = 0
+        self.missing = 0
+        self.published: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def is_reference(value: Any) -> bool:
+        return isinstance(value, dict) and REFERENCE_MARKER in value
+
+    def offload(self, value: Any) -> Any:
+        """
+        Replace a value with a reference if its serialized size exceeds the threshold.
+
+        Returns:
+            The value itself, or a reference dict if it was stored
+        """
+        return self._offload(value)[0]
+
+    def _offload(self, value: Any) -> Tuple[Any, int]:
+        """Offload a value if it is large; returns (value or reference, serialized size sent inline)."""
+        if not self.enabled:
+            return value, 0
+        if value is None or isinstance(value, (bool, int, float)):
+            return value, len(str(value))
+        if self.is_reference(value):
+            return value, len(json.dumps(value, separators=(",", ":")))
+
+        encoded = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+        if len(encoded) <= self.threshold:
+            return value, len(encoded)
+
+        try:
+            reference = self._put(encoded)
+        except Exception as e:
+            # Sending the value inline is slower but still correct
+            with self._lock:
+                self.offload_failures += 1
+            logger.warning(f"Claim-check store failed, sending {len(encoded)} bytes inline: {e}")
+            return value, len(encoded)
+        return reference, len(json.dumps(reference, separators=(",", ":")))
+
+    def store_value(self, value: Any) -> Dict[str, Any]:
+        """
+        Store a value regardless of its size and return a reference to it.
+
+        Used to pass data between pipeline stages by reference.
+        """
+        return self._put(json.dumps(value, separators=(",", ":"), default=str).encode("utf-8"))
+
+    def _put(self, encoded: bytes) -> Dict[str, Any]:
+        digest = hashlib.sha256(encoded).hexdigest()
+        compressed = zlib.compress(encoded, self.compression_level)
+        self.store.put(digest, compressed)
+
+        with self._lock:
+            self.offloaded += 1
+            self.bytes_offloaded += len(encoded)
+            self.bytes_stored += len(compressed)
+        return {REFERENCE_MARKER: digest, "backend": self.store.name,
+                "size": len(encoded), "stored_size": len(compressed)}
+
+    def offload_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Offload large task arguments, keeping small ones inline."""
+        return self.offload_kwargs_sized(kwargs)[0]
+
+    def offload_kwargs_sized(self, kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[int]]:
+        """
+        Offload large task arguments and measure what is left to send.
+
+        The size comes from the serialization offloading does anyway; it is
+        None when the claim check is disabled, since nothing was serialized.
+
+        Returns:
+            Tuple of (arguments to publish, their approximate serialized size in bytes)
+        """
+        if not self.enabled:
+            return kwargs, None
+        offloaded = {}
+        nbytes = 0
+        for name, value in kwargs.items():
+            offloaded[name], size = self._offload(value)
+            nbytes += len(name) + size
+        return offloaded, nbytes
+
+    def should_sample_publish(self) -> bool:
+        """Whether to serialize an unmeasured published message for size stats."""
+        return self.publish_sample_rate > 0 and random.random() < self.publish_sample_rate
+
+    def resolve(self, value: Any) -> Any:
+        """
+        Replace references in a value (and nested lists and dicts) with the stored values.
+
+        Raises:
+            ClaimCheckError: If a referenced blob is missing
+        """
+        if isinstance(value, dict):
+            if REFERENCE_MARKER in value:
+                return self._fetch(value[REFERENCE_MARKER])
+            return {key: self.resolve(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.resolve(item) for item in value)
+        return value
+
+    def _fetch(self, digest: str) -> Any:
+        data = self.store.get(digest)
+        if data is None:
+            with self._lock:
+                self.missing += 1
+            raise ClaimCheckError(f"Claim-check blob {digest} not found (expired?)")
+        with self._lock:
+            self.resolved += 1
+        return json.loads(zlib.decompress(data))
+
+    def record_publish(self, task_name: str, nbytes: int, sampled: bool = False):
+        """Record the task argument size of a published task (measured, or from a sample)."""
+        with self._lock:
+            stats = self.published.setdefault(task_name, {"messages": 0, "sampled": 0, "total_bytes": 0,
+                                                          "max_bytes": 0})
+            stats["sampled"] += int(sampled)
+            stats["messages"] += 1
+            stats["total_bytes"] += nbytes
+            stats["max_bytes"] = max(stats["max_bytes"], nbytes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get claim-check and broker message size statistics for this process."""
+        with self._lock:
+            broker_bytes = {
+                name: {**stats, "average_bytes": stats["total_bytes"] / stats["messages"]}
+                for name, stats in self.published.items()
+            }
+            return {
+                "enabled": self.enabled,
+                "backend": self.store.name,
+                "threshold_bytes": self.threshold,
+                "publish_sample_rate": self.publish_sample_rate,
+                "offloaded": self.offloaded,
+                "offload_failures": self.offload_failures,
+                "bytes_offloaded": self.bytes_offloaded,
+                "bytes_stored": self.bytes_stored,
+                "compression_ratio": self.bytes_stored / self.bytes_offloaded if self.bytes_offloaded else None,
+                "resolved": self.resolved,
+                "missing": self.missing,
+                "broker_bytes_per_task": broker_bytes,
+            }
+
+
+# Global claim-check layer
+claim_check = ClaimCheck()
+
+
+def get_claim_check_stats() -> Dict[str, Any]:
+    """Get claim-check statistics."""
+    return claim_check.get_stats()
@@ -43,7 +43,7 @@ async def gremlins_exception_handler(request: Request, exc: GremlinsAIException)
     return JSONResponse(
         status_code=exc.status_code,
         content=exc.error_response.model_dump(),
-        headers={"X-Request-ID": exc.error_response.request_id}
+        headers={"X-Request-ID": exc.error_response.request_id, **(exc.headers or {})}
     )
 
 
@@ -377,3 +377,35 @@ class RateLimitException(GremlinsAIException):
             documentation_url="https://docs.gremlinsai.com/api/rate-limits",
             **kwargs
         )
+
+
+class AgentQueueFullException(RateLimitException):
+    """Exception raised when an agent or task admission queue is full."""
+    
+    def __init__(self, queue_name: str, retry_after: int, **kwargs):
+        self.retry_after = retry_after
+        super().__init__(
+            error_message=f"Admission queue '{queue_name}' is full",
+            retry_after=retry_after,
+            headers={"Retry-After": str(retry_after)},
+            **kwargs
+        )
+
+
+class AgentQueueTimeoutException(GremlinsAIException):
+    """Exception raised when a request waits too long for agent capacity."""
+    
+    def __init__(self, queue_name: str, waited: float, retry_after: int, **kwargs):
+        self.retry_after = retry_after
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code=ErrorCode.AGENT_UNAVAILABLE,
+            error_message=f"No capacity became available in admission queue '{queue_name}'",
+            error_details=f"Request waited {waited:.1f} seconds",
+            severity=ErrorSeverity.MEDIUM,
+            category="rate_limiting",
+            suggested_action=f"Retry after {retry_after} seconds",
+            documentation_url="https://docs.gremlinsai.com/api/rate-limits",
+            headers={"Retry-After": str(retry_after)},
+            **kwargs
+        )
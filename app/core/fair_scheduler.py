@@ -0,0 +1,390 @@
+# app/core/fair_scheduler.py
+"""
+Fair-share scheduler for LLM and agent capacity.
+
+Implements weighted fair queuing (start-time fair queuing) in front of LLM and
+agent execution so that a single user running batch jobs cannot monopolize
+every execution slot. Requests are keyed by the authenticated ``User.id`` from
+``app.core.security``; each user's share is weighted by their roles and capped
+by a per-user concurrency limit. The queue itself is bounded: requests are
+rejected (429 with ``Retry-After``) when it is full and give up with 503 when
+they wait longer than the configured maximum.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Deque
+
+from app.core.exceptions import AgentQueueFullException, AgentQueueTimeoutException
+
+logger = logging.getLogger(__name__)
+
+ANONYMOUS_USER_ID = "anonymous"
+
+# Scheduler configuration
+FAIR_SCHEDULER_CAPACITY = int(os.getenv("FAIR_SCHEDULER_CAPACITY", "10"))
+FAIR_SCHEDULER_PER_USER_CAP = int(os.getenv("FAIR_SCHEDULER_PER_USER_CAP", "4"))
+FAIR_SCHEDULER_QUEUE_DEPTH = int(os.getenv("FAIR_SCHEDULER_QUEUE_DEPTH", "100"))
+FAIR_SCHEDULER_MAX_WAIT = float(os.getenv("FAIR_SCHEDULER_MAX_WAIT", "30"))
+# Seconds after which an idle user's scheduling state is dropped
+FAIR_SCHEDULER_IDLE_TTL = float(os.getenv("FAIR_SCHEDULER_IDLE_TTL", "600"))
+
+DEFAULT_ROLE_WEIGHTS: Dict[str, float] = {
+    "admin": 4.0,
+    "moderator": 2.0,
+    "user": 1.0,
+    "batch": 0.5,
+}
+
+
+def _parse_role_weights(raw: Optional[str]) -> Dict[str, float]:
+    """Parse role weights from a ``role=weight,role=weight`` string."""
+    weights = dict(DEFAULT_ROLE_WEIGHTS)
+    if not raw:
+        return weights
+
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        role, value = item.split("=", 1)
+        try:
+            weight = float(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid weight for role '{role.strip()}': {value}")
+            continue
+        if weight > 0:
+            weights[role.strip()] = weight
+
+    return weights
+
+
+class _Waiter:
+    """A queued request waiting for an execution slot."""
+
+    __slots__ = ("future", "finish_tag", "start_tag", "enqueued_at")
+
+    def __init__(self, future: asyncio.Future, start_tag: float, finish_tag: float):
+        self.future = future
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.enqueued_at = time.monotonic()
+
+
+class _UserState:
+    """Per-user scheduling state and consumption metrics."""
+
+    def __init__(self, user_id: str, weight: float, max_concurrent: int):
+        self.user_id = user_id
+        self.weight = weight
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self.last_finish_tag = 0.0
+        self.queue: Deque[_Waiter] = deque()
+
+        # Metrics
+        self.granted = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_service_time = 0.0
+        self.last_seen = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert user state to a metrics dictionary."""
+        return {
+            "user_id": self.user_id,
+            "weight": self.weight,
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "queued": len(self.queue),
+            "granted": self.granted,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "average_wait_time": self.total_wait_time / self.granted if self.granted else 0.0,
+            "max_wait_time": self.max_wait_time,
+            "total_service_time": self.total_service_time,
+            "last_seen": self.last_seen,
+        }
+
+
+class FairShareScheduler:
+    """
+    Weighted fair-queuing scheduler for shared LLM and agent capacity.
+
+    Each request is tagged with a virtual start time of
+    ``max(virtual_time, user.last_finish_tag)`` and a finish tag of
+    ``start + cost / weight``. When a slot frees up, the head request with the
+    smallest finish tag among users below their concurrency cap is admitted, so
+    capacity is split between active users in proportion to their weights. At
+    most ``max_depth`` requests wait across all users.
+    """
+
+    def __init__(
+        self,
+        capacity: int = FAIR_SCHEDULER_CAPACITY,
+        per_user_cap: int = FAIR_SCHEDULER_PER_USER_CAP,
+        role_weights: Optional[Dict[str, float]] = None,
+        max_depth: int = FAIR_SCHEDULER_QUEUE_DEPTH,
+        max_wait: float = FAIR_SCHEDULER_MAX_WAIT,
+        idle_ttl: float = FAIR_SCHEDULER_IDLE_TTL
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            capacity: Total number of concurrent execution slots
+            per_user_cap: Maximum concurrent slots held by a single user
+            role_weights: Mapping of role name to scheduling weight
+            max_depth: Maximum number of waiting requests before rejecting
+            max_wait: Maximum time in seconds a request waits for a slot
+            idle_ttl: Seconds without requests after which an idle user's state is dropped
+        """
+        self.capacity = max(1, capacity)
+        self.per_user_cap = max(1, per_user_cap)
+        self.role_weights = role_weights or _parse_role_weights(os.getenv("FAIR_SCHEDULER_ROLE_WEIGHTS"))
+        self.max_depth = max(0, max_depth)
+        self.max_wait = max_wait
+        self.idle_ttl = idle_ttl
+        self.active = 0
+        self.virtual_time = 0.0
+        self._users: Dict[str, _UserState] = {}
+        self._queued = 0
+        self._last_prune = time.time()
+
+        # Metrics
+        self.rejected = 0
+        self.timed_out = 0
+        self.pruned_users = 0
+        self._service_time = 0.0
+        self._completed = 0
+
+    def weight_for_roles(self, roles: Optional[List[str]]) -> float:
+        """Get the scheduling weight for a set of roles (highest role wins)."""
+        if not roles:
+            return self.role_weights.get("user", 1.0)
+        return max(self.role_weights.get(role, self.role_weights.get("user", 1.0)) for role in roles)
+
+    def _get_user_state(self, user_id: str, roles: Optional[List[str]]) -> _UserState:
+        state = self._users.get(user_id)
+        weight = self.weight_for_roles(roles)
+        if state is None:
+            # New users are the only way the map grows, so that is when it is pruned
+            self._prune_idle_users()
+            state = _UserState(user_id, weight, self.per_user_cap)
+            self._users[user_id] = state
+        else:
+            # Roles may change between tokens; always use the latest weight
+            state.weight = weight
+        state.last_seen = time.time()
+        return state
+
+    def _prune_idle_users(self):
+        """Drop users with nothing active or queued that have not been seen for idle_ttl."""
+        now = time.time()
+        if now - self._last_prune < self.idle_ttl:
+            return
+        self._last_prune = now
+        # Users still ahead of the virtual clock are kept: starting over would reset their tags
+        idle = [
+            user_id for user_id, state in self._users.items()
+            if not state.active and not state.queue and now - state.last_seen > self.idle_ttl
+            and state.last_finish_tag <= self.virtual_time
+        ]
+        for user_id in idle:
+            del self._users[user_id]
+        self.pruned_users += len(idle)
+
+    def _has_waiters(self) -> bool:
+        return self._queued > 0
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a new request could be admitted."""
+        average_run = self._service_time / self._completed if self._completed else 1.0
+        estimate = average_run * (self._queued + 1) / self.capacity
+        return max(1, min(int(math.ceil(estimate)), int(math.ceil(self.max_wait)) or 1))
+
+    async def acquire(self, user_id: Optional[str] = None, roles: Optional[List[str]] = None,
+                      cost: float = 1.0) -> float:
+        """
+        Wait for an execution slot for the given user.
+
+        Args:
+            user_id: Authenticated user ID (``None`` for anonymous callers)
+            roles: Roles of the user, used to look up the scheduling weight
+            cost: Relative cost of the request (e.g. number of documents)
+
+        Returns:
+            Time spent waiting in the queue, in seconds
+
+        Raises:
+            AgentQueueFullException: If the queue is full
+            AgentQueueTimeoutException: If no slot became available within max_wait
+        """
+        user_id = user_id or ANONYMOUS_USER_ID
+        state = self._get_user_state(user_id, roles)
+
+        start_tag = max(self.virtual_time, state.last_finish_tag)
+        finish_tag = start_tag + max(cost, 0.001) / state.weight
+
+        # Fast path: free capacity and nobody waiting ahead of us
+        if self.active < self.capacity and state.active < state.max_concurrent and not self._has_waiters():
+            state.last_finish_tag = finish_tag
+            self._grant(state, start_tag, 0.0)
+            return 0.0
+
+        if self._queued >= self.max_depth:
+            self.rejected += 1
+            retry_after = self.retry_after()
+            logger.warning(f"Fair-share queue full ({self._queued} waiting), retry after {retry_after}s")
+            raise AgentQueueFullException("fair_share", retry_after)
+
+        state.last_finish_tag = finish_tag
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(loop.create_future(), start_tag, finish_tag)
+        state.queue.append(waiter)
+        self._queued += 1
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(waiter.future, timeout=self.max_wait if self.max_wait > 0 else None)
+        except asyncio.TimeoutError:
+            self._abandon(state, waiter)
+            self.timed_out += 1
+            waited = time.monotonic() - waiter.enqueued_at
+            raise AgentQueueTimeoutException("fair_share", waited, self.retry_after())
+        except asyncio.CancelledError:
+            self._abandon(state, waiter)
+            state.cancelled += 1
+            raise
+
+        return time.monotonic() - waiter.enqueued_at
+
+    def _abandon(self, state: _UserState, waiter: _Waiter):
+        """Take a waiter that timed out or was cancelled out of the queue."""
+        if waiter.future.done() and not waiter.future.cancelled():
+            # Slot was granted just before the waiter gave up; hand it back
+            self.release(state.user_id)
+            return
+        try:
+            state.queue.remove(waiter)
+        except ValueError:
+            # Already dropped by _dispatch
+            return
+        self._queued -= 1
+
+    def _grant(self, state: _UserState, start_tag: float, wait_time: float):
+        self.active += 1
+        state.active += 1
+        state.granted += 1
+        state.total_wait_time += wait_time
+        state.max_wait_time = max(state.max_wait_time, wait_time)
+        self.virtual_time = max(self.virtual_time, start_tag)
+
+    def release(self, user_id: Optional[str] = None, service_time: float = 0.0):
+        """
+        Release a slot held by the given user and admit the next waiter.
+
+        Args:
+            user_id: User ID that held the slot
+            service_time: Time the slot was held, recorded for metrics
+        """
+        state = self._users.get(user_id or ANONYMOUS_USER_ID)
+        self.active = max(0, self.active - 1)
+        self._service_time += service_time
+        self._completed += 1
+        if state is not None:
+            state.active = max(0, state.active - 1)
+            state.completed += 1
+            state.total_service_time += service_time
+        self._dispatch()
+
+    def _dispatch(self):
+        """Admit waiters in finish-tag order while capacity is available."""
+        while self.active < self.capacity:
+            candidate: Optional[_UserState] = None
+            for state in self._users.values():
+                # Drop waiters whose callers have gone away
+                while state.queue and state.queue[0].future.done():
+                    state.queue.popleft()
+                    self._queued -= 1
+                if not state.queue or state.active >= state.max_concurrent:
+                    continue
+                if candidate is None or state.queue[0].finish_tag < candidate.queue[0].finish_tag:
+                    candidate = state
+
+            if candidate is None:
+                break
+
+            waiter = candidate.queue.popleft()
+            self._queued -= 1
+            self._grant(candidate, waiter.start_tag, time.monotonic() - waiter.enqueued_at)
+            waiter.future.set_result(True)
+
+        if not self._has_waiters():
+            # Idle system: reset virtual clock so tags don't grow without bound
+            self._reset_idle_tags()
+
+    def _reset_idle_tags(self):
+        if self.active == 0:
+            self.virtual_time = 0.0
+            for state in self._users.values():
+                state.last_finish_tag = 0.0
+
+    @asynccontextmanager
+    async def slot(self, user_id: Optional[str] = None, roles: Optional[List[str]] = None,
+                   cost: float = 1.0):
+        """
+        Async context manager holding a fair-share slot for the duration of the block.
+
+        Example:
+            async with fair_scheduler.slot(user.id, user.roles):
+                result = await run_llm_work()
+        """
+        await self.acquire(user_id, roles, cost)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(user_id, time.monotonic() - started)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics including per-user queue metrics."""
+        users = sorted(
+            (state.to_dict() for state in self._users.values()),
+            key=lambda item: (item["active"] + item["queued"], item["total_service_time"]),
+            reverse=True
+        )
+        return {
+            "capacity": self.capacity,
+            "per_user_cap": self.per_user_cap,
+            "max_depth": self.max_depth,
+            "max_wait": self.max_wait,
+            "active": self.active,
+            "queued": self._queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "tracked_users": len(self._users),
+            "pruned_users": self.pruned_users,
+            "virtual_time": self.virtual_time,
+            "role_weights": dict(self.role_weights),
+            "users": users,
+        }
+
+
+# Global scheduler instance shared by LLM and agent execution paths
+fair_scheduler = FairShareScheduler()
+
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    """Get fair-share scheduler statistics."""
+    return fair_scheduler.get_stats()
@@ -0,0 +1,256 @@
+# app/core/idempotency.py
+"""
+Idempotency keys for asynchronous orchestrator tasks.
+
+Client retries often re-submit a task while the first copy is still running.
+Each async submission claims an idempotency key in Redis (client supplied, or
+derived from the task type and payload) mapped to its Celery task ID. Keys are
+scoped to the submitting user, and payload-derived keys are only used for
+authenticated submissions, so one caller never receives another's result. A later
+submission with the same key gets the existing task ID instead of enqueuing a
+duplicate. A claim holds the key only briefly until the task is dispatched, and
+then for the in-flight TTL, so queued tasks are never enqueued twice however
+long they wait. When the task succeeds the key is kept for a reuse window; when
+it fails the key is released so a retry runs again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Idempotency configuration
+TASK_IDEMPOTENCY_ENABLED = os.getenv("TASK_IDEMPOTENCY_ENABLED", "true").lower() == "true"
+TASK_IDEMPOTENCY_INFLIGHT_TTL = int(os.getenv("TASK_IDEMPOTENCY_INFLIGHT_TTL", "3600"))
+TASK_IDEMPOTENCY_RESULT_TTL = int(os.getenv("TASK_IDEMPOTENCY_RESULT_TTL", "600"))
+# Seconds a claim holds its key before the task is dispatched; frees the key quickly if
+# the submitting process dies between claiming and dispatching
+TASK_IDEMPOTENCY_CLAIM_TTL = int(os.getenv("TASK_IDEMPOTENCY_CLAIM_TTL", "60"))
+# Task types deduplicated by payload hash when the client supplies no key. Chats and
+# workflows are left out: re-asking the same question should produce a new turn
+TASK_IDEMPOTENCY_DERIVED_TYPES = [
+    task_type.strip()
+    for task_type in os.getenv("TASK_IDEMPOTENCY_DERIVED_TYPES", "rag_query,document_processing").split(",")
+    if task_type.strip()
+]
+
+IDEMPOTENCY_KEY_PREFIX = "gremlins:idempotency:"
+IDEMPOTENCY_HEADER = "idempotency_key"
+
+# Celery states in which an existing task can be reused
+IN_FLIGHT_STATES = frozenset({"PENDING", "RECEIVED", "STARTED", "PROGRESS", "RETRY"})
+
+# Replace the key's task ID only if it still points at the expected one
+_COMPARE_AND_SET = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('set', KEYS[1], ARGV[2], 'EX', ARGV[3])
+end
+return nil
+"""
+
+_COMPARE_AND_DELETE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Extend a claim to the in-flight TTL, unless the task already settled the key (a
+# completed task's key holds the result TTL, which is longer than the claim TTL)
+_MARK_DISPATCHED = """
+if redis.call('get', KEYS[1]) == ARGV[1] and redis.call('ttl', KEYS[1]) <= tonumber(ARGV[3]) then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_COMPARE_AND_EXPIRE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def make_idempotency_key(task_type: str, payload: Dict[str, Any], client_key: Optional[str] = None,
+                         user_id: Optional[str] = None) -> str:
+    """
+    Build the Redis key for a task submission.
+
+    Args:
+        task_type: Orchestrator task type
+        payload: Task payload, hashed when no client key is given
+        client_key: Idempotency key supplied by the client
+        user_id: Submitting user, part of every key
+
+    Returns:
+        Redis key scoped by task type and user
+    """
+    scope = {"user": user_id or "", "conversation": payload.get("conversation_id") or ""}
+    if client_key:
+        encoded = json.dumps({**scope, "key": client_key}, sort_keys=True)
+        digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        return f"{IDEMPOTENCY_KEY_PREFIX}{task_type}:client:{digest}"
+
+    encoded = json.dumps({**scope, "payload": payload}, sort_keys=True, default=str)
+    digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    return f"{IDEMPOTENCY_KEY_PREFIX}{task_type}:payload:{digest}"
+
+
+class TaskDeduplicator:
+    """Claims idempotency keys for task submissions and tracks reuse."""
+
+    def __init__(self, enabled: bool = TASK_IDEMPOTENCY_ENABLED,
+                 inflight_ttl: int = TASK_IDEMPOTENCY_INFLIGHT_TTL,
+                 result_ttl: int = TASK_IDEMPOTENCY_RESULT_TTL,
+                 claim_ttl: int = TASK_IDEMPOTENCY_CLAIM_TTL):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            enabled: Whether deduplication is enabled
+            inflight_ttl: Upper bound in seconds on how long a running task holds its key
+            result_ttl: Seconds a successful task's result stays reusable (0 disables reuse)
+            claim_ttl: Seconds a claim holds its key until the task is dispatched
+        """
+        self.enabled = enabled
+        self.inflight_ttl = max(1, inflight_ttl)
+        self.result_ttl = max(0, result_ttl)
+        self.claim_ttl = min(max(1, claim_ttl), self.inflight_ttl)
+
+        # Metrics
+        self.claimed = 0
+        self.reused_in_flight = 0
+        self.reused_completed = 0
+        self.replaced = 0
+
+    def key_for(self, task_type: str, payload: Dict[str, Any], client_key: Optional[str] = None,
+                user_id: Optional[str] = None) -> Optional[str]:
+        """
+        Get the idempotency key for a submission, or None if it should not be deduplicated.
+
+        Client-supplied keys apply to every task type; payload-derived keys only
+        to TASK_IDEMPOTENCY_DERIVED_TYPES submitted by an authenticated user.
+        """
+        if not self.enabled:
+            return None
+        if client_key or (user_id and task_type in TASK_IDEMPOTENCY_DERIVED_TYPES):
+            return make_idempotency_key(task_type, payload, client_key, user_id)
+        return None
+
+    def _client(self):
+        if not self.enabled:
+            return None
+        from app.core.redis_client import get_redis
+
+        return get_redis()
+
+    def claim(self, key: str, task_id: str) -> Tuple[str, Optional[str]]:
+        """
+        Claim a key for a new task, or find the task already holding it.
+
+        Args:
+            key: Idempotency key from make_idempotency_key
+            task_id: ID the new task will be dispatched with
+
+        Returns:
+            Tuple of (task ID to use, state of the reused task). The state is
+            None when the caller claimed the key and must dispatch the task, then
+            call mark_dispatched (or release if dispatching failed).
+        """
+        client = self._client()
+        if client is None:
+            return task_id, None
+
+        try:
+            from app.core.celery_app import celery_app
+
+            for _ in range(3):
+                if client.set(key, task_id, nx=True, ex=self.claim_ttl):
+                    self.claimed += 1
+                    return task_id, None
+
+                existing_id = client.get(key)
+                if existing_id is None:
+                    continue  # Expired between SET and GET; try again
+
+                # PENDING covers tasks waiting in the queue and claims not yet dispatched;
+                # a claim whose dispatch never happened expires after claim_ttl
+                state = celery_app.AsyncResult(existing_id).state
+                if state in IN_FLIGHT_STATES:
+                    self.reused_in_flight += 1
+                    logger.info(f"Reusing in-flight task {existing_id} for duplicate submission")
+                    return existing_id, state
+                if state == "SUCCESS" and self.result_ttl > 0:
+                    self.reused_completed += 1
+                    logger.info(f"Reusing completed task {existing_id} for duplicate submission")
+                    return existing_id, state
+
+                # Failed, revoked or outside the reuse window: take the key over
+                if client.eval(_COMPARE_AND_SET, 1, key, existing_id, task_id, self.claim_ttl):
+                    self.replaced += 1
+                    return task_id, None
+
+        except Exception as e:
+            logger.warning(f"Idempotency check failed, dispatching without deduplication: {e}")
+
+        return task_id, None
+
+    def mark_dispatched(self, key: str, task_id: str):
+        """Hold a claimed key for the in-flight TTL once its task has been dispatched."""
+        client = self._client()
+        if client is None:
+            return
+        try:
+            client.eval(_MARK_DISPATCHED, 1, key, task_id, self.inflight_ttl, self.claim_ttl)
+        except Exception as e:
+            logger.debug(f"Failed to mark idempotency key dispatched for task {task_id}: {e}")
+
+    def release(self, key: str, task_id: str):
+        """Release a key held by a task that failed or was never dispatched."""
+        client = self._client()
+        if client is None:
+            return
+        try:
+            client.eval(_COMPARE_AND_DELETE, 1, key, task_id)
+        except Exception as e:
+            logger.debug(f"Failed to release idempotency key for task {task_id}: {e}")
+
+    def complete(self, key: str, task_id: str):
+        """Keep a successful task's key for the result reuse window."""
+        client = self._client()
+        if client is None:
+            return
+        if self.result_ttl <= 0:
+            self.release(key, task_id)
+            return
+        try:
+            client.eval(_COMPARE_AND_EXPIRE, 1, key, task_id, self.result_ttl)
+        except Exception as e:
+            logger.debug(f"Failed to update idempotency key for task {task_id}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get deduplication statistics for this process."""
+        return {
+            "enabled": self.enabled,
+            "inflight_ttl": self.inflight_ttl,
+            "result_ttl": self.result_ttl,
+            "claim_ttl": self.claim_ttl,
+            "derived_task_types": list(TASK_IDEMPOTENCY_DERIVED_TYPES),
+            "claimed": self.claimed,
+            "reused_in_flight": self.reused_in_flight,
+            "reused_completed": self.reused_completed,
+            "replaced": self.replaced,
+        }
+
+
+# Global task deduplicator
+task_deduplicator = TaskDeduplicator()
+
+
+def get_idempotency_stats() -> Dict[str, Any]:
+    """Get task deduplication statistics."""
+    return task_deduplicator.get_stats()
@@ -195,6 +195,7 @@ llm_config = LLMConfig()
 
 # Global LLM instance cache with thread safety
 import threading
+from contextlib import contextmanager
 _llm_instance_cache = None
 _llm_config_hash = None
 _llm_cache_lock = threading.RLock()
@@ -393,6 +394,12 @@ class LLMPool:
         self.request_count = 0
         self._pool_lock = threading.RLock()
 
+        # Concurrency limit: at most pool_size in-flight requests per pool
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self.active_requests = 0
+        self.peak_active_requests = 0
+        self.total_wait_time = 0.0
+
         logger.info(f"Initializing LLM pool with size {self.pool_size} for {agent_type} agent")
 
     def get_llm(self):
@@ -416,6 +423,32 @@ class LLMPool:
             logger.debug(f"Serving LLM instance {self.current_index} from pool (request #{self.request_count})")
             return llm
 
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None):
+        """
+        Hold one of the pool's concurrency slots for the duration of a request.
+
+        Args:
+            timeout: Maximum seconds to wait for a slot (None waits indefinitely)
+
+        Raises:
+            TimeoutError: If no slot became available within the timeout
+        """
+        wait_start = time.time()
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No LLM slot available for {self.agent_type} within {timeout}s")
+
+        with self._pool_lock:
+            self.total_wait_time += time.time() - wait_start
+            self.active_requests += 1
+            self.peak_active_requests = max(self.peak_active_requests, self.active_requests)
+        try:
+            yield
+        finally:
+            with self._pool_lock:
+                self.active_requests -= 1
+            self._slots.release()
+
     def _create_pool(self):
         """Create the pool of LLM instances."""
         logger.info(f"Creating LLM pool with {self.pool_size} instances for {self.agent_type}")
@@ -452,7 +485,10 @@ class LLMPool:
                 "creation_count": self.creation_count,
                 "request_count": self.request_count,
                 "current_index": self.current_index,
-                "instances_created": len(self.instances) > 0
+                "instances_created": len(self.instances) > 0,
+                "active_requests": self.active_requests,
+                "peak_active_requests": self.peak_active_requests,
+                "total_slot_wait_time": self.total_wait_time
             }
 
     def invalidate_pool(self):
@@ -467,7 +503,35 @@ class LLMPool:
 _llm_pools: Dict[str, LLMPool] = {}
 _pool_lock = threading.RLock()
 
-def get_pooled_llm(agent_type: str = "default", pool_size: int = 2):
+# Default number of instances (and concurrent requests) per pool
+DEFAULT_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "2"))
+
+def _get_or_create_pool(agent_type: str, pool_size: int) -> LLMPool:
+    """Get the pool for an agent type, creating it if needed."""
+    with _pool_lock:
+        if agent_type not in _llm_pools:
+            _llm_pools[agent_type] = LLMPool(pool_size=pool_size, agent_type=agent_type)
+        return _llm_pools[agent_type]
+
+def llm_slot(agent_type: str = "default", pool_size: int = DEFAULT_POOL_SIZE, timeout: Optional[float] = None):
+    """
+    Context manager limiting concurrent LLM requests for an agent type.
+
+    Callers that run LLM work from worker threads (e.g. parallel workflow steps)
+    wrap each request in this so the number of in-flight requests never exceeds
+    the size of the agent type's pool.
+
+    Args:
+        agent_type: Type of agent ('researcher', 'writer', 'analyst', 'coordinator', 'default')
+        pool_size: Size of the pool if it has to be created
+        timeout: Maximum seconds to wait for a slot
+
+    Returns:
+        Context manager holding a pool slot
+    """
+    return _get_or_create_pool(agent_type, pool_size).slot(timeout=timeout)
+
+def get_pooled_llm(agent_type: str = "default", pool_size: int = DEFAULT_POOL_SIZE):
     """
     Get an LLM instance from a connection pool.
 
@@ -484,12 +548,8 @@ def get_pooled_llm(agent_type: str = "default", pool_size: int = 2):
     global _llm_pools, _llm_metrics
     _llm_metrics.record_pooled_request()
 
-    with _pool_lock:
-        # Create pool if it doesn't exist
-        if agent_type not in _llm_pools:
-            _llm_pools[agent_type] = LLMPool(pool_size=pool_size, agent_type=agent_type)
-
-        return _llm_pools[agent_type].get_llm()
+    # Create pool if it doesn't exist
+    return _get_or_create_pool(agent_type, pool_size).get_llm()
 
 def get_pool_stats(agent_type: str = None) -> Dict[str, Any]:
     """
@@ -0,0 +1,212 @@
+# app/core/model_preload.py
+"""
+Copy-on-write model preloading for prefork Celery workers.
+
+Every prefork child used to load its own SentenceTransformer, CLIP and Whisper
+weights, so worker memory grew linearly with concurrency. With preloading the
+parent process loads the models once (on the CPU) before the pool forks, and
+the children share those pages copy-on-write:
+
+- Models are put in eval mode with gradients disabled, so nothing writes to
+  the weight tensors after the fork.
+- ``gc.freeze()`` moves every object loaded so far to a permanent generation,
+  so the garbage collector in the children doesn't touch their headers (which
+  would copy the pages holding them).
+- CUDA and the torch / tokenizer thread pools are not initialized in the
+  parent; neither survives a fork. Each child sets its thread count and, if
+  configured, moves its models to the GPU in ``after_fork``.
+
+``preload_in_parent`` runs from ``celeryd_init`` and ``after_fork`` from
+``worker_process_init`` (see app/core/celery_app.py).
+"""
+
+import gc
+import logging
+import os
+import sys
+import time
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# Preload configuration
+WORKER_PRELOAD_MODE = os.getenv("WORKER_PRELOAD_MODE", "parent")  # parent or off (each child loads its own)
+WORKER_MODEL_DEVICE = os.getenv("WORKER_MODEL_DEVICE", "cpu")  # Device children move models to after fork
+WORKER_TORCH_THREADS = int(os.getenv("WORKER_TORCH_THREADS", "0"))  # 0 = CPU count / pool size
+
+PREFORK_POOLS = ("prefork", "processes")
+
+_preload_state: Dict[str, Any] = {
+    "mode": WORKER_PRELOAD_MODE,
+    "preloaded": False,
+    "parent_pid": None,
+    "preload_time": 0.0,
+    "concurrency": None,
+    "models": [],
+}
+
+
+def _shared_models() -> List[Any]:
+    """Get the loaded torch modules of the vector store and multimodal processor."""
+    models = []
+    vector_store_module = sys.modules.get("app.core.vector_store")
+    if vector_store_module is not None:
+        store = vector_store_module.vector_store
+        models.extend([store.text_embedding_model, store.clip_model])
+
+    multimodal_module = sys.modules.get("app.core.multimodal")
+    if multimodal_module is not None:
+        models.append(multimodal_module.multimodal_processor.audio_processor.whisper_model)
+    return [model for model in models if model is not None]
+
+
+def _freeze(model: Any):
+    """Make a model read-only: eval mode and no gradient buffers."""
+    if hasattr(model, "eval"):
+        model.eval()
+    if hasattr(model, "requires_grad_"):
+        model.requires_grad_(False)
+
+
+def preload_in_parent(pool: Optional[str] = None, concurrency: Optional[int] = None,
+                      force: bool = False) -> bool:
+    """
+    Load the models in the worker parent so forked children share them.
+
+    Args:
+        pool: Worker pool implementation; only prefork pools fork after this runs
+        concurrency: Number of child processes, used for the per-child thread count
+        force: Preload even if disabled or the pool doesn't fork
+
+    Returns:
+        Whether the models were preloaded
+    """
+    if not force:
+        if WORKER_PRELOAD_MODE != "parent":
+            return False
+        if pool and pool not in PREFORK_POOLS:
+            logger.info(f"Skipping parent model preload for the {pool} pool")
+            return False
+
+    started = time.perf_counter()
+    # Neither CUDA contexts nor tokenizer thread pools survive a fork
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    os.environ["MODEL_DEVICE"] = "cpu"
+
+    try:
+        from app.core.vector_store import vector_store  # noqa: F401
+    except Exception as e:
+        logger.warning(f"Failed to preload vector store models: {e}")
+    try:
+        from app.core.multimodal import multimodal_processor  # noqa: F401
+    except Exception as e:
+        logger.warning(f"Failed to preload multimodal models: {e}")
+
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_initialized():
+        logger.warning("CUDA was initialized in the worker parent before preloading; "
+                       "set MODEL_DEVICE=cpu for prefork workers")
+
+    models = _shared_models()
+    for model in models:
+        _freeze(model)
+
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+
+    _preload_state.update({
+        "preloaded": True,
+        "parent_pid": os.getpid(),
+        "preload_time": time.perf_counter() - started,
+        "concurrency": concurrency,
+        "models": [type(model).__name__ for model in models],
+    })
+    logger.info(f"Preloaded {len(models)} models in the worker parent in "
+                f"{_preload_state['preload_time']:.2f}s (shared copy-on-write by children)")
+    return True
+
+
+def after_fork(device: str = WORKER_MODEL_DEVICE, torch_threads: int = WORKER_TORCH_THREADS):
+    """
+    Initialize per-child state deferred by the parent preload.
+
+    Args:
+        device: Device to move models to ("cpu" keeps them shared)
+        torch_threads: Intra-op threads per child (0 = CPU count / pool size)
+    """
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return
+
+    if torch_threads <= 0:
+        concurrency = _preload_state["concurrency"] or 1
+        torch_threads = max(1, (os.cpu_count() or 1) // concurrency)
+    torch.set_num_threads(torch_threads)
+
+    if not device.startswith("cuda"):
+        return
+    if not torch.cuda.is_available():
+        logger.warning(f"WORKER_MODEL_DEVICE is {device} but CUDA is not available; models stay on the CPU")
+        return
+
+    # A GPU copy is private to the child; CLIP stays on the CPU because its inputs are created there
+    vector_store_module = sys.modules.get("app.core.vector_store")
+    if vector_store_module is not None and vector_store_module.vector_store.text_embedding_model is not None:
+        vector_store_module.vector_store.text_embedding_model.to(device)
+    multimodal_module = sys.modules.get("app.core.multimodal")
+    if multimodal_module is not None:
+        audio_processor = multimodal_module.multimodal_processor.audio_processor
+        if audio_processor.whisper_model is not None:
+            audio_processor.whisper_model.to(device)
+    logger.info(f"Moved worker models to {device} in process {os.getpid()}")
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, Optional[int]]:
+    """
+    Get the memory use of a process in bytes.
+
+    RSS counts shared pages in every process mapping them; PSS divides them
+    among those processes and USS counts only private pages, so PSS summed
+    over the pool is its real footprint. PSS and USS need Linux 4.14+.
+    """
+    pid = pid or os.getpid()
+    memory: Dict[str, Optional[int]] = {"rss": None, "pss": None, "uss": None}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    memory["rss"] = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        try:
+            import resource
+
+            # Peak RSS; kilobytes on Linux, bytes on macOS
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            memory["rss"] = peak if sys.platform == "darwin" else peak * 1024
+        except Exception:
+            pass
+        return memory
+
+    try:
+        fields: Dict[str, int] = {}
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) * 1024
+        memory["pss"] = fields.get("Pss")
+        memory["uss"] = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    except OSError:
+        pass
+    return memory
+
+
+def get_preload_stats() -> Dict[str, Any]:
+    """Get model preload state and the memory use of this process."""
+    return {
+        **_preload_state,
+        "shared": _preload_state["preloaded"] and _preload_state["parent_pid"] != os.getpid(),
+        "memory": process_memory(),
+    }
@@ -1,10 +1,23 @@
 # app/core/multi_agent.py
+import asyncio
+import json
 import logging
-from typing import Dict, Any, List, Optional
-from crewai import Agent, Task, Crew, Process
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator, TYPE_CHECKING
+# CrewAI is imported lazily so that modules which only need the orchestrator
+# handle (rag_system, orchestrator, Celery workers) don't pay for loading it.
 # from crewai_tools import SerperDevTool, WebsiteSearchTool  # Temporarily disabled due to import issues
 from app.core.llm_config import get_llm, get_llm_info, LLMProvider
 from app.core.tools import duckduckgo_search
+from app.core.workflow_engine import WorkflowDAG, WorkflowEngine, WorkflowStep, StepResult
+from app.core.step_cache import step_result_cache, make_step_cache_key, WORKFLOW_STEP_CACHE_STEP_TYPES
+
+if TYPE_CHECKING:
+    from crewai import Agent, Task, Crew
 
 logger = logging.getLogger(__name__)
 
@@ -12,13 +25,62 @@ class MultiAgentOrchestrator:
     """
     Multi-agent orchestrator using CrewAI for complex reasoning and task coordination.
     Manages specialized agents for different types of tasks.
+
+    Agents, their specialized LLMs and crew templates are created lazily on first
+    use and reused afterwards.
     """
     
     def __init__(self, llm_model: Optional[str] = None, temperature: Optional[float] = None):
-        """Initialize the multi-agent orchestrator."""
-        self.llm_info = get_llm_info()
-        self.llm = self._initialize_llm()
-        self.agents = self._create_agents()
+        """Initialize the multi-agent orchestrator without creating any agents."""
+        self._llm_info: Optional[Dict[str, Any]] = None
+        self._llm = None
+        self._llm_initialized = False
+        self._agents: Optional[Dict[str, Any]] = None
+        self._crew_templates: Dict[str, "Crew"] = {}
+        self._init_lock = threading.RLock()
+        self._agent_fingerprints: Dict[str, Tuple[str, str]] = {}
+        self._workflow_engine = WorkflowEngine(
+            step_timeout=self.STEP_TIMEOUT or None,
+            cache=step_result_cache
+        )
+
+    @property
+    def llm_info(self) -> Dict[str, Any]:
+        """LLM configuration info, resolved on first access."""
+        if self._llm_info is None:
+            self._llm_info = get_llm_info()
+        return self._llm_info
+
+    @property
+    def llm(self):
+        """Base LLM for agents, initialized on first access."""
+        if not self._llm_initialized:
+            with self._init_lock:
+                if not self._llm_initialized:
+                    self._llm = self._initialize_llm()
+                    self._llm_initialized = True
+        return self._llm
+
+    @property
+    def agents(self) -> Dict[str, Any]:
+        """Specialized agents, created on first access and reused afterwards."""
+        if self._agents is None:
+            with self._init_lock:
+                if self._agents is None:
+                    self._agents = self._create_agents()
+        return self._agents
+
+    @property
+    def is_initialized(self) -> bool:
+        """Whether agents have been created in this process."""
+        return self._agents is not None
+
+    def _using_mock_agents(self) -> bool:
+        """Check whether the orchestrator fell back to mock agents."""
+        if self.llm is None:
+            return True
+        researcher = self.agents.get('researcher')
+        return isinstance(researcher, dict) and researcher.get('mock', False)
 
     def _initialize_llm(self):
         """Initialize the language model for agents using local LLM configuration."""
@@ -30,7 +92,7 @@ class MultiAgentOrchestrator:
             logger.error(f"Failed to initialize LLM: {e}")
             return None
     
-    def _create_agents(self) -> Dict[str, Agent]:
+    def _create_agents(self) -> Dict[str, Any]:
         """Create specialized agents for different tasks."""
         agents = {}
 
@@ -42,6 +104,12 @@ class MultiAgentOrchestrator:
         # Log LLM provider information
         logger.info(f"Creating agents with {self.llm_info['provider']} provider using model: {self.llm_info['model_name']}")
 
+        try:
+            from crewai import Agent
+        except ImportError as e:
+            logger.error(f"CrewAI not available: {e}")
+            return self._create_mock_agents()
+
         # Research Agent - Specializes in information gathering
         try:
             from app.core.llm_config import get_specialized_llm
@@ -150,10 +218,9 @@ class MultiAgentOrchestrator:
             'coordinator': {'role': 'Project Coordinator', 'mock': True}
         }
     
-    def create_research_task(self, query: str, context: str = "") -> Task:
-        """Create a research task for the research agent."""
-        return Task(
-            description=f"""
+    # Task description templates. Placeholders such as {query} are interpolated by
+    # CrewAI at kickoff, which lets crew templates be built once and reused.
+    RESEARCH_TASK_TEMPLATE = """
             Research the following topic thoroughly: {query}
             
             Context: {context}
@@ -165,13 +232,75 @@ class MultiAgentOrchestrator:
             4. Provide a well-structured research summary
             
             Focus on accuracy and comprehensiveness.
-            """,
+            """
+
+    WORKFLOW_ANALYSIS_TEMPLATE = """
+                    Analyze the research findings about: {query}
+
+                    Research findings:
+                    {upstream}
+
+                    Provide insights, identify patterns, and draw conclusions.
+                    Focus on practical implications and actionable insights.
+                    """
+
+    WORKFLOW_WRITING_TEMPLATE = """
+                    Create a comprehensive, well-structured response based on the research
+                    and analysis about: {query}
+
+                    Research and analysis:
+                    {upstream}
+
+                    Make it informative, engaging, and accessible to a general audience.
+                    Include key findings, insights, and practical implications.
+                    """
+
+    # Step types available to workflows: (agent, description template, expected output)
+    STEP_TEMPLATES: Dict[str, Dict[str, str]] = {
+        "research": {
+            "agent": "researcher",
+            "description": RESEARCH_TASK_TEMPLATE,
+            "expected_output": "A comprehensive research summary with key findings and sources"
+        },
+        "analysis": {
+            "agent": "analyst",
+            "description": WORKFLOW_ANALYSIS_TEMPLATE,
+            "expected_output": "Detailed analysis with insights and recommendations"
+        },
+        "writing": {
+            "agent": "writer",
+            "description": WORKFLOW_WRITING_TEMPLATE,
+            "expected_output": "Well-written, comprehensive response"
+        },
+    }
+
+    # Maximum number of research sub-queries run in parallel for one workflow
+    MAX_PARALLEL_RESEARCH = int(os.getenv("WORKFLOW_MAX_PARALLEL_RESEARCH", "3"))
+
+    # Default timeout in seconds for a single workflow step (0 disables it)
+    STEP_TIMEOUT = float(os.getenv("WORKFLOW_STEP_TIMEOUT", "300"))
+
+    # Workflow types used by callers of execute_workflow mapped to DAG workflows
+    WORKFLOW_ALIASES = {
+        "enhanced_chat": "simple_research",
+        "research": "simple_research",
+        "analysis": "complex_analysis",
+    }
+
+    def create_research_task(self, query: str, context: str = "") -> "Task":
+        """Create a research task for the research agent."""
+        from crewai import Task
+
+        return Task(
+            description=self.RESEARCH_TASK_TEMPLATE.format(query=query, context=context),
             agent=self.agents['researcher'],
             expected_output="A comprehensive research summary with key findings and sources"
         )
     
-    def create_analysis_task(self, research_data: str, analysis_focus: str = "") -> Task:
+    def create_analysis_task(self, research_data: str, analysis_focus: str = "") -> "Task":
         """Create an analysis task for the analyst agent."""
+        from crewai import Task
+
         return Task(
             description=f"""
             Analyze the following research data and provide insights:
@@ -192,8 +321,10 @@ class MultiAgentOrchestrator:
             expected_output="Detailed analysis with insights, conclusions, and recommendations"
         )
     
-    def create_writing_task(self, content_brief: str, style: str = "informative") -> Task:
+    def create_writing_task(self, content_brief: str, style: str = "informative") -> "Task":
         """Create a writing task for the writer agent."""
+        from crewai import Task
+
         return Task(
             description=f"""
             Create well-written content based on the following brief:
@@ -213,14 +344,390 @@ class MultiAgentOrchestrator:
             agent=self.agents['writer'],
             expected_output="Well-structured, engaging content that meets the brief requirements"
         )
-    
+
+    def _build_crew_template(self, step_type: str) -> "Crew":
+        """Build a reusable single-agent crew for a step type with placeholder descriptions."""
+        from crewai import Task, Crew, Process
+
+        template = self.STEP_TEMPLATES.get(step_type)
+        if template is None:
+            raise ValueError(f"Unsupported step type: {step_type}")
+
+        agent = self.agents[template["agent"]]
+        task = Task(
+            description=template["description"],
+            agent=agent,
+            expected_output=template["expected_output"]
+        )
+        return Crew(
+            agents=[agent],
+            tasks=[task],
+            verbose=True,
+            process=Process.sequential
+        )
+
+    def get_crew(self, step_type: str) -> "Crew":
+        """
+        Get a crew for a workflow step type.
+
+        Crew templates are built once per step type and copied for each run,
+        so agents and task definitions are shared while per-run task outputs stay
+        isolated between concurrent executions.
+        """
+        template = self._crew_templates.get(step_type)
+        if template is None:
+            with self._init_lock:
+                template = self._crew_templates.get(step_type)
+                if template is None:
+                    template = self._build_crew_template(step_type)
+                    self._crew_templates[step_type] = template
+                    logger.info(f"Created crew template for step type: {step_type}")
+        return template.copy()
+
+    @staticmethod
+    def _split_research_questions(query: str, max_questions: int) -> List[str]:
+        """Split a query into independent research sub-questions."""
+        questions = [part.strip() for part in re.split(r"(?<=\?)\s+|;\s*|\n+", query) if part.strip()]
+        if len(questions) <= 1:
+            return [query]
+        if len(questions) > max_questions:
+            # Keep the remaining questions together in the last research step
+            questions = questions[:max_questions - 1] + [" ".join(questions[max_questions - 1:])]
+        return questions
+
+    def build_workflow_dag(self, workflow_type: str, query: str,
+                           sub_queries: Optional[List[str]] = None) -> WorkflowDAG:
+        """
+        Describe a workflow as a DAG of steps.
+
+        Research is split into independent sub-queries which run concurrently;
+        analysis waits for all research steps and writing waits for analysis.
+
+        Args:
+            workflow_type: Type of workflow (research_analyze_write, complex_analysis, simple_research)
+            query: The user query
+            sub_queries: Optional explicit research sub-queries
+
+        Returns:
+            Validated workflow DAG
+        """
+        research_queries = sub_queries or self._split_research_questions(query, self.MAX_PARALLEL_RESEARCH)
+        research_steps = [
+            WorkflowStep(
+                name=f"research_{i + 1}",
+                step_type="research",
+                agent="researcher",
+                inputs={"query": sub_query, "context": f"Part of a broader question: {query}"
+                        if len(research_queries) > 1 else ""}
+            )
+            for i, sub_query in enumerate(research_queries)
+        ]
+        research_names = [step.name for step in research_steps]
+
+        if workflow_type == "simple_research":
+            steps = research_steps
+
+        elif workflow_type == "complex_analysis":
+            steps = research_steps + [
+                WorkflowStep("analysis", "analysis", "analyst", {"query": query}, research_names)
+            ]
+
+        elif workflow_type == "research_analyze_write":
+            steps = research_steps + [
+                WorkflowStep("analysis", "analysis", "analyst", {"query": query}, research_names),
+                WorkflowStep("writing", "writing", "writer", {"query": query}, ["analysis"])
+            ]
+
+        else:
+            raise ValueError(f"Unsupported workflow type: {workflow_type}")
+
+        return WorkflowDAG(workflow_type, steps)
+
+    def _agent_fingerprint(self, agent_name: str) -> Tuple[str, str]:
+        """Get (configuration fingerprint, LLM model) of an agent for step cache keys."""
+        fingerprint = self._agent_fingerprints.get(agent_name)
+        if fingerprint is None:
+            agent = self.agents[agent_name]
+            agent_llm = getattr(agent, "llm", None)
+            llm_model = str(
+                getattr(agent_llm, "model", None)
+                or getattr(agent_llm, "model_name", None)
+                or self.llm_info.get("model_name", "")
+            )
+            config = json.dumps({
+                "role": getattr(agent, "role", agent_name),
+                "goal": getattr(agent, "goal", ""),
+                "backstory": getattr(agent, "backstory", ""),
+                "tools": sorted(getattr(tool, "name", type(tool).__name__) for tool in getattr(agent, "tools", None) or []),
+                "temperature": getattr(agent_llm, "temperature", None),
+                "provider": self.llm_info.get("provider"),
+            }, sort_keys=True, default=str)
+            fingerprint = (config, llm_model)
+            self._agent_fingerprints[agent_name] = fingerprint
+        return fingerprint
+
+    def _assign_cache_keys(self, dag: WorkflowDAG):
+        """
+        Assign step cache keys to cacheable steps of a workflow.
+
+        Only dependency-free steps are cached, since their output is fully
+        determined by their own inputs, agent configuration and model.
+        """
+        for step in dag.steps.values():
+            if step.depends_on or step.step_type not in WORKFLOW_STEP_CACHE_STEP_TYPES:
+                continue
+            agent_config, llm_model = self._agent_fingerprint(step.agent)
+            step.cache_key = make_step_cache_key(
+                step.step_type,
+                {"query": step.inputs.get("query", ""), "context": step.inputs.get("context", ""),
+                 "template": self.STEP_TEMPLATES[step.step_type]["description"]},
+                agent_config,
+                llm_model
+            )
+
+    def _run_workflow_step(self, step: WorkflowStep, step_inputs: Dict[str, Any]) -> str:
+        """Run a single workflow step with its crew template (blocking)."""
+        upstream = step_inputs.get("upstream", {})
+        inputs = {
+            "query": step_inputs.get("query", ""),
+            "context": step_inputs.get("context", ""),
+            "upstream": "\n\n".join(f"[{name}]\n{output}" for name, output in upstream.items())
+        }
+        crew = self.get_crew(step.step_type)
+        return str(crew.kickoff(inputs=inputs))
+
+    @staticmethod
+    def _format_context(context: Any) -> str:
+        """Format conversation context (message dicts or plain text) for prompts."""
+        if not context:
+            return ""
+        if isinstance(context, str):
+            return context
+        lines = []
+        for item in context:
+            if isinstance(item, dict):
+                lines.append(f"{item.get('role', 'user')}: {item.get('content', '')}")
+            else:
+                lines.append(str(item))
+        return "\n".join(lines)
+
+    async def stream_workflow(
+        self,
+        workflow_type: str,
+        input_data: str,
+        context: Any = None,
+        sub_queries: Optional[List[str]] = None,
+        conversation_id: Optional[str] = None,
+        step_timeout: Optional[float] = None,
+        record_interactions: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a multi-agent workflow, yielding progress events as steps finish.
+
+        Crew steps run in worker threads, so the event loop stays free while
+        agents work. Events are plain dictionaries suitable for JSON transport:
+
+        - ``workflow_started``: workflow ID and the planned steps
+        - ``step_completed``: one per step (completed, failed or skipped) with its output
+        - ``workflow_completed``: the final result, as returned by execute_workflow
+
+        Args:
+            workflow_type: Type of workflow to execute
+            input_data: The user query
+            context: Optional conversation context (list of message dicts or text)
+            sub_queries: Optional explicit research sub-queries to run in parallel
+            conversation_id: Optional conversation the interactions belong to
+            step_timeout: Optional per-step timeout in seconds overriding the default
+            record_interactions: Whether to persist per-step AgentInteraction rows
+        """
+        start_time = time.time()
+        workflow_id = str(uuid.uuid4())
+        workflow_type = self.WORKFLOW_ALIASES.get(workflow_type, workflow_type)
+        context_text = self._format_context(context)
+
+        try:
+            logger.info(f"Executing workflow {workflow_id}: {workflow_type} for query: {input_data}")
+
+            # Check if we have real agents or mock agents; the first call loads the
+            # LLM and builds the agents, so keep it off the event loop
+            if await asyncio.to_thread(self._using_mock_agents):
+                logger.info("Falling back to simple query due to missing LLM")
+                result = await asyncio.to_thread(self.execute_simple_query, input_data, context_text)
+                result.update({"workflow_id": workflow_id, "execution_time": time.time() - start_time})
+                yield {"event": "workflow_completed", "workflow_id": workflow_id, "result": result}
+                return
+
+            dag = self.build_workflow_dag(workflow_type, input_data, sub_queries)
+            for step in dag.steps.values():
+                step.inputs["context"] = "\n\n".join(filter(None, [context_text, step.inputs.get("context", "")]))
+                if step_timeout:
+                    step.timeout = step_timeout
+            # Fingerprinting agents may build them on first use
+            await asyncio.to_thread(self._assign_cache_keys, dag)
+
+            yield {
+                "event": "workflow_started",
+                "workflow_id": workflow_id,
+                "workflow_type": workflow_type,
+                "steps": [
+                    {"step": step.name, "step_type": step.step_type, "agent": step.agent,
+                     "depends_on": list(step.depends_on)}
+                    for step in (dag.steps[name] for name in dag.order)
+                ]
+            }
+
+            step_results: Dict[str, StepResult] = {}
+            async for step_result in self._workflow_engine.stream(dag, self._run_workflow_step):
+                step_results[step_result.name] = step_result
+                yield {
+                    "event": "step_completed",
+                    "workflow_id": workflow_id,
+                    "completed_steps": len(step_results),
+                    "total_steps": len(dag.steps),
+                    "output": step_result.output,
+                    **step_result.to_dict()
+                }
+
+            # Report steps in topological order regardless of completion order
+            step_results = {name: step_results[name] for name in dag.order}
+            failed = [r for r in step_results.values() if r.status != "completed"]
+            final_outputs = [step_results[name].output for name in dag.sinks
+                             if step_results[name].status == "completed"]
+            if not final_outputs:
+                raise RuntimeError(f"Workflow produced no output: {failed[0].error if failed else 'unknown error'}")
+
+            result = {
+                "query": input_data,
+                "result": "\n\n".join(final_outputs),
+                "agents_used": list(dict.fromkeys(r.agent for r in step_results.values())),
+                "task_type": workflow_type,
+                "workflow_id": workflow_id,
+                "workflow_steps": len(step_results),
+                "failed_steps": len(failed),
+                "step_timings": [r.to_dict() for r in step_results.values()],
+                "cache": self._workflow_cache_stats(dag, step_results),
+                "execution_time": time.time() - start_time
+            }
+
+            if record_interactions:
+                await self._record_step_interactions(
+                    workflow_id, workflow_type, step_results, conversation_id
+                )
+
+        except Exception as e:
+            logger.error(f"Error executing workflow {workflow_id}: {e}")
+            # Fallback to simple query
+            result = await asyncio.to_thread(self.execute_simple_query, input_data, context_text)
+            result.update({"workflow_id": workflow_id, "execution_time": time.time() - start_time})
+
+        yield {"event": "workflow_completed", "workflow_id": workflow_id, "result": result}
+
+    @staticmethod
+    def _workflow_cache_stats(dag: WorkflowDAG, step_results: Dict[str, StepResult]) -> Dict[str, Any]:
+        """Summarize step cache usage of a single workflow run."""
+        cacheable = [name for name, step in dag.steps.items() if step.cache_key]
+        hits = [name for name in cacheable if step_results[name].cached]
+        return {
+            "cacheable_steps": len(cacheable),
+            "hits": len(hits),
+            "misses": len(cacheable) - len(hits),
+            "hit_rate": len(hits) / len(cacheable) if cacheable else 0.0,
+            "cached_steps": hits,
+            "global": step_result_cache.get_stats()
+        }
+
+    async def execute_workflow(
+        self,
+        workflow_type: str,
+        input_data: str,
+        context: Any = None,
+        conversation_id: Optional[str] = None,
+        step_timeout: Optional[float] = None,
+        record_interactions: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Execute a multi-agent workflow without blocking the event loop.
+
+        Args:
+            workflow_type: Type of workflow to execute
+            input_data: The user query
+            context: Optional conversation context (list of message dicts or text)
+            conversation_id: Optional conversation the interactions belong to
+            step_timeout: Optional per-step timeout in seconds overriding the default
+            record_interactions: Whether to persist per-step AgentInteraction rows
+
+        Returns:
+            Workflow result with agents used, step timings and execution time
+        """
+        result: Dict[str, Any] = {}
+        async for event in self.stream_workflow(
+            workflow_type, input_data, context,
+            conversation_id=conversation_id,
+            step_timeout=step_timeout,
+            record_interactions=record_interactions
+        ):
+            if event["event"] == "workflow_completed":
+                result = event["result"]
+        return result
+
+    async def execute_complex_workflow_async(
+        self,
+        query: str,
+        workflow_type: str = "research_analyze_write",
+        sub_queries: Optional[List[str]] = None,
+        conversation_id: Optional[str] = None,
+        record_interactions: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Execute a complex multi-agent workflow as a DAG.
+
+        Independent steps run concurrently within the LLM pool limits and
+        per-step timings are returned and recorded to AgentInteraction.
+
+        Args:
+            query: The user query
+            workflow_type: Type of workflow to execute
+            sub_queries: Optional explicit research sub-queries to run in parallel
+            conversation_id: Optional conversation the interactions belong to
+            record_interactions: Whether to persist per-step AgentInteraction rows
+        """
+        result: Dict[str, Any] = {}
+        async for event in self.stream_workflow(
+            workflow_type, query,
+            sub_queries=sub_queries,
+            conversation_id=conversation_id,
+            record_interactions=record_interactions
+        ):
+            if event["event"] == "workflow_completed":
+                result = event["result"]
+        return result
+
+    async def _record_step_interactions(self, workflow_id: str, workflow_type: str,
+                                        step_results: Dict[str, StepResult],
+                                        conversation_id: Optional[str]):
+        """Persist per-step timings as AgentInteraction rows (best effort)."""
+        try:
+            from app.database.database import AsyncSessionLocal
+            from app.services.agent_memory import AgentMemoryService
+
+            async with AsyncSessionLocal() as db:
+                await AgentMemoryService.record_workflow_steps(
+                    db=db,
+                    workflow_id=workflow_id,
+                    workflow_type=workflow_type,
+                    step_results=list(step_results.values()),
+                    conversation_id=conversation_id
+                )
+        except Exception as e:
+            logger.warning(f"Failed to record workflow step interactions: {e}")
+
     def execute_simple_query(self, query: str, context: str = "") -> Dict[str, Any]:
         """Execute a simple query using the research agent."""
         try:
             logger.info(f"Executing simple query: {query}")
 
             # Check if we have real agents or mock agents
-            if self.llm is None or self.agents.get('researcher', {}).get('mock', False):
+            if self._using_mock_agents():
                 logger.info("Using fallback search due to missing LLM")
                 search_result = duckduckgo_search(query)
                 return {
@@ -231,19 +738,9 @@ class MultiAgentOrchestrator:
                     "note": "Used fallback search due to missing LLM configuration"
                 }
 
-            # Create a research task
-            research_task = self.create_research_task(query, context)
-
-            # Create a crew with just the researcher
-            crew = Crew(
-                agents=[self.agents['researcher']],
-                tasks=[research_task],
-                verbose=True,
-                process=Process.sequential
-            )
-
-            # Execute the task
-            result = crew.kickoff()
+            # Execute the research task with a crew containing just the researcher
+            crew = self.get_crew("research")
+            result = crew.kickoff(inputs={"query": query, "context": context})
 
             return {
                 "query": query,
@@ -265,75 +762,17 @@ class MultiAgentOrchestrator:
             }
     
     def execute_complex_workflow(self, query: str, workflow_type: str = "research_analyze_write") -> Dict[str, Any]:
-        """Execute a complex multi-agent workflow."""
-        try:
-            logger.info(f"Executing complex workflow: {workflow_type} for query: {query}")
-
-            # Check if we have real agents or mock agents
-            if self.llm is None or self.agents.get('researcher', {}).get('mock', False):
-                logger.info("Falling back to simple query due to missing LLM")
-                return self.execute_simple_query(query)
-
-            tasks = []
-            agents_used = []
-
-            if workflow_type == "research_analyze_write":
-                # Step 1: Research
-                research_task = self.create_research_task(query)
-                tasks.append(research_task)
-                agents_used.append("researcher")
-
-                # Step 2: Analysis (depends on research)
-                analysis_task = Task(
-                    description=f"""
-                    Analyze the research findings from the previous task about: {query}
-
-                    Provide insights, identify patterns, and draw conclusions.
-                    Focus on practical implications and actionable insights.
-                    """,
-                    agent=self.agents['analyst'],
-                    expected_output="Detailed analysis with insights and recommendations"
-                )
-                tasks.append(analysis_task)
-                agents_used.append("analyst")
-
-                # Step 3: Writing (depends on analysis)
-                writing_task = Task(
-                    description=f"""
-                    Create a comprehensive, well-structured response based on the research
-                    and analysis from previous tasks about: {query}
-
-                    Make it informative, engaging, and accessible to a general audience.
-                    Include key findings, insights, and practical implications.
-                    """,
-                    agent=self.agents['writer'],
-                    expected_output="Well-written, comprehensive response"
-                )
-                tasks.append(writing_task)
-                agents_used.append("writer")
-
-            # Create and execute the crew
-            crew = Crew(
-                agents=[self.agents[agent] for agent in agents_used],
-                tasks=tasks,
-                verbose=True,
-                process=Process.sequential
-            )
-
-            result = crew.kickoff()
-
-            return {
-                "query": query,
-                "result": str(result),
-                "agents_used": agents_used,
-                "task_type": workflow_type,
-                "workflow_steps": len(tasks)
-            }
-
-        except Exception as e:
-            logger.error(f"Error executing complex workflow: {e}")
-            # Fallback to simple query
-            return self.execute_simple_query(query)
+        """
+        Execute a complex multi-agent workflow from synchronous code.
+
+        Runs the DAG workflow on a private event loop, so it must not be called
+        from a running event loop; async callers should await
+        execute_complex_workflow_async instead. Step interactions are not
+        recorded here because the database engine belongs to the caller's loop.
+        """
+        return asyncio.run(
+            self.execute_complex_workflow_async(query, workflow_type, record_interactions=False)
+        )
     
     def get_agent_capabilities(self) -> Dict[str, Dict[str, str]]:
         """Get information about available agents and their capabilities."""
@@ -361,5 +800,6 @@ class MultiAgentOrchestrator:
         }
 
 
-# Global instance for use across the application
+# Global instance for use across the application. Construction is cheap: agents
+# and CrewAI itself are only loaded when a workflow first runs.
 multi_agent_orchestrator = MultiAgentOrchestrator()
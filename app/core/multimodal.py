@@ -166,7 +166,7 @@ class AudioProcessor:
         """Initialize audio processing models with fallback handling."""
         try:
             import whisper
-            self.whisper_model = whisper.load_model("base")
+            self.whisper_model = whisper.load_model("base", device=os.getenv("MODEL_DEVICE") or None)
             logger.info("Whisper model loaded successfully")
         except ImportError:
             logger.warning("Whisper not available - speech-to-text disabled")
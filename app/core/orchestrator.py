@@ -3,16 +3,39 @@ Enhanced Orchestrator for Phase 5 - Agent Orchestration & Scalability.
 Coordinates between different system components and manages asynchronous task execution.
 """
 
+import asyncio
 import logging
+import os
 import time
-from typing import Dict, Any, List, Optional, Union
+import uuid
+from contextlib import nullcontext
+from typing import Dict, Any, List, Optional, Tuple, Union
 from enum import Enum
 from dataclasses import dataclass
 from app.core.multi_agent import multi_agent_orchestrator
 from app.core.rag_system import rag_system
+from app.core.admission import AdmissionQueue
+from app.core.fair_scheduler import fair_scheduler
+from app.core.idempotency import task_deduplicator, IDEMPOTENCY_HEADER
+from app.core.claim_check import claim_check, ClaimCheckError, PAYLOAD_BYTES_HEADER
+from app.core.exceptions import AgentQueueFullException, AgentQueueTimeoutException
 
 logger = logging.getLogger(__name__)
 
+# In-process scheduler for synchronous tasks
+ORCHESTRATOR_SYNC_CONCURRENCY = int(os.getenv("ORCHESTRATOR_SYNC_CONCURRENCY", "8"))
+ORCHESTRATOR_SYNC_QUEUE_DEPTH = int(os.getenv("ORCHESTRATOR_SYNC_QUEUE_DEPTH", "100"))
+ORCHESTRATOR_SYNC_MAX_WAIT = float(os.getenv("ORCHESTRATOR_SYNC_MAX_WAIT", "60"))
+
+# Batch submission
+ORCHESTRATOR_MAX_BATCH_SIZE = int(os.getenv("ORCHESTRATOR_MAX_BATCH_SIZE", "1000"))
+BATCH_REDUCERS = ("collect", "summary")
+BATCH_METADATA_KEY_PREFIX = "gremlins:batch:"
+BATCH_METADATA_TTL = 3600  # Matches Celery result_expires
+
+# Run async document processing as parse -> embed -> index stages on separate queues
+DOCUMENT_PIPELINE_ENABLED = os.getenv("DOCUMENT_PIPELINE_ENABLED", "true").lower() == "true"
+
 class TaskType(Enum):
     """Enumeration of available task types."""
     AGENT_CHAT = "agent_chat"
@@ -30,14 +53,48 @@ class ExecutionMode(Enum):
     SYNCHRONOUS = "sync"
     ASYNCHRONOUS = "async"
 
+# Default priority (1 lowest - 10 highest) when a request doesn't set one, so
+# interactive requests overtake batch submissions
+DEFAULT_TASK_PRIORITIES = {
+    TaskType.AGENT_CHAT: 8,
+    TaskType.DOCUMENT_SEARCH: 8,
+    TaskType.RAG_QUERY: 7,
+    TaskType.HEALTH_CHECK: 7,
+    TaskType.MULTI_AGENT_WORKFLOW: 5,
+    TaskType.SYSTEM_ANALYSIS: 4,
+    TaskType.COMPREHENSIVE_WORKFLOW: 3,
+    TaskType.DOCUMENT_PROCESSING: 2,
+    TaskType.DATA_CLEANUP: 1,
+}
+
+# Task types that run agents or LLM calls, and so run within the submitting user's fair
+# share when executed synchronously. Celery tasks are not wrapped: each prefork child runs
+# one task at a time, so an in-process scheduler there has nothing to schedule
+FAIR_SHARE_TASK_TYPES = {
+    TaskType.AGENT_CHAT,
+    TaskType.MULTI_AGENT_WORKFLOW,
+    TaskType.RAG_QUERY,
+    TaskType.COMPREHENSIVE_WORKFLOW,
+}
+
 @dataclass
 class TaskRequest:
     """Data class for task requests."""
     task_type: TaskType
     payload: Dict[str, Any]
     execution_mode: ExecutionMode = ExecutionMode.SYNCHRONOUS
-    priority: int = 1
+    priority: Optional[int] = None  # 1 (lowest) to 10 (highest); defaults by task type
     timeout: Optional[int] = None
+    idempotency_key: Optional[str] = None  # Client-supplied key for deduplicating async submissions
+    user_id: Optional[str] = None  # Submitting user (scopes deduplication and fair-share scheduling)
+    user_roles: Optional[List[str]] = None  # Roles of the submitting user (fair-share weight)
+
+    @property
+    def effective_priority(self) -> int:
+        """Requested priority, or the task type's default."""
+        if self.priority is not None:
+            return self.priority
+        return DEFAULT_TASK_PRIORITIES.get(self.task_type, 5)
 
 @dataclass
 class TaskResult:
@@ -48,6 +105,16 @@ class TaskResult:
     execution_time: float
     error: Optional[str] = None
 
+@dataclass
+class BatchResult:
+    """Data class for batch dispatch results."""
+    batch_id: str
+    status: str
+    task_ids: List[str]
+    execution_time: float
+    reducer: Optional[str] = None
+    reduce_task_id: Optional[str] = None
+
 class EnhancedOrchestrator:
     """
     Enhanced orchestrator that coordinates between all system components
@@ -66,6 +133,13 @@ class EnhancedOrchestrator:
             TaskType.HEALTH_CHECK: self._handle_health_check,
             TaskType.DATA_CLEANUP: self._handle_data_cleanup,
         }
+        # Synchronous tasks are admitted highest priority first
+        self.sync_scheduler = AdmissionQueue(
+            "orchestrator_sync",
+            max_concurrent=ORCHESTRATOR_SYNC_CONCURRENCY,
+            max_depth=ORCHESTRATOR_SYNC_QUEUE_DEPTH,
+            max_wait=ORCHESTRATOR_SYNC_MAX_WAIT
+        )
     
     async def execute_task(self, task_request: TaskRequest) -> TaskResult:
         """
@@ -76,6 +150,10 @@ class EnhancedOrchestrator:
         
         Returns:
             TaskResult containing execution results
+        
+        Raises:
+            AgentQueueFullException: If the synchronous task queue is full
+            AgentQueueTimeoutException: If a synchronous task waited too long to start
         """
         start_time = time.time()
         
@@ -98,6 +176,8 @@ class EnhancedOrchestrator:
             else:
                 return await self._execute_sync_task(task_request, start_time)
                 
+        except (AgentQueueFullException, AgentQueueTimeoutException):
+            raise
         except Exception as e:
             logger.error(f"Task execution failed: {str(e)}")
             return TaskResult(
@@ -108,86 +188,158 @@ class EnhancedOrchestrator:
                 error=str(e)
             )
     
-    async def _execute_async_task(self, task_request: TaskRequest, start_time: float) -> TaskResult:
-        """Execute task asynchronously using Celery."""
-        try:
-            # Import Celery tasks
-            from app.tasks.agent_tasks import (
-                run_multi_agent_workflow_task,
-                run_enhanced_agent_chat_task,
-                batch_process_conversations_task
+    def _select_celery_task(self, task_request: TaskRequest) -> Tuple[Optional[Any], Dict[str, Any]]:
+        """
+        Select the Celery task and keyword arguments for a task request.
+        
+        Returns:
+            Tuple of (Celery task, kwargs); the task is None if the task type
+            has no asynchronous implementation
+        """
+        # Import Celery tasks
+        from app.tasks.agent_tasks import (
+            run_multi_agent_workflow_task,
+            run_enhanced_agent_chat_task,
+            batch_process_conversations_task
+        )
+        from app.tasks.document_tasks import (
+            process_document_batch_task,
+            rebuild_vector_index_task,
+            run_complex_rag_query_task,
+            analyze_document_collection_task
+        )
+        from app.tasks.orchestration_tasks import (
+            run_comprehensive_workflow_task,
+            system_health_check_task,
+            cleanup_old_data_task
+        )
+        
+        celery_task = None
+        task_kwargs: Dict[str, Any] = {}
+        
+        if task_request.task_type == TaskType.MULTI_AGENT_WORKFLOW:
+            celery_task = run_multi_agent_workflow_task
+            task_kwargs = dict(
+                workflow_type=task_request.payload.get("workflow_type", "simple_research"),
+                input_data=task_request.payload.get("input", ""),
+                conversation_id=task_request.payload.get("conversation_id"),
+                save_conversation=task_request.payload.get("save_conversation", True)
             )
-            from app.tasks.document_tasks import (
-                process_document_batch_task,
-                rebuild_vector_index_task,
-                run_complex_rag_query_task,
-                analyze_document_collection_task
+        
+        elif task_request.task_type == TaskType.AGENT_CHAT:
+            celery_task = run_enhanced_agent_chat_task
+            task_kwargs = dict(
+                input_data=task_request.payload.get("input", ""),
+                conversation_id=task_request.payload.get("conversation_id"),
+                use_multi_agent=task_request.payload.get("use_multi_agent", False),
+                use_rag=task_request.payload.get("use_rag", False),
+                save_conversation=task_request.payload.get("save_conversation", True)
             )
-            from app.tasks.orchestration_tasks import (
-                run_comprehensive_workflow_task,
-                system_health_check_task,
-                cleanup_old_data_task
+        
+        elif task_request.task_type == TaskType.RAG_QUERY:
+            celery_task = run_complex_rag_query_task
+            task_kwargs = dict(
+                query=task_request.payload.get("query", ""),
+                search_limit=task_request.payload.get("search_limit", 5),
+                use_multi_agent=task_request.payload.get("use_multi_agent", False),
+                conversation_id=task_request.payload.get("conversation_id"),
+                save_conversation=task_request.payload.get("save_conversation", True)
             )
+        
+        elif task_request.task_type == TaskType.DOCUMENT_PROCESSING:
+            if DOCUMENT_PIPELINE_ENABLED:
+                from app.tasks.ingestion_tasks import parse_documents_task
+                celery_task = parse_documents_task
+            else:
+                celery_task = process_document_batch_task
+            task_kwargs = dict(
+                document_data_list=task_request.payload.get("documents", []),
+                # Documents belong to the submitting user, never to an ID taken from the payload
+                user_id=task_request.user_id
+            )
+        
+        elif task_request.task_type == TaskType.SYSTEM_ANALYSIS:
+            analysis_type = task_request.payload.get("analysis_type", "summary")
+            if analysis_type == "document_collection":
+                celery_task = analyze_document_collection_task
+                task_kwargs = dict(analysis_type=analysis_type)
+            else:
+                celery_task = system_health_check_task
+        
+        elif task_request.task_type == TaskType.COMPREHENSIVE_WORKFLOW:
+            celery_task = run_comprehensive_workflow_task
+            task_kwargs = dict(workflow_config=task_request.payload)
+        
+        elif task_request.task_type == TaskType.HEALTH_CHECK:
+            celery_task = system_health_check_task
+        
+        elif task_request.task_type == TaskType.DATA_CLEANUP:
+            celery_task = cleanup_old_data_task
+            task_kwargs = dict(
+                days_old=task_request.payload.get("days_old"),
+                tables=task_request.payload.get("tables"),
+                dry_run=task_request.payload.get("dry_run", False)
+            )
+        
+        return celery_task, task_kwargs
+    
+    async def _execute_async_task(self, task_request: TaskRequest, start_time: float) -> TaskResult:
+        """Execute task asynchronously using Celery."""
+        try:
+            from app.core.celery_app import dispatch_options
             
-            # Delegate to appropriate Celery task
-            task_result = None
-            
-            if task_request.task_type == TaskType.MULTI_AGENT_WORKFLOW:
-                task_result = run_multi_agent_workflow_task.delay(
-                    workflow_type=task_request.payload.get("workflow_type", "simple_research"),
-                    input_data=task_request.payload.get("input", ""),
-                    conversation_id=task_request.payload.get("conversation_id"),
-                    save_conversation=task_request.payload.get("save_conversation", True)
-                )
-            
-            elif task_request.task_type == TaskType.AGENT_CHAT:
-                task_result = run_enhanced_agent_chat_task.delay(
-                    input_data=task_request.payload.get("input", ""),
-                    conversation_id=task_request.payload.get("conversation_id"),
-                    use_multi_agent=task_request.payload.get("use_multi_agent", False),
-                    use_rag=task_request.payload.get("use_rag", False),
-                    save_conversation=task_request.payload.get("save_conversation", True)
-                )
-            
-            elif task_request.task_type == TaskType.RAG_QUERY:
-                task_result = run_complex_rag_query_task.delay(
-                    query=task_request.payload.get("query", ""),
-                    search_limit=task_request.payload.get("search_limit", 5),
-                    use_multi_agent=task_request.payload.get("use_multi_agent", False),
-                    conversation_id=task_request.payload.get("conversation_id"),
-                    save_conversation=task_request.payload.get("save_conversation", True)
-                )
-            
-            elif task_request.task_type == TaskType.DOCUMENT_PROCESSING:
-                task_result = process_document_batch_task.delay(
-                    document_data_list=task_request.payload.get("documents", [])
-                )
-            
-            elif task_request.task_type == TaskType.SYSTEM_ANALYSIS:
-                analysis_type = task_request.payload.get("analysis_type", "summary")
-                if analysis_type == "document_collection":
-                    task_result = analyze_document_collection_task.delay(analysis_type)
-                else:
-                    task_result = system_health_check_task.delay()
-            
-            elif task_request.task_type == TaskType.COMPREHENSIVE_WORKFLOW:
-                task_result = run_comprehensive_workflow_task.delay(
-                    workflow_config=task_request.payload
-                )
-            
-            elif task_request.task_type == TaskType.HEALTH_CHECK:
-                task_result = system_health_check_task.delay()
+            # Select the Celery task and its arguments
+            celery_task, task_kwargs = self._select_celery_task(task_request)
             
-            elif task_request.task_type == TaskType.DATA_CLEANUP:
-                task_result = cleanup_old_data_task.delay(
-                    days_old=task_request.payload.get("days_old", 30)
+            task_result = None
+            if celery_task is not None:
+                # Return the existing task for duplicate submissions instead of enqueuing again
+                task_id = str(uuid.uuid4())
+                idempotency_key = task_deduplicator.key_for(
+                    task_request.task_type.value, task_request.payload, task_request.idempotency_key,
+                    task_request.user_id
                 )
+                if idempotency_key:
+                    task_id, reused_state = task_deduplicator.claim(idempotency_key, task_id)
+                    if reused_state is not None:
+                        return TaskResult(
+                            task_id=task_id,
+                            status="dispatched",
+                            result={
+                                "message": "Identical task already submitted; returning the existing task",
+                                "deduplicated": True,
+                                "state": reused_state,
+                                "priority": task_request.effective_priority
+                            },
+                            execution_time=time.time() - start_time
+                        )
+                
+                # Route to the queue of the task's priority band with a broker priority
+                options = dispatch_options(celery_task.name, task_request.effective_priority)
+                if idempotency_key:
+                    options['headers'][IDEMPOTENCY_HEADER] = idempotency_key
+                try:
+                    # Large arguments travel by reference; the size measured while
+                    # offloading feeds the broker message stats
+                    task_kwargs, payload_bytes = claim_check.offload_kwargs_sized(task_kwargs)
+                    if payload_bytes is not None:
+                        options['headers'][PAYLOAD_BYTES_HEADER] = payload_bytes
+                    task_result = celery_task.apply_async(kwargs=task_kwargs, task_id=task_id, **options)
+                except Exception:
+                    if idempotency_key:
+                        task_deduplicator.release(idempotency_key, task_id)
+                    raise
+                if idempotency_key:
+                    task_deduplicator.mark_dispatched(idempotency_key, task_id)
             
             if task_result:
                 return TaskResult(
                     task_id=task_result.id,
                     status="dispatched",
-                    result={"message": "Task dispatched for asynchronous execution"},
+                    result={
+                        "message": "Task dispatched for asynchronous execution",
+                        "priority": task_request.effective_priority
+                    },
                     execution_time=time.time() - start_time
                 )
             else:
@@ -209,6 +361,231 @@ class EnhancedOrchestrator:
                 error=f"Async execution failed: {str(e)}"
             )
     
+    async def execute_batch(self, task_requests: List[TaskRequest], reducer: Optional[str] = None) -> BatchResult:
+        """
+        Dispatch a batch of task requests as one Celery group (or chord with a reduce step).
+        
+        All tasks are executed asynchronously regardless of their execution mode.
+        Each task keeps its own priority routing.
+        
+        Args:
+            task_requests: Task requests to dispatch
+            reducer: Optional reduce step run after all tasks succeed ("collect" or "summary")
+        
+        Returns:
+            BatchResult with the batch ID and the IDs of its tasks
+        
+        Raises:
+            ValueError: If the batch is empty, too large, uses an unknown reducer or
+                contains task types without an asynchronous implementation
+        """
+        start_time = time.time()
+        
+        if not task_requests:
+            raise ValueError("Batch must contain at least one task")
+        if len(task_requests) > ORCHESTRATOR_MAX_BATCH_SIZE:
+            raise ValueError(f"Batch size {len(task_requests)} exceeds the maximum of {ORCHESTRATOR_MAX_BATCH_SIZE}")
+        if reducer is not None and reducer not in BATCH_REDUCERS:
+            raise ValueError(f"Unknown reducer '{reducer}', expected one of {', '.join(BATCH_REDUCERS)}")
+        
+        # Claim-check writes and publishing are blocking I/O; keep them off the event loop
+        signatures = await asyncio.to_thread(self._build_batch_signatures, task_requests)
+        batch_priority = max(task_request.effective_priority for task_request in task_requests)
+        group_result, reduce_task_id = await asyncio.to_thread(
+            self._publish_batch, signatures, reducer, batch_priority
+        )
+        batch_id = group_result.id
+        
+        logger.info(f"Dispatched batch {batch_id} with {len(signatures)} tasks"
+                    + (f" and '{reducer}' reduce step" if reducer else ""))
+        
+        return BatchResult(
+            batch_id=batch_id,
+            status="dispatched",
+            task_ids=[child.id for child in group_result.results],
+            execution_time=time.time() - start_time,
+            reducer=reducer,
+            reduce_task_id=reduce_task_id
+        )
+    
+    def _build_batch_signatures(self, task_requests: List[TaskRequest]) -> List[Any]:
+        """Build the Celery signatures of a batch, offloading large payloads (blocking)."""
+        from app.core.celery_app import dispatch_options
+        
+        # Build every signature before publishing so an invalid entry rejects the whole batch
+        signatures = []
+        for index, task_request in enumerate(task_requests):
+            celery_task, task_kwargs = self._select_celery_task(task_request)
+            if celery_task is None:
+                raise ValueError(
+                    f"Task {index}: {task_request.task_type.value} cannot be executed asynchronously"
+                )
+            options = dispatch_options(celery_task.name, task_request.effective_priority)
+            task_kwargs, payload_bytes = claim_check.offload_kwargs_sized(task_kwargs)
+            if payload_bytes is not None:
+                options['headers'][PAYLOAD_BYTES_HEADER] = payload_bytes
+            signatures.append(celery_task.signature(kwargs=task_kwargs, **options))
+        return signatures
+    
+    def _publish_batch(self, signatures: List[Any], reducer: Optional[str],
+                       batch_priority: int) -> Tuple[Any, Optional[str]]:
+        """Publish a batch as a group or chord and persist it (blocking); returns the group and reduce task ID."""
+        from celery import group, chord
+        from app.core.celery_app import dispatch_options
+        
+        reduce_task_id = None
+        if reducer:
+            from app.tasks.orchestration_tasks import reduce_batch_results_task
+            
+            body = reduce_batch_results_task.signature(
+                kwargs={"reducer": reducer},
+                **dispatch_options(reduce_batch_results_task.name, batch_priority)
+            )
+            reduce_result = chord(group(signatures), body).apply_async()
+            group_result = reduce_result.parent
+            reduce_task_id = reduce_result.id
+        else:
+            group_result = group(signatures).apply_async()
+        
+        # Persist the group so its progress can be looked up by batch ID
+        group_result.save()
+        self._save_batch_metadata(group_result.id, len(signatures), reducer, reduce_task_id)
+        return group_result, reduce_task_id
+    
+    def _save_batch_metadata(self, batch_id: str, total: int, reducer: Optional[str],
+                             reduce_task_id: Optional[str]):
+        """Store batch metadata (reduce step) next to the saved group result."""
+        from app.core.redis_client import get_redis
+        
+        try:
+            client = get_redis()
+            if client is None:
+                return
+            key = f"{BATCH_METADATA_KEY_PREFIX}{batch_id}"
+            client.hset(key, mapping={
+                "total": total,
+                "reducer": reducer or "",
+                "reduce_task_id": reduce_task_id or "",
+                "created_at": time.time()
+            })
+            client.expire(key, BATCH_METADATA_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to store metadata for batch {batch_id}: {e}")
+    
+    @staticmethod
+    def _read_task_metas(backend, task_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Read the stored state of several tasks, in one round trip where the backend allows it.
+        
+        Key-value result backends (Redis) are read with a single MGET; other backends
+        fall back to one read per task. Tasks without stored state are PENDING.
+        """
+        if not task_ids:
+            return []
+        if hasattr(backend, "mget") and hasattr(backend, "get_key_for_task"):
+            values = backend.mget([backend.get_key_for_task(task_id) for task_id in task_ids])
+            return [
+                backend.decode_result(value) if value else {"status": "PENDING", "result": None}
+                for value in values
+            ]
+        return [backend.get_task_meta(task_id) for task_id in task_ids]
+    
+    def _read_batch(self, batch_id: str) -> Optional[Tuple[Any, Dict[str, Any], List[Dict[str, Any]]]]:
+        """Read a batch's group, metadata and task states (blocking); None if the batch is unknown."""
+        from celery.result import GroupResult
+        from app.core.celery_app import celery_app
+        from app.core.redis_client import get_redis
+        
+        group_result = GroupResult.restore(batch_id, app=celery_app)
+        if group_result is None:
+            return None
+        
+        try:
+            client = get_redis()
+            metadata = client.hgetall(f"{BATCH_METADATA_KEY_PREFIX}{batch_id}") if client is not None else {}
+        except Exception as e:
+            logger.warning(f"Failed to read metadata for batch {batch_id}: {e}")
+            metadata = {}
+        
+        # Children and the reduce step in one read
+        task_ids = [child.id for child in group_result.results]
+        if metadata.get("reduce_task_id"):
+            task_ids.append(metadata["reduce_task_id"])
+        return group_result, metadata, self._read_task_metas(celery_app.backend, task_ids)
+    
+    async def get_batch_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get aggregate progress of a task batch.
+        
+        Tasks that report step progress contribute partially; finished tasks count fully.
+        The states of all tasks are read in one round trip.
+        
+        Args:
+            batch_id: Batch ID returned by execute_batch
+        
+        Returns:
+            Dict with aggregate progress and per-task states, or None if the batch is unknown
+        """
+        from celery.states import READY_STATES
+        
+        batch = await asyncio.to_thread(self._read_batch, batch_id)
+        if batch is None:
+            return None
+        group_result, metadata, metas = batch
+        
+        states: Dict[str, int] = {}
+        tasks = []
+        progress_total = 0.0
+        for child, meta in zip(group_result.results, metas):
+            state = meta.get("status", "PENDING")
+            info = meta.get("result") if state == "PROGRESS" else None
+            task_progress = 1.0 if state in READY_STATES else 0.0
+            if isinstance(info, dict):
+                completed, total = info.get("completed_steps"), info.get("total_steps")
+                if isinstance(info.get("progress"), (int, float)):
+                    task_progress = float(info["progress"])
+                elif isinstance(completed, int) and isinstance(total, int) and total > 0:
+                    task_progress = completed / total
+            progress_total += task_progress
+            states[state] = states.get(state, 0) + 1
+            tasks.append({"task_id": child.id, "status": state, "progress": task_progress})
+        
+        total = len(tasks)
+        completed = states.get("SUCCESS", 0)
+        failed = states.get("FAILURE", 0) + states.get("REVOKED", 0)
+        ready = completed + failed == total
+        
+        status = {
+            "batch_id": batch_id,
+            "status": ("failed" if failed == total else "completed_with_errors" if failed else "completed")
+            if ready else ("running" if states.get("PENDING", 0) < total else "pending"),
+            "total": total,
+            "completed": completed,
+            "failed": failed,
+            "pending": total - completed - failed,
+            "progress": progress_total / total if total else 1.0,
+            "states": states,
+            "tasks": tasks,
+            "reduce": None
+        }
+        
+        if metadata.get("reduce_task_id"):
+            reduce_meta = metas[-1]
+            reduced = None
+            if reduce_meta.get("status") == "SUCCESS":
+                try:
+                    reduced = await asyncio.to_thread(claim_check.resolve, reduce_meta.get("result"))
+                except ClaimCheckError as e:
+                    logger.warning(f"Reduce result of batch {batch_id} is no longer available: {e}")
+            status["reduce"] = {
+                "task_id": metadata["reduce_task_id"],
+                "reducer": metadata.get("reducer"),
+                "status": reduce_meta.get("status", "PENDING"),
+                "result": reduced
+            }
+        
+        return status
+    
     async def _execute_sync_task(self, task_request: TaskRequest, start_time: float) -> TaskResult:
         """Execute task synchronously."""
         try:
@@ -217,7 +594,14 @@ class EnhancedOrchestrator:
             task_id = f"sync-{uuid.uuid4().hex[:8]}"
 
             handler = self.supported_tasks[task_request.task_type]
-            result = await handler(task_request.payload)
+            if task_request.task_type in FAIR_SHARE_TASK_TYPES:
+                fair_share = fair_scheduler.slot(task_request.user_id, task_request.user_roles)
+            else:
+                fair_share = nullcontext()
+            # Take the fair-share slot first so a user over their share doesn't hold a sync slot while waiting
+            async with fair_share:
+                async with self.sync_scheduler.slot(task_request.effective_priority):
+                    result = await handler(task_request.payload)
 
             return TaskResult(
                 task_id=task_id,
@@ -226,6 +610,8 @@ class EnhancedOrchestrator:
                 execution_time=time.time() - start_time
             )
             
+        except (AgentQueueFullException, AgentQueueTimeoutException):
+            raise
         except Exception as e:
             logger.error(f"Sync task execution failed: {str(e)}")
             # Generate a task ID even for failed tasks
@@ -255,10 +641,18 @@ class EnhancedOrchestrator:
             
             task_result = celery_app.AsyncResult(task_id)
             
+            result = task_result.result if task_result.ready() else None
+            if task_result.successful():
+                try:
+                    result = claim_check.resolve(result)
+                except ClaimCheckError as e:
+                    logger.warning(f"Result of task {task_id} is no longer available: {e}")
+                    result = None
+            
             return {
                 "task_id": task_id,
                 "status": task_result.status,
-                "result": task_result.result if task_result.ready() else None,
+                "result": result,
                 "info": task_result.info,
                 "ready": task_result.ready(),
                 "successful": task_result.successful() if task_result.ready() else None,
@@ -273,6 +667,33 @@ class EnhancedOrchestrator:
                 "error": str(e)
             }
     
+    def get_scheduling_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduling delay per priority for synchronous and asynchronous tasks.
+        
+        Returns:
+            Dict with the in-process sync scheduler stats (queue wait per
+            priority) and Celery dispatch-to-start delay per priority
+        """
+        from app.core.celery_app import get_async_scheduling_stats, PRIORITY_HIGH_THRESHOLD, PRIORITY_LOW_THRESHOLD
+        
+        try:
+            async_stats = get_async_scheduling_stats()
+        except Exception as e:
+            logger.warning(f"Failed to get async scheduling stats: {e}")
+            async_stats = {"error": str(e)}
+        
+        return {
+            "priority_bands": {
+                "high": f">= {PRIORITY_HIGH_THRESHOLD}",
+                "low": f"<= {PRIORITY_LOW_THRESHOLD}"
+            },
+            "default_priorities": {task_type.value: priority for task_type, priority in DEFAULT_TASK_PRIORITIES.items()},
+            "sync": self.sync_scheduler.get_stats(),
+            "async": async_stats,
+            "deduplication": task_deduplicator.get_stats()
+        }
+    
     def get_capabilities(self) -> Dict[str, Any]:
         """
         Get orchestrator capabilities and supported task types.
@@ -290,7 +711,9 @@ class EnhancedOrchestrator:
                 "document_processing": True,
                 "rag_capabilities": True,
                 "system_analysis": True,
-                "health_monitoring": True
+                "health_monitoring": True,
+                "priority_scheduling": True,
+                "batch_submission": True
             },
             "version": "5.0.0"
         }
@@ -298,16 +721,15 @@ class EnhancedOrchestrator:
     # Synchronous task handlers
     async def _handle_agent_chat(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Handle basic agent chat synchronously."""
-        from app.core.agent import agent_graph_app
+        from app.core.agent import run_agent_graph
         
         agent_input = {
             "input": payload.get("input", ""),
             "chat_history": payload.get("chat_history", [])
         }
         
-        final_state = {}
-        for state in agent_graph_app.stream(agent_input):
-            final_state = state
+        # The caller's fair-share slot is already held by _execute_sync_task
+        final_state = await run_agent_graph(agent_input, merge=False, fair_share=False)
         
         return {
             "output": final_state,
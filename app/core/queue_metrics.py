@@ -0,0 +1,313 @@
+# app/core/queue_metrics.py
+"""
+Queue-depth and worker-saturation metrics for autoscaling.
+
+Collected cheaply from three sources:
+
+- The Redis broker: the length of every priority list of every task queue,
+  and the age of the oldest message (from its ``dispatched_at`` header).
+- Celery worker inspection: active and reserved tasks and pool size per
+  worker, cached for a few seconds because each call is a broadcast.
+- Task signals in the workers: runtime histograms per task name and wait
+  (dispatch to start) histograms per queue, kept as Redis hash counters so
+  every worker process contributes to the same series.
+
+``render_prometheus`` exposes the same data in the Prometheus text format for
+HPA / KEDA scalers.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Metrics configuration
+QUEUE_METRICS_INSPECT_TIMEOUT = float(os.getenv("QUEUE_METRICS_INSPECT_TIMEOUT", "1.0"))
+QUEUE_METRICS_INSPECT_TTL = float(os.getenv("QUEUE_METRICS_INSPECT_TTL", "15"))
+TASK_HISTOGRAM_BUCKETS = [
+    float(bucket) for bucket in os.getenv(
+        "TASK_HISTOGRAM_BUCKETS", "0.05,0.1,0.25,0.5,1,2.5,5,10,30,60,120,300"
+    ).split(",")
+    if bucket.strip()
+]
+
+TASK_RUNTIME_KEY_PREFIX = "gremlins:task_runtime:"
+TASK_WAIT_KEY_PREFIX = "gremlins:task_wait:"
+TASK_RUNTIME_NAMES_KEY = "gremlins:task_runtime_names"
+TASK_WAIT_QUEUES_KEY = "gremlins:task_wait_queues"
+
+# Redis transport settings (see broker_transport_options in app/core/celery_app.py)
+BROKER_PRIORITY_STEPS = range(10)
+BROKER_PRIORITY_SEP = ":"
+
+
+def all_queue_names() -> List[str]:
+    """Get every queue the workers consume, including the priority bands."""
+    from app.core.celery_app import base_queues
+
+    return ["default"] + [
+        f"{queue}{suffix}"
+        for queue in base_queues()
+        for suffix in ("_high", "", "_low")
+    ]
+
+
+def _bucket_field(duration: float) -> str:
+    for bucket in TASK_HISTOGRAM_BUCKETS:
+        if duration <= bucket:
+            return f"le:{bucket:g}"
+    return "le:+Inf"
+
+
+def _queue_observation(pipe, key: str, index_key: str, label: str, duration: float):
+    """Queue the commands adding one observation to a Redis-backed histogram."""
+    pipe.hincrby(key, _bucket_field(duration), 1)
+    pipe.hincrby(key, "count", 1)
+    pipe.hincrbyfloat(key, "sum", duration)
+    pipe.sadd(index_key, label)
+
+
+def _observe(key: str, index_key: str, label: str, duration: float):
+    """Add one observation to a Redis-backed histogram."""
+    from app.core.redis_client import get_redis
+
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        _queue_observation(pipe, key, index_key, label, duration)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"Failed to record task metric {key}: {e}")
+
+
+def observe_task_runtime(task_name: str, duration: float):
+    """Record the runtime of a finished task."""
+    _observe(f"{TASK_RUNTIME_KEY_PREFIX}{task_name}", TASK_RUNTIME_NAMES_KEY, task_name, duration)
+
+
+def queue_task_wait(pipe, queue: str, duration: float):
+    """Add an observation of how long a task waited in its queue to a caller's Redis pipeline."""
+    _queue_observation(pipe, f"{TASK_WAIT_KEY_PREFIX}{queue}", TASK_WAIT_QUEUES_KEY, queue, duration)
+
+
+def _read_histograms(client, prefix: str, index_key: str) -> Dict[str, Dict[str, Any]]:
+    """Read histograms as cumulative bucket counts with sum and count."""
+    labels = sorted(client.smembers(index_key))
+    pipe = client.pipeline(transaction=False)
+    for label in labels:
+        pipe.hgetall(f"{prefix}{label}")
+
+    histograms = {}
+    for label, raw in zip(labels, pipe.execute()):
+        cumulative = 0
+        buckets = []
+        for bucket in [f"{bucket:g}" for bucket in TASK_HISTOGRAM_BUCKETS] + ["+Inf"]:
+            cumulative += int(raw.get(f"le:{bucket}", 0))
+            buckets.append((bucket, cumulative))
+        count = int(raw.get("count", 0))
+        total = float(raw.get("sum", 0.0))
+        histograms[label] = {
+            "buckets": buckets,
+            "count": count,
+            "sum": total,
+            "average": total / count if count else 0.0,
+        }
+    return histograms
+
+
+class QueueMetricsCollector:
+    """Collects queue depth, worker saturation and task timing metrics."""
+
+    def __init__(self, inspect_timeout: float = QUEUE_METRICS_INSPECT_TIMEOUT,
+                 inspect_ttl: float = QUEUE_METRICS_INSPECT_TTL):
+        """
+        Initialize the collector.
+
+        Args:
+            inspect_timeout: Seconds to wait for worker replies to each inspect broadcast
+            inspect_ttl: Seconds worker inspection results are reused
+        """
+        self.inspect_timeout = inspect_timeout
+        self.inspect_ttl = inspect_ttl
+        self._lock = threading.Lock()
+        self._workers: Dict[str, Dict[str, Any]] = {}
+        self._workers_at = 0.0
+
+    def collect_queues(self) -> Dict[str, Dict[str, Any]]:
+        """Get the length and oldest-message age of every queue from the Redis broker."""
+        from app.core.redis_client import get_redis
+
+        client = get_redis()
+        if client is None:
+            return {}
+
+        queues = all_queue_names()
+        pipe = client.pipeline(transaction=False)
+        for queue in queues:
+            for step in BROKER_PRIORITY_STEPS:
+                key = f"{queue}{BROKER_PRIORITY_SEP}{step}" if step else queue
+                pipe.llen(key)
+                # Messages are pushed on the left and consumed from the right
+                pipe.lindex(key, -1)
+        replies = iter(pipe.execute())
+
+        now = time.time()
+        metrics = {}
+        for queue in queues:
+            length = 0
+            oldest: Optional[float] = None
+            for _ in BROKER_PRIORITY_STEPS:
+                length += next(replies) or 0
+                dispatched_at = self._dispatched_at(next(replies))
+                if dispatched_at is not None and (oldest is None or dispatched_at < oldest):
+                    oldest = dispatched_at
+            metrics[queue] = {
+                "length": length,
+                "oldest_message_age": max(0.0, now - oldest) if oldest is not None else 0.0,
+            }
+        return metrics
+
+    @staticmethod
+    def _dispatched_at(message: Optional[str]) -> Optional[float]:
+        if not message:
+            return None
+        try:
+            value = json.loads(message).get("headers", {}).get("dispatched_at")
+            return float(value) if value is not None else None
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+    def collect_workers(self) -> Dict[str, Dict[str, Any]]:
+        """Get active and reserved tasks and pool size per worker (cached)."""
+        with self._lock:
+            if time.time() - self._workers_at < self.inspect_ttl:
+                return self._workers
+
+            from app.core.celery_app import celery_app
+
+            workers: Dict[str, Dict[str, Any]] = {}
+            try:
+                inspector = celery_app.control.inspect(timeout=self.inspect_timeout)
+                active = inspector.active() or {}
+                reserved = inspector.reserved() or {}
+                stats = inspector.stats() or {}
+
+                for name in set(active) | set(reserved) | set(stats):
+                    concurrency = (stats.get(name, {}).get("pool") or {}).get("max-concurrency") or 0
+                    active_count = len(active.get(name) or [])
+                    workers[name] = {
+                        "active": active_count,
+                        "reserved": len(reserved.get(name) or []),
+                        "concurrency": concurrency,
+                        "saturation": active_count / concurrency if concurrency else None,
+                    }
+            except Exception as e:
+                logger.warning(f"Worker inspection failed: {e}")
+
+            self._workers = workers
+            self._workers_at = time.time()
+            return workers
+
+    def collect_histograms(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Get task runtime histograms by task name and wait histograms by queue."""
+        from app.core.redis_client import get_redis
+
+        client = get_redis()
+        if client is None:
+            return {}, {}
+        return (
+            _read_histograms(client, TASK_RUNTIME_KEY_PREFIX, TASK_RUNTIME_NAMES_KEY),
+            _read_histograms(client, TASK_WAIT_KEY_PREFIX, TASK_WAIT_QUEUES_KEY),
+        )
+
+    def collect(self) -> Dict[str, Any]:
+        """Collect all queue, worker and task metrics."""
+        metrics: Dict[str, Any] = {"collected_at": time.time()}
+        try:
+            metrics["queues"] = self.collect_queues()
+        except Exception as e:
+            logger.warning(f"Queue depth collection failed: {e}")
+            metrics["queues"] = {}
+
+        workers = self.collect_workers()
+        total_concurrency = sum(worker["concurrency"] for worker in workers.values())
+        metrics["workers"] = workers
+        metrics["totals"] = {
+            "queued": sum(queue["length"] for queue in metrics["queues"].values()),
+            "active": sum(worker["active"] for worker in workers.values()),
+            "reserved": sum(worker["reserved"] for worker in workers.values()),
+            "concurrency": total_concurrency,
+            "saturation": (sum(worker["active"] for worker in workers.values()) / total_concurrency
+                           if total_concurrency else None),
+        }
+
+        try:
+            metrics["task_runtime"], metrics["task_wait"] = self.collect_histograms()
+        except Exception as e:
+            logger.warning(f"Task histogram collection failed: {e}")
+            metrics["task_runtime"], metrics["task_wait"] = {}, {}
+        return metrics
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(metrics: Dict[str, Any]) -> str:
+    """Render collected metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+
+    def gauge(name: str, help_text: str, samples: List[Tuple[str, str, Any]]):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for label, value, sample in samples:
+            if sample is not None:
+                lines.append(f'{name}{{{label}="{_escape_label(value)}"}} {sample}')
+
+    def histogram(name: str, help_text: str, label: str, histograms: Dict[str, Any]):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for value, data in histograms.items():
+            escaped = _escape_label(value)
+            for bucket, count in data["buckets"]:
+                lines.append(f'{name}_bucket{{{label}="{escaped}",le="{bucket}"}} {count}')
+            lines.append(f'{name}_sum{{{label}="{escaped}"}} {data["sum"]}')
+            lines.append(f'{name}_count{{{label}="{escaped}"}} {data["count"]}')
+
+    queues = metrics.get("queues", {})
+    gauge("gremlins_queue_length", "Messages waiting in the queue",
+          [("queue", name, queue["length"]) for name, queue in queues.items()])
+    gauge("gremlins_queue_oldest_message_age_seconds", "Age of the oldest waiting message",
+          [("queue", name, queue["oldest_message_age"]) for name, queue in queues.items()])
+
+    workers = metrics.get("workers", {})
+    gauge("gremlins_worker_active_tasks", "Tasks executing on the worker",
+          [("worker", name, worker["active"]) for name, worker in workers.items()])
+    gauge("gremlins_worker_reserved_tasks", "Tasks prefetched by the worker and waiting to execute",
+          [("worker", name, worker["reserved"]) for name, worker in workers.items()])
+    gauge("gremlins_worker_concurrency", "Worker pool size",
+          [("worker", name, worker["concurrency"]) for name, worker in workers.items()])
+    gauge("gremlins_worker_saturation", "Active tasks divided by pool size",
+          [("worker", name, worker["saturation"]) for name, worker in workers.items()])
+
+    histogram("gremlins_task_runtime_seconds", "Task runtime by task name", "task",
+              metrics.get("task_runtime", {}))
+    histogram("gremlins_task_wait_seconds", "Time from dispatch to task start by queue", "queue",
+              metrics.get("task_wait", {}))
+
+    return "\n".join(lines) + "\n"
+
+
+# Global collector
+queue_metrics_collector = QueueMetricsCollector()
+
+
+def get_queue_metrics() -> Dict[str, Any]:
+    """Get queue depth, worker saturation and task timing metrics."""
+    return queue_metrics_collector.collect()
@@ -1,4 +1,5 @@
 # app/core/rag_system.py
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -99,15 +100,17 @@ class RAGSystem:
                 logger.info("Generating RAG response with retrieved context")
                 enhanced_prompt = self._create_rag_prompt(query, context)
 
+                # LLM calls are synchronous, so they run off the event loop
                 if use_multi_agent and multi_agent_orchestrator.llm is not None:
                     # Use multi-agent system for complex reasoning
-                    agent_response = multi_agent_orchestrator.execute_simple_query(
-                        query=enhanced_prompt,
-                        context=context
+                    agent_response = await asyncio.to_thread(
+                        multi_agent_orchestrator.execute_simple_query,
+                        enhanced_prompt,
+                        context
                     )
                 else:
                     # Use direct LLM response with context
-                    response_text = self._generate_context_based_response(query, context)
+                    response_text = await asyncio.to_thread(self._generate_context_based_response, query, context)
                     agent_response = {
                         "query": query,
                         "result": response_text,
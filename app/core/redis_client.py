@@ -0,0 +1,86 @@
+# app/core/redis_client.py
+"""
+Shared Redis client.
+
+Redis is already the Celery broker and result backend; this module provides a
+lazily created client for application-level use (metrics, coordination).
+Redis is optional: when the client library is missing or the server is
+unreachable, callers get ``None`` or a logged error and degrade gracefully.
+"""
+
+import logging
+import os
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "2"))
+
+_client = None
+_binary_client = None
+_client_lock = threading.Lock()
+
+
+def get_redis():
+    """
+    Get the shared synchronous Redis client, created on first use.
+
+    Returns:
+        A ``redis.Redis`` client with decoded responses, or None if the redis
+        package is not installed
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                try:
+                    import redis
+                except ImportError:
+                    logger.warning("redis package not installed; Redis-backed features are disabled")
+                    return None
+                _client = redis.Redis.from_url(
+                    REDIS_URL,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+                    decode_responses=True
+                )
+    return _client
+
+
+def get_binary_redis():
+    """
+    Get the shared synchronous Redis client for binary values, created on first use.
+
+    Returns:
+        A ``redis.Redis`` client returning raw bytes, or None if the redis
+        package is not installed
+    """
+    global _binary_client
+    if _binary_client is None:
+        with _client_lock:
+            if _binary_client is None:
+                try:
+                    import redis
+                except ImportError:
+                    logger.warning("redis package not installed; Redis-backed features are disabled")
+                    return None
+                _binary_client = redis.Redis.from_url(
+                    REDIS_URL,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=REDIS_SOCKET_TIMEOUT
+                )
+    return _binary_client
+
+
+def redis_available() -> bool:
+    """Check whether Redis is reachable."""
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        return bool(client.ping())
+    except Exception as e:
+        logger.debug(f"Redis not reachable: {e}")
+        return False
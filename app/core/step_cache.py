@@ -0,0 +1,142 @@
+# app/core/step_cache.py
+"""
+Step-level result cache for multi-agent workflows.
+
+Identical research steps are triggered repeatedly by different workflows and
+users (e.g. trending topics). Their outputs are memoized here, keyed by step
+type, normalized input, agent configuration and LLM model, so later workflows
+can reuse them and only run the steps that actually differ.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+WORKFLOW_STEP_CACHE_ENABLED = os.getenv("WORKFLOW_STEP_CACHE_ENABLED", "true").lower() == "true"
+WORKFLOW_STEP_CACHE_TTL = float(os.getenv("WORKFLOW_STEP_CACHE_TTL", "3600"))
+WORKFLOW_STEP_CACHE_MAX_ENTRIES = int(os.getenv("WORKFLOW_STEP_CACHE_MAX_ENTRIES", "1000"))
+WORKFLOW_STEP_CACHE_STEP_TYPES = [
+    step_type.strip()
+    for step_type in os.getenv("WORKFLOW_STEP_CACHE_STEP_TYPES", "research").split(",")
+    if step_type.strip()
+]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_step_input(text: str) -> str:
+    """Normalize step input so trivially different phrasings share a cache entry."""
+    return _WHITESPACE_RE.sub(" ", str(text or "")).strip().lower().rstrip("?.! ")
+
+
+def make_step_cache_key(step_type: str, inputs: Dict[str, Any], agent_config: str, llm_model: str) -> str:
+    """
+    Build a cache key for a workflow step.
+
+    Args:
+        step_type: Workflow step type (research, analysis, writing)
+        inputs: Step inputs; string values are normalized
+        agent_config: Fingerprint of the agent configuration executing the step
+        llm_model: Model identifier of the agent's LLM
+
+    Returns:
+        Hex digest identifying the step
+    """
+    normalized = {
+        key: normalize_step_input(value) if isinstance(value, str) else value
+        for key, value in sorted(inputs.items())
+    }
+    payload = json.dumps([step_type, normalized, agent_config, llm_model], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class StepResultCache:
+    """Thread-safe in-memory TTL/LRU cache for workflow step outputs."""
+
+    def __init__(self, ttl: float = WORKFLOW_STEP_CACHE_TTL,
+                 max_entries: int = WORKFLOW_STEP_CACHE_MAX_ENTRIES,
+                 enabled: bool = WORKFLOW_STEP_CACHE_ENABLED):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Time-to-live of an entry in seconds
+            max_entries: Maximum number of entries before least recently used are evicted
+            enabled: Whether caching is enabled
+        """
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.enabled = enabled and ttl > 0
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached step output, or None if missing or expired."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, output: str):
+        """Store a step output."""
+        if not self.enabled or not output:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, output)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+        logger.info("Workflow step cache cleared")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "ttl": self.ttl,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "cacheable_step_types": list(WORKFLOW_STEP_CACHE_STEP_TYPES),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Global step cache shared by all workflows in this process
+step_result_cache = StepResultCache()
+
+
+def get_step_cache_stats() -> Dict[str, Any]:
+    """Get workflow step cache statistics."""
+    return step_result_cache.get_stats()
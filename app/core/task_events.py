@@ -0,0 +1,406 @@
+# app/core/task_events.py
+"""
+Push-based task progress events.
+
+Celery workers publish every ``update_state`` call and the final task state to a
+single Redis pub/sub channel, and keep the latest event per task in Redis. Each
+API process holds one subscription to that channel and fans events out to local
+watchers (WebSocket task subscriptions, long-poll and SSE requests), so the
+number of watchers does not translate into result-backend polls.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Set, List, Callable, Awaitable, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+# Task event configuration
+TASK_EVENTS_ENABLED = os.getenv("TASK_EVENTS_ENABLED", "true").lower() == "true"
+TASK_EVENTS_CHANNEL = os.getenv("TASK_EVENTS_CHANNEL", "gremlins:task_events")
+TASK_EVENTS_TTL = int(os.getenv("TASK_EVENTS_TTL", "3600"))  # Matches Celery result_expires
+TASK_EVENTS_MAX_RESULT_BYTES = int(os.getenv("TASK_EVENTS_MAX_RESULT_BYTES", "65536"))
+TASK_EVENTS_MAX_TRACKED = int(os.getenv("TASK_EVENTS_MAX_TRACKED", "10000"))
+TASK_EVENTS_WATCHER_QUEUE_SIZE = 100
+
+TASK_EVENT_KEY_PREFIX = "gremlins:task_event:"
+
+# Celery states after which a task publishes no further events
+FINAL_STATES = frozenset({"SUCCESS", "FAILURE", "REVOKED"})
+
+TaskEventListener = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+
+def task_event_key(task_id: str) -> str:
+    """Redis key holding the sequence counter and latest event of a task."""
+    return f"{TASK_EVENT_KEY_PREFIX}{task_id}"
+
+
+def _event_progress(state: str, meta: Dict[str, Any]) -> Optional[float]:
+    """Derive a 0-1 progress value from task metadata where possible."""
+    if state in FINAL_STATES:
+        return 1.0
+    if isinstance(meta.get("progress"), (int, float)):
+        return float(meta["progress"])
+    completed, total = meta.get("completed_steps"), meta.get("total_steps")
+    if isinstance(completed, int) and isinstance(total, int) and total > 0:
+        return completed / total
+    return None
+
+
+def build_task_event(task_id: str, state: str, meta: Optional[Dict[str, Any]] = None,
+                     result: Any = None, final: bool = False) -> Dict[str, Any]:
+    """
+    Build a task event payload.
+
+    Args:
+        task_id: Celery task ID
+        state: Celery state (PROGRESS, SUCCESS, FAILURE, ...)
+        meta: Metadata passed to ``update_state``
+        result: Task result for final events; dropped if larger than TASK_EVENTS_MAX_RESULT_BYTES
+        final: Whether this is the last event of the task
+
+    Returns:
+        JSON-serializable event dict (without a sequence number)
+    """
+    meta = meta if isinstance(meta, dict) else ({"info": str(meta)} if meta is not None else {})
+    event = {
+        "task_id": task_id,
+        "state": state,
+        "status": meta.get("status"),
+        "progress": _event_progress(state, meta),
+        "meta": meta,
+        "final": final,
+        "published_at": time.time(),
+    }
+
+    if final and result is not None:
+        if isinstance(result, BaseException):
+            event["error"] = str(result)
+        else:
+            try:
+                encoded = json.dumps(result, default=str)
+            except (TypeError, ValueError):
+                encoded = None
+            if encoded is not None and len(encoded) <= TASK_EVENTS_MAX_RESULT_BYTES:
+                event["result"] = result
+            else:
+                event["result_truncated"] = True
+
+    return event
+
+
+def publish_task_event(task_id: str, state: str, meta: Optional[Dict[str, Any]] = None,
+                       result: Any = None, final: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Publish a task event from a worker (synchronous).
+
+    The event gets a per-task sequence number, is stored as the task's latest
+    event and is published on TASK_EVENTS_CHANNEL. Failures are logged and never
+    propagate into the task.
+
+    Returns:
+        The published event, or None if publishing is disabled or failed
+    """
+    if not TASK_EVENTS_ENABLED or not task_id:
+        return None
+
+    try:
+        from app.core.redis_client import get_redis
+
+        client = get_redis()
+        if client is None:
+            return None
+
+        event = build_task_event(task_id, state, meta, result, final)
+        key = task_event_key(task_id)
+        event["seq"] = int(client.hincrby(key, "seq", 1))
+        payload = json.dumps(event, default=str)
+
+        pipe = client.pipeline()
+        pipe.hset(key, "event", payload)
+        pipe.expire(key, TASK_EVENTS_TTL)
+        pipe.publish(TASK_EVENTS_CHANNEL, payload)
+        pipe.execute()
+        return event
+
+    except Exception as e:
+        logger.debug(f"Failed to publish event for task {task_id}: {e}")
+        return None
+
+
+class TaskEventHub:
+    """
+    In-process fan-out of task events received from the Redis channel.
+
+    One hub runs per API process. It keeps the latest event per task, wakes
+    local watchers and forwards every event to registered listeners (e.g. the
+    WebSocket connection manager).
+    """
+
+    def __init__(self, channel: str = TASK_EVENTS_CHANNEL, max_tracked: int = TASK_EVENTS_MAX_TRACKED,
+                 enabled: bool = TASK_EVENTS_ENABLED):
+        """
+        Initialize the hub.
+
+        Args:
+            channel: Redis pub/sub channel to subscribe to
+            max_tracked: Maximum number of tasks whose latest event is kept in memory
+            enabled: Whether to subscribe to Redis on start
+        """
+        self.channel = channel
+        self.max_tracked = max(1, max_tracked)
+        self.enabled = enabled
+        self._latest: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._watchers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listeners: List[TaskEventListener] = []
+        self._listener_task: Optional[asyncio.Task] = None
+        self._client = None
+        self.connected = False
+
+        # Metrics
+        self.events_received = 0
+        self.events_delivered = 0
+        self.events_dropped = 0
+        self.backend_reads = 0
+
+    @property
+    def running(self) -> bool:
+        return self._listener_task is not None and not self._listener_task.done()
+
+    def add_listener(self, listener: TaskEventListener):
+        """Register a coroutine function called as ``listener(task_id, event)`` for every event."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    async def start(self):
+        """Start the Redis subscription in the background."""
+        if not self.enabled or self.running:
+            return
+        self._listener_task = asyncio.create_task(self._listen())
+        logger.info(f"Task event hub subscribed to '{self.channel}'")
+
+    async def stop(self):
+        """Stop the Redis subscription and wake all watchers."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+        if self._client is not None:
+            try:
+                await self._client.close()
+            except Exception:
+                pass
+            self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import redis.asyncio as aioredis
+            from app.core.redis_client import REDIS_URL
+
+            self._client = aioredis.Redis.from_url(REDIS_URL, decode_responses=True)
+        return self._client
+
+    async def _listen(self):
+        """Receive events from Redis, reconnecting with backoff."""
+        backoff = 1.0
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._get_client().pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(self.channel)
+                self.connected = True
+                backoff = 1.0
+
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        event = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        continue
+                    await self.dispatch(event)
+
+            except asyncio.CancelledError:
+                raise
+            except ImportError:
+                logger.warning("redis package not installed; task events are disabled")
+                return
+            except Exception as e:
+                logger.warning(f"Task event subscription lost: {e}; reconnecting in {backoff:.0f}s")
+            finally:
+                self.connected = False
+                if pubsub is not None:
+                    try:
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def _remember(self, event: Dict[str, Any]) -> bool:
+        """Store an event as the task's latest; returns False if it is older than the known one."""
+        task_id = event["task_id"]
+        current = self._latest.get(task_id)
+        if current is not None and current.get("seq", 0) >= event.get("seq", 0):
+            return False
+        self._latest[task_id] = event
+        self._latest.move_to_end(task_id)
+        while len(self._latest) > self.max_tracked:
+            self._latest.popitem(last=False)
+        return True
+
+    async def dispatch(self, event: Dict[str, Any]):
+        """Deliver an event to local watchers and listeners."""
+        task_id = event.get("task_id")
+        if not task_id:
+            return
+        self.events_received += 1
+        if not self._remember(event):
+            return
+
+        for queue in list(self._watchers.get(task_id, ())):
+            if queue.full():
+                # Slow watcher: drop the oldest event, the newest state matters most
+                queue.get_nowait()
+                self.events_dropped += 1
+            queue.put_nowait(event)
+            self.events_delivered += 1
+
+        for listener in self._listeners:
+            try:
+                await listener(task_id, dict(event))
+            except Exception as e:
+                logger.warning(f"Task event listener failed for task {task_id}: {e}")
+
+    async def get_latest(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest event of a task.
+
+        Served from memory when the hub has seen the task, otherwise read once
+        from the task's Redis key.
+        """
+        event = self._latest.get(task_id)
+        if event is not None or not self.enabled:
+            return event
+
+        try:
+            self.backend_reads += 1
+            payload = await self._get_client().hget(task_event_key(task_id), "event")
+        except Exception as e:
+            logger.debug(f"Failed to read latest event for task {task_id}: {e}")
+            return None
+        if not payload:
+            return None
+
+        event = json.loads(payload)
+        self._remember(event)
+        return self._latest.get(task_id, event)
+
+    @asynccontextmanager
+    async def watch(self, task_id: str):
+        """Register a local watcher queue receiving the task's events for the duration of the block."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=TASK_EVENTS_WATCHER_QUEUE_SIZE)
+        self._watchers.setdefault(task_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            watchers = self._watchers.get(task_id)
+            if watchers is not None:
+                watchers.discard(queue)
+                if not watchers:
+                    del self._watchers[task_id]
+
+    async def wait_for_event(self, task_id: str, since: int = 0, timeout: float = 30.0) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll for a task event newer than ``since``.
+
+        Args:
+            task_id: Celery task ID
+            since: Sequence number of the last event the client has seen
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            The newest event with a sequence number above ``since``, or None on timeout
+        """
+        async with self.watch(task_id) as queue:
+            latest = await self.get_latest(task_id)
+            if latest is not None and (latest.get("seq", 0) > since or latest.get("final")):
+                return latest
+
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return None
+                if event.get("seq", 0) > since:
+                    return event
+
+    async def stream(self, task_id: str, since: int = 0,
+                     heartbeat: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Stream task events newer than ``since`` until the task finishes.
+
+        Yields None every ``heartbeat`` seconds without events so callers can
+        keep the connection alive.
+        """
+        async with self.watch(task_id) as queue:
+            latest = await self.get_latest(task_id)
+            if latest is not None and latest.get("seq", 0) > since:
+                since = latest.get("seq", 0)
+                yield latest
+                if latest.get("final"):
+                    return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event.get("seq", 0) <= since:
+                    continue
+                since = event.get("seq", 0)
+                yield event
+                if event.get("final"):
+                    return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hub statistics."""
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "connected": self.connected,
+            "channel": self.channel,
+            "tracked_tasks": len(self._latest),
+            "watched_tasks": len(self._watchers),
+            "watchers": sum(len(watchers) for watchers in self._watchers.values()),
+            "listeners": len(self._listeners),
+            "events_received": self.events_received,
+            "events_delivered": self.events_delivered,
+            "events_dropped": self.events_dropped,
+            "backend_reads": self.backend_reads,
+        }
+
+
+# Global task event hub for this API process
+task_event_hub = TaskEventHub()
+
+
+def get_task_event_stats() -> Dict[str, Any]:
+    """Get task event hub statistics."""
+    return task_event_hub.get_stats()
@@ -1,17 +1,52 @@
 # app/core/tools.py
+"""
+Tools available to agents.
+
+Search goes through a shared tool registry which caches results by normalized
+query, deduplicates identical in-flight searches and limits concurrency and
+request rate toward the search provider. The provider is a pluggable backend:
+DuckDuckGo by default, or an offline stand-in (``SEARCH_BACKEND=offline``) so
+benchmarks and tests can run without network access.
+"""
+
+import asyncio
+import hashlib
+import json
 import logging
+import os
 import re
-from langchain_community.tools import DuckDuckGoSearchRun
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
 
-# Initialize the tool. This can be reused across the application.
-search_tool = DuckDuckGoSearchRun()
+# Search tool configuration
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "duckduckgo")
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "900"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1000"))
+SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "2"))
+SEARCH_RATE_LIMIT = float(os.getenv("SEARCH_RATE_LIMIT", "1.0"))  # Requests per second, 0 disables
+SEARCH_RATE_BURST = int(os.getenv("SEARCH_RATE_BURST", "3"))
+SEARCH_OFFLINE_FIXTURES = os.getenv("SEARCH_OFFLINE_FIXTURES")
+
+NO_RESULTS_MESSAGE = "No good DuckDuckGo Search Result was found"
 
 class SearchInput(BaseModel):
     query: str = Field(description="The search query to execute.")
 
+# Sanitization patterns are compiled once at import time
+_DANGEROUS_TAGS = "script|iframe|object|embed|form|input|button"
+_INPUT_TAGS_RE = re.compile(
+    rf"<script[^>]*>.*?</script>|<(?:{_DANGEROUS_TAGS})[^>]*>|</(?:{_DANGEROUS_TAGS})>",
+    re.IGNORECASE | re.DOTALL
+)
+_INPUT_URLS_RE = re.compile(r"(?:javascript|data):[^\"\s]*", re.IGNORECASE)
+_OUTPUT_SANITIZE_RE = re.compile(r"<script[^>]*>(?:.*?</script>)?|</script>", re.IGNORECASE | re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+
 def sanitize_input(text: str) -> str:
     """
     Sanitize input text to prevent XSS and other security issues.
@@ -20,62 +55,321 @@ def sanitize_input(text: str) -> str:
     if not text:
         return text
 
-    # Remove script tags and their content
-    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.IGNORECASE | re.DOTALL)
-
-    # Remove other potentially dangerous tags
-    dangerous_tags = ['script', 'iframe', 'object', 'embed', 'form', 'input', 'button']
-    for tag in dangerous_tags:
-        text = re.sub(f'<{tag}[^>]*>', '', text, flags=re.IGNORECASE)
-        text = re.sub(f'</{tag}>', '', text, flags=re.IGNORECASE)
-
-    # Remove javascript: and data: URLs
-    text = re.sub(r'javascript:[^"\s]*', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'data:[^"\s]*', '', text, flags=re.IGNORECASE)
+    # Tags are removed before URLs so that a URL cannot swallow a tag boundary
+    text = _INPUT_TAGS_RE.sub("", text)
+    text = _INPUT_URLS_RE.sub("", text)
 
     return text.strip()
 
+def _replace_script(match: "re.Match") -> str:
+    return "[/SCRIPT_REMOVED]" if match.group(0).startswith("</") else "[SCRIPT_REMOVED]"
+
 def sanitize_output(text: str) -> str:
     """
     Sanitize output text to prevent XSS in search results.
-    Removes script tags and other dangerous content from search results.
+    Replaces script blocks and stray script tags in a single pass.
     """
     if not text:
         return text
 
-    # Remove script tags and their content from search results
-    text = re.sub(r'<script[^>]*>.*?</script>', '[SCRIPT_REMOVED]', text, flags=re.IGNORECASE | re.DOTALL)
+    return _OUTPUT_SANITIZE_RE.sub(_replace_script, text)
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query for caching (case and whitespace insensitive)."""
+    return _WHITESPACE_RE.sub(" ", query or "").strip().lower()
+
+
+class SearchBackend:
+    """Base class for search providers. ``search`` is blocking."""
+
+    name = "base"
+
+    def search(self, query: str) -> str:
+        raise NotImplementedError
+
+
+class DuckDuckGoBackend(SearchBackend):
+    """DuckDuckGo search via LangChain, created on first use."""
+
+    name = "duckduckgo"
+
+    def __init__(self):
+        self._tool = None
+        self._lock = threading.Lock()
+
+    def search(self, query: str) -> str:
+        if self._tool is None:
+            with self._lock:
+                if self._tool is None:
+                    from langchain_community.tools import DuckDuckGoSearchRun
+                    self._tool = DuckDuckGoSearchRun()
+        return self._tool.invoke(query)
+
+
+class OfflineSearchBackend(SearchBackend):
+    """
+    Deterministic offline stand-in for benchmarks and tests.
+
+    Results come from a fixtures mapping (normalized query to result text),
+    optionally loaded from a JSON file, or are generated from the query.
+    """
+
+    name = "offline"
+
+    def __init__(self, fixtures: Optional[Dict[str, str]] = None, latency: float = 0.0,
+                 fixtures_path: Optional[str] = SEARCH_OFFLINE_FIXTURES):
+        """
+        Initialize the offline backend.
+
+        Args:
+            fixtures: Mapping of query to canned result
+            latency: Simulated provider latency in seconds
+            fixtures_path: Optional JSON file with additional fixtures
+        """
+        self.fixtures = {normalize_query(q): r for q, r in (fixtures or {}).items()}
+        if fixtures_path:
+            try:
+                with open(fixtures_path, "r", encoding="utf-8") as f:
+                    self.fixtures.update({normalize_query(q): r for q, r in json.load(f).items()})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Failed to load offline search fixtures from {fixtures_path}: {e}")
+        self.latency = latency
+        self.calls = 0
+
+    def search(self, query: str) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        normalized = normalize_query(query)
+        if normalized in self.fixtures:
+            return self.fixtures[normalized]
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:8]
+        return (
+            f"[offline:{digest}] Summary for '{query}': background, key facts and recent "
+            f"developments related to {query}. Source: https://example.org/{digest}"
+        )
+
 
-    # Replace standalone script tags
-    text = re.sub(r'<script[^>]*>', '[SCRIPT_REMOVED]', text, flags=re.IGNORECASE)
-    text = re.sub(r'</script>', '[/SCRIPT_REMOVED]', text, flags=re.IGNORECASE)
+class RateLimiter:
+    """Thread-safe token bucket limiting requests per second."""
 
-    # Also remove any remaining script-like patterns
-    text = re.sub(r'<script>', '[SCRIPT_REMOVED]', text, flags=re.IGNORECASE)
-    text = re.sub(r'<script\s+[^>]*>', '[SCRIPT_REMOVED]', text, flags=re.IGNORECASE)
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
 
-    return text
+    def acquire(self) -> float:
+        """Block until a token is available. Returns the time waited in seconds."""
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ToolRegistry:
+    """
+    Registry of search backends with a shared cache and provider limits.
+
+    Both the blocking ``search`` (for agent tools running in worker threads)
+    and the async ``asearch`` share the same cache, in-flight deduplication,
+    concurrency limit and rate limiter.
+    """
+
+    def __init__(self, backend: str = SEARCH_BACKEND, cache_ttl: float = SEARCH_CACHE_TTL,
+                 cache_max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+                 max_concurrency: int = SEARCH_MAX_CONCURRENCY,
+                 rate_limit: float = SEARCH_RATE_LIMIT, rate_burst: int = SEARCH_RATE_BURST):
+        """
+        Initialize the registry.
+
+        Args:
+            backend: Name of the active search backend
+            cache_ttl: Time-to-live of cached results in seconds (0 disables caching)
+            cache_max_entries: Maximum number of cached queries
+            max_concurrency: Maximum concurrent requests to the provider
+            rate_limit: Maximum provider requests per second (0 disables)
+            rate_burst: Number of requests allowed in a burst
+        """
+        self._backends: Dict[str, SearchBackend] = {
+            DuckDuckGoBackend.name: DuckDuckGoBackend(),
+            OfflineSearchBackend.name: OfflineSearchBackend(),
+        }
+        if backend not in self._backends:
+            logger.warning(f"Unknown search backend '{backend}', using duckduckgo")
+            backend = DuckDuckGoBackend.name
+        self.active_backend = backend
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = max(1, cache_max_entries)
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._in_flight: Dict[Tuple[str, str], threading.Event] = {}
+        self._provider_slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = RateLimiter(rate_limit, rate_burst)
+
+        # Metrics
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.deduplicated = 0
+        self.provider_calls = 0
+        self.provider_errors = 0
+        self.rate_limit_wait = 0.0
+
+    def register_backend(self, backend: SearchBackend, activate: bool = False):
+        """Register a search backend, optionally making it the active one."""
+        self._backends[backend.name] = backend
+        if activate:
+            self.use_backend(backend.name)
+
+    def use_backend(self, name: str):
+        """Switch the active search backend."""
+        if name not in self._backends:
+            raise ValueError(f"Unknown search backend: {name}")
+        self.active_backend = name
+        logger.info(f"Search backend set to {name}")
+
+    def get_backend(self, name: Optional[str] = None) -> SearchBackend:
+        return self._backends[name or self.active_backend]
+
+    def _cache_get(self, key: Tuple[str, str]) -> Optional[str]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+
+    def _cache_set(self, key: Tuple[str, str], result: str):
+        if self.cache_ttl <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def search(self, query: str) -> str:
+        """
+        Run a search (blocking), returning sanitized results.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Sanitized search results, or a no-results message on failure
+        """
+        sanitized_query = sanitize_input(query)
+        key = (self.active_backend, normalize_query(sanitized_query))
+
+        while True:
+            cached = self._cache_get(key)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+
+            with self._cache_lock:
+                in_flight = self._in_flight.get(key)
+                if in_flight is None:
+                    in_flight = threading.Event()
+                    self._in_flight[key] = in_flight
+                    break
+            # Identical search already running; wait for it and reuse its result
+            in_flight.wait()
+            cached = self._cache_get(key)
+            if cached is not None:
+                self.deduplicated += 1
+                return cached
+            # The other search failed; fall through and try ourselves
+            with self._cache_lock:
+                if self._in_flight.get(key) is None:
+                    self._in_flight[key] = threading.Event()
+                    break
+
+        self.cache_misses += 1
+        logger.info(f"Executing search for: {sanitized_query}")
+        try:
+            with self._provider_slots:
+                self.rate_limit_wait += self.rate_limiter.acquire()
+                self.provider_calls += 1
+                results = self.get_backend(key[0]).search(sanitized_query)
+
+            sanitized_results = sanitize_output(results)
+            self._cache_set(key, sanitized_results)
+            return sanitized_results
+        except Exception as e:
+            self.provider_errors += 1
+            logger.error(f"Search failed: {e}")
+            return NO_RESULTS_MESSAGE
+        finally:
+            with self._cache_lock:
+                event = self._in_flight.pop(key, None)
+            if event is not None:
+                event.set()
+
+    async def asearch(self, query: str) -> str:
+        """Run a search without blocking the event loop."""
+        cached = self._cache_get((self.active_backend, normalize_query(sanitize_input(query))))
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        return await asyncio.to_thread(self.search, query)
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get search tool statistics."""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "backend": self.active_backend,
+            "backends": sorted(self._backends),
+            "cache_entries": len(self._cache),
+            "cache_ttl": self.cache_ttl,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "deduplicated": self.deduplicated,
+            "provider_calls": self.provider_calls,
+            "provider_errors": self.provider_errors,
+            "max_concurrency": self.max_concurrency,
+            "rate_limit": self.rate_limiter.rate,
+            "rate_limit_wait": self.rate_limit_wait,
+        }
+
+
+# Global tool registry. This can be reused across the application.
+tool_registry = ToolRegistry()
 
 def duckduckgo_search(query: str) -> str:
     """
-    A wrapper for the DuckDuckGo Search tool to be used by agents.
+    A wrapper for the search tool to be used by agents.
     It takes a query string and returns the search results with security sanitization.
     """
-    # Sanitize the input query
-    sanitized_query = sanitize_input(query)
-    logger.info(f"Executing search for: {sanitized_query}")
-
-    try:
-        # Perform the search
-        results = search_tool.invoke(sanitized_query)
+    return tool_registry.search(query)
 
-        # Sanitize the output to prevent XSS in search results
-        sanitized_results = sanitize_output(results)
+async def duckduckgo_search_async(query: str) -> str:
+    """Async variant of duckduckgo_search for use from the event loop."""
+    return await tool_registry.asearch(query)
 
-        return sanitized_results
-    except Exception as e:
-        logger.error(f"Search failed: {e}")
-        return "No good DuckDuckGo Search Result was found"
+def get_search_tool_stats() -> Dict[str, Any]:
+    """Get search tool cache and rate limiter statistics."""
+    return tool_registry.get_stats()
 
 # In later phases, more tools will be added here.
 # Example:
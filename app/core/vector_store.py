@@ -52,7 +52,8 @@ class WeaviateVectorStore:
         weaviate_api_key: Optional[str] = None,
         embedding_model: str = "all-MiniLM-L6-v2",
         use_clip: bool = True,
-        class_name: str = "GremlinsDocument"
+        class_name: str = "GremlinsDocument",
+        device: Optional[str] = None
     ):
         """Initialize the Weaviate vector store manager."""
         self.weaviate_url = weaviate_url
@@ -60,6 +61,7 @@ class WeaviateVectorStore:
         self.class_name = class_name
         self.embedding_model_name = embedding_model
         self.use_clip = use_clip and CLIP_AVAILABLE
+        self.device = device  # None lets each library pick (CUDA if available)
 
         # Initialize embedding models
         self.text_embedding_model = None
@@ -79,7 +81,7 @@ class WeaviateVectorStore:
         # Initialize text embedding model
         if SENTENCE_TRANSFORMERS_AVAILABLE:
             try:
-                self.text_embedding_model = SentenceTransformer(self.embedding_model_name)
+                self.text_embedding_model = SentenceTransformer(self.embedding_model_name, device=self.device)
                 self.vector_size = self.text_embedding_model.get_sentence_embedding_dimension()
                 logger.info(f"Initialized text embedding model: {self.embedding_model_name} (dimension: {self.vector_size})")
             except Exception as e:
@@ -91,7 +93,10 @@ class WeaviateVectorStore:
         # Initialize CLIP model for multimodal embeddings
         if self.use_clip and CLIP_AVAILABLE:
             try:
-                self.clip_model, self.clip_preprocess = clip.load("ViT-B/32")
+                if self.device:
+                    self.clip_model, self.clip_preprocess = clip.load("ViT-B/32", device=self.device)
+                else:
+                    self.clip_model, self.clip_preprocess = clip.load("ViT-B/32")
                 logger.info("Initialized CLIP model for multimodal embeddings")
             except Exception as e:
                 logger.error(f"Failed to initialize CLIP model: {e}")
@@ -141,7 +146,9 @@ class WeaviateVectorStore:
             # Check if collection already exists (v4 API)
             collections = self.client.collections.list_all()
 
-            if self.class_name not in collections:
+            if self.resolve_alias(self.class_name):
+                logger.info(f"Weaviate alias {self.class_name} already exists")
+            elif self.class_name not in collections:
                 # Create collection using v4 API
                 self._create_simple_collection()
             else:
@@ -150,15 +157,16 @@ class WeaviateVectorStore:
         except Exception as e:
             logger.error(f"Failed to ensure schema exists: {e}")
 
-    def _create_simple_collection(self):
+    def _create_simple_collection(self, name: Optional[str] = None):
         """Create a simple collection for document storage (v4 API)."""
+        name = name or self.class_name
         try:
             # Import v4 classes
             import weaviate.classes.config as wvc
 
             # Create simple collection (BM25 search compatible)
             collection = self.client.collections.create(
-                name=self.class_name,
+                name=name,
                 description="GremlinsAI document storage with BM25 and vector search capabilities",
                 properties=[
                     wvc.Property(
@@ -215,7 +223,7 @@ class WeaviateVectorStore:
                 # No vector configuration - use default (supports both BM25 and manual vectors)
             )
 
-            logger.info(f"Created Weaviate collection: {self.class_name}")
+            logger.info(f"Created Weaviate collection: {name}")
             return collection
 
         except Exception as e:
@@ -298,6 +306,218 @@ class WeaviateVectorStore:
             logger.error(f"Failed to generate multimodal embedding: {e}")
             return None
     
+    def embed_texts(self, texts: List[str], batch_size: int = 32) -> List[Optional[List[float]]]:
+        """Generate text embeddings for many texts in one model call."""
+        if not texts:
+            return []
+        if not self.text_embedding_model:
+            logger.warning("Text embedding model not available")
+            return [None] * len(texts)
+
+        try:
+            embeddings = self.text_embedding_model.encode(texts, batch_size=batch_size, convert_to_tensor=False)
+            return [embedding.tolist() for embedding in embeddings]
+        except Exception as e:
+            logger.error(f"Failed to generate batch text embeddings: {e}")
+            return [None] * len(texts)
+
+    def _build_properties(self, content: str, metadata: Optional[Dict[str, Any]],
+                          document_id: str, media_type: str = "text") -> Dict[str, Any]:
+        """Build Weaviate object properties, ensuring all required fields are present."""
+        properties = {
+            "content": content or "",
+            "document_id": metadata.get("document_id", document_id) if metadata else document_id,
+            "title": metadata.get("title", "") if metadata else "",
+            "chunk_id": metadata.get("chunk_id", "") if metadata else "",  # Always include chunk_id
+            "content_type": metadata.get("content_type", "text/plain") if metadata else "text/plain",
+            "chunk_type": metadata.get("chunk_type", "full_document") if metadata else "full_document",
+            "chunk_index": metadata.get("chunk_index", 0) if metadata else 0,
+            "embedding_model": self.embedding_model_name or "unknown",
+            "created_at": datetime.utcnow().isoformat(),
+            "media_type": media_type or "text"
+        }
+
+        # Ensure no None values for string fields
+        for key in ["content", "document_id", "title", "chunk_id", "content_type", "chunk_type", "embedding_model", "created_at", "media_type"]:
+            if properties[key] is None:
+                properties[key] = ""
+
+        return properties
+
+    def add_documents_batch(self, items: List[Dict[str, Any]], batch_size: int = 32,
+                            collection_name: Optional[str] = None) -> List[Optional[str]]:
+        """
+        Embed and upsert many text objects with one embedding call and one insert request.
+
+        Args:
+            items: Dicts with ``content``, optional ``metadata`` and optional ``document_id``
+                (used as the object UUID, so re-ingesting the same ID overwrites it)
+            batch_size: Embedding model batch size
+            collection_name: Collection (or alias) to write to; defaults to the store's class
+
+        Returns:
+            Vector IDs in input order; None for items that could not be stored
+        """
+        if not items:
+            return []
+        if not self.is_connected:
+            logger.warning("Vector store not connected, cannot add documents")
+            return [None] * len(items)
+
+        embeddings = self.embed_texts([item.get("content") or "" for item in items], batch_size=batch_size)
+        return self.insert_embedded_batch(items, embeddings, collection_name=collection_name)
+
+    def insert_embedded_batch(self, items: List[Dict[str, Any]], embeddings: List[Optional[List[float]]],
+                              collection_name: Optional[str] = None) -> List[Optional[str]]:
+        """
+        Upsert many text objects with precomputed embeddings in one insert request.
+
+        Args:
+            items: Dicts with ``content``, optional ``metadata`` and optional ``document_id``
+            embeddings: One embedding per item; items without an embedding are skipped
+            collection_name: Collection (or alias) to write to; defaults to the store's class
+
+        Returns:
+            Vector IDs in input order; None for items that could not be stored
+        """
+        if not items:
+            return []
+        if not self.is_connected:
+            logger.warning("Vector store not connected, cannot add documents")
+            return [None] * len(items)
+
+        try:
+            from weaviate.classes.data import DataObject
+
+            vector_ids: List[Optional[str]] = [None] * len(items)
+            objects = []
+            positions = []
+            for position, (item, embedding) in enumerate(zip(items, embeddings)):
+                if not embedding:
+                    continue
+                object_id = item.get("document_id") or str(uuid.uuid4())
+                objects.append(DataObject(
+                    properties=self._build_properties(item.get("content"), item.get("metadata"), object_id),
+                    uuid=object_id,
+                    vector=embedding
+                ))
+                positions.append((position, object_id))
+
+            if not objects:
+                return vector_ids
+
+            target = collection_name or self.class_name
+            try:
+                collection = self.client.collections.get(target)
+                response = collection.data.insert_many(objects)
+            except Exception as e:
+                # If collection doesn't exist, create it first
+                if "not found" in str(e).lower():
+                    self._create_simple_collection(target)
+                    collection = self.client.collections.get(target)
+                    response = collection.data.insert_many(objects)
+                else:
+                    raise e
+
+            errors = getattr(response, "errors", None) or {}
+            for index, (position, object_id) in enumerate(positions):
+                if index in errors:
+                    logger.warning(f"Failed to add object {object_id} to Weaviate: {errors[index]}")
+                else:
+                    vector_ids[position] = object_id
+
+            logger.info(f"Added {len(objects) - len(errors)} objects to Weaviate in one batch")
+            return vector_ids
+
+        except Exception as e:
+            logger.error(f"Failed to add document batch to Weaviate: {e}")
+            return [None] * len(items)
+
+    def delete_documents_batch(self, vector_ids: List[str], collection_name: Optional[str] = None) -> int:
+        """Delete many objects by ID with one request; returns the number deleted."""
+        if not vector_ids or not self.is_connected:
+            return 0
+
+        try:
+            collection = self.client.collections.get(collection_name or self.class_name)
+            result = collection.data.delete_many(where=Filter.by_id().contains_any(vector_ids))
+            return getattr(result, "successful", len(vector_ids))
+        except Exception as e:
+            logger.error(f"Failed to delete document batch from Weaviate: {e}")
+            return 0
+
+    def delete_by_document_ids(self, document_ids: List[str], collection_name: Optional[str] = None) -> int:
+        """Delete every object (full document and chunks) of the given documents; returns the number deleted."""
+        if not document_ids or not self.is_connected:
+            return 0
+
+        try:
+            collection = self.client.collections.get(collection_name or self.class_name)
+            result = collection.data.delete_many(where=Filter.by_property("document_id").contains_any(document_ids))
+            return getattr(result, "successful", 0)
+        except Exception as e:
+            logger.error(f"Failed to delete documents from Weaviate: {e}")
+            return 0
+
+    def collection_exists(self, name: str) -> bool:
+        """Check whether a concrete collection (not an alias) exists."""
+        return bool(self.is_connected and self.client.collections.exists(name))
+
+    def create_collection(self, name: str):
+        """Create a collection with the document schema."""
+        return self._create_simple_collection(name)
+
+    def delete_collection(self, name: str):
+        """Delete a collection and all its objects."""
+        self.client.collections.delete(name)
+        logger.info(f"Deleted Weaviate collection: {name}")
+
+    def resolve_alias(self, alias: str) -> Optional[str]:
+        """Get the collection an alias points to, or None if ``alias`` is not an alias."""
+        try:
+            result = self.client.alias.get(alias_name=alias)
+        except Exception as e:
+            logger.debug(f"Failed to resolve Weaviate alias {alias}: {e}")
+            return None
+        return getattr(result, "collection", None) if result else None
+
+    def needs_alias_migration(self, alias: str) -> bool:
+        """Check whether ``alias`` is still a concrete collection that has to be replaced by an alias."""
+        return self.resolve_alias(alias) is None and self.collection_exists(alias)
+
+    def swap_alias(self, alias: str, target: str, replace_collection: bool = False) -> Optional[str]:
+        """
+        Point an alias at a collection, creating the alias if needed.
+
+        Readers use the alias name, so swapping is atomic for them. The first
+        swap for a store whose class is still a concrete collection has to
+        delete that collection before the alias can take its name; searches
+        find no index between the two calls, so that one-time migration must
+        run in a maintenance window and is refused unless ``replace_collection``.
+
+        Returns:
+            The collection the alias pointed to before, if any
+
+        Raises:
+            RuntimeError: If ``alias`` is a concrete collection and ``replace_collection`` is False
+        """
+        previous = self.resolve_alias(alias)
+        if previous is not None:
+            self.client.alias.update(alias_name=alias, new_target_collection=target)
+        else:
+            if self.collection_exists(alias):
+                if not replace_collection:
+                    raise RuntimeError(
+                        f"{alias} is a concrete collection; replacing it with an alias briefly leaves searches "
+                        f"without an index and must be allowed explicitly (maintenance window)"
+                    )
+                logger.warning(f"Maintenance step: deleting concrete collection {alias} to replace it with an "
+                               f"alias; searches return no results until the alias to {target} is created")
+                self.delete_collection(alias)
+            self.client.alias.create(alias_name=alias, target_collection=target)
+        logger.info(f"Weaviate alias {alias} now points to {target}")
+        return previous
+
     def add_document(
         self,
         content: str,
@@ -327,24 +547,7 @@ class WeaviateVectorStore:
             if not document_id:
                 document_id = str(uuid.uuid4())
 
-            # Prepare properties (ensure all required fields are present)
-            properties = {
-                "content": content or "",
-                "document_id": metadata.get("document_id", document_id) if metadata else document_id,
-                "title": metadata.get("title", "") if metadata else "",
-                "chunk_id": metadata.get("chunk_id", "") if metadata else "",  # Always include chunk_id
-                "content_type": metadata.get("content_type", "text/plain") if metadata else "text/plain",
-                "chunk_type": metadata.get("chunk_type", "full_document") if metadata else "full_document",
-                "chunk_index": metadata.get("chunk_index", 0) if metadata else 0,
-                "embedding_model": self.embedding_model_name or "unknown",
-                "created_at": datetime.utcnow().isoformat(),
-                "media_type": media_type or "text"
-            }
-
-            # Ensure no None values for string fields
-            for key in ["content", "document_id", "title", "chunk_id", "content_type", "chunk_type", "embedding_model", "created_at", "media_type"]:
-                if properties[key] is None:
-                    properties[key] = ""
+            properties = self._build_properties(content, metadata, document_id, media_type)
 
             # Add image data if provided
             if image_data and self.use_clip:
@@ -625,13 +828,15 @@ def create_vector_store() -> WeaviateVectorStore:
     embedding_model = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
     use_clip = os.getenv("USE_CLIP", "true").lower() == "true"
     class_name = os.getenv("WEAVIATE_CLASS_NAME", "GremlinsDocument")
+    device = os.getenv("MODEL_DEVICE") or None
 
     return WeaviateVectorStore(
         weaviate_url=weaviate_url,
         weaviate_api_key=weaviate_api_key,
         embedding_model=embedding_model,
         use_clip=use_clip,
-        class_name=class_name
+        class_name=class_name,
+        device=device
     )
 
 # Global instance
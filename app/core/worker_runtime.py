@@ -0,0 +1,188 @@
+# app/core/worker_runtime.py
+"""
+Per-process runtime for Celery workers.
+
+Tasks used to create and close a fresh event loop per run, which throws away
+the async engine's pooled connections (they are bound to the loop that opened
+them) and pays loop and connection setup on every task. Each worker process
+now owns one long-lived event loop running in a background thread, together
+with the async DB engine and preloaded models.
+Tasks submit their coroutines to that loop with ``run_coroutine``.
+
+The runtime is started from ``worker_process_init`` and stopped from
+``worker_process_shutdown`` (see app/core/celery_app.py); outside a worker it
+starts lazily on first use.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Coroutine, TypeVar
+
+from app.core.model_preload import process_memory
+
+logger = logging.getLogger(__name__)
+
+# Runtime configuration
+WORKER_PRELOAD_MODELS = os.getenv("WORKER_PRELOAD_MODELS", "true").lower() == "true"
+
+T = TypeVar("T")
+
+
+class WorkerRuntime:
+    """Long-lived event loop and shared resources of one worker process."""
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.pid: Optional[int] = None
+        self.started_at: Optional[float] = None
+
+        # Metrics
+        self.tasks_run = 0
+        self.tasks_failed = 0
+        self.total_run_time = 0.0
+        self.preload_time = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self.loop is not None and self.loop.is_running() and self.pid == os.getpid()
+
+    def start(self, preload_models: bool = WORKER_PRELOAD_MODELS):
+        """
+        Start the event loop thread and prepare shared resources.
+
+        Args:
+            preload_models: Load the LLM and embedding models before the first task
+        """
+        with self._lock:
+            if self.running:
+                return
+
+            # Connections inherited from the parent process must not be reused after fork
+            self._reset_inherited_resources()
+
+            self.loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(self.loop)
+                self.loop.call_soon(ready.set)
+                self.loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name="worker-event-loop", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+            self.pid = os.getpid()
+            self.started_at = time.time()
+            logger.info(f"Worker runtime started in process {self.pid}")
+
+        if preload_models:
+            self._preload_models()
+
+    def _reset_inherited_resources(self):
+        """Drop DB pool connections inherited from a parent process."""
+        from app.database.database import async_engine
+
+        # close=False leaves the parent's connections alone and starts a fresh pool
+        async_engine.sync_engine.dispose(close=False)
+
+    def _preload_models(self):
+        """Load the LLM and embedding models so the first task doesn't pay for it."""
+        started = time.perf_counter()
+        try:
+            from app.core.llm_config import get_llm
+
+            get_llm()
+        except Exception as e:
+            logger.warning(f"Failed to preload LLM: {e}")
+
+        try:
+            from app.core.vector_store import vector_store
+
+            logger.info(f"Vector store ready (connected: {vector_store.is_connected}, "
+                        f"embeddings: {vector_store.text_embedding_model is not None})")
+        except Exception as e:
+            logger.warning(f"Failed to preload vector store: {e}")
+
+        self.preload_time = time.perf_counter() - started
+        logger.info(f"Worker models preloaded in {self.preload_time:.2f}s")
+
+    def run_coroutine(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine on the worker loop and wait for its result.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Maximum seconds to wait; the coroutine is cancelled on timeout
+
+        Returns:
+            The coroutine's result
+        """
+        if not self.running:
+            self.start(preload_models=False)
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        started = time.perf_counter()
+        try:
+            return future.result(timeout)
+        except BaseException:
+            self.tasks_failed += 1
+            future.cancel()
+            raise
+        finally:
+            self.tasks_run += 1
+            self.total_run_time += time.perf_counter() - started
+
+    async def _close_resources(self):
+        from app.database.database import async_engine
+
+        await async_engine.dispose()
+
+    def stop(self):
+        """Close shared resources and stop the event loop."""
+        with self._lock:
+            if not self.running:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._close_resources(), self.loop).result(10)
+            except Exception as e:
+                logger.warning(f"Failed to close worker resources: {e}")
+
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=10)
+            self.loop.close()
+            self.loop = None
+            self._thread = None
+            logger.info(f"Worker runtime stopped in process {self.pid}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get runtime statistics for this process."""
+        return {
+            "pid": self.pid,
+            "running": self.running,
+            "uptime": time.time() - self.started_at if self.started_at else 0.0,
+            "tasks_run": self.tasks_run,
+            "tasks_failed": self.tasks_failed,
+            "average_run_time": self.total_run_time / self.tasks_run if self.tasks_run else 0.0,
+            "preload_time": self.preload_time,
+            "memory": process_memory(),
+        }
+
+
+# Global runtime of this worker process
+worker_runtime = WorkerRuntime()
+
+
+def run_coroutine(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """Run a coroutine on this process's worker loop (see WorkerRuntime.run_coroutine)."""
+    return worker_runtime.run_coroutine(coro, timeout)
+
+
+def get_worker_runtime_stats() -> Dict[str, Any]:
+    """Get worker runtime statistics."""
+    return worker_runtime.get_stats()
@@ -0,0 +1,282 @@
+# app/core/workflow_engine.py
+"""
+DAG-based workflow engine for multi-agent workflows.
+
+Each workflow is described as a set of steps with explicit data dependencies.
+Steps whose dependencies are satisfied run concurrently (bounded by the LLM
+pool of the agent executing them), and downstream steps start as soon as all
+of their inputs are ready rather than waiting for an entire stage to finish.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, AsyncIterator
+
+from app.core.llm_config import llm_slot
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowValidationError(ValueError):
+    """Raised when a workflow definition is not a valid DAG."""
+    pass
+
+
+@dataclass
+class WorkflowStep:
+    """A single step in a workflow DAG."""
+    name: str
+    step_type: str  # research, analysis, writing
+    agent: str  # researcher, analyst, writer, coordinator
+    inputs: Dict[str, Any] = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)
+    timeout: Optional[float] = None  # Overrides the engine's step timeout
+    cache_key: Optional[str] = None  # Set for steps whose output may be reused
+
+
+@dataclass
+class StepResult:
+    """Execution result and timings of a single workflow step."""
+    name: str
+    step_type: str
+    agent: str
+    depends_on: List[str]
+    query: str = ""
+    status: str = "pending"  # pending, completed, failed, skipped
+    output: str = ""
+    error: Optional[str] = None
+    started_at: float = 0.0  # Seconds since workflow start
+    completed_at: float = 0.0  # Seconds since workflow start
+    queue_time: float = 0.0  # Seconds spent waiting for an LLM slot
+    duration: float = 0.0
+    cached: bool = False  # Output was served from the step cache
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert step result to a serializable dictionary (without output)."""
+        return {
+            "step": self.name,
+            "step_type": self.step_type,
+            "agent": self.agent,
+            "depends_on": list(self.depends_on),
+            "status": self.status,
+            "error": self.error,
+            "started_at": round(self.started_at, 4),
+            "completed_at": round(self.completed_at, 4),
+            "queue_time": round(self.queue_time, 4),
+            "duration": round(self.duration, 4),
+            "cached": self.cached,
+        }
+
+
+class WorkflowDAG:
+    """A validated, topologically ordered set of workflow steps."""
+
+    def __init__(self, workflow_type: str, steps: List[WorkflowStep]):
+        self.workflow_type = workflow_type
+        self.steps: Dict[str, WorkflowStep] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise WorkflowValidationError(f"Duplicate step name: {step.name}")
+            self.steps[step.name] = step
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Return step names in dependency order, rejecting unknown deps and cycles."""
+        remaining = {}
+        for name, step in self.steps.items():
+            for dep in step.depends_on:
+                if dep not in self.steps:
+                    raise WorkflowValidationError(f"Step '{name}' depends on unknown step '{dep}'")
+            remaining[name] = set(step.depends_on)
+
+        order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise WorkflowValidationError(f"Workflow contains a cycle: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    @property
+    def sinks(self) -> List[str]:
+        """Steps no other step depends on (the workflow outputs)."""
+        depended_on = {dep for step in self.steps.values() for dep in step.depends_on}
+        return [name for name in self.order if name not in depended_on]
+
+
+# A step runner executes one step given its resolved inputs and returns its output.
+StepRunner = Callable[[WorkflowStep, Dict[str, Any]], str]
+
+
+class WorkflowEngine:
+    """
+    Executes workflow DAGs, running independent steps concurrently.
+
+    Step runners are blocking (CrewAI kickoff), so each step runs in a worker
+    thread while holding a slot of its agent's LLM pool. Steps with a cache key
+    are looked up in the step cache first and skip execution on a hit.
+
+    A step that times out or is cancelled while still queued for its slot never
+    starts its runner. A runner that already started can't be interrupted: its
+    thread finishes the call, but its output is discarded.
+    """
+
+    def __init__(self, step_timeout: Optional[float] = None, cache=None):
+        """
+        Initialize the engine.
+
+        Args:
+            step_timeout: Optional per-step timeout in seconds, counted from the moment the
+                step holds its LLM slot (waiting in the pool queue is not included)
+            cache: Optional step result cache providing get(key) and set(key, output)
+        """
+        self.step_timeout = step_timeout
+        self.cache = cache
+
+    async def run(self, dag: WorkflowDAG, runner: StepRunner) -> Dict[str, StepResult]:
+        """
+        Execute a workflow DAG.
+
+        Args:
+            dag: Workflow to execute
+            runner: Blocking callable executing a single step
+
+        Returns:
+            Mapping of step name to its result, in topological order
+        """
+        results = {name: None for name in dag.order}
+        async for step_result in self.stream(dag, runner):
+            results[step_result.name] = step_result
+        return results
+
+    async def stream(self, dag: WorkflowDAG, runner: StepRunner) -> AsyncIterator[StepResult]:
+        """
+        Execute a workflow DAG, yielding each step result as soon as it finishes.
+
+        Skipped steps are yielded as well, so every step of the DAG is reported
+        exactly once. Closing the iterator early cancels the remaining steps.
+
+        Args:
+            dag: Workflow to execute
+            runner: Blocking callable executing a single step
+
+        Yields:
+            Step results in completion order
+        """
+        workflow_start = time.monotonic()
+        results: Dict[str, StepResult] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        finished: asyncio.Queue = asyncio.Queue()
+
+        # Tasks are created in topological order so dependencies always exist
+        for name in dag.order:
+            step = dag.steps[name]
+            results[name] = StepResult(
+                name=step.name,
+                step_type=step.step_type,
+                agent=step.agent,
+                depends_on=list(step.depends_on),
+                query=str(step.inputs.get("query", ""))
+            )
+            dependencies = [tasks[dep] for dep in step.depends_on]
+            tasks[name] = asyncio.create_task(
+                self._run_step(step, dependencies, results, runner, workflow_start)
+            )
+            tasks[name].add_done_callback(lambda _, name=name: finished.put_nowait(name))
+
+        try:
+            for _ in range(len(tasks)):
+                name = await finished.get()
+                yield results[name]
+        finally:
+            pending = [task for task in tasks.values() if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _run_step(self, step: WorkflowStep, dependencies: List[asyncio.Task],
+                        results: Dict[str, StepResult], runner: StepRunner,
+                        workflow_start: float):
+        """Wait for dependencies, then run a step in a worker thread."""
+        if dependencies:
+            await asyncio.gather(*dependencies)
+
+        result = results[step.name]
+        failed_deps = [dep for dep in step.depends_on if results[dep].status != "completed"]
+        if failed_deps:
+            result.status = "skipped"
+            result.error = f"Dependencies did not complete: {', '.join(failed_deps)}"
+            return
+
+        # Data dependencies: upstream outputs are passed to the step by name
+        step_inputs = dict(step.inputs)
+        step_inputs["upstream"] = {dep: results[dep].output for dep in step.depends_on}
+
+        ready_at = time.monotonic()
+
+        if self.cache is not None and step.cache_key:
+            cached_output = self.cache.get(step.cache_key)
+            if cached_output is not None:
+                result.output = cached_output
+                result.status = "completed"
+                result.cached = True
+                result.started_at = result.completed_at = ready_at - workflow_start
+                return
+
+        loop = asyncio.get_running_loop()
+        slot_held = asyncio.Event()
+        cancelled = threading.Event()
+        timing: Dict[str, float] = {}
+
+        def run_with_slot() -> Optional[str]:
+            # The worker thread only touches ``timing``; the result is filled in on the loop
+            with llm_slot(step.agent):
+                if cancelled.is_set():
+                    # Timed out or cancelled while queued: give the slot back without running
+                    return None
+                timing["started"] = time.monotonic()
+                loop.call_soon_threadsafe(slot_held.set)
+                return runner(step, step_inputs)
+
+        timeout = step.timeout or self.step_timeout
+        execution = asyncio.ensure_future(asyncio.to_thread(run_with_slot))
+        waiting_for_slot = asyncio.ensure_future(slot_held.wait())
+        try:
+            # The timeout starts once the slot is held; queueing for it is not part of the step
+            await asyncio.wait({execution, waiting_for_slot}, return_when=asyncio.FIRST_COMPLETED)
+            if timeout and not execution.done():
+                result.output = await asyncio.wait_for(asyncio.shield(execution), timeout=timeout)
+            else:
+                result.output = await execution
+            result.status = "completed"
+            if self.cache is not None and step.cache_key:
+                self.cache.set(step.cache_key, result.output)
+        except asyncio.TimeoutError:
+            cancelled.set()
+            result.status = "failed"
+            result.error = f"Step timed out after {timeout} seconds"
+            logger.error(f"Workflow step {step.name} timed out")
+        except asyncio.CancelledError:
+            cancelled.set()
+            result.status = "failed"
+            result.error = "Step cancelled"
+            raise
+        except Exception as e:
+            result.status = "failed"
+            result.error = str(e)
+            logger.error(f"Workflow step {step.name} failed: {e}")
+        finally:
+            waiting_for_slot.cancel()
+            result.completed_at = time.monotonic() - workflow_start
+            if "started" in timing:
+                result.started_at = timing["started"] - workflow_start
+                result.queue_time = timing["started"] - ready_at
+                result.duration = result.completed_at - result.started_at
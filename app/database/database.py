@@ -1,7 +1,12 @@
 # app/database/database.py
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Dict, Any, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 # Get database URL from environment variable
@@ -13,11 +18,173 @@ if DATABASE_URL.startswith("sqlite:///"):
 else:
     ASYNC_DATABASE_URL = DATABASE_URL
 
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name, "")
+    return int(value) if value.strip() else None
+
+
+# Engine configuration (pool settings left empty use the dialect profile defaults below)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = _optional_int("DB_POOL_SIZE")
+DB_MAX_OVERFLOW = _optional_int("DB_MAX_OVERFLOW")
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = _optional_int("DB_POOL_RECYCLE")
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "")
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))  # Compiled SQL cache per engine
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))  # Prepared statements per connection
+
+# SQLite pragmas applied to every new connection
+DB_SQLITE_JOURNAL_MODE = os.getenv("DB_SQLITE_JOURNAL_MODE", "WAL").upper()
+DB_SQLITE_SYNCHRONOUS = os.getenv("DB_SQLITE_SYNCHRONOUS", "NORMAL").upper()
+DB_SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("DB_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+DB_SQLITE_CACHE_SIZE_KB = int(os.getenv("DB_SQLITE_CACHE_SIZE_KB", "20000"))
+
+# Per-dialect pool defaults: SQLite has a single writer, so a few connections suffice;
+# Postgres connections go stale behind load balancers, so they are pinged and recycled
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "sqlite": {"pool_size": 5, "max_overflow": 10, "pool_recycle": -1, "pool_pre_ping": False},
+    "postgresql": {"pool_size": 10, "max_overflow": 20, "pool_recycle": 1800, "pool_pre_ping": True},
+    "default": {"pool_size": 5, "max_overflow": 10, "pool_recycle": 3600, "pool_pre_ping": True},
+}
+
+
+def engine_options(url: str, is_async: bool) -> Dict[str, Any]:
+    """
+    Get create_engine keyword arguments for a database URL.
+
+    Args:
+        url: Database URL
+        is_async: Whether the options are for create_async_engine
+
+    Returns:
+        Engine keyword arguments from the dialect profile and environment overrides
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    profile = ENGINE_PROFILES.get(backend, ENGINE_PROFILES["default"])
+    options: Dict[str, Any] = {"echo": DB_ECHO, "query_cache_size": DB_QUERY_CACHE_SIZE}
+    connect_args: Dict[str, Any] = {}
+
+    if backend == "sqlite":
+        connect_args = {
+            "check_same_thread": False,
+            "timeout": DB_SQLITE_BUSY_TIMEOUT_MS / 1000,
+            "cached_statements": DB_STATEMENT_CACHE_SIZE,
+        }
+        if parsed.database in (None, "", ":memory:"):
+            # In-memory databases live in one connection; keep the dialect's default pool
+            options["connect_args"] = connect_args
+            return options
+        # Reuse connections (and their pragmas) instead of reopening the file per checkout
+        options["poolclass"] = AsyncAdaptedQueuePool if is_async else QueuePool
+    elif parsed.get_driver_name() == "asyncpg":
+        connect_args["prepared_statement_cache_size"] = DB_STATEMENT_CACHE_SIZE
+
+    options.update(
+        connect_args=connect_args,
+        pool_size=DB_POOL_SIZE if DB_POOL_SIZE is not None else profile["pool_size"],
+        max_overflow=DB_MAX_OVERFLOW if DB_MAX_OVERFLOW is not None else profile["max_overflow"],
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE if DB_POOL_RECYCLE is not None else profile["pool_recycle"],
+        pool_pre_ping=(DB_POOL_PRE_PING.lower() == "true" if DB_POOL_PRE_PING else profile["pool_pre_ping"]),
+    )
+    return options
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Configure a new SQLite connection for concurrent API and worker writers."""
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers proceed during a write; NORMAL syncs only at checkpoints in WAL mode
+        cursor.execute(f"PRAGMA journal_mode={DB_SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={DB_SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(DB_SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(DB_SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+class PoolMetrics:
+    """Connection pool checkout metrics of one engine."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.total_hold_time = 0.0
+        self.max_hold_time = 0.0
+
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        with self._lock:
+            self.checkins += 1
+            if checked_out_at is not None:
+                self.checked_out = max(0, self.checked_out - 1)
+                hold_time = time.perf_counter() - checked_out_at
+                self.total_hold_time += hold_time
+                self.max_hold_time = max(self.max_hold_time, hold_time)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get checkout counters and the current pool state."""
+        pool = self.engine.pool
+        with self._lock:
+            stats = {
+                "pool_class": type(pool).__name__,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "average_hold_time": self.total_hold_time / self.checkins if self.checkins else 0.0,
+                "max_hold_time": self.max_hold_time,
+            }
+        for name in ("size", "checkedin", "overflow"):
+            if hasattr(pool, name):
+                stats[f"pool_{name}"] = getattr(pool, name)()
+        return stats
+
+
 # Create sync engine for Alembic migrations
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, is_async=False))
 
 # Create async engine for FastAPI
-async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+
+if make_url(DATABASE_URL).get_backend_name() == "sqlite":
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+# Pool metrics
+sync_pool_metrics = PoolMetrics(engine)
+async_pool_metrics = PoolMetrics(async_engine.sync_engine)
 
 # Create session makers
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -42,3 +209,13 @@ def ensure_data_directory():
         data_dir = os.path.dirname(DATABASE_URL.replace("sqlite:///", ""))
         if data_dir and not os.path.exists(data_dir):
             os.makedirs(data_dir, exist_ok=True)
+
+
+def get_database_pool_stats() -> Dict[str, Any]:
+    """Get engine settings and pool checkout metrics of the sync and async engines."""
+    return {
+        "dialect": async_engine.dialect.name,
+        "driver": async_engine.dialect.driver,
+        "async_engine": async_pool_metrics.get_stats(),
+        "sync_engine": sync_pool_metrics.get_stats(),
+    }
@@ -1,5 +1,5 @@
 # app/database/models.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, LargeBinary, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, LargeBinary, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database.database import Base
@@ -57,6 +57,11 @@ class Conversation(Base):
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
     multimodal_content = relationship("MultiModalContent", back_populates="conversation", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Active conversation lists, most recently updated first
+        Index("ix_conversations_active_updated", "is_active", "updated_at"),
+    )
+
     def __repr__(self):
         return f"<Conversation(id={self.id}, title={self.title}, user_id={self.user_id})>"
 
@@ -72,12 +77,17 @@ class Message(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Additional metadata
-    tool_calls = Column(Text, nullable=True)  # JSON string for tool calls
-    extra_data = Column(Text, nullable=True)  # JSON string for additional metadata
+    tool_calls = Column(JSON, nullable=True)  # Tool calls
+    extra_data = Column(JSON, nullable=True)  # Additional metadata
     
     # Relationship to conversation
     conversation = relationship("Conversation", back_populates="messages")
 
+    __table_args__ = (
+        # Message history of a conversation in order
+        Index("ix_messages_conversation_created", "conversation_id", "created_at"),
+    )
+
     def __repr__(self):
         return f"<Message(id={self.id}, role={self.role}, conversation_id={self.conversation_id})>"
 
@@ -115,6 +125,11 @@ class Document(Base):
     user = relationship("User", back_populates="documents")
     chunks = relationship("DocumentChunk", back_populates="document", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Active document lists, newest first (keyset pages break ties on id)
+        Index("ix_documents_active_created", "is_active", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Document(id={self.id}, title={self.title[:50]}, user_id={self.user_id})>"
 
@@ -149,6 +164,11 @@ class DocumentChunk(Base):
     # Relationships
     document = relationship("Document", back_populates="chunks")
 
+    __table_args__ = (
+        # Chunks of a document in order
+        Index("ix_document_chunks_document_index", "document_id", "chunk_index"),
+    )
+
     def __repr__(self):
         return f"<DocumentChunk(id={self.id}, document_id={self.document_id}, index={self.chunk_index})>"
 
@@ -358,6 +378,11 @@ class SearchQuery(Base):
     # Relationships
     conversation = relationship("Conversation")
 
+    __table_args__ = (
+        # Recent searches and analytics / retention windows
+        Index("ix_search_queries_created_at", "created_at"),
+    )
+
     def __repr__(self):
         return f"<SearchQuery(id={self.id}, query={self.query_text[:50]})>"
 
@@ -440,3 +465,31 @@ class MultiModalContent(Base):
 
     def __repr__(self):
         return f"<MultiModalContent(id={self.id}, type={self.media_type}, filename={self.filename})>"
+
+
+class AnalyticsRollup(Base):
+    """
+    Daily aggregates of analytics events removed by the retention engine.
+    """
+    __tablename__ = "analytics_rollups"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+
+    # Source of the aggregated events
+    source_table = Column(String(100), nullable=False)  # search_analytics, user_engagement
+    period = Column(String(10), nullable=False)  # Day as YYYY-MM-DD
+    dimension = Column(String(100), nullable=True)  # search_type, action_type, ...
+
+    # Aggregates (one row per retention batch; sum event_count across rows of a period)
+    event_count = Column(Integer, default=0)
+    metrics = Column(JSON, nullable=True)  # Averages and totals of the source columns
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_analytics_rollups_source_period", "source_table", "period"),
+    )
+
+    def __repr__(self):
+        return f"<AnalyticsRollup(source={self.source_table}, period={self.period}, count={self.event_count})>"
@@ -33,6 +33,16 @@ async def lifespan(app: FastAPI):
     from app.core.service_monitor import initialize_service_monitoring
     initialize_service_monitoring()
 
+    # Relay Celery task events to WebSocket task subscribers, long-poll and SSE watchers
+    from app.core.task_events import task_event_hub
+    from app.api.v1.websocket.connection_manager import connection_manager
+    task_event_hub.add_listener(connection_manager.broadcast_task_update)
+    await task_event_hub.start()
+
+    # Flush buffered search and engagement analytics in the background
+    from app.services.analytics_buffer import analytics_buffer
+    await analytics_buffer.start()
+
     # Check and log LLM status on startup
     try:
         from app.core.llm_config import get_llm_info, get_llm_health_status
@@ -62,7 +72,8 @@ async def lifespan(app: FastAPI):
 
     yield
     # Shutdown
-    pass
+    await task_event_hub.stop()
+    await analytics_buffer.stop()
 
 
 # Create the main FastAPI application instance
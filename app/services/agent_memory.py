@@ -18,22 +18,18 @@ class AgentMemoryService:
     """
     
     @staticmethod
-    async def store_agent_interaction(
-        db: AsyncSession,
-        conversation_id: str,
+    def agent_interaction_message(
         agent_name: str,
         task_type: str,
         input_data: Dict[str, Any],
         output_data: Dict[str, Any],
         metadata: Optional[Dict[str, Any]] = None
-    ) -> Optional[str]:
-        """Store an agent interaction in the chat history system."""
-        try:
-            # Create a structured message for the agent interaction
-            agent_message_content = f"[Agent: {agent_name}] Task: {task_type}"
-            
-            # Prepare metadata with agent-specific information
-            agent_metadata = {
+    ) -> Dict[str, Any]:
+        """Build the system message recording an agent interaction, for ChatHistoryService.add_messages."""
+        return {
+            "role": "system",
+            "content": f"[Agent: {agent_name}] Task: {task_type}",
+            "extra_data": {
                 "agent_name": agent_name,
                 "task_type": task_type,
                 "input_data": input_data,
@@ -41,21 +37,68 @@ class AgentMemoryService:
                 "timestamp": datetime.utcnow().isoformat(),
                 **(metadata or {})
             }
-            
+        }
+
+    @staticmethod
+    async def store_agent_interaction(
+        db: AsyncSession,
+        conversation_id: str,
+        agent_name: str,
+        task_type: str,
+        input_data: Dict[str, Any],
+        output_data: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """Store an agent interaction in the chat history system."""
+        try:
             # Store as a system message in the conversation
-            message = await ChatHistoryService.add_message(
-                db=db,
-                conversation_id=conversation_id,
-                role="system",
-                content=agent_message_content,
-                extra_data=agent_metadata
-            )
-            
-            return message.id if message else None
-            
+            messages = await ChatHistoryService.add_messages(db, conversation_id, [
+                AgentMemoryService.agent_interaction_message(agent_name, task_type, input_data, output_data, metadata)
+            ])
+
+            return messages[0].id if messages else None
+
         except Exception as e:
             logger.error(f"Error storing agent interaction: {e}")
             return None
+
+    @staticmethod
+    async def record_workflow_steps(
+        db: AsyncSession,
+        workflow_id: str,
+        workflow_type: str,
+        step_results: List[Any],
+        conversation_id: Optional[str] = None
+    ) -> int:
+        """Record per-step results and timings of a workflow as AgentInteraction rows."""
+        from app.database.models import AgentInteraction
+
+        try:
+            completed_at = datetime.utcnow()
+            for step_number, step in enumerate(step_results, start=1):
+                db.add(AgentInteraction(
+                    agent_name=step.agent,
+                    interaction_type="workflow",
+                    input_data=step.query or None,
+                    output_data=step.output[:5000] if step.output else None,
+                    workflow_id=workflow_id,
+                    workflow_type=workflow_type,
+                    step_number=step_number,
+                    execution_time_ms=step.duration * 1000,
+                    conversation_id=conversation_id,
+                    task_metadata=step.to_dict(),
+                    status=step.status,
+                    error_message=step.error,
+                    completed_at=completed_at
+                ))
+
+            await db.commit()
+            return len(step_results)
+
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error recording workflow steps: {e}")
+            return 0
     
     @staticmethod
     async def get_agent_context(
@@ -149,7 +192,9 @@ class AgentMemoryService:
                 elif message.role == "system" and include_agent_actions:
                     # Check if this is an agent interaction
                     try:
-                        extra_data = json.loads(message.extra_data) if message.extra_data else {}
+                        extra_data = message.extra_data or {}
+                        if isinstance(extra_data, str):
+                            extra_data = json.loads(extra_data)
                         if extra_data.get("agent_name"):
                             summary["agent_interactions"] += 1
                             summary["agents_used"].add(extra_data.get("agent_name"))
@@ -0,0 +1,349 @@
+# app/services/analytics_buffer.py
+"""
+Write-behind buffer for search and engagement analytics.
+
+Search logging and engagement tracking used to insert or read-modify-write a
+row and commit inside the request. With the buffer running, the request only
+appends to memory:
+
+- events (SearchQuery, SearchAnalytics and UserEngagement rows) go to a
+  bounded queue and are written as bulk INSERTs
+- DocumentAnalytics counters are summed per document and applied as one
+  ``UPDATE ... SET view_count = view_count + n`` per document
+- clicked search results are collected per search and appended in one UPDATE
+  per search
+
+A background task flushes every ANALYTICS_BUFFER_FLUSH_INTERVAL seconds, or
+sooner once ANALYTICS_BUFFER_FLUSH_SIZE events are pending. Analytics reads
+therefore lag writes by up to one flush interval. Each flush writes the events
+of each table, the clicks and the counters in separate transactions, so a bad
+row only loses its own group. Events that don't fit in the buffer, fail to
+flush or are discarded at shutdown are counted, not retried.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, insert, select, update
+
+from app.database.models import DocumentAnalytics, SearchAnalytics
+
+logger = logging.getLogger(__name__)
+
+# Buffer configuration
+ANALYTICS_BUFFER_ENABLED = os.getenv("ANALYTICS_BUFFER_ENABLED", "true").lower() == "true"
+ANALYTICS_BUFFER_MAX_EVENTS = int(os.getenv("ANALYTICS_BUFFER_MAX_EVENTS", "10000"))
+ANALYTICS_BUFFER_FLUSH_INTERVAL = float(os.getenv("ANALYTICS_BUFFER_FLUSH_INTERVAL", "2.0"))
+ANALYTICS_BUFFER_FLUSH_SIZE = int(os.getenv("ANALYTICS_BUFFER_FLUSH_SIZE", "500"))
+ANALYTICS_BUFFER_SHUTDOWN_MODE = os.getenv("ANALYTICS_BUFFER_SHUTDOWN_MODE", "flush").lower()  # flush or drop
+ANALYTICS_BUFFER_SHUTDOWN_TIMEOUT = float(os.getenv("ANALYTICS_BUFFER_SHUTDOWN_TIMEOUT", "10"))
+
+# Counter columns of DocumentAnalytics that can be incremented
+DOCUMENT_COUNTERS = ("view_count", "search_count")
+
+
+class AnalyticsWriteBuffer:
+    """In-process write-behind buffer for analytics rows and counters."""
+
+    def __init__(self, enabled: bool = ANALYTICS_BUFFER_ENABLED,
+                 max_events: int = ANALYTICS_BUFFER_MAX_EVENTS,
+                 flush_interval: float = ANALYTICS_BUFFER_FLUSH_INTERVAL,
+                 flush_size: int = ANALYTICS_BUFFER_FLUSH_SIZE,
+                 shutdown_mode: str = ANALYTICS_BUFFER_SHUTDOWN_MODE,
+                 shutdown_timeout: float = ANALYTICS_BUFFER_SHUTDOWN_TIMEOUT):
+        """
+        Initialize the buffer.
+
+        Args:
+            enabled: Whether start() runs the flusher (when not running, callers write directly)
+            max_events: Maximum pending events, documents with pending counters and searches with pending clicks
+            flush_interval: Seconds between flushes
+            flush_size: Pending events that trigger an early flush
+            shutdown_mode: "flush" writes pending data on stop, "drop" discards it
+            shutdown_timeout: Maximum seconds the final flush may take
+        """
+        self.enabled = enabled
+        self.max_events = max(1, max_events)
+        self.flush_interval = flush_interval
+        self.flush_size = max(1, flush_size)
+        self.shutdown_mode = shutdown_mode if shutdown_mode in ("flush", "drop") else "flush"
+        self.shutdown_timeout = shutdown_timeout
+
+        self._events: Deque[Tuple[Any, Dict[str, Any]]] = deque()
+        self._counters: Dict[str, Dict[str, float]] = {}
+        self._clicks: Dict[str, List[str]] = {}
+        self._flusher_task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+        # Metrics
+        self.events_buffered = 0
+        self.events_written = 0
+        self.counter_updates = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.last_flush_duration = 0.0
+        self.dropped: Dict[str, int] = {"buffer_full": 0, "flush_error": 0, "shutdown": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._flusher_task is not None and not self._flusher_task.done()
+
+    @property
+    def pending(self) -> int:
+        return len(self._events) + len(self._counters) + len(self._clicks)
+
+    async def start(self):
+        """Start flushing in the background."""
+        if not self.enabled or self.running:
+            return
+        self._wake = asyncio.Event()
+        self._flusher_task = asyncio.create_task(self._run())
+        logger.info(f"Analytics write buffer started (flush every {self.flush_interval}s)")
+
+    async def stop(self):
+        """Stop the flusher, then flush or drop pending data according to the shutdown mode."""
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
+            try:
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._flusher_task = None
+
+        if self.shutdown_mode == "drop":
+            self.dropped["shutdown"] += self._discard()
+            return
+
+        try:
+            await asyncio.wait_for(self.flush(), timeout=self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Analytics buffer shutdown flush timed out after {self.shutdown_timeout}s")
+        self.dropped["shutdown"] += self._discard()
+
+    def add_event(self, model, values: Dict[str, Any]) -> bool:
+        """
+        Buffer one row to insert.
+
+        Args:
+            model: Model of the row (its table is bulk-inserted on flush)
+            values: Column values, including the id if the caller needs it
+
+        Returns:
+            Whether the event was buffered (False if the buffer was full)
+        """
+        if self.pending >= self.max_events:
+            self.dropped["buffer_full"] += 1
+            return False
+        values.setdefault("created_at", datetime.utcnow())
+        self._events.append((model, values))
+        self.events_buffered += 1
+        if len(self._events) >= self.flush_size:
+            self._wake.set()
+        return True
+
+    def increment_document(self, document_id: str, counter: str, amount: int = 1,
+                           duration_seconds: Optional[float] = None) -> bool:
+        """
+        Buffer a DocumentAnalytics counter increment.
+
+        Args:
+            document_id: Document ID
+            counter: Counter column (view_count or search_count)
+            amount: Increment
+            duration_seconds: View duration to fold into avg_time_spent
+
+        Returns:
+            Whether the increment was buffered (False if the buffer was full)
+        """
+        counters = self._counters.get(document_id)
+        if counters is None:
+            if self.pending >= self.max_events:
+                self.dropped["buffer_full"] += 1
+                return False
+            counters = self._counters[document_id] = {}
+        counters[counter] = counters.get(counter, 0) + amount
+        if duration_seconds:
+            counters["time_spent"] = counters.get("time_spent", 0.0) + duration_seconds
+        return True
+
+    def add_click(self, search_analytics_id: str, document_id: str) -> bool:
+        """Buffer a clicked result of a search (appended to SearchAnalytics.clicked_results)."""
+        clicks = self._clicks.get(search_analytics_id)
+        if clicks is None:
+            if self.pending >= self.max_events:
+                self.dropped["buffer_full"] += 1
+                return False
+            clicks = self._clicks[search_analytics_id] = []
+        clicks.append(document_id)
+        return True
+
+    async def flush(self) -> int:
+        """
+        Write all pending data: each table's events, the clicks and the counters in their own transaction.
+
+        Returns:
+            Number of events and counter updates written
+        """
+        async with self._flush_lock:
+            events, self._events = list(self._events), deque()
+            counters, self._counters = self._counters, {}
+            clicks, self._clicks = self._clicks, {}
+            if not events and not counters and not clicks:
+                return 0
+
+            started = time.perf_counter()
+            written = 0
+
+            # Rows first, so clicks can reference searches buffered in the same flush
+            for model, rows in self._group_events(events).items():
+                if await self._write_group(
+                    f"{model.__tablename__} events", len(rows),
+                    lambda db, model=model, rows=rows: db.execute(insert(model), rows)
+                ):
+                    self.events_written += len(rows)
+                    written += len(rows)
+
+            if clicks:
+                await self._write_group("search clicks", len(clicks), lambda db: self._apply_clicks(db, clicks))
+
+            if counters and await self._write_group(
+                "document counters", len(counters), lambda db: self._apply_all_document_counters(db, counters)
+            ):
+                self.counter_updates += len(counters)
+                written += len(counters)
+
+            self.flushes += 1
+            self.last_flush_duration = time.perf_counter() - started
+            return written
+
+    async def _write_group(self, name: str, size: int, apply: Callable[[Any], Awaitable[Any]]) -> bool:
+        """Apply one group of pending writes in its own transaction; returns whether it committed."""
+        from app.database.database import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await apply(db)
+                await db.commit()
+            return True
+        except Exception as e:
+            self.flush_errors += 1
+            self.dropped["flush_error"] += size
+            logger.error(f"Analytics buffer flush of {size} {name} failed, dropped them: {e}")
+            return False
+
+    @staticmethod
+    def _group_events(events: List[Tuple[Any, Dict[str, Any]]]) -> Dict[Any, List[Dict[str, Any]]]:
+        grouped: Dict[Any, List[Dict[str, Any]]] = {}
+        for model, values in events:
+            grouped.setdefault(model, []).append(values)
+        return grouped
+
+    @classmethod
+    async def _apply_all_document_counters(cls, db, counters: Dict[str, Dict[str, float]]):
+        for document_id, increments in counters.items():
+            await cls._apply_document_counters(db, document_id, increments)
+
+    @staticmethod
+    async def _apply_document_counters(db, document_id: str, increments: Dict[str, float]):
+        """Apply summed increments to a document's analytics row, creating it if missing."""
+        views = int(increments.get("view_count", 0))
+        time_spent = increments.get("time_spent", 0.0)
+        values: Dict[str, Any] = {
+            counter: func.coalesce(getattr(DocumentAnalytics, counter), 0) + int(increments[counter])
+            for counter in DOCUMENT_COUNTERS if increments.get(counter)
+        }
+        if views and time_spent:
+            # Running average over all views, as one arithmetic update
+            previous_views = func.coalesce(DocumentAnalytics.view_count, 0)
+            values["avg_time_spent"] = (
+                func.coalesce(DocumentAnalytics.avg_time_spent, 0.0) * previous_views + time_spent
+            ) / (previous_views + views)
+        if not values:
+            return
+
+        result = await db.execute(
+            update(DocumentAnalytics).where(DocumentAnalytics.document_id == document_id).values(**values)
+        )
+        if result.rowcount == 0:
+            await db.execute(insert(DocumentAnalytics).values(
+                document_id=document_id,
+                view_count=views,
+                search_count=int(increments.get("search_count", 0)),
+                avg_time_spent=time_spent / views if views else 0.0
+            ))
+
+    @staticmethod
+    async def _apply_clicks(db, clicks: Dict[str, List[str]]):
+        """Append buffered clicks to each search's clicked_results."""
+        result = await db.execute(
+            select(SearchAnalytics.id, SearchAnalytics.clicked_results).where(SearchAnalytics.id.in_(list(clicks)))
+        )
+        rows = [
+            {"search_id": search_id, "clicked": (clicked or []) + clicks[search_id]}
+            for search_id, clicked in result
+        ]
+        if rows:
+            await db.execute(
+                update(SearchAnalytics.__table__)
+                .where(SearchAnalytics.__table__.c.id == bindparam("search_id"))
+                .values(clicked_results=bindparam("clicked")),
+                rows
+            )
+
+    def _discard(self) -> int:
+        discarded = self.pending
+        self._events.clear()
+        self._counters.clear()
+        self._clicks.clear()
+        return discarded
+
+    async def _run(self):
+        """Flush periodically, or early when enough events are pending."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Analytics buffer flusher error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer state and counters."""
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "pending_events": len(self._events),
+            "pending_document_counters": len(self._counters),
+            "pending_search_clicks": len(self._clicks),
+            "max_events": self.max_events,
+            "flush_interval": self.flush_interval,
+            "shutdown_mode": self.shutdown_mode,
+            "events_buffered": self.events_buffered,
+            "events_written": self.events_written,
+            "counter_updates": self.counter_updates,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "last_flush_duration": self.last_flush_duration,
+            "dropped": dict(self.dropped),
+            "dropped_total": sum(self.dropped.values()),
+        }
+
+
+# Global analytics buffer
+analytics_buffer = AnalyticsWriteBuffer()
+
+
+def get_analytics_buffer_stats() -> Dict[str, Any]:
+    """Get analytics write buffer statistics."""
+    return analytics_buffer.get_stats()
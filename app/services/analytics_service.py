@@ -1,12 +1,14 @@
 # app/services/analytics_service.py
 import logging
 import hashlib
+import uuid
 from typing import List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc, and_, or_
 from datetime import datetime, timedelta
 
 from app.database.models import Document, DocumentAnalytics, SearchAnalytics, UserEngagement
+from app.services.analytics_buffer import analytics_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +23,18 @@ class AnalyticsService:
         duration_seconds: Optional[float] = None
     ):
         """Track a document view event."""
+        if analytics_buffer.running:
+            analytics_buffer.increment_document(document_id, "view_count", duration_seconds=duration_seconds)
+            analytics_buffer.add_event(UserEngagement, {
+                "id": str(uuid.uuid4()),
+                "user_session": user_session,
+                "action_type": "view",
+                "resource_type": "document",
+                "resource_id": document_id,
+                "duration_seconds": duration_seconds
+            })
+            return
+
         try:
             # Update document analytics
             analytics = await AnalyticsService._get_or_create_document_analytics(db, document_id)
@@ -62,7 +76,35 @@ class AnalyticsService:
         """Track a search query and return search analytics ID."""
         try:
             query_hash = hashlib.sha256(query.encode()).hexdigest()
-            
+
+            if analytics_buffer.running:
+                search_analytics_id = str(uuid.uuid4())
+                analytics_buffer.add_event(SearchAnalytics, {
+                    "id": search_analytics_id,
+                    "query": query,
+                    "query_hash": query_hash,
+                    "search_type": search_type,
+                    "results_count": results_count,
+                    "results_returned": results_returned,
+                    "execution_time_ms": execution_time_ms,
+                    "user_session": user_session,
+                    "filters_applied": filters_applied
+                })
+                if user_session:
+                    analytics_buffer.add_event(UserEngagement, {
+                        "id": str(uuid.uuid4()),
+                        "user_session": user_session,
+                        "action_type": "search",
+                        "resource_type": "search",
+                        "resource_id": search_analytics_id,
+                        "context_data": {
+                            "query": query,
+                            "search_type": search_type,
+                            "results_count": results_count
+                        }
+                    })
+                return search_analytics_id
+
             search_analytics = SearchAnalytics(
                 query=query,
                 query_hash=query_hash,
@@ -108,6 +150,20 @@ class AnalyticsService:
         user_session: Optional[str] = None
     ):
         """Track when a user clicks on a search result."""
+        if analytics_buffer.running:
+            analytics_buffer.add_click(search_analytics_id, document_id)
+            analytics_buffer.increment_document(document_id, "search_count")
+            if user_session:
+                analytics_buffer.add_event(UserEngagement, {
+                    "id": str(uuid.uuid4()),
+                    "user_session": user_session,
+                    "action_type": "search_click",
+                    "resource_type": "document",
+                    "resource_id": document_id,
+                    "context_data": {"search_analytics_id": search_analytics_id}
+                })
+            return
+
         try:
             # Update search analytics
             search_analytics = await db.get(SearchAnalytics, search_analytics_id)
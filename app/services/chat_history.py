@@ -1,14 +1,57 @@
 # app/services/chat_history.py
+from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, and_
+from sqlalchemy import select, desc, and_, insert, update
 from sqlalchemy.orm import selectinload
-import json
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from app.database.models import Conversation, Message
 from app.database.database import AsyncSessionLocal
+from app.services.pagination import Page, cached_count, count_cache, keyset_page
+
+
+# Read paths select only these columns into slotted records instead of building ORM
+# instances and detached copies (tool_calls and extra_data are native JSON columns)
+@dataclass(slots=True)
+class MessageRecord:
+    """A message as returned by ChatHistoryService (not bound to a session)."""
+    id: str
+    conversation_id: str
+    role: str
+    content: str
+    tool_calls: Optional[Any]
+    extra_data: Optional[Any]
+    created_at: Optional[datetime]
+
+
+@dataclass(slots=True)
+class ConversationRecord:
+    """A conversation as returned by ChatHistoryService (not bound to a session)."""
+    id: str
+    title: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    is_active: bool
+    messages: Optional[List[MessageRecord]] = None
+
+
+MESSAGE_COLUMNS = (
+    Message.id, Message.conversation_id, Message.role, Message.content,
+    Message.tool_calls, Message.extra_data, Message.created_at
+)
+CONVERSATION_COLUMNS = (
+    Conversation.id, Conversation.title, Conversation.created_at, Conversation.updated_at, Conversation.is_active
+)
+
+
+def _message_record(row) -> MessageRecord:
+    return MessageRecord(*row[:len(MESSAGE_COLUMNS)])
+
+
+def _conversation_record(row) -> ConversationRecord:
+    return ConversationRecord(*row[:len(CONVERSATION_COLUMNS)])
 
 
 class ChatHistoryService:
@@ -19,7 +62,7 @@ class ChatHistoryService:
         db: AsyncSession,
         title: Optional[str] = None,
         initial_message: Optional[str] = None
-    ) -> Conversation:
+    ) -> ConversationRecord:
         """Create a new conversation."""
         conversation = Conversation(
             id=str(uuid.uuid4()),
@@ -28,6 +71,7 @@ class ChatHistoryService:
         )
         
         db.add(conversation)
+        count_cache.invalidate("conversations")
         await db.flush()  # Get the ID without committing
         
         # Add initial message if provided
@@ -41,17 +85,7 @@ class ChatHistoryService:
         
         await db.commit()
         await db.refresh(conversation)
-
-        # Create a detached copy to avoid session issues
-        from app.database.models import Conversation as ConversationModel
-        detached_conversation = ConversationModel(
-            id=conversation.id,
-            title=conversation.title,
-            created_at=conversation.created_at,
-            updated_at=conversation.updated_at,
-            is_active=conversation.is_active
-        )
-        return detached_conversation
+        return ChatHistoryService._conversation_from_model(conversation)
 
     @staticmethod
     async def get_conversation(
@@ -84,57 +118,24 @@ class ChatHistoryService:
         db: AsyncSession,
         conversation_id: str,
         include_messages: bool = True
-    ) -> Optional[Conversation]:
-        """Get a conversation by ID as a detached object for API responses."""
-        conversation = await ChatHistoryService.get_conversation(
-            db, conversation_id, include_messages, active_only=True
+    ) -> Optional[ConversationRecord]:
+        """Get a conversation by ID as a record for API responses."""
+        result = await db.execute(
+            select(*CONVERSATION_COLUMNS).where(Conversation.id == conversation_id, Conversation.is_active == True)
         )
-
-        if not conversation:
+        row = result.first()
+        if row is None:
             return None
 
-        # Create a detached copy to avoid session issues
-        from app.database.models import Conversation as ConversationModel, Message as MessageModel
-        detached_conversation = ConversationModel(
-            id=conversation.id,
-            title=conversation.title,
-            created_at=conversation.created_at,
-            updated_at=conversation.updated_at,
-            is_active=conversation.is_active
-        )
-
-        # If messages are included, create detached message copies
-        if include_messages and hasattr(conversation, 'messages') and conversation.messages:
-            detached_messages = []
-            for msg in conversation.messages:
-                # Deserialize JSON fields
-                tool_calls_data = None
-                if msg.tool_calls:
-                    try:
-                        tool_calls_data = json.loads(msg.tool_calls)
-                    except json.JSONDecodeError:
-                        tool_calls_data = msg.tool_calls
-
-                extra_data_dict = None
-                if msg.extra_data:
-                    try:
-                        extra_data_dict = json.loads(msg.extra_data)
-                    except json.JSONDecodeError:
-                        extra_data_dict = msg.extra_data
-
-                detached_msg = MessageModel(
-                    id=msg.id,
-                    conversation_id=msg.conversation_id,
-                    role=msg.role,
-                    content=msg.content,
-                    tool_calls=tool_calls_data,
-                    extra_data=extra_data_dict,
-                    created_at=msg.created_at
-                )
-                detached_messages.append(detached_msg)
-            detached_conversation.messages = detached_messages
-
-        return detached_conversation
+        conversation = _conversation_record(row)
+        if include_messages:
+            result = await db.execute(
+                select(*MESSAGE_COLUMNS)
+                .where(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at, Message.id)
+            )
+            conversation.messages = [_message_record(message_row) for message_row in result]
+        return conversation
 
     @staticmethod
     async def get_conversations(
@@ -142,9 +143,9 @@ class ChatHistoryService:
         limit: int = 50,
         offset: int = 0,
         active_only: bool = True
-    ) -> List[Conversation]:
+    ) -> List[ConversationRecord]:
         """Get a list of conversations."""
-        query = select(Conversation)
+        query = select(*CONVERSATION_COLUMNS)
 
         if active_only:
             query = query.where(Conversation.is_active == True)
@@ -152,22 +153,62 @@ class ChatHistoryService:
         query = query.order_by(desc(Conversation.updated_at)).limit(limit).offset(offset)
 
         result = await db.execute(query)
-        conversations = list(result.scalars().all())
-
-        # Create detached copies to avoid session issues
-        from app.database.models import Conversation as ConversationModel
-        detached_conversations = []
-        for conv in conversations:
-            detached_conv = ConversationModel(
-                id=conv.id,
-                title=conv.title,
-                created_at=conv.created_at,
-                updated_at=conv.updated_at,
-                is_active=conv.is_active
-            )
-            detached_conversations.append(detached_conv)
+        return [_conversation_record(row) for row in result]
 
-        return detached_conversations
+    @staticmethod
+    async def get_conversations_page(
+        db: AsyncSession,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        active_only: bool = True,
+        include_total: bool = False
+    ) -> Page:
+        """
+        Get a page of conversations, most recently updated first.
+
+        Args:
+            db: Database session
+            limit: Maximum conversations per page
+            cursor: Cursor returned with the previous page
+            active_only: Only include active conversations
+            include_total: Also count all matching conversations (cached briefly)
+
+        Returns:
+            Page of conversation records
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        conditions = [Conversation.is_active == True] if active_only else []
+        conversations, next_cursor, has_more = await keyset_page(
+            db, select(*CONVERSATION_COLUMNS).where(*conditions), Conversation.updated_at, Conversation.id,
+            limit, cursor, descending=True, row_factory=_conversation_record
+        )
+
+        total = await ChatHistoryService.count_conversations(db, active_only) if include_total else None
+
+        return Page(
+            items=conversations,
+            next_cursor=next_cursor,
+            has_more=has_more,
+            total=total
+        )
+
+    @staticmethod
+    async def count_conversations(db: AsyncSession, active_only: bool = True) -> int:
+        """Count conversations (cached briefly)."""
+        conditions = [Conversation.is_active == True] if active_only else []
+        return await cached_count(db, "conversations", {"active_only": active_only}, Conversation, *conditions)
+
+    @staticmethod
+    def _conversation_from_model(conversation: Conversation) -> ConversationRecord:
+        return ConversationRecord(
+            id=conversation.id,
+            title=conversation.title,
+            created_at=conversation.created_at,
+            updated_at=conversation.updated_at,
+            is_active=conversation.is_active
+        )
 
     @staticmethod
     async def update_conversation(
@@ -175,7 +216,7 @@ class ChatHistoryService:
         conversation_id: str,
         title: Optional[str] = None,
         is_active: Optional[bool] = None
-    ) -> Optional[Conversation]:
+    ) -> Optional[ConversationRecord]:
         """Update a conversation."""
         conversation = await ChatHistoryService.get_conversation(
             db, conversation_id, include_messages=False, active_only=True
@@ -189,20 +230,11 @@ class ChatHistoryService:
 
         if is_active is not None:
             conversation.is_active = is_active
+            count_cache.invalidate("conversations")
 
         await db.commit()
         await db.refresh(conversation)
-
-        # Create a detached copy to avoid session issues
-        from app.database.models import Conversation as ConversationModel
-        detached_conversation = ConversationModel(
-            id=conversation.id,
-            title=conversation.title,
-            created_at=conversation.created_at,
-            updated_at=conversation.updated_at,
-            is_active=conversation.is_active
-        )
-        return detached_conversation
+        return ChatHistoryService._conversation_from_model(conversation)
 
     @staticmethod
     async def delete_conversation(
@@ -218,6 +250,7 @@ class ChatHistoryService:
         if not conversation:
             return False
         
+        count_cache.invalidate("conversations")
         if soft_delete:
             conversation.is_active = False
             await db.commit()
@@ -235,60 +268,80 @@ class ChatHistoryService:
         content: str,
         tool_calls: Optional[Dict[str, Any]] = None,
         extra_data: Optional[Dict[str, Any]] = None
-    ) -> Optional[Message]:
+    ) -> Optional[MessageRecord]:
         """Add a message to a conversation."""
-        # Verify conversation exists
-        conversation = await ChatHistoryService.get_conversation(
-            db, conversation_id, include_messages=False, active_only=True
+        messages = await ChatHistoryService.add_messages(db, conversation_id, [{
+            "role": role,
+            "content": content,
+            "tool_calls": tool_calls,
+            "extra_data": extra_data
+        }])
+        return messages[0] if messages else None
+
+    @staticmethod
+    async def add_messages(
+        db: AsyncSession,
+        conversation_id: str,
+        messages: List[Dict[str, Any]]
+    ) -> Optional[List[MessageRecord]]:
+        """
+        Append several messages to a conversation in one transaction.
+
+        The transaction takes three round trips however many messages it writes: an
+        UPDATE bumping the conversation's updated_at (which doubles as the existence
+        check), one multi-row INSERT of the messages, and the commit.
+
+        Args:
+            db: Database session
+            conversation_id: Conversation ID
+            messages: Messages in order, each with role and content and optionally
+                tool_calls and extra_data
+
+        Returns:
+            The stored messages in order, or None if the conversation doesn't exist or is inactive
+        """
+        # Aware UTC: the columns are timezone-aware, and a naive value would be read
+        # in the database session's time zone
+        now = datetime.now(timezone.utc)
+        result = await db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id, Conversation.is_active == True)
+            .values(updated_at=now)
         )
-        
-        if not conversation:
+        if result.rowcount == 0:
             return None
-        
-        message = Message(
-            id=str(uuid.uuid4()),
-            conversation_id=conversation_id,
-            role=role,
-            content=content,
-            tool_calls=json.dumps(tool_calls) if tool_calls else None,
-            extra_data=json.dumps(extra_data) if extra_data else None
-        )
-        
-        db.add(message)
-        
-        # Update conversation's updated_at timestamp
-        conversation.updated_at = datetime.utcnow()
-        
+
+        # Timestamps are assigned here (a microsecond apart to keep the order within
+        # the batch) so nothing has to be read back after the insert
+        records = [
+            MessageRecord(
+                id=str(uuid.uuid4()),
+                conversation_id=conversation_id,
+                role=message["role"],
+                content=message["content"],
+                tool_calls=message.get("tool_calls") or None,
+                extra_data=message.get("extra_data") or None,
+                created_at=now + timedelta(microseconds=index)
+            )
+            for index, message in enumerate(messages)
+        ]
+        if records:
+            await db.execute(insert(Message).values([
+                {
+                    "id": record.id,
+                    "conversation_id": record.conversation_id,
+                    "role": record.role,
+                    "content": record.content,
+                    "tool_calls": record.tool_calls,
+                    "extra_data": record.extra_data,
+                    "created_at": record.created_at
+                }
+                for record in records
+            ]))
+            count_cache.invalidate("messages")
+
         await db.commit()
-        await db.refresh(message)
-
-        # Create a detached copy to avoid session issues with deserialized JSON fields
-        from app.database.models import Message as MessageModel
-
-        tool_calls_data = None
-        if message.tool_calls:
-            try:
-                tool_calls_data = json.loads(message.tool_calls)
-            except json.JSONDecodeError:
-                tool_calls_data = message.tool_calls
-
-        extra_data_dict = None
-        if message.extra_data:
-            try:
-                extra_data_dict = json.loads(message.extra_data)
-            except json.JSONDecodeError:
-                extra_data_dict = message.extra_data
-
-        detached_message = MessageModel(
-            id=message.id,
-            conversation_id=message.conversation_id,
-            role=message.role,
-            content=message.content,
-            tool_calls=tool_calls_data,
-            extra_data=extra_data_dict,
-            created_at=message.created_at
-        )
-        return detached_message
+        return records
 
     @staticmethod
     async def get_messages(
@@ -296,10 +349,10 @@ class ChatHistoryService:
         conversation_id: str,
         limit: int = 100,
         offset: int = 0
-    ) -> List[Message]:
-        """Get messages for a conversation with properly deserialized JSON fields."""
+    ) -> List[MessageRecord]:
+        """Get messages for a conversation."""
         query = (
-            select(Message)
+            select(*MESSAGE_COLUMNS)
             .where(Message.conversation_id == conversation_id)
             .order_by(Message.created_at)
             .limit(limit)
@@ -307,40 +360,51 @@ class ChatHistoryService:
         )
 
         result = await db.execute(query)
-        raw_messages = list(result.scalars().all())
-
-        # Create detached copies with deserialized JSON fields
-        from app.database.models import Message as MessageModel
-        detached_messages = []
-
-        for msg in raw_messages:
-            # Deserialize JSON fields
-            tool_calls_data = None
-            if msg.tool_calls:
-                try:
-                    tool_calls_data = json.loads(msg.tool_calls)
-                except json.JSONDecodeError:
-                    tool_calls_data = msg.tool_calls
-
-            extra_data_dict = None
-            if msg.extra_data:
-                try:
-                    extra_data_dict = json.loads(msg.extra_data)
-                except json.JSONDecodeError:
-                    extra_data_dict = msg.extra_data
-
-            detached_msg = MessageModel(
-                id=msg.id,
-                conversation_id=msg.conversation_id,
-                role=msg.role,
-                content=msg.content,
-                tool_calls=tool_calls_data,
-                extra_data=extra_data_dict,
-                created_at=msg.created_at
-            )
-            detached_messages.append(detached_msg)
+        return [_message_record(row) for row in result]
 
-        return detached_messages
+    @staticmethod
+    async def get_messages_page(
+        db: AsyncSession,
+        conversation_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = False
+    ) -> Page:
+        """
+        Get a page of a conversation's messages, oldest first.
+
+        Args:
+            db: Database session
+            conversation_id: Conversation ID
+            limit: Maximum messages per page
+            cursor: Cursor returned with the previous page
+            include_total: Also count all messages of the conversation (cached briefly)
+
+        Returns:
+            Page of message records
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        messages, next_cursor, has_more = await keyset_page(
+            db, select(*MESSAGE_COLUMNS).where(Message.conversation_id == conversation_id),
+            Message.created_at, Message.id, limit, cursor, row_factory=_message_record
+        )
+
+        total = await ChatHistoryService.count_messages(db, conversation_id) if include_total else None
+
+        return Page(
+            items=messages,
+            next_cursor=next_cursor,
+            has_more=has_more,
+            total=total
+        )
+
+    @staticmethod
+    async def count_messages(db: AsyncSession, conversation_id: str) -> int:
+        """Count the messages of a conversation (cached briefly)."""
+        return await cached_count(db, "messages", {"conversation_id": conversation_id},
+                                  Message, Message.conversation_id == conversation_id)
 
     @staticmethod
     async def get_conversation_context(
@@ -362,11 +426,9 @@ class ChatHistoryService:
             }
             
             if message.tool_calls:
-                # tool_calls is already deserialized by get_messages()
                 msg_dict["tool_calls"] = message.tool_calls
 
             if message.extra_data:
-                # extra_data is already deserialized by get_messages()
                 msg_dict["extra_data"] = message.extra_data
             
             context.append(msg_dict)
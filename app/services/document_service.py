@@ -1,18 +1,29 @@
 # app/services/document_service.py
+import asyncio
 import logging
+import os
 import time
-from typing import List, Dict, Any, Optional, Tuple
+import uuid
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, and_
+from sqlalchemy import select, desc, and_, insert
 from sqlalchemy.orm import selectinload
 import json
 from datetime import datetime
 
 from app.database.models import Document, DocumentChunk, SearchQuery
 from app.core.vector_store import vector_store
+from app.services.pagination import Page, cached_count, count_cache, keyset_page
+from app.services.analytics_buffer import analytics_buffer
 
 logger = logging.getLogger(__name__)
 
+# Batch ingestion: documents parsed and embedding groups in flight at once, chunks per
+# vector upsert, and documents per bulk INSERT transaction
+DOCUMENT_BATCH_CONCURRENCY = int(os.getenv("DOCUMENT_BATCH_CONCURRENCY", "4"))
+DOCUMENT_VECTOR_BATCH_SIZE = int(os.getenv("DOCUMENT_VECTOR_BATCH_SIZE", "64"))
+DOCUMENT_INSERT_BATCH_SIZE = int(os.getenv("DOCUMENT_INSERT_BATCH_SIZE", "100"))
+
 class DocumentService:
     """
     Service for managing documents, chunks, and semantic search functionality.
@@ -108,6 +119,7 @@ class DocumentService:
                 db.add(chunk)
             
             await db.commit()
+            count_cache.invalidate("documents")
             logger.info(f"Created document {document.id} with {len(chunks)} chunks")
             return document
             
@@ -116,6 +128,253 @@ class DocumentService:
             await db.rollback()
             return None
     
+    @staticmethod
+    def _prepare_document(doc_data: Dict[str, Any], user_id: Optional[str]) -> Dict[str, Any]:
+        """
+        Validate and chunk one document of a batch into Document and DocumentChunk rows.
+
+        The owner is always ``user_id`` (the submitting user); a ``user_id`` in the
+        document data is ignored so callers can't create documents for someone else.
+        """
+        content = doc_data.get("content") or ""
+        if not user_id:
+            raise ValueError("An authenticated owner is required")
+        if not content.strip():
+            raise ValueError("Document content is empty")
+
+        title = doc_data.get("title", "Untitled")
+        doc_metadata = doc_data.get("metadata", {})
+        document_row = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "title": title,
+            "content": content,
+            "content_type": doc_data.get("content_type", "text/plain"),
+            "file_path": doc_data.get("file_path"),
+            "file_size": doc_data.get("file_size") or len(content),
+            "doc_metadata": doc_metadata,
+            "tags": doc_data.get("tags", []),
+            "embedding_model": vector_store.embedding_model_name,
+            "vector_id": None,
+            "is_active": True
+        }
+
+        chunks = vector_store.chunk_text(
+            content, doc_data.get("chunk_size", 1000), doc_data.get("chunk_overlap", 200)
+        )
+        chunk_rows = []
+        search_from = 0
+        for i, chunk_content in enumerate(chunks):
+            # Chunks are in order, so search from the previous chunk's start
+            start_pos = content.find(chunk_content, search_from)
+            if start_pos != -1:
+                search_from = start_pos + 1
+            chunk_rows.append({
+                "id": str(uuid.uuid4()),
+                "document_id": document_row["id"],
+                "content": chunk_content,
+                "chunk_index": i,
+                "chunk_size": len(chunk_content),
+                "start_position": start_pos,
+                "end_position": start_pos + len(chunk_content) if start_pos != -1 else None,
+                "embedding_model": vector_store.embedding_model_name,
+                "chunk_metadata": {
+                    "document_title": title,
+                    "chunk_index": i,
+                    "total_chunks": len(chunks)
+                },
+                "vector_id": None
+            })
+
+        return {"document": document_row, "chunks": chunk_rows, "metadata": doc_metadata or {}}
+
+    @staticmethod
+    def _vector_items(prepared: Dict[str, Any]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Vector objects for a prepared document and its chunks, paired with their rows."""
+        document_row = prepared["document"]
+        items = [(document_row, {
+            "document_id": document_row["id"],
+            "content": document_row["content"],
+            "metadata": {
+                "document_id": document_row["id"],
+                "title": document_row["title"],
+                "content_type": document_row["content_type"],
+                "chunk_type": "full_document",
+                **prepared["metadata"]
+            }
+        })]
+        for chunk_row in prepared["chunks"]:
+            items.append((chunk_row, {
+                "document_id": chunk_row["id"],
+                "content": chunk_row["content"],
+                "metadata": {
+                    "document_id": document_row["id"],
+                    "chunk_id": chunk_row["id"],
+                    "title": document_row["title"],
+                    "chunk_index": chunk_row["chunk_index"],
+                    "chunk_type": "chunk",
+                    **prepared["metadata"]
+                }
+            }))
+        return items
+
+    @staticmethod
+    async def _store_prepared_documents(db: AsyncSession, prepared: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Bulk insert prepared documents whose vectors are already stored.
+
+        Vectors of documents whose rows could not be inserted are deleted again.
+
+        Returns:
+            Per-document results in input order
+        """
+        errors = await DocumentService._bulk_insert_documents(db, prepared)
+        results = []
+        for item, error in zip(prepared, errors):
+            if error is None:
+                results.append({
+                    "title": item["document"]["title"],
+                    "document_id": item["document"]["id"],
+                    "status": "success",
+                    "chunks_created": len(item["chunks"])
+                })
+                continue
+
+            results.append({
+                "title": item["document"]["title"],
+                "document_id": None,
+                "status": "failed",
+                "error": error
+            })
+            # Remove vectors of documents whose rows could not be stored
+            for row in [item["document"], *item["chunks"]]:
+                if row["vector_id"]:
+                    await asyncio.to_thread(vector_store.delete_document, row["vector_id"])
+        return results
+
+    @staticmethod
+    async def _bulk_insert_documents(db: AsyncSession, prepared: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Insert prepared documents and chunks with bulk INSERTs in one transaction.
+
+        If the transaction fails, documents are retried one by one so a bad
+        document only fails itself.
+
+        Returns:
+            An error message per document, None for documents that were inserted
+        """
+        try:
+            await db.execute(insert(Document), [item["document"] for item in prepared])
+            chunk_rows = [chunk for item in prepared for chunk in item["chunks"]]
+            if chunk_rows:
+                await db.execute(insert(DocumentChunk), chunk_rows)
+            await db.commit()
+            count_cache.invalidate("documents")
+            return [None] * len(prepared)
+
+        except Exception as e:
+            await db.rollback()
+            if len(prepared) == 1:
+                return [str(e)]
+            logger.warning(f"Bulk insert of {len(prepared)} documents failed, isolating failures: {e}")
+            errors = []
+            for item in prepared:
+                errors.extend(await DocumentService._bulk_insert_documents(db, [item]))
+            return errors
+
+    @staticmethod
+    async def create_documents_batch(
+        db: AsyncSession,
+        documents: List[Dict[str, Any]],
+        user_id: Optional[str] = None,
+        concurrency: int = DOCUMENT_BATCH_CONCURRENCY,
+        vector_batch_size: int = DOCUMENT_VECTOR_BATCH_SIZE,
+        insert_batch_size: int = DOCUMENT_INSERT_BATCH_SIZE,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Create many documents with bounded concurrency, batched embeddings and bulk INSERTs.
+
+        Documents are processed in windows of ``insert_batch_size``: each window is
+        chunked concurrently, its texts are embedded and upserted to the vector store
+        ``vector_batch_size`` at a time, and its rows are written with bulk INSERTs in
+        one transaction. A failing document does not fail the rest of the batch.
+
+        Args:
+            db: Database session
+            documents: Document dicts (title, content, content_type, metadata, tags,
+                chunk_size, chunk_overlap)
+            user_id: Owner of every document in the batch
+            concurrency: Documents chunked and embedding groups processed at once
+            vector_batch_size: Texts per embedding call and vector upsert
+            insert_batch_size: Documents per bulk INSERT transaction
+            progress_callback: Called with progress metadata after each window
+
+        Returns:
+            Per-document results in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(documents)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        insert_batch_size = max(1, insert_batch_size)
+        vector_batch_size = max(1, vector_batch_size)
+        successful = 0
+
+        def failure(index: int, error: str) -> Dict[str, Any]:
+            return {
+                "title": documents[index].get("title"),
+                "document_id": None,
+                "status": "failed",
+                "error": error
+            }
+
+        async def prepare(index: int) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(DocumentService._prepare_document, documents[index], user_id)
+                except Exception as e:
+                    results[index] = failure(index, str(e))
+                    return None
+
+        async def upsert_vectors(group: List[Tuple[Dict[str, Any], Dict[str, Any]]]):
+            async with semaphore:
+                vector_ids = await asyncio.to_thread(
+                    vector_store.add_documents_batch, [item for _, item in group]
+                )
+            for (row, _), vector_id in zip(group, vector_ids):
+                row["vector_id"] = vector_id
+
+        for window_start in range(0, len(documents), insert_batch_size):
+            window = range(window_start, min(window_start + insert_batch_size, len(documents)))
+            prepared_list = await asyncio.gather(*(prepare(index) for index in window))
+            prepared = [(index, item) for index, item in zip(window, prepared_list) if item is not None]
+
+            vector_items = [pair for _, item in prepared for pair in DocumentService._vector_items(item)]
+            await asyncio.gather(*(
+                upsert_vectors(vector_items[start:start + vector_batch_size])
+                for start in range(0, len(vector_items), vector_batch_size)
+            ))
+
+            if prepared:
+                stored = await DocumentService._store_prepared_documents(db, [item for _, item in prepared])
+                for (index, _), result in zip(prepared, stored):
+                    if result["status"] == "success":
+                        successful += 1
+                    results[index] = result
+
+            processed = window.stop
+            logger.info(f"Batch ingestion: {processed}/{len(documents)} documents processed, {successful} stored")
+            if progress_callback is not None:
+                progress_callback({
+                    "status": f"Processed {processed} of {len(documents)} documents",
+                    "processed": processed,
+                    "successful": successful,
+                    "failed": processed - successful,
+                    "total": len(documents),
+                    "progress": processed / len(documents)
+                })
+
+        return results
+
     @staticmethod
     async def get_document(
         db: AsyncSession,
@@ -148,28 +407,13 @@ class DocumentService:
     ) -> Tuple[List[Document], int]:
         """List documents with optional filtering."""
         try:
-            # Build base query
-            query = select(Document).where(Document.is_active == True)
-            
-            # Apply filters
-            if tags:
-                # Simple tag filtering - in production, you might want more sophisticated filtering
-                for tag in tags:
-                    query = query.where(Document.tags.contains(tag))
-            
-            if content_type:
-                query = query.where(Document.content_type == content_type)
+            conditions = DocumentService._document_filters(tags, content_type)
+            query = select(Document).where(*conditions)
             
             # Get total count
-            count_query = select(Document.id).where(Document.is_active == True)
-            if tags:
-                for tag in tags:
-                    count_query = count_query.where(Document.tags.contains(tag))
-            if content_type:
-                count_query = count_query.where(Document.content_type == content_type)
-            
-            count_result = await db.execute(count_query)
-            total = len(count_result.all())
+            total = await cached_count(
+                db, "documents", {"tags": tags, "content_type": content_type}, Document, *conditions
+            )
             
             # Apply pagination and ordering
             query = query.order_by(desc(Document.created_at)).limit(limit).offset(offset)
@@ -182,6 +426,58 @@ class DocumentService:
         except Exception as e:
             logger.error(f"Error listing documents: {e}")
             return [], 0
+
+    @staticmethod
+    async def list_documents_page(
+        db: AsyncSession,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        content_type: Optional[str] = None,
+        include_total: bool = False
+    ) -> Page:
+        """
+        Get a page of active documents, newest first.
+
+        Args:
+            db: Database session
+            limit: Maximum documents per page
+            cursor: Cursor returned with the previous page
+            tags: Only include documents with all of these tags
+            content_type: Only include documents of this content type
+            include_total: Also count all matching documents (cached briefly)
+
+        Returns:
+            Page of documents
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        conditions = DocumentService._document_filters(tags, content_type)
+        documents, next_cursor, has_more = await keyset_page(
+            db, select(Document).where(*conditions), Document.created_at, Document.id,
+            limit, cursor, descending=True
+        )
+
+        total = None
+        if include_total:
+            total = await cached_count(
+                db, "documents", {"tags": tags, "content_type": content_type}, Document, *conditions
+            )
+
+        return Page(items=documents, next_cursor=next_cursor, has_more=has_more, total=total)
+
+    @staticmethod
+    def _document_filters(tags: Optional[List[str]], content_type: Optional[str]) -> List[Any]:
+        """WHERE conditions of a document listing."""
+        conditions = [Document.is_active == True]
+        if tags:
+            # Simple tag filtering - in production, you might want more sophisticated filtering
+            for tag in tags:
+                conditions.append(Document.tags.contains(tag))
+        if content_type:
+            conditions.append(Document.content_type == content_type)
+        return conditions
     
     @staticmethod
     async def semantic_search(
@@ -254,25 +550,28 @@ class DocumentService:
             
             execution_time = (time.time() - start_time) * 1000
             
-            # Log search query
-            search_query = SearchQuery(
-                query_text=query,
-                query_type="semantic",
-                limit_requested=limit,
-                score_threshold=score_threshold,
-                filter_conditions=filter_conditions,
-                results_count=len(enriched_results),
-                results_metadata={
+            # Log search query (through the write-behind buffer when it is running)
+            search_query_values = {
+                "id": str(uuid.uuid4()),
+                "query_text": query,
+                "query_type": "semantic",
+                "limit_requested": limit,
+                "score_threshold": score_threshold,
+                "filter_conditions": filter_conditions,
+                "results_count": len(enriched_results),
+                "results_metadata": {
                     "search_type": search_type,
                     "vector_results_count": len(vector_results)
                 },
-                execution_time_ms=execution_time,
-                conversation_id=conversation_id
-            )
-            
-            db.add(search_query)
-            await db.commit()
-            search_query_id = search_query.id
+                "execution_time_ms": execution_time,
+                "conversation_id": conversation_id
+            }
+            if analytics_buffer.running:
+                analytics_buffer.add_event(SearchQuery, search_query_values)
+            else:
+                db.add(SearchQuery(**search_query_values))
+                await db.commit()
+            search_query_id = search_query_values["id"]
             
             logger.info(f"Semantic search completed: {len(enriched_results)} results in {execution_time:.2f}ms")
             return enriched_results, search_query_id
@@ -294,6 +593,7 @@ class DocumentService:
             if not document:
                 return False
             
+            count_cache.invalidate("documents")
             if soft_delete:
                 # Soft delete
                 document.is_active = False
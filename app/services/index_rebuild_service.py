@@ -0,0 +1,469 @@
+# app/services/index_rebuild_service.py
+"""
+Streaming, resumable vector index rebuild.
+
+Active documents are streamed with keyset pagination (ordered by ID), their
+full text and chunks are re-embedded and written through the vector store's
+batch API, and the database is updated once per page. After every page a
+checkpoint is stored in Redis, so a crashed or restarted job resumes after the
+last completed page. In shadow mode the index is built into a new collection
+and the store's alias is swapped to it at the end, so searches keep using the
+old index until the new one is complete.
+
+Objects are keyed by row ID. In shadow mode the database keeps pointing at the
+live index until the swap: ingestion and deletes during the rebuild go to the
+old collection, and documents created, updated or deactivated since the
+rebuild started are replayed into the new collection just before and just
+after the swap (the walk by ID misses rows inserted behind the cursor).
+Vector IDs are switched to the row IDs only once the alias points at the new
+collection, and only for rows that were written to it: rows whose write failed
+and documents re-ingested through the alias after the swap keep their IDs.
+
+Turning a concrete collection into an alias deletes it first, which leaves
+searches without an index for a moment; that one-time step is refused unless
+INDEX_REBUILD_ALLOW_ALIAS_MIGRATION is set and belongs in a maintenance window.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Callable, Set
+
+from sqlalchemy import select, func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.database.models import Document, DocumentChunk
+from app.core.vector_store import vector_store
+
+logger = logging.getLogger(__name__)
+
+# Rebuild configuration
+INDEX_REBUILD_PAGE_SIZE = int(os.getenv("INDEX_REBUILD_PAGE_SIZE", "200"))
+INDEX_REBUILD_VECTOR_BATCH_SIZE = int(os.getenv("INDEX_REBUILD_VECTOR_BATCH_SIZE", "256"))
+INDEX_REBUILD_CHECKPOINT_TTL = int(os.getenv("INDEX_REBUILD_CHECKPOINT_TTL", str(7 * 24 * 3600)))
+INDEX_REBUILD_ALLOW_ALIAS_MIGRATION = os.getenv("INDEX_REBUILD_ALLOW_ALIAS_MIGRATION", "false").lower() == "true"
+INDEX_REBUILD_LOCK_TTL = 600
+# Catch-up windows start this much earlier to absorb clock skew between workers and the database
+INDEX_REBUILD_CATCH_UP_MARGIN = timedelta(seconds=60)
+
+REBUILD_KEY_PREFIX = "gremlins:index_rebuild:"
+
+# Only the worker holding the lock may refresh or release it
+_COMPARE_AND_DELETE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_COMPARE_AND_EXPIRE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class IndexRebuildInProgress(Exception):
+    """Raised when another worker holds the rebuild lock for the same index."""
+
+
+def _checkpoint_key(job_id: str) -> str:
+    return f"{REBUILD_KEY_PREFIX}{job_id}"
+
+
+def load_rebuild_checkpoint(job_id: str) -> Optional[Dict[str, Any]]:
+    """Load a rebuild checkpoint, or None if there is none (or Redis is unavailable)."""
+    from app.core.redis_client import get_redis
+
+    client = get_redis()
+    if client is None:
+        return None
+    payload = client.get(_checkpoint_key(job_id))
+    return json.loads(payload) if payload else None
+
+
+def save_rebuild_checkpoint(checkpoint: Dict[str, Any]):
+    """Store a rebuild checkpoint."""
+    from app.core.redis_client import get_redis
+
+    client = get_redis()
+    if client is None:
+        return
+    checkpoint["updated_at"] = time.time()
+    client.set(_checkpoint_key(checkpoint["job_id"]), json.dumps(checkpoint), ex=INDEX_REBUILD_CHECKPOINT_TTL)
+
+
+class VectorIndexRebuilder:
+    """Rebuilds the vector index of all active documents page by page."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        collection_name: Optional[str] = None,
+        shadow: bool = True,
+        page_size: int = INDEX_REBUILD_PAGE_SIZE,
+        vector_batch_size: int = INDEX_REBUILD_VECTOR_BATCH_SIZE,
+        keep_previous: bool = False,
+        job_id: Optional[str] = None,
+        allow_alias_migration: bool = INDEX_REBUILD_ALLOW_ALIAS_MIGRATION
+    ):
+        """
+        Initialize the rebuilder.
+
+        Args:
+            db: Database session
+            collection_name: Collection (alias) searched by the application; defaults to the store's class
+            shadow: Build into a new collection and swap the alias at the end
+            page_size: Documents per page (and per checkpoint)
+            vector_batch_size: Texts per embedding call and vector upsert
+            keep_previous: Keep the collection the alias pointed to before the swap
+            job_id: Checkpoint ID; defaults to the collection name so one rebuild runs per index
+            allow_alias_migration: Allow replacing a concrete collection named like the alias
+                (searches have no index for a moment; run in a maintenance window)
+        """
+        self.db = db
+        self.alias = collection_name or vector_store.class_name
+        self.shadow = shadow
+        self.page_size = max(1, page_size)
+        self.vector_batch_size = max(1, vector_batch_size)
+        self.keep_previous = keep_previous
+        self.job_id = job_id or self.alias
+        self.allow_alias_migration = allow_alias_migration
+        self._lock_token = str(uuid.uuid4())
+        # Rows (documents and chunks) whose last write to the target collection failed
+        self._failed_rows: Set[str] = set()
+
+    def _new_checkpoint(self) -> Dict[str, Any]:
+        suffix = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        return {
+            "job_id": self.job_id,
+            "alias": self.alias,
+            "shadow": self.shadow,
+            "target_collection": f"{self.alias}_{suffix}" if self.shadow else self.alias,
+            "last_document_id": "",
+            "processed": 0,
+            "failed": 0,
+            "vectors_written": 0,
+            "failed_row_ids": [],
+            "pages": 0,
+            "status": "running",
+            "started_at": time.time()
+        }
+
+    def _acquire_lock(self) -> bool:
+        from app.core.redis_client import get_redis
+
+        client = get_redis()
+        if client is None:
+            return True
+        return bool(client.set(f"{_checkpoint_key(self.job_id)}:lock", self._lock_token,
+                               nx=True, ex=INDEX_REBUILD_LOCK_TTL))
+
+    def _refresh_lock(self):
+        from app.core.redis_client import get_redis
+
+        client = get_redis()
+        if client is not None:
+            client.eval(_COMPARE_AND_EXPIRE, 1, f"{_checkpoint_key(self.job_id)}:lock",
+                        self._lock_token, INDEX_REBUILD_LOCK_TTL)
+
+    def _release_lock(self):
+        from app.core.redis_client import get_redis
+
+        client = get_redis()
+        if client is not None:
+            # The lock may have expired and been taken by another worker
+            client.eval(_COMPARE_AND_DELETE, 1, f"{_checkpoint_key(self.job_id)}:lock", self._lock_token)
+
+    async def _count_documents(self) -> int:
+        result = await self.db.execute(select(func.count(Document.id)).where(Document.is_active == True))
+        return result.scalar() or 0
+
+    async def _next_page(self, after_id: str, changed_since: Optional[datetime] = None) -> List[Document]:
+        """
+        Fetch the next page of documents after ``after_id`` (keyset pagination).
+
+        Without ``changed_since`` only active documents are returned; with it, every
+        document created or updated since then, including deactivated ones.
+        """
+        query = select(Document).options(selectinload(Document.chunks)).where(Document.id > after_id)
+        if changed_since is None:
+            query = query.where(Document.is_active == True)
+        else:
+            query = query.where(or_(Document.created_at >= changed_since, Document.updated_at >= changed_since))
+        result = await self.db.execute(query.order_by(Document.id).limit(self.page_size))
+        return list(result.scalars().all())
+
+    async def _index_page(self, documents: List[Document], target: str) -> Dict[str, Any]:
+        """Embed and write one page of documents, then store their new vector IDs."""
+        rows = []
+        items = []
+        for document in documents:
+            rows.append(document)
+            items.append({
+                "document_id": document.id,
+                "content": document.content,
+                "metadata": {
+                    "document_id": document.id,
+                    "title": document.title,
+                    "content_type": document.content_type,
+                    "chunk_type": "full_document",
+                    **(document.doc_metadata or {})
+                }
+            })
+            for chunk in document.chunks:
+                rows.append(chunk)
+                items.append({
+                    "document_id": chunk.id,
+                    "content": chunk.content,
+                    "metadata": {
+                        "document_id": document.id,
+                        "chunk_id": chunk.id,
+                        "title": document.title,
+                        "chunk_index": chunk.chunk_index,
+                        "chunk_type": "chunk",
+                        **(document.doc_metadata or {})
+                    }
+                })
+
+        vector_ids: List[Optional[str]] = []
+        for start in range(0, len(items), self.vector_batch_size):
+            vector_ids.extend(await asyncio.to_thread(
+                vector_store.add_documents_batch,
+                items[start:start + self.vector_batch_size],
+                collection_name=target
+            ))
+
+        failed_documents = set()
+        for row, vector_id in zip(rows, vector_ids):
+            if not vector_id:
+                failed_documents.add(getattr(row, "document_id", None) or row.id)
+                self._failed_rows.add(row.id)
+            else:
+                self._failed_rows.discard(row.id)
+
+        if not self.shadow:
+            # Objects are keyed by row ID now; in place, remove vectors stored under older IDs
+            stale_ids = [
+                row.vector_id for row, vector_id in zip(rows, vector_ids)
+                if vector_id and row.vector_id and row.vector_id != vector_id
+            ]
+            if stale_ids:
+                await asyncio.to_thread(vector_store.delete_documents_batch, stale_ids, target)
+            for row, vector_id in zip(rows, vector_ids):
+                if vector_id:
+                    row.vector_id = vector_id
+            await self.db.commit()
+        # In shadow mode the rows keep pointing at the live index until the swap
+
+        written = [row.id for row, vector_id in zip(rows, vector_ids) if vector_id]
+        return {
+            "vectors_written": len(written),
+            "written_row_ids": written,
+            "failed": len(failed_documents)
+        }
+
+    async def _catch_up(self, target: str, since: datetime) -> Dict[str, Any]:
+        """
+        Replay documents created, updated or deactivated since ``since`` into ``target``.
+
+        Their existing objects (including chunks that no longer exist) are removed first;
+        active documents are then re-indexed. ``written`` maps the replayed rows to the
+        ``updated_at`` of their document as read (chunks map to None).
+        """
+        stats = {"documents": 0, "removed": 0, "vectors_written": 0, "failed": 0, "written": {}}
+        after_id = ""
+        while True:
+            documents = await self._next_page(after_id, changed_since=since)
+            if not documents:
+                break
+            after_id = documents[-1].id
+
+            await asyncio.to_thread(vector_store.delete_by_document_ids, [d.id for d in documents], target)
+            active = [document for document in documents if document.is_active]
+            stats["removed"] += len(documents) - len(active)
+            if active:
+                updated_at = {document.id: document.updated_at for document in active}
+                page_stats = await self._index_page(active, target)
+                stats["vectors_written"] += page_stats["vectors_written"]
+                stats["failed"] += page_stats["failed"]
+                for row_id in page_stats["written_row_ids"]:
+                    stats["written"][row_id] = updated_at.get(row_id)
+            stats["documents"] += len(documents)
+            self._refresh_lock()
+            self.db.expunge_all()
+        return stats
+
+    async def _database_now(self) -> datetime:
+        """Get the database's clock, which timestamps the rows compared against it."""
+        return (await self.db.execute(select(func.now()))).scalar()
+
+    async def _point_rows_at_row_ids(self, swapped_at: datetime, replayed: Dict[str, Optional[datetime]]):
+        """
+        After the swap, switch stored vector IDs to the row IDs the new collection is keyed by.
+
+        Only rows written to the new collection are switched. Rows whose write failed
+        keep their IDs, and so do documents updated and chunks created at or after
+        ``swapped_at`` (re-ingested through the alias under their own IDs), unless
+        the final replay wrote them and the document has not changed since.
+
+        Args:
+            swapped_at: Database time right after the swap
+            replayed: Rows written by the replay after the swap (see _catch_up)
+        """
+        failed = list(self._failed_rows)
+        documents = [Document.is_active == True, Document.updated_at < swapped_at]
+        chunks = [
+            DocumentChunk.created_at < swapped_at,
+            DocumentChunk.document_id.in_(select(Document.id).where(Document.is_active == True))
+        ]
+        if failed:
+            documents.append(Document.id.notin_(failed))
+            chunks.append(DocumentChunk.id.notin_(failed))
+
+        await self.db.execute(
+            update(Document).where(*documents).values(vector_id=Document.id)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(
+            update(DocumentChunk).where(*chunks).values(vector_id=DocumentChunk.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        for row_id, updated_at in replayed.items():
+            if updated_at is None:
+                # Re-ingestion replaces chunks with new rows, so a replayed chunk that still exists is current
+                await self.db.execute(
+                    update(DocumentChunk).where(DocumentChunk.id == row_id).values(vector_id=DocumentChunk.id)
+                    .execution_options(synchronize_session=False)
+                )
+            else:
+                await self.db.execute(
+                    update(Document)
+                    .where(Document.id == row_id, Document.is_active == True, Document.updated_at == updated_at)
+                    .values(vector_id=Document.id)
+                    .execution_options(synchronize_session=False)
+                )
+        await self.db.commit()
+
+    async def run(self, resume: bool = True,
+                  progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Rebuild the index, resuming from the last checkpoint if there is one.
+
+        Args:
+            resume: Continue an unfinished rebuild of the same job instead of starting over
+            progress_callback: Called with the checkpoint after every page
+
+        Returns:
+            The final checkpoint with rebuild statistics
+
+        Raises:
+            IndexRebuildInProgress: If another rebuild of the same index is running
+        """
+        if not vector_store.is_connected:
+            raise RuntimeError("Vector store not connected")
+        if self.shadow and not self.allow_alias_migration and \
+                await asyncio.to_thread(vector_store.needs_alias_migration, self.alias):
+            # Fail before building anything rather than at the swap
+            raise RuntimeError(
+                f"{self.alias} is a concrete collection; the first shadow rebuild replaces it with an alias, "
+                f"which briefly leaves searches without an index. Run it in a maintenance window with "
+                f"INDEX_REBUILD_ALLOW_ALIAS_MIGRATION=true, or rebuild in place (shadow=False)"
+            )
+        if not self._acquire_lock():
+            raise IndexRebuildInProgress(f"Index rebuild '{self.job_id}' is already running")
+
+        try:
+            checkpoint = load_rebuild_checkpoint(self.job_id)
+            if resume and checkpoint and checkpoint.get("status") == "running" \
+                    and checkpoint.get("shadow") == self.shadow:
+                logger.info(f"Resuming index rebuild '{self.job_id}' after document "
+                            f"{checkpoint['last_document_id']} ({checkpoint['processed']} processed)")
+                checkpoint["resumed_at"] = time.time()
+                self._failed_rows = set(checkpoint.get("failed_row_ids", []))
+            else:
+                if checkpoint and checkpoint.get("status") == "running" and checkpoint.get("shadow"):
+                    # Nothing points at an abandoned shadow collection, so it can go
+                    abandoned = checkpoint["target_collection"]
+                    if await asyncio.to_thread(vector_store.collection_exists, abandoned):
+                        logger.info(f"Deleting abandoned shadow collection {abandoned}")
+                        await asyncio.to_thread(vector_store.delete_collection, abandoned)
+                checkpoint = self._new_checkpoint()
+
+            target = checkpoint["target_collection"]
+            if self.shadow and not await asyncio.to_thread(vector_store.collection_exists, target):
+                await asyncio.to_thread(vector_store.create_collection, target)
+
+            checkpoint["total"] = await self._count_documents()
+            save_rebuild_checkpoint(checkpoint)
+
+            while True:
+                documents = await self._next_page(checkpoint["last_document_id"])
+                if not documents:
+                    break
+
+                page_stats = await self._index_page(documents, target)
+
+                checkpoint["last_document_id"] = documents[-1].id
+                checkpoint["processed"] += len(documents)
+                checkpoint["failed"] += page_stats["failed"]
+                checkpoint["vectors_written"] += page_stats["vectors_written"]
+                checkpoint["failed_row_ids"] = sorted(self._failed_rows)
+                checkpoint["pages"] += 1
+                save_rebuild_checkpoint(checkpoint)
+                self._refresh_lock()
+
+                # Loaded documents are no longer needed; keep memory flat
+                self.db.expunge_all()
+
+                if progress_callback is not None:
+                    total = checkpoint["total"] or 1
+                    progress_callback({
+                        "status": f"Re-indexed {checkpoint['processed']} of {checkpoint['total']} documents",
+                        "processed": checkpoint["processed"],
+                        "total": checkpoint["total"],
+                        "failed": checkpoint["failed"],
+                        "progress": min(1.0, checkpoint["processed"] / total)
+                    })
+
+            if self.shadow:
+                # Replay writes the walk by ID missed; then once more after the swap for
+                # writes that reached the old collection while the first replay ran
+                started = datetime.utcfromtimestamp(checkpoint["started_at"]) - INDEX_REBUILD_CATCH_UP_MARGIN
+                catch_up_started = datetime.utcnow() - INDEX_REBUILD_CATCH_UP_MARGIN
+                catch_up = await self._catch_up(target, started)
+
+                if await asyncio.to_thread(vector_store.needs_alias_migration, self.alias):
+                    logger.warning(f"Maintenance window: replacing collection {self.alias} with an alias to "
+                                   f"{target}; searches have no index until the alias exists")
+                previous = await asyncio.to_thread(
+                    vector_store.swap_alias, self.alias, target, self.allow_alias_migration
+                )
+                checkpoint["previous_collection"] = previous
+                swapped_at = await self._database_now()
+
+                final_catch_up = await self._catch_up(target, catch_up_started)
+                checkpoint["caught_up"] = catch_up["documents"] + final_catch_up["documents"]
+                checkpoint["vectors_written"] += catch_up["vectors_written"] + final_catch_up["vectors_written"]
+                checkpoint["failed_row_ids"] = sorted(self._failed_rows)
+                await self._point_rows_at_row_ids(swapped_at, final_catch_up["written"])
+
+                if previous and previous != target and not self.keep_previous:
+                    await asyncio.to_thread(vector_store.delete_collection, previous)
+
+            checkpoint["status"] = "completed"
+            checkpoint["completed_at"] = time.time()
+            save_rebuild_checkpoint(checkpoint)
+            logger.info(f"Index rebuild '{self.job_id}' completed: {checkpoint['processed']} documents, "
+                        f"{checkpoint['vectors_written']} vectors into {target}")
+            return checkpoint
+
+        finally:
+            self._release_lock()
@@ -0,0 +1,218 @@
+# app/services/pagination.py
+"""
+Keyset (cursor) pagination and cached counts for list queries.
+
+Pages are ordered by (sort key, id) and the next page starts after the last
+row of the previous one, so every page costs an index range scan no matter
+how deep it is (LIMIT/OFFSET scans and discards every earlier row). Cursors
+are opaque URL-safe strings holding the sort key and id of that last row.
+
+Totals are a real ``COUNT(*)``, computed only when requested and cached for
+a short TTL per filter set, so paging through a list doesn't count it on
+every page.
+"""
+
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import String, desc, func, or_, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Count cache configuration
+PAGINATION_COUNT_CACHE_TTL = float(os.getenv("PAGINATION_COUNT_CACHE_TTL", "30"))
+PAGINATION_COUNT_CACHE_MAX_ENTRIES = int(os.getenv("PAGINATION_COUNT_CACHE_MAX_ENTRIES", "1024"))
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor is malformed."""
+
+
+@dataclass
+class Page:
+    """One page of a keyset-paginated list."""
+    items: List[Any]
+    next_cursor: Optional[str]
+    has_more: bool
+    total: Optional[int] = None
+
+
+def encode_cursor(sort_value: Any, row_id: str) -> str:
+    """Encode the sort key and id of the last row of a page as an opaque cursor."""
+    if isinstance(sort_value, datetime):
+        payload = {"t": "dt", "v": sort_value.isoformat(), "i": row_id}
+    else:
+        payload = {"t": "raw", "v": sort_value, "i": row_id}
+    encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    return encoded.decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    """
+    Decode a cursor into its sort key and id.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = payload["v"]
+        if payload["t"] == "dt":
+            value = datetime.fromisoformat(value)
+        return value, str(payload["i"])
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {cursor!r}") from e
+
+
+async def keyset_page(
+    db: AsyncSession,
+    query,
+    sort_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    row_factory: Optional[Callable[[Any], Any]] = None
+) -> Tuple[List[Any], Optional[str], bool]:
+    """
+    Fetch one page of a query ordered by (sort column, id).
+
+    Args:
+        db: Database session
+        query: Select of one entity or of columns, with filters but without ordering or limits
+        sort_column: Column the list is ordered by
+        id_column: Unique tie-breaker column
+        limit: Maximum rows per page
+        cursor: Cursor returned with the previous page
+        descending: Order newest / largest first
+        row_factory: Builds each item from its row; defaults to the row's first element (the entity)
+
+    Returns:
+        Tuple of (rows, next page cursor or None, whether more rows follow)
+    """
+    # SQLite stores timestamps as text in two formats (with and without microseconds),
+    # so compare the stored text itself rather than a re-formatted datetime
+    key = type_coerce(sort_column, String) if db.get_bind().dialect.name == "sqlite" else sort_column
+
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        if key is not sort_column and isinstance(value, datetime):
+            raise InvalidCursorError("Pagination cursor was issued by a different database backend")
+        # The leading range on the sort key alone lets the planner use a (filter, sort key)
+        # index range scan; the OR only breaks ties within the cursor's sort key
+        if descending:
+            query = query.where(key <= value, or_(key < value, id_column < last_id))
+        else:
+            query = query.where(key >= value, or_(key > value, id_column > last_id))
+
+    order = (desc(sort_column), desc(id_column)) if descending else (sort_column, id_column)
+    result = await db.execute(
+        query.add_columns(key.label("cursor_key"), id_column.label("cursor_id"))
+        .order_by(*order)
+        .limit(limit + 1)
+    )
+    rows = result.all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1].cursor_key, rows[-1].cursor_id) if has_more else None
+    return [row_factory(row) if row_factory else row[0] for row in rows], next_cursor, has_more
+
+
+class CountCache:
+    """Short-lived cache of COUNT(*) results keyed by list and filters."""
+
+    def __init__(self, ttl: float = PAGINATION_COUNT_CACHE_TTL,
+                 max_entries: int = PAGINATION_COUNT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(name: str, filters: Dict[str, Any]) -> str:
+        return f"{name}:{json.dumps(filters, sort_keys=True, default=str)}"
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, count: int):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), count)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drop cached counts of one list (or all lists)."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key.startswith(f"{name}:")]:
+                    del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Global count cache
+count_cache = CountCache()
+
+
+async def cached_count(db: AsyncSession, name: str, filters: Dict[str, Any], model, *conditions) -> int:
+    """
+    Count the rows of a model matching conditions, using the count cache.
+
+    Args:
+        db: Database session
+        name: List name, used to invalidate its counts
+        filters: Filter values identifying the condition set in the cache key
+        model: Model to count
+        conditions: WHERE conditions
+
+    Returns:
+        Number of matching rows
+    """
+    key = CountCache.make_key(name, filters)
+    count = count_cache.get(key)
+    if count is None:
+        result = await db.execute(select(func.count()).select_from(model).where(*conditions))
+        count = result.scalar() or 0
+        count_cache.set(key, count)
+    return count
+
+
+def get_pagination_stats() -> Dict[str, Any]:
+    """Get count cache statistics."""
+    return count_cache.get_stats()
@@ -0,0 +1,305 @@
+# app/services/retention_service.py
+"""
+Retention engine for append-only tables.
+
+Each table has a retention policy: delete rows older than N days, aggregate
+them into daily rollups and then delete them, or purge soft-deleted rows.
+Rows are removed in bounded batches, each in its own short transaction, with
+a pause between batches so a large backlog never holds one long lock. Every
+run reports the rows removed and an estimate of the bytes reclaimed per table.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import (
+    AgentInteraction, AnalyticsRollup, Document, DocumentAnalytics, DocumentChangeLog,
+    DocumentChunk, DocumentVersion, SearchAnalytics, SearchQuery, UserEngagement
+)
+
+logger = logging.getLogger(__name__)
+
+# Retention configuration (days; 0 disables a policy)
+RETENTION_SEARCH_QUERIES_DAYS = int(os.getenv("RETENTION_SEARCH_QUERIES_DAYS", "30"))
+RETENTION_SEARCH_ANALYTICS_DAYS = int(os.getenv("RETENTION_SEARCH_ANALYTICS_DAYS", "90"))
+RETENTION_USER_ENGAGEMENT_DAYS = int(os.getenv("RETENTION_USER_ENGAGEMENT_DAYS", "90"))
+RETENTION_AGENT_INTERACTIONS_DAYS = int(os.getenv("RETENTION_AGENT_INTERACTIONS_DAYS", "90"))
+RETENTION_DELETED_DOCUMENTS_DAYS = int(os.getenv("RETENTION_DELETED_DOCUMENTS_DAYS", "30"))
+
+# Batching
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+RETENTION_BATCH_PAUSE = float(os.getenv("RETENTION_BATCH_PAUSE", "0.05"))
+RETENTION_MAX_BATCHES = int(os.getenv("RETENTION_MAX_BATCHES", "0"))  # Per table per run; 0 = no limit
+
+
+@dataclass
+class RetentionPolicy:
+    """Retention policy for one table."""
+    table: str
+    model: Any
+    retention_days: int
+    action: str = "delete"  # delete, aggregate (rollup then delete) or purge (soft-deleted rows)
+    timestamp_column: str = "created_at"
+    dimension: Optional[str] = None  # Column rollups are grouped by
+    average_columns: List[str] = field(default_factory=list)
+    sum_columns: List[str] = field(default_factory=list)
+
+
+def default_policies() -> List[RetentionPolicy]:
+    """Get the configured retention policies."""
+    return [
+        RetentionPolicy("search_queries", SearchQuery, RETENTION_SEARCH_QUERIES_DAYS),
+        RetentionPolicy(
+            "search_analytics", SearchAnalytics, RETENTION_SEARCH_ANALYTICS_DAYS,
+            action="aggregate", dimension="search_type",
+            average_columns=["execution_time_ms"], sum_columns=["results_count", "results_returned"]
+        ),
+        RetentionPolicy(
+            "user_engagement", UserEngagement, RETENTION_USER_ENGAGEMENT_DAYS,
+            action="aggregate", dimension="action_type",
+            average_columns=["duration_seconds"]
+        ),
+        RetentionPolicy("agent_interactions", AgentInteraction, RETENTION_AGENT_INTERACTIONS_DAYS),
+        RetentionPolicy(
+            "documents", Document, RETENTION_DELETED_DOCUMENTS_DAYS,
+            action="purge", timestamp_column="updated_at"
+        ),
+    ]
+
+
+class RetentionEngine:
+    """Applies retention policies in bounded batches."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        policies: Optional[List[RetentionPolicy]] = None,
+        batch_size: int = RETENTION_BATCH_SIZE,
+        batch_pause: float = RETENTION_BATCH_PAUSE,
+        max_batches: int = RETENTION_MAX_BATCHES
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            db: Database session
+            policies: Policies to apply; defaults to default_policies()
+            batch_size: Rows removed per transaction
+            batch_pause: Seconds to sleep between batches
+            max_batches: Maximum batches per table per run (0 = no limit)
+        """
+        self.db = db
+        self.policies = policies if policies is not None else default_policies()
+        self.batch_size = max(1, batch_size)
+        self.batch_pause = max(0.0, batch_pause)
+        self.max_batches = max(0, max_batches)
+
+    def _dialect(self) -> str:
+        return self.db.get_bind().dialect.name
+
+    def _expired(self, policy: RetentionPolicy, cutoff: datetime):
+        """WHERE clause selecting the rows a policy removes."""
+        conditions = [getattr(policy.model, policy.timestamp_column) < cutoff]
+        if policy.action == "purge":
+            conditions.append(policy.model.is_active == False)
+        return conditions
+
+    async def _table_size(self, table: str) -> Optional[int]:
+        """Get a table's on-disk size in bytes, if the database can report it."""
+        try:
+            dialect = self._dialect()
+            if dialect == "postgresql":
+                result = await self.db.execute(text("SELECT pg_total_relation_size(:table)"), {"table": table})
+            elif dialect == "sqlite":
+                # Requires SQLite built with the dbstat virtual table
+                result = await self.db.execute(text("SELECT SUM(pgsize) FROM dbstat WHERE name = :table"),
+                                               {"table": table})
+            else:
+                return None
+            return result.scalar()
+        except Exception as e:
+            logger.debug(f"Table size unavailable for {table}: {e}")
+            await self.db.rollback()
+            return None
+
+    async def _aggregate(self, policy: RetentionPolicy, ids: List[str]) -> int:
+        """Add daily rollups of the rows about to be deleted to the current transaction."""
+        model = policy.model
+        day = func.date(getattr(model, policy.timestamp_column)).label("day")
+        dimension = getattr(model, policy.dimension).label("dimension") if policy.dimension else None
+
+        columns = [day] + ([dimension] if dimension is not None else []) + [func.count().label("event_count")]
+        columns += [func.avg(getattr(model, name)).label(f"avg_{name}") for name in policy.average_columns]
+        columns += [func.sum(getattr(model, name)).label(f"total_{name}") for name in policy.sum_columns]
+        group_by = [day] + ([dimension] if dimension is not None else [])
+
+        result = await self.db.execute(select(*columns).where(model.id.in_(ids)).group_by(*group_by))
+        rows = result.mappings().all()
+        for row in rows:
+            metrics = {
+                key: float(value) if value is not None else None
+                for key, value in row.items()
+                if key.startswith(("avg_", "total_"))
+            }
+            self.db.add(AnalyticsRollup(
+                source_table=policy.table,
+                period=str(row["day"])[:10],
+                dimension=row.get("dimension"),
+                event_count=row["event_count"],
+                metrics=metrics
+            ))
+        return len(rows)
+
+    async def _purge_document_dependents(self, ids: List[str]) -> List[str]:
+        """Delete rows referencing the documents; returns their vector IDs."""
+        vector_ids = []
+        for model in (Document, DocumentChunk):
+            id_column = model.id if model is Document else model.document_id
+            result = await self.db.execute(
+                select(model.vector_id).where(id_column.in_(ids), model.vector_id.isnot(None))
+            )
+            vector_ids.extend(result.scalars().all())
+
+        for model in (DocumentChunk, DocumentAnalytics, DocumentVersion, DocumentChangeLog):
+            await self.db.execute(delete(model).where(model.document_id.in_(ids)))
+        return vector_ids
+
+    async def apply(self, policy: RetentionPolicy, retention_days: Optional[int] = None,
+                    dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Apply one retention policy.
+
+        Args:
+            policy: Policy to apply
+            retention_days: Override of the policy's retention period; for purge policies
+                it can only lengthen the period, never shorten or enable it
+            dry_run: Only count the rows that would be removed
+
+        Returns:
+            Report with rows removed, batches and estimated bytes reclaimed
+        """
+        days = policy.retention_days if retention_days is None else retention_days
+        if policy.action == "purge" and policy.retention_days > 0:
+            days = max(days, policy.retention_days)
+        elif policy.action == "purge":
+            days = 0
+        report: Dict[str, Any] = {"action": policy.action, "retention_days": days, "rows_removed": 0}
+        if days <= 0:
+            report["status"] = "disabled"
+            return report
+
+        model = policy.model
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        report["cutoff_date"] = cutoff.isoformat()
+        conditions = self._expired(policy, cutoff)
+
+        if dry_run:
+            result = await self.db.execute(select(func.count()).select_from(model).where(*conditions))
+            report["rows_eligible"] = result.scalar() or 0
+            report["status"] = "dry_run"
+            return report
+
+        # Average row size from the table size before deleting; freed pages are reused
+        # by the database (or returned to the OS by VACUUM)
+        size_before = await self._table_size(policy.table)
+        rows_before = (await self.db.execute(select(func.count()).select_from(model))).scalar() or 0
+        await self.db.commit()
+
+        started = time.perf_counter()
+        batches = 0
+        rollups = 0
+        vector_ids: List[str] = []
+
+        while not self.max_batches or batches < self.max_batches:
+            # Oldest expired rows first
+            result = await self.db.execute(
+                select(model.id).where(*conditions)
+                .order_by(getattr(model, policy.timestamp_column))
+                .limit(self.batch_size)
+            )
+            ids = list(result.scalars().all())
+            if not ids:
+                break
+
+            try:
+                if policy.action == "aggregate":
+                    rollups += await self._aggregate(policy, ids)
+                elif policy.action == "purge":
+                    vector_ids.extend(await self._purge_document_dependents(ids))
+
+                deleted = await self.db.execute(delete(model).where(model.id.in_(ids)))
+                await self.db.commit()
+            except Exception:
+                await self.db.rollback()
+                raise
+
+            report["rows_removed"] += deleted.rowcount if deleted.rowcount is not None else len(ids)
+            batches += 1
+            if len(ids) < self.batch_size:
+                break
+            if self.batch_pause:
+                await asyncio.sleep(self.batch_pause)
+
+        if vector_ids:
+            from app.core.vector_store import vector_store
+
+            report["vectors_removed"] = await asyncio.to_thread(vector_store.delete_documents_batch, vector_ids)
+
+        report["batches"] = batches
+        report["duration_seconds"] = round(time.perf_counter() - started, 3)
+        report["table_size_bytes"] = size_before
+        report["estimated_bytes_reclaimed"] = (
+            int(size_before * report["rows_removed"] / rows_before) if size_before and rows_before else None
+        )
+        if policy.action == "aggregate":
+            report["rollups_written"] = rollups
+        report["complete"] = not self.max_batches or batches < self.max_batches
+        report["status"] = "completed"
+        return report
+
+    async def run(self, retention_days: Optional[int] = None, tables: Optional[List[str]] = None,
+                  dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Apply all retention policies.
+
+        Args:
+            retention_days: Override the policies' retention periods (purge policies are only lengthened)
+            tables: Only apply the policies of these tables
+            dry_run: Only count the rows that would be removed
+
+        Returns:
+            Report with per-table results and totals
+        """
+        started = time.perf_counter()
+        reports: Dict[str, Any] = {}
+
+        for policy in self.policies:
+            if tables and policy.table not in tables:
+                continue
+            try:
+                reports[policy.table] = await self.apply(policy, retention_days, dry_run)
+            except Exception as e:
+                logger.error(f"Retention for {policy.table} failed: {e}")
+                reports[policy.table] = {"action": policy.action, "status": "failed", "error": str(e),
+                                         "rows_removed": 0}
+
+        total_rows = sum(report.get("rows_removed", 0) for report in reports.values())
+        total_bytes = sum(report.get("estimated_bytes_reclaimed") or 0 for report in reports.values())
+        logger.info(f"Retention removed {total_rows} rows (~{total_bytes} bytes) from {len(reports)} tables")
+
+        return {
+            "tables": reports,
+            "total_rows_removed": total_rows,
+            "estimated_bytes_reclaimed": total_bytes,
+            "duration_seconds": round(time.perf_counter() - started, 3),
+            "dry_run": dry_run,
+            "status": "completed" if all(r["status"] != "failed" for r in reports.values()) else "partial"
+        }
@@ -3,11 +3,11 @@ Agent-related asynchronous tasks for Phase 5.
 Handles long-running agent operations and multi-agent workflows.
 """
 
-import asyncio
 import logging
 import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 from app.core.celery_app import task
+from app.core.worker_runtime import run_coroutine
 from app.database.database import AsyncSessionLocal
 from app.services.chat_history import ChatHistoryService
 from app.core.multi_agent import multi_agent_orchestrator
@@ -34,22 +34,18 @@ def run_multi_agent_workflow_task(self, workflow_type: str, input_data: str,
         # Update task state
         self.update_state(state='PROGRESS', meta={'status': 'Starting multi-agent workflow'})
         
-        # Run the workflow asynchronously
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(
-                _execute_multi_agent_workflow(
-                    workflow_type, input_data, conversation_id, save_conversation
-                )
+        # Run the workflow on this worker process's persistent event loop. Progress
+        # is reported from the loop thread, so the task ID is passed explicitly.
+        task_id = self.request.id
+        result = run_coroutine(
+            _execute_multi_agent_workflow(
+                workflow_type, input_data, conversation_id, save_conversation,
+                progress_callback=lambda meta: self.update_state(task_id=task_id, state='PROGRESS', meta=meta)
             )
-            
-            self.update_state(state='SUCCESS', meta={'status': 'Workflow completed successfully'})
-            return result
-            
-        finally:
-            loop.close()
+        )
+        
+        self.update_state(state='SUCCESS', meta={'status': 'Workflow completed successfully'})
+        return result
             
     except Exception as e:
         logger.error(f"Multi-agent workflow task failed: {str(e)}")
@@ -61,8 +57,10 @@ def run_multi_agent_workflow_task(self, workflow_type: str, input_data: str,
 
 async def _execute_multi_agent_workflow(workflow_type: str, input_data: str,
                                       conversation_id: Optional[str],
-                                      save_conversation: bool) -> Dict[str, Any]:
-    """Execute the multi-agent workflow asynchronously."""
+                                      save_conversation: bool,
+                                      progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+                                      ) -> Dict[str, Any]:
+    """Execute the multi-agent workflow asynchronously, reporting per-step progress."""
     
     async with AsyncSessionLocal() as db:
         try:
@@ -76,12 +74,26 @@ async def _execute_multi_agent_workflow(workflow_type: str, input_data: str,
                         for msg in conversation.messages[-10:]  # Last 10 messages
                     ]
             
-            # Execute multi-agent workflow
-            workflow_result = await multi_agent_orchestrator.execute_workflow(
+            # Execute multi-agent workflow, reporting each step as it finishes
+            workflow_result = {}
+            async for event in multi_agent_orchestrator.stream_workflow(
                 workflow_type=workflow_type,
                 input_data=input_data,
-                context=context
-            )
+                context=context,
+                conversation_id=conversation_id
+            ):
+                if event["event"] == "workflow_completed":
+                    workflow_result = event["result"]
+                elif event["event"] == "step_completed" and progress_callback:
+                    progress_callback({
+                        'status': f"Step {event['step']} {event['status']}",
+                        'workflow_id': event['workflow_id'],
+                        'step': event['step'],
+                        'step_status': event['status'],
+                        'completed_steps': event['completed_steps'],
+                        'total_steps': event['total_steps'],
+                        'progress': event['completed_steps'] / event['total_steps']
+                    })
             
             # Save conversation if requested
             if save_conversation:
@@ -141,21 +153,15 @@ def run_enhanced_agent_chat_task(self, input_data: str, conversation_id: Optiona
     try:
         self.update_state(state='PROGRESS', meta={'status': 'Processing enhanced chat'})
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(
-                _execute_enhanced_chat(
-                    input_data, conversation_id, use_multi_agent, use_rag, save_conversation
-                )
+        # Run on this worker process's persistent event loop
+        result = run_coroutine(
+            _execute_enhanced_chat(
+                input_data, conversation_id, use_multi_agent, use_rag, save_conversation
             )
-            
-            self.update_state(state='SUCCESS', meta={'status': 'Chat completed successfully'})
-            return result
-            
-        finally:
-            loop.close()
+        )
+        
+        self.update_state(state='SUCCESS', meta={'status': 'Chat completed successfully'})
+        return result
             
     except Exception as e:
         logger.error(f"Enhanced agent chat task failed: {str(e)}")
@@ -205,16 +211,14 @@ async def _execute_enhanced_chat(input_data: str, conversation_id: Optional[str]
                 response_data["execution_time"] = workflow_result.get("execution_time", 0)
             else:
                 # Use basic agent processing
-                from app.core.agent import agent_graph_app
+                from app.core.agent import run_agent_graph
                 
                 agent_input = {
                     "input": input_data,
                     "chat_history": context
                 }
                 
-                final_state = {}
-                for state in agent_graph_app.stream(agent_input):
-                    final_state = state
+                final_state = await run_agent_graph(agent_input, merge=False)
                 
                 response_data["output"] = final_state
                 response_data["agents_used"] = ["basic_agent"]
@@ -270,19 +274,13 @@ def batch_process_conversations_task(self, conversation_ids: List[str],
             meta={'status': f'Processing {len(conversation_ids)} conversations'}
         )
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # Run on this worker process's persistent event loop
+        result = run_coroutine(
+            _batch_process_conversations(conversation_ids, operation)
+        )
         
-        try:
-            result = loop.run_until_complete(
-                _batch_process_conversations(conversation_ids, operation)
-            )
-            
-            self.update_state(state='SUCCESS', meta={'status': 'Batch processing completed'})
-            return result
-            
-        finally:
-            loop.close()
+        self.update_state(state='SUCCESS', meta={'status': 'Batch processing completed'})
+        return result
             
     except Exception as e:
         logger.error(f"Batch conversation processing failed: {str(e)}")
@@ -3,11 +3,11 @@ Document-related asynchronous tasks for Phase 5.
 Handles long-running document processing, indexing, and RAG operations.
 """
 
-import asyncio
 import logging
 import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 from app.core.celery_app import task
+from app.core.worker_runtime import run_coroutine
 from app.database.database import AsyncSessionLocal
 from app.services.document_service import DocumentService
 from app.core.rag_system import rag_system
@@ -15,12 +15,14 @@ from app.core.rag_system import rag_system
 logger = logging.getLogger(__name__)
 
 @task(bind=True, name="document_tasks.process_document_batch")
-def process_document_batch_task(self, document_data_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+def process_document_batch_task(self, document_data_list: List[Dict[str, Any]],
+                                user_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Asynchronously process a batch of documents.
     
     Args:
         document_data_list: List of document data dictionaries
+        user_id: Owner of every document in the batch (the submitting user)
     
     Returns:
         Dict containing batch processing results
@@ -28,22 +30,20 @@ def process_document_batch_task(self, document_data_list: List[Dict[str, Any]])
     try:
         self.update_state(
             state='PROGRESS',
-            meta={'status': f'Processing {len(document_data_list)} documents'}
+            meta={'status': f'Processing {len(document_data_list)} documents', 'progress': 0.0}
         )
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(
-                _process_document_batch(document_data_list)
+        # Progress is reported from the worker loop thread, so the task ID is passed explicitly
+        task_id = self.request.id
+        result = run_coroutine(
+            _process_document_batch(
+                document_data_list, user_id,
+                progress_callback=lambda meta: self.update_state(task_id=task_id, state='PROGRESS', meta=meta)
             )
-            
-            self.update_state(state='SUCCESS', meta={'status': 'Batch processing completed'})
-            return result
-            
-        finally:
-            loop.close()
+        )
+        
+        self.update_state(state='SUCCESS', meta={'status': 'Batch processing completed'})
+        return result
             
     except Exception as e:
         logger.error(f"Document batch processing failed: {str(e)}")
@@ -53,80 +53,63 @@ def process_document_batch_task(self, document_data_list: List[Dict[str, Any]])
         )
         raise
 
-async def _process_document_batch(document_data_list: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Process a batch of documents asynchronously."""
+async def _process_document_batch(document_data_list: List[Dict[str, Any]], user_id: Optional[str] = None,
+                                  progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+                                  ) -> Dict[str, Any]:
+    """Process a batch of documents with concurrent chunking, batched embeddings and bulk inserts."""
     
     async with AsyncSessionLocal() as db:
-        results = []
-        successful = 0
-        failed = 0
+        results = await DocumentService.create_documents_batch(
+            db=db,
+            documents=document_data_list,
+            user_id=user_id,
+            progress_callback=progress_callback
+        )
         
-        for doc_data in document_data_list:
-            try:
-                # Create document
-                document = await DocumentService.create_document(
-                    db=db,
-                    title=doc_data.get("title", "Untitled"),
-                    content=doc_data.get("content", ""),
-                    content_type=doc_data.get("content_type", "text/plain"),
-                    doc_metadata=doc_data.get("metadata", {}),
-                    tags=doc_data.get("tags", []),
-                    chunk_size=doc_data.get("chunk_size", 1000),
-                    chunk_overlap=doc_data.get("chunk_overlap", 200)
-                )
-                
-                results.append({
-                    "title": doc_data.get("title"),
-                    "document_id": document.id,
-                    "status": "success",
-                    "chunks_created": len(document.chunks)
-                })
-                successful += 1
-                
-            except Exception as e:
-                results.append({
-                    "title": doc_data.get("title"),
-                    "document_id": None,
-                    "status": "failed",
-                    "error": str(e)
-                })
-                failed += 1
+        successful = sum(1 for result in results if result["status"] == "success")
         
         return {
             "total_documents": len(document_data_list),
             "successful": successful,
-            "failed": failed,
+            "failed": len(results) - successful,
             "results": results,
             "status": "completed"
         }
 
 @task(bind=True, name="document_tasks.rebuild_vector_index")
-def rebuild_vector_index_task(self, collection_name: Optional[str] = None) -> Dict[str, Any]:
+def rebuild_vector_index_task(self, collection_name: Optional[str] = None, shadow: bool = True,
+                              resume: bool = True, page_size: Optional[int] = None,
+                              job_id: Optional[str] = None) -> Dict[str, Any]:
     """
-    Asynchronously rebuild the vector index for documents.
+    Asynchronously rebuild the vector index for all active documents.
+    
+    Documents are streamed page by page and progress is checkpointed, so a
+    rebuild interrupted by a crash or restart resumes where it stopped.
     
     Args:
-        collection_name: Optional specific collection to rebuild
+        collection_name: Collection (alias) to rebuild; defaults to the vector store's class
+        shadow: Build into a new collection and swap the alias when complete
+        resume: Resume an unfinished rebuild of the same index
+        page_size: Documents per page and checkpoint
+        job_id: Checkpoint ID; defaults to the collection name
     
     Returns:
         Dict containing rebuild results
     """
     try:
-        self.update_state(state='PROGRESS', meta={'status': 'Rebuilding vector index'})
+        self.update_state(state='PROGRESS', meta={'status': 'Rebuilding vector index', 'progress': 0.0})
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(
-                _rebuild_vector_index(collection_name)
+        # Progress is reported from the worker loop thread, so the task ID is passed explicitly
+        task_id = self.request.id
+        result = run_coroutine(
+            _rebuild_vector_index(
+                collection_name, shadow, resume, page_size, job_id,
+                progress_callback=lambda meta: self.update_state(task_id=task_id, state='PROGRESS', meta=meta)
             )
-            
-            self.update_state(state='SUCCESS', meta={'status': 'Vector index rebuilt'})
-            return result
-            
-        finally:
-            loop.close()
+        )
+        
+        self.update_state(state='SUCCESS', meta={'status': 'Vector index rebuilt'})
+        return result
             
     except Exception as e:
         logger.error(f"Vector index rebuild failed: {str(e)}")
@@ -136,59 +119,34 @@ def rebuild_vector_index_task(self, collection_name: Optional[str] = None) -> Di
         )
         raise
 
-async def _rebuild_vector_index(collection_name: Optional[str]) -> Dict[str, Any]:
-    """Rebuild vector index asynchronously."""
+async def _rebuild_vector_index(collection_name: Optional[str], shadow: bool = True, resume: bool = True,
+                                page_size: Optional[int] = None, job_id: Optional[str] = None,
+                                progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+                                ) -> Dict[str, Any]:
+    """Rebuild the vector index with the streaming, checkpointed rebuilder."""
+    from app.services.index_rebuild_service import VectorIndexRebuilder, INDEX_REBUILD_PAGE_SIZE
     
     async with AsyncSessionLocal() as db:
-        try:
-            from app.core.vector_store import vector_store
-            
-            # Get all documents
-            documents = await DocumentService.list_documents(db, limit=1000)
-            
-            indexed_count = 0
-            failed_count = 0
-            
-            for document in documents.items:
-                try:
-                    # Re-index document chunks
-                    for chunk in document.chunks:
-                        if chunk.vector_id:
-                            # Remove old vector
-                            vector_store.delete_document(chunk.vector_id)
-                        
-                        # Add new vector
-                        vector_id = vector_store.add_document(
-                            content=chunk.content,
-                            metadata={
-                                "document_id": str(document.id),
-                                "chunk_id": str(chunk.id),
-                                "title": document.title,
-                                "tags": document.tags
-                            }
-                        )
-                        
-                        # Update chunk with new vector ID
-                        chunk.vector_id = vector_id
-                        await db.commit()
-                    
-                    indexed_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Failed to index document {document.id}: {str(e)}")
-                    failed_count += 1
-            
-            return {
-                "total_documents": len(documents.items),
-                "indexed_successfully": indexed_count,
-                "failed": failed_count,
-                "collection_name": collection_name or "default",
-                "status": "completed"
-            }
-            
-        except Exception as e:
-            logger.error(f"Vector index rebuild failed: {str(e)}")
-            raise
+        rebuilder = VectorIndexRebuilder(
+            db,
+            collection_name=collection_name,
+            shadow=shadow,
+            page_size=page_size or INDEX_REBUILD_PAGE_SIZE,
+            job_id=job_id
+        )
+        checkpoint = await rebuilder.run(resume=resume, progress_callback=progress_callback)
+        
+        return {
+            "total_documents": checkpoint.get("total", 0),
+            "indexed_successfully": checkpoint["processed"] - checkpoint["failed"],
+            "failed": checkpoint["failed"],
+            "vectors_written": checkpoint["vectors_written"],
+            "collection_name": rebuilder.alias,
+            "target_collection": checkpoint["target_collection"],
+            "previous_collection": checkpoint.get("previous_collection"),
+            "resumed": "resumed_at" in checkpoint,
+            "status": "completed"
+        }
 
 @task(bind=True, name="document_tasks.run_complex_rag_query")
 def run_complex_rag_query_task(self, query: str, search_limit: int = 5,
@@ -211,21 +169,15 @@ def run_complex_rag_query_task(self, query: str, search_limit: int = 5,
     try:
         self.update_state(state='PROGRESS', meta={'status': 'Processing RAG query'})
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(
-                _execute_complex_rag_query(
-                    query, search_limit, use_multi_agent, conversation_id, save_conversation
-                )
+        # Run on this worker process's persistent event loop
+        result = run_coroutine(
+            _execute_complex_rag_query(
+                query, search_limit, use_multi_agent, conversation_id, save_conversation
             )
-            
-            self.update_state(state='SUCCESS', meta={'status': 'RAG query completed'})
-            return result
-            
-        finally:
-            loop.close()
+        )
+        
+        self.update_state(state='SUCCESS', meta={'status': 'RAG query completed'})
+        return result
             
     except Exception as e:
         logger.error(f"Complex RAG query failed: {str(e)}")
@@ -323,19 +275,13 @@ def analyze_document_collection_task(self, analysis_type: str = "summary") -> Di
     try:
         self.update_state(state='PROGRESS', meta={'status': 'Analyzing document collection'})
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # Run on this worker process's persistent event loop
+        result = run_coroutine(
+            _analyze_document_collection(analysis_type)
+        )
         
-        try:
-            result = loop.run_until_complete(
-                _analyze_document_collection(analysis_type)
-            )
-            
-            self.update_state(state='SUCCESS', meta={'status': 'Analysis completed'})
-            return result
-            
-        finally:
-            loop.close()
+        self.update_state(state='SUCCESS', meta={'status': 'Analysis completed'})
+        return result
             
     except Exception as e:
         logger.error(f"Document collection analysis failed: {str(e)}")
@@ -0,0 +1,220 @@
+"""
+Staged document ingestion pipeline.
+
+Ingestion is split into three chained tasks, each on its own queue so every
+stage can scale its own worker pool:
+
+- parse (parse_queue): validate and chunk documents
+- embed (embed_queue): embed the texts of all documents in one encoder pass
+- index (index_queue): upsert vectors and bulk insert the database rows
+
+Stages pass their batch by reference through the claim-check store, so only
+small references travel through the broker.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict, Any, List, Optional, Callable
+from celery import chain
+from app.core.celery_app import task, dispatch_options, _request_header
+from app.core.claim_check import claim_check
+from app.core.vector_store import vector_store
+from app.core.worker_runtime import run_coroutine
+from app.database.database import AsyncSessionLocal
+from app.services.document_service import (
+    DocumentService, DOCUMENT_VECTOR_BATCH_SIZE, DOCUMENT_INSERT_BATCH_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+# Texts per encoder batch and texts embedded between progress updates
+INGESTION_ENCODER_BATCH_SIZE = int(os.getenv("INGESTION_ENCODER_BATCH_SIZE", "64"))
+INGESTION_EMBED_SLICE_SIZE = int(os.getenv("INGESTION_EMBED_SLICE_SIZE", "1024"))
+
+
+def _by_reference(batch: Dict[str, Any]) -> Any:
+    """Store a stage batch in the claim-check store, falling back to passing it inline."""
+    try:
+        return claim_check.store_value(batch)
+    except Exception as e:
+        logger.warning(f"Claim-check store unavailable, passing ingestion batch inline: {e}")
+        return batch
+
+
+def _summary(batch: Dict[str, Any]) -> Dict[str, Any]:
+    results = batch["results"]
+    successful = sum(1 for result in results if result and result["status"] == "success")
+    return {
+        "total_documents": batch["total"],
+        "successful": successful,
+        "failed": batch["total"] - successful,
+        "results": results,
+        "status": "completed"
+    }
+
+
+@task(bind=True, name="ingestion_tasks.parse_documents")
+def parse_documents_task(self, document_data_list: List[Dict[str, Any]],
+                         user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse and chunk documents, then hand the batch to the embed and index stages.
+
+    The task is replaced by the embed -> index chain, so its task ID reports the
+    final ingestion result.
+
+    Args:
+        document_data_list: List of document data dictionaries
+        user_id: Owner of every document in the batch (the submitting user)
+
+    Returns:
+        Dict containing batch processing results (once the index stage completes)
+    """
+    total = len(document_data_list)
+    self.update_state(state='PROGRESS', meta={'status': f'Parsing {total} documents', 'progress': 0.0})
+
+    prepared = []
+    results: List[Optional[Dict[str, Any]]] = [None] * total
+    for index, doc_data in enumerate(document_data_list):
+        try:
+            item = DocumentService._prepare_document(doc_data, user_id)
+            item["index"] = index
+            prepared.append(item)
+        except Exception as e:
+            results[index] = {
+                "title": doc_data.get("title"),
+                "document_id": None,
+                "status": "failed",
+                "error": str(e)
+            }
+
+    batch = {"total": total, "prepared": prepared, "results": results}
+    if not prepared:
+        return _summary(batch)
+
+    # Later stages keep this task's priority band and report progress under its ID
+    priority = _request_header(self.request, 'task_priority')
+    stage_kwargs = {"progress_task_id": self.request.id}
+    pipeline = chain(
+        embed_chunks_task.signature(
+            args=(_by_reference(batch),), kwargs=stage_kwargs,
+            **dispatch_options(embed_chunks_task.name, priority)
+        ),
+        index_documents_task.signature(
+            kwargs=stage_kwargs,
+            **dispatch_options(index_documents_task.name, priority)
+        )
+    )
+    logger.info(f"Parsed {len(prepared)}/{total} documents into "
+                f"{sum(len(item['chunks']) for item in prepared)} chunks")
+    return self.replace(pipeline)
+
+
+@task(bind=True, name="ingestion_tasks.embed_chunks")
+def embed_chunks_task(self, batch: Dict[str, Any], progress_task_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Embed the full text and chunks of every document in a parsed batch.
+
+    Texts of all documents are encoded together, so the encoder always runs
+    full batches regardless of document sizes.
+
+    Args:
+        batch: Parsed batch (resolved from its claim-check reference)
+        progress_task_id: Task ID progress is reported under
+
+    Returns:
+        Dict with a reference to the batch including its embeddings
+    """
+    progress_task_id = progress_task_id or self.request.id
+    texts = [
+        vector_item["content"] or ""
+        for item in batch["prepared"]
+        for _, vector_item in DocumentService._vector_items(item)
+    ]
+
+    embeddings: List[Optional[List[float]]] = []
+    slice_size = max(1, INGESTION_EMBED_SLICE_SIZE)
+    for start in range(0, len(texts), slice_size):
+        self.update_state(task_id=progress_task_id, state='PROGRESS', meta={
+            'status': f'Embedding {len(texts)} texts',
+            'stage': 'embed',
+            'embedded': start,
+            'texts': len(texts),
+            'progress': 0.1 + 0.6 * start / len(texts)
+        })
+        embeddings.extend(vector_store.embed_texts(
+            texts[start:start + slice_size], batch_size=INGESTION_ENCODER_BATCH_SIZE
+        ))
+
+    batch["embeddings"] = embeddings
+    return {"batch": _by_reference(batch)}
+
+
+@task(bind=True, name="ingestion_tasks.index_documents")
+def index_documents_task(self, stage_result: Dict[str, Any],
+                         progress_task_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Upsert the embedded vectors and bulk insert document and chunk rows.
+
+    Args:
+        stage_result: Result of the embed stage (its batch resolved from the reference)
+        progress_task_id: Task ID progress is reported under
+
+    Returns:
+        Dict containing batch processing results
+    """
+    progress_task_id = progress_task_id or self.request.id
+    try:
+        # Progress is reported from the worker loop thread, so the task ID is passed explicitly
+        return run_coroutine(_index_documents(
+            stage_result["batch"],
+            progress_callback=lambda meta: self.update_state(task_id=progress_task_id, state='PROGRESS', meta=meta)
+        ))
+    except Exception as e:
+        logger.error(f"Document indexing failed: {str(e)}")
+        raise
+
+
+async def _index_documents(batch: Dict[str, Any],
+                           progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+                           ) -> Dict[str, Any]:
+    """Write an embedded batch to the vector store and database in windows."""
+    prepared = batch["prepared"]
+    embeddings = iter(batch["embeddings"])
+    results = batch["results"]
+    insert_batch_size = max(1, DOCUMENT_INSERT_BATCH_SIZE)
+    vector_batch_size = max(1, DOCUMENT_VECTOR_BATCH_SIZE)
+
+    async with AsyncSessionLocal() as db:
+        for window_start in range(0, len(prepared), insert_batch_size):
+            window = prepared[window_start:window_start + insert_batch_size]
+
+            pairs = [pair for item in window for pair in DocumentService._vector_items(item)]
+            window_embeddings = [next(embeddings, None) for _ in pairs]
+            for start in range(0, len(pairs), vector_batch_size):
+                group = pairs[start:start + vector_batch_size]
+                vector_ids = await asyncio.to_thread(
+                    vector_store.insert_embedded_batch,
+                    [vector_item for _, vector_item in group],
+                    window_embeddings[start:start + vector_batch_size]
+                )
+                for (row, _), vector_id in zip(group, vector_ids):
+                    row["vector_id"] = vector_id
+
+            stored = await DocumentService._store_prepared_documents(db, window)
+            for item, result in zip(window, stored):
+                results[item["index"]] = result
+
+            processed = window_start + len(window)
+            if progress_callback is not None:
+                progress_callback({
+                    'status': f'Indexed {processed} of {len(prepared)} documents',
+                    'stage': 'index',
+                    'processed': processed,
+                    'total': len(prepared),
+                    'progress': 0.7 + 0.3 * processed / len(prepared)
+                })
+
+    summary = _summary(batch)
+    logger.info(f"Ingestion pipeline stored {summary['successful']}/{summary['total_documents']} documents")
+    return summary
@@ -3,11 +3,11 @@ Orchestration-related asynchronous tasks for Phase 5.
 Handles complex workflows that coordinate multiple system components.
 """
 
-import asyncio
 import logging
 import time
 from typing import Dict, Any, List, Optional
 from app.core.celery_app import task
+from app.core.worker_runtime import run_coroutine
 from app.database.database import AsyncSessionLocal
 from app.services.chat_history import ChatHistoryService
 from app.services.document_service import DocumentService
@@ -33,19 +33,13 @@ def run_comprehensive_workflow_task(self, workflow_config: Dict[str, Any]) -> Di
             meta={'status': 'Starting comprehensive workflow'}
         )
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # Run on this worker process's persistent event loop
+        result = run_coroutine(
+            _execute_comprehensive_workflow(workflow_config)
+        )
         
-        try:
-            result = loop.run_until_complete(
-                _execute_comprehensive_workflow(workflow_config)
-            )
-            
-            self.update_state(state='SUCCESS', meta={'status': 'Comprehensive workflow completed'})
-            return result
-            
-        finally:
-            loop.close()
+        self.update_state(state='SUCCESS', meta={'status': 'Comprehensive workflow completed'})
+        return result
             
     except Exception as e:
         logger.error(f"Comprehensive workflow failed: {str(e)}")
@@ -232,17 +226,11 @@ def system_health_check_task(self) -> Dict[str, Any]:
     try:
         self.update_state(state='PROGRESS', meta={'status': 'Performing system health check'})
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # Run on this worker process's persistent event loop
+        result = run_coroutine(_perform_system_health_check())
         
-        try:
-            result = loop.run_until_complete(_perform_system_health_check())
-            
-            self.update_state(state='SUCCESS', meta={'status': 'Health check completed'})
-            return result
-            
-        finally:
-            loop.close()
+        self.update_state(state='SUCCESS', meta={'status': 'Health check completed'})
+        return result
             
     except Exception as e:
         logger.error(f"System health check failed: {str(e)}")
@@ -333,30 +321,28 @@ async def _perform_system_health_check() -> Dict[str, Any]:
     return health_status
 
 @task(bind=True, name="orchestration_tasks.cleanup_old_data")
-def cleanup_old_data_task(self, days_old: int = 30) -> Dict[str, Any]:
+def cleanup_old_data_task(self, days_old: Optional[int] = None, tables: Optional[List[str]] = None,
+                          dry_run: bool = False) -> Dict[str, Any]:
     """
-    Clean up old data from the system.
+    Clean up old data from the system by applying the retention policies.
     
     Args:
-        days_old: Number of days old data should be to be considered for cleanup
+        days_old: Override the tables' retention periods (days; purge policies are only lengthened);
+            None uses the per-table policies
+        tables: Only apply the policies of these tables
+        dry_run: Only count the rows that would be removed
     
     Returns:
-        Dict containing cleanup results
+        Dict containing the retention report
     """
     try:
         self.update_state(state='PROGRESS', meta={'status': 'Cleaning up old data'})
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # Run on this worker process's persistent event loop
+        result = run_coroutine(_cleanup_old_data(days_old, tables, dry_run))
         
-        try:
-            result = loop.run_until_complete(_cleanup_old_data(days_old))
-            
-            self.update_state(state='SUCCESS', meta={'status': 'Cleanup completed'})
-            return result
-            
-        finally:
-            loop.close()
+        self.update_state(state='SUCCESS', meta={'status': 'Cleanup completed'})
+        return result
             
     except Exception as e:
         logger.error(f"Data cleanup failed: {str(e)}")
@@ -366,37 +352,45 @@ def cleanup_old_data_task(self, days_old: int = 30) -> Dict[str, Any]:
         )
         raise
 
-async def _cleanup_old_data(days_old: int) -> Dict[str, Any]:
-    """Clean up old data asynchronously."""
+async def _cleanup_old_data(days_old: Optional[int], tables: Optional[List[str]] = None,
+                            dry_run: bool = False) -> Dict[str, Any]:
+    """Apply the retention policies in bounded batches."""
+    from app.services.retention_service import RetentionEngine
     
     async with AsyncSessionLocal() as db:
-        try:
-            from datetime import datetime, timedelta
-            from app.database.models import SearchQuery
-            
-            cutoff_date = datetime.utcnow() - timedelta(days=days_old)
-            
-            # Clean up old search queries
-            old_searches = await db.execute(
-                f"SELECT COUNT(*) FROM search_queries WHERE created_at < '{cutoff_date}'"
-            )
-            old_search_count = old_searches.scalar()
-            
-            # Delete old search queries
-            await db.execute(
-                f"DELETE FROM search_queries WHERE created_at < '{cutoff_date}'"
-            )
-            await db.commit()
-            
-            return {
-                "cutoff_date": cutoff_date.isoformat(),
-                "days_old": days_old,
-                "cleaned_up": {
-                    "search_queries": old_search_count
-                },
-                "status": "completed"
-            }
-            
-        except Exception as e:
-            logger.error(f"Data cleanup failed: {str(e)}")
-            raise
+        report = await RetentionEngine(db).run(retention_days=days_old, tables=tables, dry_run=dry_run)
+        report["days_old"] = days_old
+        return report
+
+@task(bind=True, name="orchestration_tasks.reduce_batch_results")
+def reduce_batch_results_task(self, results: List[Any], reducer: str = "collect") -> Dict[str, Any]:
+    """
+    Reduce the results of a task batch (chord callback).
+    
+    Args:
+        results: Results of the batch tasks, in submission order
+        reducer: "collect" returns all results, "summary" returns counts and totals only
+    
+    Returns:
+        Dict containing the reduced batch result
+    """
+    self.update_state(state='PROGRESS', meta={'status': f'Reducing {len(results)} batch results'})
+    
+    statuses: Dict[str, int] = {}
+    total_execution_time = 0.0
+    for result in results:
+        status = result.get("status", "completed") if isinstance(result, dict) else "completed"
+        statuses[status] = statuses.get(status, 0) + 1
+        if isinstance(result, dict) and isinstance(result.get("execution_time"), (int, float)):
+            total_execution_time += result["execution_time"]
+    
+    reduced = {
+        "reducer": reducer,
+        "total": len(results),
+        "statuses": statuses,
+        "total_execution_time": total_execution_time
+    }
+    if reducer == "collect":
+        reduced["results"] = results
+    
+    return reduced
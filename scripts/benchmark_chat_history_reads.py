@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the ChatHistoryService read paths.
+
+Compares the previous read paths with the current ones on the same rows in a
+temporary SQLite database:
+
+- before: load full ORM instances, build a second detached ORM copy of every
+  row and json.loads the tool_calls / extra_data text columns (replayed here
+  against a copy of the old messages table)
+- after: select only the needed columns into slotted records, with
+  tool_calls / extra_data stored as native JSON columns
+
+Reports the median wall time per call and the memory allocated per call
+(tracemalloc peak).
+
+Usage:
+    python scripts/benchmark_chat_history_reads.py --messages 500 --conversations 200 --repeat 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import Column, String, Text, DateTime, desc, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.database.database import Base
+from app.database.models import User, Conversation, Message
+from app.services.chat_history import ChatHistoryService
+
+LegacyBase = declarative_base()
+
+
+class LegacyMessage(LegacyBase):
+    """The messages table as it was before tool_calls / extra_data became JSON columns."""
+    __tablename__ = "legacy_messages"
+
+    id = Column(String, primary_key=True)
+    conversation_id = Column(String, nullable=False, index=True)
+    role = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    tool_calls = Column(Text, nullable=True)
+    extra_data = Column(Text, nullable=True)
+    created_at = Column(DateTime)
+
+
+async def legacy_get_messages(db: AsyncSession, conversation_id: str, limit: int):
+    """The previous get_messages: ORM load, detached copy and json.loads per row."""
+    result = await db.execute(
+        select(LegacyMessage).where(LegacyMessage.conversation_id == conversation_id)
+        .order_by(LegacyMessage.created_at).limit(limit)
+    )
+    messages = []
+    for msg in result.scalars().all():
+        tool_calls = None
+        if msg.tool_calls:
+            try:
+                tool_calls = json.loads(msg.tool_calls)
+            except json.JSONDecodeError:
+                tool_calls = msg.tool_calls
+        extra_data = None
+        if msg.extra_data:
+            try:
+                extra_data = json.loads(msg.extra_data)
+            except json.JSONDecodeError:
+                extra_data = msg.extra_data
+        messages.append(LegacyMessage(
+            id=msg.id, conversation_id=msg.conversation_id, role=msg.role, content=msg.content,
+            tool_calls=tool_calls, extra_data=extra_data, created_at=msg.created_at
+        ))
+    return messages
+
+
+async def legacy_get_conversations(db: AsyncSession, limit: int):
+    """The previous get_conversations: ORM load and a detached copy per row."""
+    result = await db.execute(
+        select(Conversation).where(Conversation.is_active == True)
+        .order_by(desc(Conversation.updated_at)).limit(limit)
+    )
+    return [
+        Conversation(id=conv.id, title=conv.title, created_at=conv.created_at,
+                     updated_at=conv.updated_at, is_active=conv.is_active)
+        for conv in result.scalars().all()
+    ]
+
+
+async def seed(engine, messages: int, conversations: int) -> str:
+    """Insert one long conversation (in both message tables) and a list of conversations."""
+    now = datetime.utcnow()
+    user_id = f"benchmark-{uuid.uuid4()}"
+    conversation_ids = [str(uuid.uuid4()) for _ in range(conversations)]
+    rows = [
+        {"id": str(uuid.uuid4()), "conversation_id": conversation_ids[0],
+         "role": "user" if i % 2 == 0 else "assistant", "content": f"Benchmark message {i} " * 8,
+         "tool_calls": {"calls": [{"name": "search", "args": {"query": f"q{i}"}}]} if i % 2 else None,
+         "extra_data": {"agent_name": "researcher", "task_type": "chat", "index": i},
+         "created_at": now - timedelta(seconds=messages - i)}
+        for i in range(messages)
+    ]
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.run_sync(LegacyBase.metadata.create_all)
+        await connection.execute(insert(User), [{"id": user_id, "email": f"{user_id}@example.com",
+                                                 "name": "Benchmark"}])
+        await connection.execute(insert(Conversation), [
+            {"id": cid, "user_id": user_id, "title": f"Conversation {i}", "is_active": True,
+             "created_at": now - timedelta(minutes=i), "updated_at": now - timedelta(minutes=i)}
+            for i, cid in enumerate(conversation_ids)
+        ])
+        await connection.execute(insert(Message), rows)
+        await connection.execute(insert(LegacyMessage), [
+            {**row,
+             "tool_calls": json.dumps(row["tool_calls"]) if row["tool_calls"] else None,
+             "extra_data": json.dumps(row["extra_data"])}
+            for row in rows
+        ])
+    return conversation_ids[0]
+
+
+async def measure(engine, call, repeat: int):
+    """Get (median seconds, peak allocated bytes) of one call, each in a fresh session."""
+    timings = []
+    for _ in range(repeat):
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            started = time.perf_counter()
+            await call(db)
+            timings.append(time.perf_counter() - started)
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        tracemalloc.start()
+        await call(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_dir}/chat_history_reads.db")
+        try:
+            conversation_id = await seed(engine, args.messages, args.conversations)
+            scenarios = [
+                (f"get_messages ({args.messages} messages)",
+                 lambda db: legacy_get_messages(db, conversation_id, args.messages),
+                 lambda db: ChatHistoryService.get_messages(db, conversation_id, limit=args.messages)),
+                (f"get_conversations ({args.conversations} rows)",
+                 lambda db: legacy_get_conversations(db, args.conversations),
+                 lambda db: ChatHistoryService.get_conversations(db, limit=args.conversations)),
+            ]
+
+            print("=" * 84)
+            print(f"{'Read path':<36} {'Before ms':>10} {'After ms':>10} {'Speedup':>8} "
+                  f"{'Before KiB':>11} {'After KiB':>10}")
+            print("=" * 84)
+            for name, before, after in scenarios:
+                before_time, before_peak = await measure(engine, before, args.repeat)
+                after_time, after_peak = await measure(engine, after, args.repeat)
+                print(f"{name:<36} {before_time * 1000:10.2f} {after_time * 1000:10.2f} "
+                      f"{before_time / after_time:7.2f}x {before_peak / 1024:11.1f} {after_peak / 1024:10.1f}")
+        finally:
+            await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ChatHistoryService read paths before and after")
+    parser.add_argument("--messages", type=int, default=500, help="Messages in the benchmark conversation")
+    parser.add_argument("--conversations", type=int, default=200, help="Conversations in the list")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed calls per read path")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark the search tool layer without network access.
+
+Runs a burst of concurrent searches with a skewed query mix (a few "trending"
+queries repeated many times) against the offline search backend and reports
+throughput, cache hit rate, deduplicated in-flight searches and provider calls.
+
+Usage:
+    python scripts/benchmark_search_tools.py --requests 200 --unique 20 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+async def run_benchmark(requests: int, unique: int, latency: float, rate_limit: float,
+                        concurrency: int, cache_ttl: float):
+    from app.core.tools import ToolRegistry, OfflineSearchBackend
+
+    registry = ToolRegistry(
+        backend="offline",
+        cache_ttl=cache_ttl,
+        max_concurrency=concurrency,
+        rate_limit=rate_limit,
+        rate_burst=concurrency
+    )
+    backend = OfflineSearchBackend(latency=latency, fixtures_path=None)
+    registry.register_backend(backend, activate=True)
+
+    # Zipf-like mix: a few queries dominate, like trending topics
+    random.seed(42)
+    queries = [f"Trending topic {i}" for i in range(unique)]
+    weights = [1 / (i + 1) for i in range(unique)]
+    workload = [
+        random.choice(["", " ", "  "]) + query.upper() if random.random() < 0.2 else query
+        for query in random.choices(queries, weights=weights, k=requests)
+    ]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(registry.asearch(query) for query in workload))
+    elapsed = time.perf_counter() - start
+
+    stats = registry.get_stats()
+    print("=" * 60)
+    print("Search tool benchmark (offline backend)")
+    print("=" * 60)
+    print(f"Requests:            {requests} ({unique} unique queries)")
+    print(f"Provider latency:    {latency:.3f}s, concurrency {concurrency}, rate {rate_limit}/s")
+    print(f"Elapsed:             {elapsed:.3f}s ({requests / elapsed:.1f} req/s)")
+    print(f"Provider calls:      {backend.calls}")
+    print(f"Cache hit rate:      {stats['cache_hit_rate'] * 100:.1f}%")
+    print(f"Deduplicated:        {stats['deduplicated']}")
+    print(f"Rate limit wait:     {stats['rate_limit_wait']:.3f}s")
+    uncached = requests * latency / concurrency
+    print(f"Uncached estimate:   {uncached:.3f}s (sequential provider calls / concurrency)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cached, rate-limited search tool layer")
+    parser.add_argument("--requests", type=int, default=200, help="Number of searches to issue")
+    parser.add_argument("--unique", type=int, default=20, help="Number of distinct queries")
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated provider latency in seconds")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Provider requests per second (0 disables)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Concurrent provider requests")
+    parser.add_argument("--cache-ttl", type=float, default=900, help="Cache TTL in seconds (0 disables caching)")
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(
+        args.requests, args.unique, args.latency, args.rate_limit, args.concurrency, args.cache_ttl
+    ))
+
+
+if __name__ == "__main__":
+    main()
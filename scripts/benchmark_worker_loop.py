@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-task overhead of the Celery worker event loop strategies.
+
+Compares the previous pattern (a fresh event loop per task, closed afterwards)
+with the persistent per-process worker runtime. Each simulated task opens an
+AsyncSessionLocal session and runs a trivial query, which is where the fresh
+loop loses its pooled connection every time.
+
+Usage:
+    python scripts/benchmark_worker_loop.py --tasks 200
+    DATABASE_URL=postgresql+asyncpg://... python scripts/benchmark_worker_loop.py --tasks 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+async def simulated_task(query: bool):
+    """Body of a minimal task: one session and one query."""
+    if not query:
+        return None
+
+    from sqlalchemy import text
+    from app.database.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(text("SELECT 1"))
+        return result.scalar()
+
+
+def run_fresh_loop(query: bool) -> float:
+    """Previous pattern: create, run and close an event loop per task."""
+    started = time.perf_counter()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(simulated_task(query))
+    finally:
+        loop.close()
+    return time.perf_counter() - started
+
+
+def run_persistent_loop(query: bool) -> float:
+    """New pattern: submit the coroutine to the worker runtime's loop."""
+    from app.core.worker_runtime import run_coroutine
+
+    started = time.perf_counter()
+    run_coroutine(simulated_task(query))
+    return time.perf_counter() - started
+
+
+def report(name: str, timings):
+    timings = sorted(timings)
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(f"{name:<18} mean {statistics.mean(timings) * 1000:8.3f} ms   "
+          f"p50 {statistics.median(timings) * 1000:8.3f} ms   p95 {p95 * 1000:8.3f} ms")
+    return statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-task event loop overhead for Celery tasks")
+    parser.add_argument("--tasks", type=int, default=200, help="Number of simulated tasks per strategy")
+    parser.add_argument("--no-query", action="store_true", help="Measure loop overhead only, without a DB query")
+    args = parser.parse_args()
+
+    from app.database.database import ensure_data_directory, async_engine
+    from app.core.worker_runtime import worker_runtime
+
+    ensure_data_directory()
+    query = not args.no_query
+
+    fresh = [run_fresh_loop(query) for _ in range(args.tasks)]
+    # Connections opened by the fresh loops are bound to closed loops; start clean
+    async_engine.sync_engine.dispose(close=False)
+
+    worker_runtime.start(preload_models=False)
+    run_persistent_loop(query)  # Warm-up: first task opens the pooled connection
+    persistent = [run_persistent_loop(query) for _ in range(args.tasks)]
+    worker_runtime.stop()
+
+    print("=" * 72)
+    print(f"Per-task overhead over {args.tasks} tasks ({'session + SELECT 1' if query else 'empty coroutine'})")
+    print("=" * 72)
+    fresh_mean = report("Fresh loop", fresh)
+    persistent_mean = report("Persistent loop", persistent)
+    if persistent_mean > 0:
+        print(f"Speedup: {fresh_mean / persistent_mean:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-child memory of prefork Celery workers with and without model preloading.
+
+Simulates a prefork pool: for each concurrency level N, a fresh process forks
+N children that each run one embedding (as a task would) and report their
+memory. In "per_child" mode every child loads the models itself (the previous
+behaviour); in "shared" mode the parent preloads them with
+``preload_in_parent`` and the children only call ``after_fork``.
+
+RSS counts shared pages in every child, so it barely changes between modes;
+PSS splits shared pages among the processes mapping them and shows the
+actual saving.
+
+Usage:
+    python scripts/benchmark_worker_memory.py
+    python scripts/benchmark_worker_memory.py --concurrency 1 2 4 8 --modes shared per_child
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+MB = 1024 * 1024
+
+
+def load_models():
+    """Import the modules that load the models, as the task modules do."""
+    from app.core.vector_store import vector_store
+    from app.core.multimodal import multimodal_processor  # noqa: F401
+
+    return vector_store
+
+
+def child(mode: str, results):
+    """Body of one pool child: initialize, run a task, report memory."""
+    from app.core.model_preload import after_fork, process_memory
+
+    if mode == "shared":
+        after_fork()
+    vector_store = load_models()
+    vector_store.embed_texts(["warm-up sentence for the embedding model"])
+    results.put(process_memory())
+
+
+def run_pool(mode: str, concurrency: int):
+    """Fork a pool of children in this (fresh) process and print its memory as JSON."""
+    from app.core.model_preload import preload_in_parent, process_memory
+
+    os.environ["MODEL_DEVICE"] = "cpu"
+    if mode == "shared":
+        preload_in_parent(concurrency=concurrency, force=True)
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [context.Process(target=child, args=(mode, results)) for _ in range(concurrency)]
+    for process in processes:
+        process.start()
+    children = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    print(json.dumps({"parent": process_memory(), "children": children}))
+
+
+def average(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+def fmt(value) -> str:
+    return f"{value / MB:10.1f}" if value is not None else f"{'n/a':>10}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-child memory of prefork workers")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Pool sizes to measure")
+    parser.add_argument("--modes", nargs="+", default=["shared", "per_child"],
+                        choices=["shared", "per_child"], help="Model loading modes to compare")
+    parser.add_argument("--run-pool", nargs=2, metavar=("MODE", "CONCURRENCY"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_pool:
+        run_pool(args.run_pool[0], int(args.run_pool[1]))
+        return
+
+    print("=" * 84)
+    print(f"{'Mode':<10} {'Children':>8} {'RSS/child MB':>14} {'PSS/child MB':>14} "
+          f"{'USS/child MB':>14} {'Pool PSS MB':>14}")
+    print("=" * 84)
+    for concurrency in args.concurrency:
+        for mode in args.modes:
+            # Each measurement starts from a clean interpreter
+            output = subprocess.run(
+                [sys.executable, __file__, "--run-pool", mode, str(concurrency)],
+                capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            memory = json.loads(output)
+            children = memory["children"]
+
+            pss = [child["pss"] for child in children]
+            pool_pss = None
+            if None not in pss and memory["parent"]["pss"] is not None:
+                pool_pss = sum(pss) + memory["parent"]["pss"]
+            print(f"{mode:<10} {concurrency:>8} {fmt(average(c['rss'] for c in children)):>14} "
+                  f"{fmt(average(pss)):>14} {fmt(average(c['uss'] for c in children)):>14} {fmt(pool_pss):>14}")
+
+
+if __name__ == "__main__":
+    main()
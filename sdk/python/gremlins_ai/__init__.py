@@ -19,6 +19,7 @@ from .models import (
     Document,
     Agent,
     Task,
+    TaskBatch,
     SystemHealth
 )
 
@@ -38,5 +39,6 @@ __all__ = [
     "Document",
     "Agent",
     "Task",
+    "TaskBatch",
     "SystemHealth"
 ]
@@ -14,7 +14,7 @@ import httpx
 import websockets
 
 from .exceptions import APIError, ValidationError, RateLimitError, AuthenticationError
-from .models import Conversation, Message, Document, Agent, Task, SystemHealth
+from .models import Conversation, Message, Document, Agent, Task, TaskBatch, SystemHealth
 
 
 logger = logging.getLogger(__name__)
@@ -272,9 +272,15 @@ class GremlinsAIClient:
         payload: Dict[str, Any],
         execution_mode: str = "sync",
         priority: int = 1,
-        timeout: Optional[int] = None
+        timeout: Optional[int] = None,
+        idempotency_key: Optional[str] = None
     ) -> Task:
-        """Execute a task through the orchestrator."""
+        """
+        Execute a task through the orchestrator.
+        
+        Pass the same ``idempotency_key`` when retrying an async submission so the
+        server returns the original task instead of running it twice.
+        """
         request_payload = {
             "task_type": task_type,
             "payload": payload,
@@ -283,11 +289,49 @@ class GremlinsAIClient:
         }
         if timeout:
             request_payload["timeout"] = timeout
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
             
-        response = await self.http_client.post("/api/v1/orchestrator/execute", json=request_payload)
+        response = await self.http_client.post(
+            "/api/v1/orchestrator/execute",
+            json=request_payload,
+            headers=headers
+        )
         data = self._handle_response(response)
         return Task.from_dict(data)
     
+    async def execute_task_batch(
+        self,
+        tasks: List[Dict[str, Any]],
+        reduce: Optional[str] = None
+    ) -> TaskBatch:
+        """
+        Execute a batch of tasks asynchronously with a single request.
+        
+        Args:
+            tasks: Task definitions with task_type, payload and optional priority and timeout
+            reduce: Optional reduce step run after all tasks succeed ("collect" or "summary")
+            
+        Returns:
+            TaskBatch with the batch ID and the IDs of its tasks
+        """
+        request_payload: Dict[str, Any] = {
+            "tasks": [
+                {key: value for key, value in task.items() if key != "execution_mode"}
+                for task in tasks
+            ]
+        }
+        if reduce:
+            request_payload["reduce"] = reduce
+            
+        response = await self.http_client.post("/api/v1/orchestrator/batch", json=request_payload)
+        data = self._handle_response(response)
+        return TaskBatch.from_dict(data)
+    
+    async def get_batch_status(self, batch_id: str) -> Dict[str, Any]:
+        """Get aggregate progress, per-task states and the reduce result of a task batch."""
+        response = await self.http_client.get(f"/api/v1/orchestrator/batch/{batch_id}")
+        return self._handle_response(response)
+    
     async def get_task_status(self, task_id: str) -> Task:
         """Get the status of an asynchronous task."""
         response = await self.http_client.get(f"/api/v1/orchestrator/tasks/{task_id}/status")
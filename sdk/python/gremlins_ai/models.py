@@ -134,6 +134,22 @@ class Task(BaseModel):
         return cls(**data)
 
 
+class TaskBatch(BaseModel):
+    """Represents a batch of orchestrator tasks dispatched together."""
+    
+    batch_id: str
+    status: str
+    task_ids: List[str] = Field(default_factory=list)
+    total_tasks: int = 0
+    reduce_task_id: Optional[str] = None
+    execution_time: Optional[float] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TaskBatch":
+        """Create a TaskBatch from a dictionary."""
+        return cls(**data)
+
+
 class ComponentStatus(BaseModel):
     """Represents the status of a system component."""
     
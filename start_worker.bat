@@ -26,12 +26,12 @@ echo   Worker name: gremlinsai-worker
 echo   Concurrency: 4
 echo   Log level: INFO
 
-REM Start Celery worker
+REM Start Celery worker (high, normal and low priority queues per task module)
 celery -A app.core.celery_app worker ^
     --loglevel=info ^
     --concurrency=4 ^
     --hostname=gremlinsai-worker@%%h ^
-    --queues=default,agent_queue,document_queue,orchestration_queue ^
+    --queues=agent_queue_high,document_queue_high,orchestration_queue_high,parse_queue_high,embed_queue_high,index_queue_high,default,agent_queue,document_queue,orchestration_queue,parse_queue,embed_queue,index_queue,agent_queue_low,document_queue_low,orchestration_queue_low,parse_queue_low,embed_queue_low,index_queue_low ^
     --prefetch-multiplier=1 ^
     --max-tasks-per-child=1000
 
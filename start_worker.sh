@@ -31,12 +31,16 @@ echo -e "  Worker name: gremlinsai-worker"
 echo -e "  Concurrency: 4"
 echo -e "  Log level: INFO"
 
-# Start Celery worker
+# Start Celery worker. Each task module has high/normal/low priority queues;
+# for strict isolation run a dedicated worker on just the *_high queues.
+# Document ingestion stages (parse_queue, embed_queue, index_queue) can also be
+# scaled separately, e.g. a CPU-sized embedding pool:
+#   celery -A app.core.celery_app worker --concurrency=2 --queues=embed_queue_high,embed_queue,embed_queue_low
 celery -A app.core.celery_app worker \
     --loglevel=info \
     --concurrency=4 \
     --hostname=gremlinsai-worker@%h \
-    --queues=default,agent_queue,document_queue,orchestration_queue \
+    --queues=agent_queue_high,document_queue_high,orchestration_queue_high,parse_queue_high,embed_queue_high,index_queue_high,default,agent_queue,document_queue,orchestration_queue,parse_queue,embed_queue,index_queue,agent_queue_low,document_queue_low,orchestration_queue_low,parse_queue_low,embed_queue_low,index_queue_low \
     --prefetch-multiplier=1 \
     --max-tasks-per-child=1000
 
@@ -0,0 +1,180 @@
+# tests/test_admission.py
+"""Unit tests for the bounded agent admission queue."""
+
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionQueue, Histogram
+from app.core.exceptions import AgentQueueFullException, AgentQueueTimeoutException
+from app.core.fair_scheduler import FairShareScheduler
+
+pytestmark = pytest.mark.unit
+
+
+async def test_admits_up_to_max_concurrent_without_waiting():
+    queue = AdmissionQueue("test", max_concurrent=2, max_depth=5, max_wait=1)
+
+    assert await queue.acquire() == 0.0
+    assert await queue.acquire() == 0.0
+    assert queue.active == 2
+    assert queue.queued == 0
+
+
+async def test_rejects_when_queue_is_full():
+    queue = AdmissionQueue("test", max_concurrent=1, max_depth=1, max_wait=5)
+    await queue.acquire()
+    waiter = asyncio.create_task(queue.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(AgentQueueFullException) as exc_info:
+        await queue.acquire()
+
+    assert exc_info.value.retry_after >= 1
+    assert queue.rejected == 1
+
+    queue.release()
+    await asyncio.wait_for(waiter, timeout=1)
+
+
+async def test_times_out_after_max_wait():
+    queue = AdmissionQueue("test", max_concurrent=1, max_depth=5, max_wait=0.05)
+    await queue.acquire()
+
+    with pytest.raises(AgentQueueTimeoutException):
+        await queue.acquire()
+
+    assert queue.timed_out == 1
+    assert queue.queued == 0
+
+    # The timed-out waiter is skipped; the slot simply frees up
+    queue.release()
+    assert queue.active == 0
+
+
+async def test_admits_highest_priority_first_fifo_within_priority():
+    queue = AdmissionQueue("test", max_concurrent=1, max_depth=10, max_wait=1)
+    await queue.acquire()
+    order = []
+
+    async def request(name, priority):
+        await queue.acquire(priority)
+        order.append(name)
+        queue.release()
+
+    tasks = [
+        asyncio.create_task(request("low", 1)),
+        asyncio.create_task(request("high-1", 9)),
+        asyncio.create_task(request("normal", 5)),
+        asyncio.create_task(request("high-2", 9)),
+    ]
+    await asyncio.sleep(0)
+    assert queue.queued == 4
+
+    queue.release()
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+
+    assert order == ["high-1", "high-2", "normal", "low"]
+    assert queue.active == 0
+
+
+async def test_cancelled_waiter_frees_its_queue_place():
+    queue = AdmissionQueue("test", max_concurrent=1, max_depth=1, max_wait=5)
+    await queue.acquire()
+
+    waiter = asyncio.create_task(queue.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert queue.queued == 0
+    queue.release()
+    assert queue.active == 0
+
+
+async def test_slot_records_run_time_and_releases_on_error():
+    queue = AdmissionQueue("test", max_concurrent=1, max_depth=1, max_wait=1)
+
+    with pytest.raises(RuntimeError):
+        async with queue.slot(priority=8):
+            raise RuntimeError("boom")
+
+    stats = queue.get_stats()
+    assert stats["active"] == 0
+    assert stats["run_time_seconds"]["count"] == 1
+    assert list(stats["queue_wait_seconds_by_priority"]) == ["8"]
+
+
+@pytest.fixture
+def agent_queues(monkeypatch):
+    """Small fair-share and admission queues behind app.core.agent.agent_slot."""
+    from app.core import agent
+
+    scheduler = FairShareScheduler(capacity=2, per_user_cap=2, max_depth=1, max_wait=0.2)
+    admission = AdmissionQueue("agent", max_concurrent=2, max_depth=1, max_wait=0.2)
+    monkeypatch.setattr(agent, "fair_scheduler", scheduler)
+    monkeypatch.setattr(agent, "agent_admission", admission)
+    return agent, scheduler, admission
+
+
+async def test_agent_slot_rejects_overload_with_429(agent_queues):
+    agent, scheduler, admission = agent_queues
+    done = asyncio.Event()
+
+    async def run(user_id):
+        async with agent.agent_slot(user_id=user_id):
+            await done.wait()
+
+    running = [asyncio.create_task(run("alice")), asyncio.create_task(run("bob"))]
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(run("carol"))
+    await asyncio.sleep(0)
+    assert scheduler.queued == 1
+
+    with pytest.raises(AgentQueueFullException) as exc_info:
+        async with agent.agent_slot(user_id="dave"):
+            pass
+
+    assert exc_info.value.status_code == 429
+    assert int(exc_info.value.headers["Retry-After"]) >= 1
+
+    done.set()
+    await asyncio.wait_for(asyncio.gather(*running, queued), timeout=1)
+    assert scheduler.active == 0
+    assert admission.active == 0
+
+
+async def test_agent_slot_times_out_with_503(agent_queues):
+    agent, scheduler, admission = agent_queues
+    done = asyncio.Event()
+
+    async def run(user_id):
+        async with agent.agent_slot(user_id=user_id):
+            await done.wait()
+
+    running = [asyncio.create_task(run("alice")), asyncio.create_task(run("bob"))]
+    await asyncio.sleep(0)
+
+    with pytest.raises(AgentQueueTimeoutException) as exc_info:
+        async with agent.agent_slot(user_id="carol"):
+            pass
+
+    assert exc_info.value.status_code == 503
+    assert scheduler.queued == 0
+
+    done.set()
+    await asyncio.wait_for(asyncio.gather(*running), timeout=1)
+
+
+def test_histogram_quantiles_use_bucket_upper_bounds():
+    histogram = Histogram(buckets=(0.1, 1.0, 10.0))
+    for value in (0.05, 0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.95) == 10.0
+
+    histogram.observe(100.0)
+    assert histogram.to_dict()["buckets"]["+Inf"] == 5
+    assert histogram.quantile(1.0) is None
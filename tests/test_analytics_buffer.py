@@ -0,0 +1,126 @@
+# tests/test_analytics_buffer.py
+"""Unit tests for the analytics write-behind buffer."""
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import database
+from app.database.database import Base
+from app.database.models import DocumentAnalytics, SearchAnalytics, SearchQuery
+from app.services.analytics_buffer import AnalyticsWriteBuffer
+
+pytestmark = pytest.mark.unit
+
+
+def make_buffer(max_events: int = 100, shutdown_mode: str = "flush") -> AnalyticsWriteBuffer:
+    return AnalyticsWriteBuffer(enabled=True, max_events=max_events, flush_interval=60, flush_size=50,
+                                shutdown_mode=shutdown_mode, shutdown_timeout=5)
+
+
+def search_row(search_id: str) -> dict:
+    return {"id": search_id, "query": "what is rag", "query_hash": "h" * 64, "search_type": "hybrid"}
+
+
+@pytest.fixture
+async def session_factory(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/analytics.db")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    # flush() opens its own sessions
+    monkeypatch.setattr(database, "AsyncSessionLocal", factory)
+    yield factory
+    await engine.dispose()
+
+
+def test_events_are_dropped_when_buffer_is_full():
+    buffer = make_buffer(max_events=2)
+
+    assert buffer.add_event(SearchAnalytics, search_row("s1"))
+    assert buffer.add_event(SearchAnalytics, search_row("s2"))
+    assert not buffer.add_event(SearchAnalytics, search_row("s3"))
+    assert not buffer.increment_document("d1", "view_count")
+    assert not buffer.add_click("s1", "d1")
+
+    assert buffer.pending == 2
+    assert buffer.dropped["buffer_full"] == 3
+
+
+def test_counters_and_clicks_merge_per_key():
+    buffer = make_buffer(max_events=2)
+
+    assert buffer.increment_document("d1", "view_count")
+    assert buffer.increment_document("d1", "search_count", amount=3)
+    assert buffer.add_click("s1", "d1")
+    # Existing keys still accept updates when the buffer is full
+    assert buffer.add_click("s1", "d2")
+    assert buffer.increment_document("d1", "view_count")
+
+    assert buffer.pending == 2
+    assert buffer.dropped["buffer_full"] == 0
+
+
+async def test_drop_mode_discards_pending_data_on_stop():
+    buffer = make_buffer(shutdown_mode="drop")
+    buffer.add_event(SearchAnalytics, search_row("s1"))
+    buffer.increment_document("d1", "view_count")
+
+    await buffer.stop()
+
+    assert buffer.pending == 0
+    assert buffer.get_stats()["dropped"]["shutdown"] == 2
+
+
+async def test_empty_flush_does_not_open_a_session():
+    assert await make_buffer().flush() == 0
+
+
+async def test_flush_writes_events_clicks_and_counters(session_factory):
+    buffer = make_buffer()
+    buffer.add_event(SearchAnalytics, search_row("s1"))
+    buffer.add_click("s1", "d1")
+    buffer.add_click("s1", "d2")
+    buffer.increment_document("d1", "view_count", duration_seconds=10)
+    buffer.increment_document("d1", "view_count", duration_seconds=20)
+
+    assert await buffer.flush() == 2
+    assert buffer.pending == 0
+
+    # A second flush updates the existing row in place
+    buffer.increment_document("d1", "view_count", duration_seconds=30)
+    await buffer.flush()
+
+    async with session_factory() as db:
+        search = (await db.execute(select(SearchAnalytics).where(SearchAnalytics.id == "s1"))).scalar_one()
+        document = (await db.execute(
+            select(DocumentAnalytics).where(DocumentAnalytics.document_id == "d1")
+        )).scalar_one()
+
+    assert search.clicked_results == ["d1", "d2"]
+    assert document.view_count == 3
+    assert document.avg_time_spent == pytest.approx(20.0)
+    assert buffer.get_stats()["events_written"] == 1
+
+
+async def test_failed_group_does_not_drop_the_others(session_factory):
+    buffer = make_buffer()
+    # Missing the required query column: the search_analytics insert fails
+    buffer.add_event(SearchAnalytics, {"id": "bad", "query_hash": "h" * 64})
+    buffer.add_event(SearchQuery, {"id": "q1", "query_text": "what is rag"})
+    buffer.increment_document("d1", "view_count")
+
+    assert await buffer.flush() == 2
+
+    async with session_factory() as db:
+        assert (await db.execute(select(SearchQuery.id))).scalars().all() == ["q1"]
+        assert (await db.execute(select(SearchAnalytics.id))).scalars().all() == []
+        document = (await db.execute(
+            select(DocumentAnalytics).where(DocumentAnalytics.document_id == "d1")
+        )).scalar_one()
+
+    assert document.view_count == 1
+    stats = buffer.get_stats()
+    assert stats["flush_errors"] == 1
+    assert stats["dropped"]["flush_error"] == 1
+    assert stats["events_written"] == 1
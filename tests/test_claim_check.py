@@ -0,0 +1,126 @@
+# tests/test_claim_check.py
+"""Unit tests for claim-check offloading of large task payloads."""
+
+import os
+import time
+
+import pytest
+
+from app.core.claim_check import REFERENCE_MARKER, ClaimCheck, ClaimCheckError, LocalBlobStore
+
+pytestmark = pytest.mark.unit
+
+LARGE_TEXT = "lorem ipsum dolor sit amet " * 100
+
+
+@pytest.fixture
+def claim_check(tmp_path):
+    check = ClaimCheck(enabled=True, threshold=256, backend="local", publish_sample_rate=0.0)
+    check.store = LocalBlobStore(str(tmp_path), ttl=3600)
+    return check
+
+
+def test_small_values_stay_inline(claim_check):
+    value = {"query": "short"}
+
+    assert claim_check.offload(value) is value
+    assert claim_check.offload(42) == 42
+    assert claim_check.offloaded == 0
+
+
+def test_large_value_round_trip(claim_check):
+    value = {"documents": [LARGE_TEXT, LARGE_TEXT], "top_k": 5}
+
+    reference = claim_check.offload(value)
+
+    assert ClaimCheck.is_reference(reference)
+    assert reference["backend"] == "local"
+    assert reference["stored_size"] < reference["size"]
+    assert claim_check.resolve(reference) == value
+
+
+def test_resolve_replaces_nested_references(claim_check):
+    reference = claim_check.offload(LARGE_TEXT)
+    payload = {"inputs": [reference, "inline"], "pair": (1, reference)}
+
+    resolved = claim_check.resolve(payload)
+
+    assert resolved == {"inputs": [LARGE_TEXT, "inline"], "pair": (1, LARGE_TEXT)}
+    assert claim_check.resolved == 2
+
+
+def test_identical_values_share_one_blob(claim_check, tmp_path):
+    first = claim_check.offload(LARGE_TEXT)
+    second = claim_check.offload(LARGE_TEXT)
+
+    assert first[REFERENCE_MARKER] == second[REFERENCE_MARKER]
+    blobs = [name for _, _, files in os.walk(tmp_path) for name in files]
+    assert len(blobs) == 1
+
+
+def test_store_value_stores_small_values(claim_check):
+    reference = claim_check.store_value({"step": 1})
+
+    assert ClaimCheck.is_reference(reference)
+    assert claim_check.resolve(reference) == {"step": 1}
+
+
+def test_missing_blob_raises(claim_check):
+    reference = {REFERENCE_MARKER: "0" * 64, "backend": "local"}
+
+    with pytest.raises(ClaimCheckError):
+        claim_check.resolve({"payload": reference})
+    assert claim_check.missing == 1
+
+
+def test_store_failure_sends_value_inline(claim_check, monkeypatch):
+    def fail(digest, data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(claim_check.store, "put", fail)
+
+    assert claim_check.offload(LARGE_TEXT) == LARGE_TEXT
+    assert claim_check.offload_failures == 1
+
+
+def test_offload_kwargs_sized_measures_what_is_sent(claim_check):
+    kwargs, nbytes = claim_check.offload_kwargs_sized({"query": "short", "context": LARGE_TEXT})
+
+    assert kwargs["query"] == "short"
+    assert ClaimCheck.is_reference(kwargs["context"])
+    # The large argument only contributes its reference
+    assert 0 < nbytes < len(LARGE_TEXT)
+
+
+def test_disabled_claim_check_leaves_kwargs_unmeasured(tmp_path):
+    check = ClaimCheck(enabled=False, backend="local")
+    kwargs = {"context": LARGE_TEXT}
+
+    assert check.offload_kwargs_sized(kwargs) == (kwargs, None)
+    assert check.offload(LARGE_TEXT) == LARGE_TEXT
+
+
+def test_publish_sampling_rate_bounds():
+    assert not ClaimCheck(backend="local", publish_sample_rate=0.0).should_sample_publish()
+    assert ClaimCheck(backend="local", publish_sample_rate=1.0).should_sample_publish()
+
+
+def test_record_publish_stats(claim_check):
+    claim_check.record_publish("app.tasks.run", 100)
+    claim_check.record_publish("app.tasks.run", 300, sampled=True)
+
+    stats = claim_check.get_stats()["broker_bytes_per_task"]["app.tasks.run"]
+    assert stats["messages"] == 2
+    assert stats["sampled"] == 1
+    assert stats["max_bytes"] == 300
+    assert stats["average_bytes"] == 200
+
+
+def test_purge_removes_expired_blobs(tmp_path):
+    store = LocalBlobStore(str(tmp_path), ttl=60)
+    store.put("ab" * 32, b"data")
+    expired = time.time() - 120
+    os.utime(store._path("ab" * 32), (expired, expired))
+
+    assert store.purge_expired() == 1
+    assert store.get("ab" * 32) is None
@@ -0,0 +1,207 @@
+# tests/test_fair_scheduler.py
+"""Unit tests for the fair-share scheduler."""
+
+import asyncio
+
+import pytest
+
+from app.core import fair_scheduler as fair_scheduler_module
+from app.core.exceptions import AgentQueueFullException, AgentQueueTimeoutException
+from app.core.fair_scheduler import ANONYMOUS_USER_ID, FairShareScheduler
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def make_scheduler(capacity: int = 1, per_user_cap: int = 4, max_depth: int = 100,
+                   max_wait: float = 5) -> FairShareScheduler:
+    return FairShareScheduler(capacity=capacity, per_user_cap=per_user_cap,
+                              role_weights={"admin": 4.0, "user": 1.0, "batch": 0.5},
+                              max_depth=max_depth, max_wait=max_wait)
+
+
+async def test_grants_free_slots_without_waiting():
+    scheduler = make_scheduler(capacity=2)
+
+    assert await scheduler.acquire("alice") == 0.0
+    assert await scheduler.acquire("bob") == 0.0
+    assert scheduler.active == 2
+
+    scheduler.release("alice")
+    scheduler.release("bob")
+    assert scheduler.active == 0
+
+
+async def test_anonymous_callers_share_one_user():
+    scheduler = make_scheduler(capacity=2)
+
+    await scheduler.acquire()
+    stats = scheduler.get_stats()
+
+    assert [user["user_id"] for user in stats["users"]] == [ANONYMOUS_USER_ID]
+
+
+def test_weight_for_roles_uses_highest_role():
+    scheduler = make_scheduler()
+
+    assert scheduler.weight_for_roles(None) == 1.0
+    assert scheduler.weight_for_roles(["batch"]) == 0.5
+    assert scheduler.weight_for_roles(["user", "admin"]) == 4.0
+    assert scheduler.weight_for_roles(["unknown"]) == 1.0
+
+
+async def test_per_user_cap_does_not_block_other_users():
+    scheduler = make_scheduler(capacity=2, per_user_cap=1)
+    await scheduler.acquire("alice")
+
+    second_alice = asyncio.create_task(scheduler.acquire("alice"))
+    await asyncio.sleep(0)
+    assert not second_alice.done()
+
+    # Bob is admitted past Alice's queued request, which is held by her cap
+    await asyncio.wait_for(scheduler.acquire("bob"), timeout=1)
+    assert not second_alice.done()
+
+    scheduler.release("alice")
+    await asyncio.wait_for(second_alice, timeout=1)
+    assert scheduler.active == 2
+
+
+async def test_waiters_are_admitted_in_proportion_to_weight():
+    scheduler = make_scheduler(capacity=1)
+    await scheduler.acquire("holder")
+    order = []
+
+    async def request(user_id, roles):
+        await scheduler.acquire(user_id, roles)
+        order.append(user_id)
+        scheduler.release(user_id)
+
+    tasks = []
+    for _ in range(4):
+        tasks.append(asyncio.create_task(request("admin", ["admin"])))
+        tasks.append(asyncio.create_task(request("user", ["user"])))
+    await asyncio.sleep(0)
+    assert scheduler.get_stats()["queued"] == 8
+
+    scheduler.release("holder")
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+
+    # Weight 4 vs 1: the admin's four requests finish (in virtual time) no later than the user's first
+    assert order == ["admin"] * 4 + ["user"] * 4
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = make_scheduler(capacity=1)
+    await scheduler.acquire("alice")
+
+    waiter = asyncio.create_task(scheduler.acquire("bob"))
+    await asyncio.sleep(0)
+    assert scheduler.get_stats()["queued"] == 1
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    stats = scheduler.get_stats()
+    assert stats["queued"] == 0
+    assert next(user for user in stats["users"] if user["user_id"] == "bob")["cancelled"] == 1
+
+    # The freed slot is not handed to the cancelled waiter
+    scheduler.release("alice")
+    assert scheduler.active == 0
+
+
+async def test_rejects_when_queue_is_full():
+    scheduler = make_scheduler(capacity=1, max_depth=1)
+    await scheduler.acquire("alice")
+    waiter = asyncio.create_task(scheduler.acquire("bob"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AgentQueueFullException) as exc_info:
+        await scheduler.acquire("carol")
+
+    assert exc_info.value.retry_after >= 1
+    assert scheduler.rejected == 1
+
+    scheduler.release("alice")
+    await asyncio.wait_for(waiter, timeout=1)
+
+
+async def test_rejected_request_does_not_advance_the_users_tag():
+    scheduler = make_scheduler(capacity=1, max_depth=0)
+    await scheduler.acquire("alice")
+
+    with pytest.raises(AgentQueueFullException):
+        await scheduler.acquire("bob")
+
+    bob = next(user for user in scheduler._users.values() if user.user_id == "bob")
+    assert bob.last_finish_tag == 0.0
+
+
+async def test_times_out_after_max_wait():
+    scheduler = make_scheduler(capacity=1, max_wait=0.05)
+    await scheduler.acquire("alice")
+
+    with pytest.raises(AgentQueueTimeoutException):
+        await scheduler.acquire("bob")
+
+    assert scheduler.timed_out == 1
+    assert scheduler.queued == 0
+
+    # The timed-out waiter is not granted the freed slot
+    scheduler.release("alice")
+    assert scheduler.active == 0
+
+
+async def test_slot_releases_on_error():
+    scheduler = make_scheduler(capacity=1)
+
+    with pytest.raises(RuntimeError):
+        async with scheduler.slot("alice"):
+            assert scheduler.active == 1
+            raise RuntimeError("boom")
+
+    assert scheduler.active == 0
+    alice = scheduler.get_stats()["users"][0]
+    assert alice["granted"] == 1
+    assert alice["completed"] == 1
+
+
+async def test_virtual_clock_resets_when_idle():
+    scheduler = make_scheduler(capacity=1)
+
+    async with scheduler.slot("alice", cost=5):
+        pass
+
+    assert scheduler.virtual_time == 0.0
+    assert scheduler._users["alice"].last_finish_tag == 0.0
+
+
+async def test_idle_users_are_pruned(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(fair_scheduler_module, "time", clock)
+    scheduler = FairShareScheduler(capacity=2, per_user_cap=2, idle_ttl=60)
+
+    async with scheduler.slot("alice"):
+        pass
+    await scheduler.acquire("bob")
+
+    clock.now += 61
+    async with scheduler.slot("carol"):
+        pass
+
+    stats = scheduler.get_stats()
+    # Bob still holds a slot, so only Alice is dropped
+    assert {user["user_id"] for user in stats["users"]} == {"bob", "carol"}
+    assert stats["pruned_users"] == 1
@@ -0,0 +1,176 @@
+# tests/test_idempotency.py
+"""Unit tests for idempotency keys of async orchestrator tasks."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import idempotency
+from app.core.celery_app import celery_app
+from app.core.idempotency import TaskDeduplicator, make_idempotency_key
+
+pytestmark = pytest.mark.unit
+
+INFLIGHT_TTL = 3600
+RESULT_TTL = 600
+CLAIM_TTL = 60
+
+
+class FakeRedis:
+    """The subset of a Redis client the deduplicator uses."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        self.ttls[key] = ex
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def ttl(self, key):
+        return self.ttls.get(key, -2)
+
+    def eval(self, script, numkeys, key, expected, *args):
+        if self.values.get(key) != expected:
+            return None if script == idempotency._COMPARE_AND_SET else 0
+        if script == idempotency._COMPARE_AND_SET:
+            self.values[key], self.ttls[key] = args[0], args[1]
+            return True
+        if script == idempotency._COMPARE_AND_DELETE:
+            del self.values[key]
+            del self.ttls[key]
+        elif script == idempotency._MARK_DISPATCHED:
+            if self.ttls[key] > int(args[1]):
+                return 0
+            self.ttls[key] = args[0]
+        else:
+            self.ttls[key] = args[0]
+        return 1
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(TaskDeduplicator, "_client", lambda self: client)
+    return client
+
+
+@pytest.fixture
+def task_states(monkeypatch):
+    states = {}
+    monkeypatch.setattr(celery_app, "AsyncResult", lambda task_id: SimpleNamespace(state=states[task_id]))
+    return states
+
+
+@pytest.fixture
+def deduplicator():
+    return TaskDeduplicator(enabled=True, inflight_ttl=INFLIGHT_TTL, result_ttl=RESULT_TTL, claim_ttl=CLAIM_TTL)
+
+
+def test_keys_are_scoped_per_user_and_conversation():
+    payload = {"query": "What is RAG?", "conversation_id": "c1"}
+    key = make_idempotency_key("rag_query", payload, user_id="u1")
+
+    assert key == make_idempotency_key("rag_query", dict(payload), user_id="u1")
+    assert key != make_idempotency_key("rag_query", payload, user_id="u2")
+    assert key != make_idempotency_key("rag_query", {**payload, "conversation_id": "c2"}, user_id="u1")
+    assert make_idempotency_key("rag_query", payload, "retry-1", "u1") != \
+        make_idempotency_key("rag_query", payload, "retry-1", "u2")
+
+
+def test_key_for_only_derives_keys_for_authenticated_users(deduplicator):
+    payload = {"query": "What is RAG?"}
+
+    assert deduplicator.key_for("rag_query", payload, user_id="u1") is not None
+    assert deduplicator.key_for("rag_query", payload) is None
+    assert deduplicator.key_for("agent_chat", payload, user_id="u1") is None
+    assert deduplicator.key_for("agent_chat", payload, client_key="retry-1") is not None
+    assert TaskDeduplicator(enabled=False).key_for("rag_query", payload, "retry-1", "u1") is None
+
+
+def test_first_submission_claims_the_key_until_dispatched(redis, deduplicator):
+    assert deduplicator.claim("key", "task-1") == ("task-1", None)
+    assert redis.get("key") == "task-1"
+    assert redis.ttl("key") == CLAIM_TTL
+    assert deduplicator.claimed == 1
+
+    deduplicator.mark_dispatched("key", "task-1")
+    assert redis.ttl("key") == INFLIGHT_TTL
+
+
+@pytest.mark.parametrize("state", ["STARTED", "SUCCESS"])
+def test_duplicate_reuses_running_or_completed_task(redis, task_states, deduplicator, state):
+    deduplicator.claim("key", "task-1")
+    task_states["task-1"] = state
+
+    assert deduplicator.claim("key", "task-2") == ("task-1", state)
+    assert redis.get("key") == "task-1"
+
+
+def test_failed_task_key_is_taken_over(redis, task_states, deduplicator):
+    deduplicator.claim("key", "task-1")
+    task_states["task-1"] = "FAILURE"
+
+    assert deduplicator.claim("key", "task-2") == ("task-2", None)
+    assert redis.get("key") == "task-2"
+    assert deduplicator.replaced == 1
+
+
+def test_queued_task_is_reused_however_long_it_waits(redis, task_states, deduplicator):
+    deduplicator.claim("key", "task-1")
+    deduplicator.mark_dispatched("key", "task-1")
+    task_states["task-1"] = "PENDING"
+    # Waiting in the queue for most of the in-flight TTL
+    redis.ttls["key"] = 10
+
+    assert deduplicator.claim("key", "task-2") == ("task-1", "PENDING")
+    assert redis.get("key") == "task-1"
+
+
+def test_mark_dispatched_keeps_a_settled_key(redis, deduplicator):
+    deduplicator.claim("key", "task-1")
+    # The task finished before the submitter marked it dispatched
+    deduplicator.complete("key", "task-1")
+    deduplicator.mark_dispatched("key", "task-1")
+
+    assert redis.ttl("key") == RESULT_TTL
+
+
+def test_release_only_drops_the_holders_key(redis, deduplicator):
+    deduplicator.claim("key", "task-1")
+
+    deduplicator.release("key", "task-other")
+    assert redis.get("key") == "task-1"
+
+    deduplicator.release("key", "task-1")
+    assert redis.get("key") is None
+
+
+def test_complete_keeps_key_for_reuse_window(redis, deduplicator):
+    deduplicator.claim("key", "task-1")
+    deduplicator.complete("key", "task-1")
+
+    assert redis.ttl("key") == RESULT_TTL
+
+
+def test_complete_without_reuse_window_releases_key(redis):
+    deduplicator = TaskDeduplicator(enabled=True, result_ttl=0)
+    deduplicator.claim("key", "task-1")
+    deduplicator.complete("key", "task-1")
+
+    assert redis.get("key") is None
+
+
+def test_redis_errors_dispatch_without_deduplication(redis, deduplicator, monkeypatch):
+    def fail(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(redis, "set", fail)
+
+    assert deduplicator.claim("key", "task-1") == ("task-1", None)
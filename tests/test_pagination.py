@@ -0,0 +1,138 @@
+# tests/test_pagination.py
+"""Unit tests for keyset pagination cursors and the count cache."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Column, DateTime, String, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.services.pagination import (
+    CountCache, InvalidCursorError, decode_cursor, encode_cursor, keyset_page
+)
+
+pytestmark = pytest.mark.unit
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id = Column(String, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+# Timestamps as SQLite stores them: server defaults write no microseconds,
+# SQLAlchemy writes six digits, and several rows share a timestamp
+RAW_ROWS = [
+    ("r1", "2024-01-01 10:00:00"),
+    ("r2", "2024-01-01 10:00:00"),
+    ("r3", "2024-01-01 10:00:00"),
+    ("r4", "2024-01-01 10:00:00.500000"),
+    ("r5", "2024-01-01 10:00:01"),
+    ("r6", "2024-01-01 10:00:01"),
+]
+
+
+@pytest.fixture
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/pagination.db")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(
+            text("INSERT INTO items (id, created_at) VALUES (:id, :created_at)"),
+            [{"id": row_id, "created_at": created_at} for row_id, created_at in RAW_ROWS]
+        )
+        await connection.execute(insert(Item), [
+            {"id": "r7", "created_at": datetime(2024, 1, 1, 10, 0, 0)},
+            {"id": "r8", "created_at": datetime(2024, 1, 1, 10, 0, 1, 250000)},
+        ])
+    async with AsyncSession(engine) as session:
+        yield session
+    await engine.dispose()
+
+
+async def walk(db: AsyncSession, limit: int, descending: bool = False):
+    ids, cursor = [], None
+    while True:
+        items, cursor, has_more = await keyset_page(
+            db, select(Item), Item.created_at, Item.id, limit, cursor=cursor, descending=descending
+        )
+        ids.extend(item.id for item in items)
+        assert has_more == (cursor is not None)
+        if not has_more:
+            return ids
+
+
+@pytest.mark.parametrize("value", [
+    datetime(2024, 1, 1, 10, 0, 0, 123456),
+    "2024-01-01 10:00:00",
+    42,
+])
+def test_cursor_round_trip(value):
+    cursor = encode_cursor(value, "row-1")
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (value, "row-1")
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", encode_cursor("x", "y")[:-3]])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("limit", [1, 2, 3, 10])
+async def test_sqlite_walk_returns_every_row_once(db, limit, descending):
+    order = (Item.created_at.desc(), Item.id.desc()) if descending else (Item.created_at, Item.id)
+    expected = list((await db.execute(select(Item.id).order_by(*order))).scalars())
+
+    ids = await walk(db, limit, descending)
+
+    assert ids == expected
+    assert len(set(ids)) == len(RAW_ROWS) + 2
+
+
+async def test_sqlite_cursor_holds_the_stored_text(db):
+    _, cursor, _ = await keyset_page(db, select(Item), Item.created_at, Item.id, 2)
+
+    assert decode_cursor(cursor) == ("2024-01-01 10:00:00", "r2")
+
+
+async def test_sqlite_rejects_datetime_cursor(db):
+    cursor = encode_cursor(datetime(2024, 1, 1, 10, 0, 0), "r1")
+
+    with pytest.raises(InvalidCursorError):
+        await keyset_page(db, select(Item), Item.created_at, Item.id, 2, cursor=cursor)
+
+
+def test_count_cache_hits_and_invalidation():
+    cache = CountCache(ttl=60, max_entries=2)
+    key = CountCache.make_key("documents", {"user": "u1", "type": None})
+
+    assert cache.get(key) is None
+    cache.set(key, 7)
+    assert cache.get(key) == 7
+
+    cache.invalidate("documents")
+    assert cache.get(key) is None
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_count_cache_evicts_oldest_entry():
+    cache = CountCache(ttl=60, max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.set(CountCache.make_key(name, {}), 1)
+
+    assert cache.get(CountCache.make_key("a", {})) is None
+    assert cache.get(CountCache.make_key("c", {})) == 1
+
+
+def test_count_cache_disabled_with_zero_ttl():
+    cache = CountCache(ttl=0)
+    cache.set("documents:{}", 3)
+
+    assert cache.get("documents:{}") is None
@@ -0,0 +1,47 @@
+# tests/test_query_plans.py
+"""Query-plan regression tests for the hot queries in scripts/check_query_plans.py (SQLite)."""
+
+from argparse import Namespace
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database.database import Base
+from scripts.check_query_plans import CHECKS, explain, plan_problems, run_checks, seed_database
+
+pytestmark = pytest.mark.unit
+
+SEED = {"conversations": 50, "messages": 5, "documents": 50, "chunks": 5, "searches": 200}
+
+
+@pytest.fixture
+async def seeded(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/query_plans.db")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        seed = await seed_database(connection, **SEED)
+    async with engine.connect() as connection:
+        yield connection, seed
+    await engine.dispose()
+
+
+@pytest.mark.parametrize("check", CHECKS, ids=[check.name for check in CHECKS])
+async def test_hot_query_uses_its_index(seeded, check):
+    connection, seed = seeded
+    plan = await explain(connection, check.build(seed))
+    assert plan_problems(check, plan, "sqlite") == [], "\n".join(plan)
+
+
+def test_plan_problems_flags_scans_and_sorts():
+    check = CHECKS[0]
+    plan = [f"SCAN {check.table}", "USE TEMP B-TREE FOR ORDER BY"]
+    assert plan_problems(check, plan, "sqlite") == [
+        f"index {check.index} not used",
+        f"full scan of {check.table}",
+        "sorts rows instead of reading them in index order",
+    ]
+
+
+async def test_run_checks_passes(tmp_path):
+    args = Namespace(verbose=False, **SEED)
+    assert await run_checks(f"sqlite+aiosqlite:///{tmp_path}/run_checks.db", args)
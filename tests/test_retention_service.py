@@ -0,0 +1,194 @@
+# tests/test_retention_service.py
+"""Unit tests for the retention engine."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.database.database import Base
+from app.database.models import AnalyticsRollup, Document, DocumentChunk, SearchAnalytics, SearchQuery
+from app.services.retention_service import RetentionEngine, RetentionPolicy
+
+pytestmark = pytest.mark.unit
+
+
+def days_ago(days: int) -> datetime:
+    return datetime.utcnow() - timedelta(days=days)
+
+
+@pytest.fixture
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/retention.db")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        yield session
+    await engine.dispose()
+
+
+async def count(db: AsyncSession, model, *conditions) -> int:
+    return (await db.execute(select(func.count()).select_from(model).where(*conditions))).scalar()
+
+
+async def add_queries(db: AsyncSession, ages):
+    await db.execute(insert(SearchQuery), [
+        {"id": f"q{i}", "query_text": "query", "created_at": days_ago(age)} for i, age in enumerate(ages)
+    ])
+    await db.commit()
+
+
+async def add_document(db: AsyncSession, doc_id: str, updated_days_ago: int, is_active: bool):
+    await db.execute(insert(Document), [{
+        "id": doc_id, "user_id": "u1", "title": doc_id, "content": "text",
+        "is_active": is_active, "updated_at": days_ago(updated_days_ago)
+    }])
+    await db.execute(insert(DocumentChunk), [
+        {"document_id": doc_id, "content": "chunk", "chunk_index": i, "chunk_size": 5} for i in range(2)
+    ])
+    await db.commit()
+
+
+QUERIES = RetentionPolicy("search_queries", SearchQuery, 30)
+DOCUMENTS = RetentionPolicy("documents", Document, 30, action="purge", timestamp_column="updated_at")
+
+
+async def test_delete_removes_only_expired_rows_in_batches(db):
+    await add_queries(db, [40, 45, 50, 60, 70, 10, 1])
+    engine = RetentionEngine(db, [QUERIES], batch_size=2, batch_pause=0)
+
+    report = await engine.apply(QUERIES)
+
+    assert report["status"] == "completed"
+    assert report["rows_removed"] == 5
+    assert report["batches"] == 3
+    assert report["complete"] is True
+    assert await count(db, SearchQuery) == 2
+
+
+async def test_max_batches_leaves_the_rest_for_the_next_run(db):
+    await add_queries(db, [40, 45, 50, 60, 70])
+    engine = RetentionEngine(db, [QUERIES], batch_size=2, batch_pause=0, max_batches=1)
+
+    report = await engine.apply(QUERIES)
+
+    assert report["rows_removed"] == 2
+    assert report["complete"] is False
+    # Oldest rows go first
+    assert await count(db, SearchQuery, SearchQuery.created_at < days_ago(55)) == 0
+
+
+async def test_dry_run_counts_without_deleting(db):
+    await add_queries(db, [40, 45, 10])
+    engine = RetentionEngine(db, [QUERIES], batch_pause=0)
+
+    report = await engine.apply(QUERIES, dry_run=True)
+
+    assert report["status"] == "dry_run"
+    assert report["rows_eligible"] == 2
+    assert await count(db, SearchQuery) == 3
+
+
+async def test_override_shortens_delete_policies(db):
+    await add_queries(db, [40, 10, 1])
+    engine = RetentionEngine(db, [QUERIES], batch_pause=0)
+
+    report = await engine.apply(QUERIES, retention_days=7)
+
+    assert report["retention_days"] == 7
+    assert report["rows_removed"] == 2
+
+
+async def test_aggregate_writes_rollups_before_deleting(db):
+    policy = RetentionPolicy(
+        "search_analytics", SearchAnalytics, 30, action="aggregate", dimension="search_type",
+        average_columns=["execution_time_ms"], sum_columns=["results_count"]
+    )
+    old = days_ago(40).replace(hour=12)
+    await db.execute(insert(SearchAnalytics), [
+        {"query": "a", "query_hash": "h", "search_type": "semantic", "results_count": 3,
+         "execution_time_ms": 10.0, "created_at": old},
+        {"query": "b", "query_hash": "h", "search_type": "semantic", "results_count": 5,
+         "execution_time_ms": 30.0, "created_at": old},
+        {"query": "c", "query_hash": "h", "search_type": "hybrid", "results_count": 1,
+         "execution_time_ms": 5.0, "created_at": old},
+        {"query": "d", "query_hash": "h", "search_type": "hybrid", "results_count": 1,
+         "execution_time_ms": 5.0, "created_at": days_ago(1)},
+    ])
+    await db.commit()
+    engine = RetentionEngine(db, [policy], batch_pause=0)
+
+    report = await engine.apply(policy)
+
+    assert report["rows_removed"] == 3
+    assert report["rollups_written"] == 2
+    assert await count(db, SearchAnalytics) == 1
+    rollups = {
+        rollup.dimension: rollup
+        for rollup in (await db.execute(select(AnalyticsRollup))).scalars().all()
+    }
+    assert rollups["semantic"].event_count == 2
+    assert rollups["semantic"].period == old.strftime("%Y-%m-%d")
+    assert rollups["semantic"].metrics == {"avg_execution_time_ms": 20.0, "total_results_count": 8.0}
+    assert rollups["hybrid"].event_count == 1
+
+
+async def test_purge_removes_only_old_soft_deleted_documents(db):
+    await add_document(db, "deleted-old", 40, is_active=False)
+    await add_document(db, "deleted-recent", 10, is_active=False)
+    await add_document(db, "active-old", 40, is_active=True)
+    engine = RetentionEngine(db, [DOCUMENTS], batch_pause=0)
+
+    report = await engine.apply(DOCUMENTS)
+
+    assert report["rows_removed"] == 1
+    assert await count(db, Document, Document.id == "deleted-old") == 0
+    assert await count(db, DocumentChunk, DocumentChunk.document_id == "deleted-old") == 0
+    assert await count(db, DocumentChunk) == 4
+
+
+@pytest.mark.parametrize("override", [0, 1, 7])
+async def test_override_never_shortens_purge_policies(db, override):
+    await add_document(db, "deleted-recent", 10, is_active=False)
+    engine = RetentionEngine(db, [DOCUMENTS], batch_pause=0)
+
+    report = await engine.apply(DOCUMENTS, retention_days=override)
+
+    assert report["retention_days"] == 30
+    assert report["rows_removed"] == 0
+    assert await count(db, Document) == 1
+
+
+async def test_override_lengthens_purge_policies(db):
+    await add_document(db, "deleted-old", 40, is_active=False)
+    engine = RetentionEngine(db, [DOCUMENTS], batch_pause=0)
+
+    report = await engine.apply(DOCUMENTS, retention_days=60)
+
+    assert report["retention_days"] == 60
+    assert report["rows_removed"] == 0
+
+
+async def test_override_never_enables_a_disabled_purge_policy(db):
+    await add_document(db, "deleted-old", 40, is_active=False)
+    policy = RetentionPolicy("documents", Document, 0, action="purge", timestamp_column="updated_at")
+    engine = RetentionEngine(db, [policy], batch_pause=0)
+
+    report = await engine.apply(policy, retention_days=1)
+
+    assert report["status"] == "disabled"
+    assert await count(db, Document) == 1
+
+
+async def test_run_applies_selected_tables(db):
+    await add_queries(db, [40])
+    await add_document(db, "deleted-old", 40, is_active=False)
+    engine = RetentionEngine(db, [QUERIES, DOCUMENTS], batch_pause=0)
+
+    report = await engine.run(tables=["search_queries"])
+
+    assert list(report["tables"]) == ["search_queries"]
+    assert report["total_rows_removed"] == 1
+    assert report["status"] == "completed"
+    assert await count(db, Document) == 1
@@ -0,0 +1,95 @@
+# tests/test_step_cache.py
+"""Unit tests for the workflow step result cache."""
+
+import pytest
+
+from app.core import step_cache
+from app.core.step_cache import StepResultCache, make_step_cache_key, normalize_step_input
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(step_cache, "time", fake)
+    return fake
+
+
+def test_normalize_step_input():
+    assert normalize_step_input("  What is   RAG?\n") == "what is rag"
+    assert normalize_step_input(None) == ""
+
+
+def test_key_ignores_trivial_input_differences():
+    first = make_step_cache_key("research", {"topic": "Vector  databases?"}, "researcher:v1", "gpt-4")
+    second = make_step_cache_key("research", {"topic": "vector databases"}, "researcher:v1", "gpt-4")
+
+    assert first == second
+
+
+@pytest.mark.parametrize("changed", [
+    ("analysis", {"topic": "vector databases"}, "researcher:v1", "gpt-4"),
+    ("research", {"topic": "graph databases"}, "researcher:v1", "gpt-4"),
+    ("research", {"topic": "vector databases"}, "researcher:v2", "gpt-4"),
+    ("research", {"topic": "vector databases"}, "researcher:v1", "llama3"),
+])
+def test_key_depends_on_step_input_agent_and_model(changed):
+    base = make_step_cache_key("research", {"topic": "vector databases"}, "researcher:v1", "gpt-4")
+
+    assert make_step_cache_key(*changed) != base
+
+
+def test_get_returns_stored_output(clock):
+    cache = StepResultCache(ttl=60, max_entries=10, enabled=True)
+    cache.set("key", "findings")
+
+    assert cache.get("key") == "findings"
+    assert cache.get("other") is None
+    assert cache.get_stats()["hit_rate"] == 0.5
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = StepResultCache(ttl=60, max_entries=10, enabled=True)
+    cache.set("key", "findings")
+
+    clock.now += 61
+
+    assert cache.get("key") is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = StepResultCache(ttl=60, max_entries=2, enabled=True)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.evictions == 1
+
+
+def test_empty_outputs_are_not_cached(clock):
+    cache = StepResultCache(ttl=60, max_entries=10, enabled=True)
+    cache.set("key", "")
+
+    assert cache.get("key") is None
+
+
+@pytest.mark.parametrize("ttl, enabled", [(60, False), (0, True)])
+def test_disabled_cache_stores_nothing(clock, ttl, enabled):
+    cache = StepResultCache(ttl=ttl, max_entries=10, enabled=enabled)
+    cache.set("key", "findings")
+
+    assert cache.get("key") is None
+    assert cache.get_stats()["enabled"] is False